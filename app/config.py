@@ -50,7 +50,7 @@ DEFAULT_PC_IP = "192.168.2.1"
 # UI configuration
 DEFAULT_WINDOW_WIDTH = 1200
 DEFAULT_WINDOW_HEIGHT = 800
-MAX_TABLE_ROWS = 1000
+MAX_LIVE_TABLE_ROWS = 1_000_000  # Rows kept in the data table during real-time acquisition
 
 # Data acquisition
 MAX_DEVICES = 5
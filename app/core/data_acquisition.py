@@ -11,9 +11,12 @@ from dataclasses import dataclass
 from typing import Any, Callable
 
 import numpy as np
-from PySide6.QtCore import QObject, Signal, QTimer
+from PySide6.QtCore import QObject, Qt, Signal
 
 from app import config
+from app.core.device_capabilities import CapabilityCache
+from app.core.sample_queue import OverflowPolicy, SampleQueue
+from app.core.settings_manager import get_settings_manager
 
 
 @dataclass
@@ -27,11 +30,28 @@ class RealTimeData:
 
 
 class DataAcquisition(QObject):
-    """Handle real-time data acquisition from connected devices."""
+    """Handle real-time data acquisition from connected devices.
+
+    Device I/O runs on a dedicated worker thread that owns the connection
+    while acquiring. Results go into a bounded ``SampleQueue``; the worker
+    posts at most one queued notification, and the GUI thread drains the
+    queue and emits ``data_received`` for each item. A stalled GUI therefore
+    never accumulates more than ``queue_capacity`` results.
+    """
     
     # Signals for thread-safe communication
     data_received = Signal(str, object)  # device_id, RealTimeData
+    acquisition_started = Signal(str)    # device_id, device initialized
+    acquisition_failed = Signal(str, str)  # device_id, error_message
     error_occurred = Signal(str, str)    # device_id, error_message
+    queue_high_watermark = Signal(int, int)  # queued results, queue capacity
+
+    # Internal: results are waiting in the queue
+    _data_ready = Signal()
+
+    # Extra time added to the measured round trip before the next request,
+    # leaving the connection idle briefly for commands from the UI
+    ROUND_TRIP_HEADROOM = 0.1
     
     def __init__(self, device_manager):
         """Initialize data acquisition.
@@ -44,14 +64,22 @@ class DataAcquisition(QObject):
         self.is_acquiring = False
         self.logger = logging.getLogger(__name__)
         
-        # QTimer for thread-safe acquisition
-        self.acquisition_timer = QTimer()
-        self.acquisition_timer.timeout.connect(self._acquisition_tick)
+        # Worker thread performing all device I/O while acquiring
+        self._worker: threading.Thread | None = None
+        self._stop_event = threading.Event()
         self.current_device_id = None
         
         # Data buffer settings
         self.buffer_size = 1000  # Number of points to keep in buffer
-        self.acquisition_interval = 0.1  # Seconds between data requests
+        self.acquisition_interval = 0.1  # Minimum seconds between data requests
+        self.round_trip_time = 0.0  # Smoothed duration of one data request
+        
+        # Results waiting for the GUI thread; snapshots are coalesced to the
+        # latest one by default because only the newest is displayed
+        self.queue = self._create_queue(64, "coalesce")
+        self._next_queue: SampleQueue | None = None  # Installed by the next start
+        self._delivery_pending = False
+        self._data_ready.connect(self._deliver, Qt.ConnectionType.QueuedConnection)
         
         # Channel configuration (will be detected from device)
         self.active_channels = []
@@ -60,6 +88,7 @@ class DataAcquisition(QObject):
         
         # Cached active channels (discovered during first acquisition)
         self.discovered_channels = None  # Will be populated on first scan
+        self.capability_cache: CapabilityCache | None = None  # Created on first use
         
     
     def start_acquisition(self, device_id: str | None = None) -> bool:
@@ -68,8 +97,11 @@ class DataAcquisition(QObject):
         Args:
             device_id: Specific device ID, or None for all connected devices
             
+        Device initialization runs on the worker thread; its outcome is
+        reported later by ``acquisition_started`` or ``acquisition_failed``.
+
         Returns:
-            True if acquisition started successfully
+            True if the worker thread was started
         """
         if self.is_acquiring:
             return False
@@ -87,49 +119,118 @@ class DataAcquisition(QObject):
             self._notify_error(target_device, "Device not connected")
             return False
         
-        # Initialize acquisition
-        if not self._initialize_acquisition(target_device):
+        # A previous worker may still be finishing its last request
+        if self._worker and self._worker.is_alive():
+            self._notify_error(target_device, "Previous acquisition is still stopping")
             return False
         
-        # Start acquisition using QTimer (thread-safe)
+        # Initialization and polling both run on the worker thread
         self.is_acquiring = True
         self.current_device_id = target_device
-        
-        # Start timer with 2 second interval (给足够时间完成数据采集)
-        self.acquisition_timer.start(2000)  # 2000ms = 2 seconds
-        print(f"Started acquisition timer for device: {target_device}")
-        print(f"采集间隔: 2秒（首次扫描较慢，后续会加快）")
+        self.round_trip_time = 0.0
+        if self._next_queue is not None:
+            self.queue, self._next_queue = self._next_queue, None
+        self.queue.reopen()
+        self._stop_event = threading.Event()
+        self._worker = threading.Thread(
+            target=self._acquisition_worker,
+            args=(target_device, self._stop_event),
+            name="data-acquisition",
+            daemon=True
+        )
+        self._worker.start()
+        print(f"Started acquisition worker for device: {target_device}")
         
         return True
     
     def stop_acquisition(self) -> None:
-        """Stop data acquisition."""
+        """Stop data acquisition.
+
+        Returns without waiting for a request in progress; the worker exits
+        after it and emits nothing more. Results still queued are discarded.
+        """
         self.is_acquiring = False
+        self._stop_event.set()
+        self.queue.close()
+        self.queue.clear()
         
-        # Stop timer
-        if self.acquisition_timer.isActive():
-            self.acquisition_timer.stop()
-            print("Stopped acquisition timer")
+        if self._worker and self._worker.is_alive():
+            self._worker.join(timeout=0.2)
+            print("Stopped acquisition worker")
         
         self.current_device_id = None
     
-    def _acquisition_tick(self):
-        """Timer callback for data acquisition (thread-safe)."""
-        if not self.is_acquiring or not self.current_device_id:
+    def _acquisition_worker(self, device_id: str, stop_event: threading.Event) -> None:
+        """Acquisition loop running on the worker thread.
+
+        The request period follows the measured round-trip time: the next
+        request starts as soon as the previous one finished plus a small
+        headroom, but never sooner than ``acquisition_interval``.
+
+        Args:
+            device_id: Device identifier
+            stop_event: Set by ``stop_acquisition`` to end this worker
+        """
+        if not self._initialize_acquisition(device_id):
+            self.is_acquiring = False
+            if not stop_event.is_set():
+                self.acquisition_failed.emit(device_id, "Device initialization failed")
             return
-            
-        try:
-            # Get real-time data
-            real_time_data = self._get_real_time_data(self.current_device_id)
-            
+        if stop_event.is_set():
+            return
+        # Queued before any data, so the UI is ready when the first result arrives
+        self.acquisition_started.emit(device_id)
+
+        while not stop_event.is_set():
+            started = time.monotonic()
+            try:
+                real_time_data = self._get_real_time_data(device_id)
+            except Exception as e:
+                real_time_data = None
+                if not stop_event.is_set():
+                    self._notify_error(device_id, f"Acquisition error: {e}")
+
+            elapsed = time.monotonic() - started
+            if self.round_trip_time == 0.0:
+                self.round_trip_time = elapsed
+            else:
+                self.round_trip_time = 0.8 * self.round_trip_time + 0.2 * elapsed
+
+            if stop_event.is_set():
+                break
             if real_time_data:
-                # Emit signal (thread-safe)
-                self.data_received.emit(self.current_device_id, real_time_data)
+                self._publish(device_id, real_time_data)
             else:
-                self.error_occurred.emit(self.current_device_id, "No data received")
-                
-        except Exception as e:
-            self.error_occurred.emit(self.current_device_id, f"Acquisition error: {e}")
+                self._notify_error(device_id, "No data received")
+
+            period = max(self.acquisition_interval,
+                         self.round_trip_time * (1.0 + self.ROUND_TRIP_HEADROOM))
+            stop_event.wait(max(0.0, period - elapsed))
+
+    def _create_queue(self, capacity: int, policy: OverflowPolicy) -> SampleQueue:
+        return SampleQueue(capacity, policy, on_high_watermark=self.queue_high_watermark.emit)
+
+    def _publish(self, device_id: str, data: RealTimeData) -> None:
+        """Queue a result and notify the GUI thread if it is not already due."""
+        self.queue.put((device_id, data))
+        if not self._delivery_pending:
+            self._delivery_pending = True
+            self._data_ready.emit()
+
+    def _deliver(self) -> None:
+        """Emit all queued results (runs on the GUI thread)."""
+        # Cleared before draining so a result queued afterwards notifies again
+        self._delivery_pending = False
+        if not self.is_acquiring:
+            self.queue.clear()
+            return
+        for device_id, data in self.queue.drain():
+            self.data_received.emit(device_id, data)
+
+    def _notify_error(self, device_id: str, message: str) -> None:
+        """Report an error to the UI (safe to call from the worker thread)."""
+        self.logger.error(f"{device_id}: {message}")
+        self.error_occurred.emit(device_id, message)
     
     def _initialize_acquisition(self, device_id: str) -> bool:
         """\u6839\u636eAPI\u6587\u6863\u521d\u59cb\u5316\u8bbe\u5907\u6570\u636e\u91c7\u96c6
@@ -221,6 +322,10 @@ class DataAcquisition(QObject):
                 time.sleep(0.3)  # 等待设备准备数据
                 
                 # Step 2: 扫描通道（首次全扫描，后续只查询有效通道）
+                # 已知设备直接使用缓存的记录通道，跳过首次扫描
+                if self.discovered_channels is None:
+                    self.discovered_channels = self._load_cached_channels(device_id)
+
                 if self.discovered_channels is None:
                     # 首次扫描：全面扫描发现有效通道
                     print("首次扫描：发现有效通道...")
@@ -261,6 +366,7 @@ class DataAcquisition(QObject):
                     if channel_data:
                         self.discovered_channels = list(channel_data.keys())
                         print(f"\n✓ 发现 {len(self.discovered_channels)} 个有效通道，后续只查询这些通道")
+                        self._store_capabilities(device_id, self.discovered_channels)
                 else:
                     # 后续采集：只查询已发现的有效通道（快速）
                     for channel in self.discovered_channels:
@@ -320,6 +426,62 @@ class DataAcquisition(QObject):
             except:
                 return None
     
+    def _get_capability_cache(self) -> CapabilityCache:
+        """Return the device capability cache in the settings directory."""
+        if self.capability_cache is None:
+            self.capability_cache = CapabilityCache(get_settings_manager().config_dir)
+        return self.capability_cache
+
+    def _load_cached_channels(self, device_id: str) -> list[str] | None:
+        """Return the cached stored channels of a known device.
+
+        Args:
+            device_id: Device identifier
+
+        Returns:
+            Channel list, or None if the device is unknown or its units changed
+        """
+        device = self.device_manager.get_connected_devices().get(device_id)
+        if device is None or not device.serial:
+            return None
+
+        cache = self._get_capability_cache()
+        cached = cache.lookup(device.serial, device.firmware)
+        if cached is None:
+            return None
+
+        def query(command: str) -> str:
+            return self.device_manager.query_device(device_id, command)
+
+        if not cache.revalidate(cached, query):
+            return None
+
+        channels = cached.all_stored_channels()
+        if not channels:
+            return None
+        print(f"✓ 使用缓存的通道信息: {len(channels)} 个通道")
+        return channels
+
+    def _store_capabilities(self, device_id: str, channels: list[str]) -> None:
+        """Save the units and stored channels found by the first scan.
+
+        Args:
+            device_id: Device identifier
+            channels: Channels that returned data
+        """
+        device = self.device_manager.get_connected_devices().get(device_id)
+        if device is None or not device.serial:
+            return
+
+        units = sorted({int(channel[2:].split("_")[0])
+                        for channel in channels if channel.startswith("CH")})
+        cache = self._get_capability_cache()
+        capabilities = cache.read(
+            lambda command: self.device_manager.query_device(device_id, command),
+            device.serial, device.firmware, device.model, units)
+        if capabilities:
+            cache.store(capabilities)
+
     def _get_channel_binary_data(self, device_id: str, channel: str) -> np.ndarray | None:
         """Get binary data for a specific channel.
         
@@ -420,19 +582,42 @@ class DataAcquisition(QObject):
             "active_channels": self.active_channels,
             "sample_rate": self.sample_rate,
             "buffer_size": self.buffer_size,
-            "acquisition_interval": self.acquisition_interval
+            "acquisition_interval": self.acquisition_interval,
+            "round_trip_time": self.round_trip_time,
+            "queue": self.queue.stats()
         }
     
     def set_acquisition_parameters(self, sample_rate: float = None, 
                                  buffer_size: int = None,
-                                 interval: float = None) -> None:
+                                 interval: float = None,
+                                 queue_capacity: int = None,
+                                 overflow_policy: OverflowPolicy = None) -> None:
         """Set acquisition parameters.
         
         Args:
             sample_rate: Sampling rate in Hz
             buffer_size: Buffer size in samples
             interval: Acquisition interval in seconds
+            queue_capacity: Maximum results waiting for the GUI thread
+            overflow_policy: "block", "drop_oldest" or "coalesce"; applies
+                when the queue is full
+
+        The worker publishes into the queue, so a new queue is not swapped in
+        while acquiring or while a stopped worker is still finishing; it is
+        installed by the next ``start_acquisition`` instead.
+
+        Raises:
+            ValueError: If the queue capacity or policy is invalid
         """
+        if queue_capacity is not None or overflow_policy is not None:
+            current = self._next_queue or self.queue
+            queue = self._create_queue(queue_capacity or current.capacity,
+                                       overflow_policy or current.policy)
+            if self.is_acquiring or (self._worker and self._worker.is_alive()):
+                self._next_queue = queue
+            else:
+                self.queue, self._next_queue = queue, None
+            
         if sample_rate is not None:
             self.sample_rate = sample_rate
             
@@ -0,0 +1,215 @@
+# -*- coding: utf-8 -*-
+"""Persistent cache of installed units and stored channels per device."""
+
+from __future__ import annotations
+
+import json
+import logging
+import re
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Callable
+
+# Measurement channels per unit model
+UNIT_CHANNEL_COUNTS = {
+    "U8550": 15,
+    "U8551": 15,
+    "U8552": 30,
+    "U8553": 5,
+    "U8554": 5,
+}
+
+_UNIT_IDN_PATTERN = re.compile(r"^UNIT(\d+),")
+
+
+@dataclass
+class DeviceCapabilities:
+    """Installed units and stored channels of one device."""
+
+    serial: str
+    firmware: str
+    model: str = ""
+    units: dict[int, str] = field(default_factory=dict)  # unit -> :UNIT:IDN? response
+    stored_channels: dict[int, list[str]] = field(default_factory=dict)
+    updated_at: float = 0.0
+
+    @property
+    def installed_units(self) -> list[int]:
+        """Unit numbers with a module installed."""
+        return sorted(self.units)
+
+    def channel_count(self, unit: int) -> int:
+        """Number of measurement channels of ``unit`` (0 if unknown)."""
+        parts = self.units.get(unit, "").split(",")
+        model = parts[1].strip() if len(parts) > 1 else ""
+        return UNIT_CHANNEL_COUNTS.get(model, 0)
+
+    @property
+    def channel_counts(self) -> dict[int, int]:
+        return {unit: self.channel_count(unit) for unit in self.installed_units}
+
+    def all_stored_channels(self) -> list[str]:
+        """Stored channels of all units in unit order."""
+        return [channel
+                for unit in self.installed_units
+                for channel in self.stored_channels.get(unit, [])]
+
+    def to_dict(self) -> dict:
+        data = asdict(self)
+        # JSON object keys are strings
+        data["units"] = {str(k): v for k, v in self.units.items()}
+        data["stored_channels"] = {str(k): v for k, v in self.stored_channels.items()}
+        return data
+
+    @classmethod
+    def from_dict(cls, data: dict) -> DeviceCapabilities:
+        return cls(
+            serial=data["serial"],
+            firmware=data["firmware"],
+            model=data.get("model", ""),
+            units={int(k): v for k, v in data.get("units", {}).items()},
+            stored_channels={int(k): list(v) for k, v in data.get("stored_channels", {}).items()},
+            updated_at=data.get("updated_at", 0.0),
+        )
+
+
+def parse_idn(idn: str | None) -> tuple[str, str, str] | None:
+    """Split a ``*IDN?`` response into (model, serial, firmware).
+
+    Returns:
+        Tuple of strings, or None if the response has no serial number
+    """
+    if not idn:
+        return None
+    parts = [part.strip() for part in idn.split(",")]
+    if len(parts) < 3 or not parts[2]:
+        return None
+    firmware = parts[3] if len(parts) > 3 else ""
+    return parts[1], parts[2], firmware
+
+
+class CapabilityCache:
+    """On-disk cache of device capabilities keyed by serial number.
+
+    An entry is only used when the firmware version still matches and a
+    single compound query confirms that the cached units are still
+    installed. Reconnecting a known device then skips slot-by-slot module
+    detection and the channel scan.
+    """
+
+    FILE_NAME = "device_capabilities.json"
+
+    def __init__(self, config_dir: str | Path):
+        """Initialize the cache.
+
+        Args:
+            config_dir: Application config directory holding the cache file
+        """
+        self.logger = logging.getLogger(__name__)
+        self.config_dir = Path(config_dir)
+        self.cache_file = self.config_dir / self.FILE_NAME
+        self._entries = self._load()
+
+    def _load(self) -> dict[str, dict]:
+        try:
+            if self.cache_file.exists():
+                with open(self.cache_file, "r", encoding="utf-8") as f:
+                    return json.load(f)
+        except Exception as e:
+            self.logger.warning(f"Failed to load device capabilities: {e}")
+        return {}
+
+    def _save(self) -> None:
+        try:
+            self.config_dir.mkdir(parents=True, exist_ok=True)
+            with open(self.cache_file, "w", encoding="utf-8") as f:
+                json.dump(self._entries, f, indent=2, ensure_ascii=False)
+        except Exception as e:
+            self.logger.error(f"Failed to save device capabilities: {e}")
+
+    def lookup(self, serial: str, firmware: str) -> DeviceCapabilities | None:
+        """Return cached capabilities if the firmware version still matches."""
+        data = self._entries.get(serial)
+        if not data:
+            return None
+        try:
+            capabilities = DeviceCapabilities.from_dict(data)
+        except (KeyError, TypeError, ValueError):
+            return None
+        if capabilities.firmware != firmware:
+            return None
+        return capabilities
+
+    def store(self, capabilities: DeviceCapabilities) -> None:
+        """Save capabilities for their serial number."""
+        capabilities.updated_at = time.time()
+        self._entries[capabilities.serial] = capabilities.to_dict()
+        self._save()
+
+    def invalidate(self, serial: str) -> None:
+        """Remove the entry for ``serial``."""
+        if self._entries.pop(serial, None) is not None:
+            self._save()
+
+    @staticmethod
+    def read(query: Callable[[str], str | None], serial: str, firmware: str,
+             model: str, units: list[int]) -> DeviceCapabilities | None:
+        """Read unit IDs and stored channels of ``units`` in one round trip.
+
+        Args:
+            query: Function sending one query and returning the response line
+            serial: Device serial number
+            firmware: Device firmware version
+            model: Device model
+            units: Unit numbers known to be installed
+
+        Returns:
+            Capabilities, or None if any of the units did not answer
+        """
+        if not units:
+            return None
+
+        command = ";".join(
+            f":UNIT:IDN? UNIT{unit};:MEMory:TARCH? UNIT{unit}" for unit in units)
+        response = query(command)
+        if not response:
+            return None
+
+        capabilities = DeviceCapabilities(serial=serial, firmware=firmware, model=model)
+        current_unit = None
+        for item in response.split(";"):
+            item = item.strip()
+            match = _UNIT_IDN_PATTERN.match(item)
+            if match:
+                current_unit = int(match.group(1))
+                capabilities.units[current_unit] = item
+            elif current_unit is not None and item:
+                # A unit without stored channels answers :TARCH? with an error
+                capabilities.stored_channels[current_unit] = [
+                    channel.strip() for channel in item.split(",") if channel.strip()]
+
+        if sorted(capabilities.units) != sorted(units):
+            return None
+        return capabilities
+
+    def revalidate(self, capabilities: DeviceCapabilities,
+                   query: Callable[[str], str | None]) -> bool:
+        """Check a cached entry against the device with one query.
+
+        The stored-channel map is refreshed from the same response. The entry
+        is removed if the installed units changed.
+
+        Returns:
+            True if the cached units are still installed
+        """
+        current = self.read(query, capabilities.serial, capabilities.firmware,
+                            capabilities.model, capabilities.installed_units)
+        if current is None or current.units != capabilities.units:
+            self.invalidate(capabilities.serial)
+            return False
+
+        if current.stored_channels != capabilities.stored_channels:
+            capabilities.stored_channels = current.stored_channels
+            self.store(capabilities)
+        return True
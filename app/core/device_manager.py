@@ -12,6 +12,8 @@ from typing import Any, Callable
 
 from app import config
 from app.core.device_identifier import DeviceIdentifier
+from app.core.lan_scanner import DiscoveredDevice, LanScanner
+from app.core.scpi_transport import SCPITransport
 
 
 class ConnectionStatus(Enum):
@@ -45,8 +47,16 @@ class DeviceManager:
         self.identifier = DeviceIdentifier()
         self.connected_devices: dict[str, DeviceInfo] = {}
         self.sockets: dict[str, socket.socket] = {}
+        self.transports: dict[str, SCPITransport] = {}
         self.status_callbacks: list[Callable[[str, ConnectionStatus], None]] = []
         self.data_callbacks: list[Callable[[str, dict], None]] = []
+        self.discovery_callbacks: list[Callable[[DiscoveredDevice], None]] = []
+        self.discovery_finished_callbacks: list[Callable[[int], None]] = []
+        self.discovered_devices: dict[str, DiscoveredDevice] = {}
+        # Guards discovered_devices, which the scan workers fill while the UI reads it
+        self._discovery_lock = threading.Lock()
+        # Serializes command/response pairs between the acquisition worker and the UI
+        self._io_lock = threading.RLock()
         self._discovery_thread: threading.Thread | None = None
         self._stop_discovery = False
         
@@ -58,6 +68,14 @@ class DeviceManager:
         """Add a callback for received data."""
         self.data_callbacks.append(callback)
     
+    def add_discovery_callback(self, callback: Callable[[DiscoveredDevice], None]) -> None:
+        """Add a callback for each device found by discovery (called from the scan thread)."""
+        self.discovery_callbacks.append(callback)
+
+    def add_discovery_finished_callback(self, callback: Callable[[int], None]) -> None:
+        """Add a callback for the end of discovery with the number of devices found."""
+        self.discovery_finished_callbacks.append(callback)
+
     def _notify_status_change(self, device_id: str, status: ConnectionStatus) -> None:
         """Notify all callbacks of status change."""
         for callback in self.status_callbacks:
@@ -115,9 +133,10 @@ class DeviceManager:
             # Create socket and connect (increase timeout for LR8450)
             sock = socket.create_connection((ip_address, port), timeout=10.0)
             sock.settimeout(10.0)  # Longer timeout for SCPI commands
+            transport = SCPITransport(sock, timeout=10.0)
             
             # Query device identification
-            idn_response = self._query_device(sock, "*IDN?")
+            idn_response = self._query_device(transport, "*IDN?")
             if not idn_response:
                 raise ValueError("No response to *IDN? query")
             
@@ -125,11 +144,11 @@ class DeviceManager:
             # 1. \u53d1\u9001 *IDN? \u5df2\u5b8c\u6210
             # 2. \u8bbe\u7f6e header OFF (\u6309\u7167Sample3\u4f7f\u7528:HEAD OFF)
             print("Setting header OFF...")
-            self._write_device(sock, ":HEAD OFF")
+            self._write_device(transport, ":HEAD OFF")
             
             # 3. \u6e05\u9664\u9519\u8bef
             print("Clearing errors...")
-            self._write_device(sock, "*CLS")
+            self._write_device(transport, "*CLS")
             
             # Parse device information
             device_info = self.identifier.parse_idn_response(idn_response)
@@ -148,6 +167,7 @@ class DeviceManager:
             
             # Store socket
             self.sockets[device_id] = sock
+            self.transports[device_id] = transport
             
             # Setup communication
             self._setup_device_communication(sock)
@@ -179,6 +199,7 @@ class DeviceManager:
             if device_id in self.sockets:
                 self.sockets[device_id].close()
                 del self.sockets[device_id]
+            self.transports.pop(device_id, None)
             
             if device_id in self.connected_devices:
                 self.connected_devices[device_id].status = ConnectionStatus.DISCONNECTED
@@ -190,58 +211,21 @@ class DeviceManager:
             print(f"Error disconnecting from {device_id}: {e}")
             return False
     
-    def _query_device(self, sock: socket.socket, command: str) -> str:
+    def _query_device(self, transport: SCPITransport, command: str) -> str:
         """Send a query command and receive response.
         
         Args:
-            sock: Socket connection
+            transport: Buffered transport of the device connection
             command: SCPI command to send
             
         Returns:
             Device response string
         """
         try:
-            # Send command with debug output
-            cmd_with_terminator = command + "\r\n"
             print(f">> Sending: {repr(command)}")
-
-            # Try ASCII first, fall back to UTF-8 for Chinese characters
-            try:
-                sock.sendall(cmd_with_terminator.encode("ascii"))
-            except UnicodeEncodeError:
-                # For commands with Chinese characters, use UTF-8
-                print(f"   Using UTF-8 encoding for non-ASCII characters")
-                sock.sendall(cmd_with_terminator.encode("utf-8"))
-            
-            # Receive response byte by byte (like official VB.NET sample)
-            response_bytes = []
-            start_time = time.time()
+            transport.send_line(command)
             
-            while time.time() - start_time < 10.0:  # 10 second timeout
-                try:
-                    # Check if data is available
-                    sock.settimeout(0.1)  # Short timeout for individual reads
-                    byte = sock.recv(1)
-                    if not byte:
-                        break
-                    
-                    char = byte.decode('ascii', errors='ignore')
-                    if char == '\n':  # LF found, end of response
-                        break
-                    elif char == '\r':  # Skip CR
-                        continue
-                    else:
-                        response_bytes.append(char)
-                        
-                except socket.timeout:
-                    # Check if we have any data yet
-                    if response_bytes:
-                        continue  # Keep waiting for more data
-                    else:
-                        # No data received at all
-                        break
-                        
-            response = ''.join(response_bytes)
+            response = transport.readline() or ""
             print(f"<< Received: {repr(response)}")
             return response
             
@@ -249,28 +233,19 @@ class DeviceManager:
             print(f"Query error for '{command}': {e}")
             return ""
     
-    def _write_device(self, sock: socket.socket, command: str) -> bool:
+    def _write_device(self, transport: SCPITransport, command: str) -> bool:
         """Send a write command (no response expected).
 
         Args:
-            sock: Socket connection
+            transport: Buffered transport of the device connection
             command: SCPI command to send
 
         Returns:
             True if successful
         """
         try:
-            cmd_with_terminator = command + "\r\n"
             print(f">> Sending (write): {repr(command)}")
-
-            # Try ASCII first, fall back to UTF-8 for Chinese characters
-            try:
-                sock.sendall(cmd_with_terminator.encode("ascii"))
-            except UnicodeEncodeError:
-                # For commands with Chinese characters, use UTF-8
-                print(f"   Using UTF-8 encoding for non-ASCII characters")
-                sock.sendall(cmd_with_terminator.encode("utf-8"))
-
+            transport.send_line(command)
             return True
         except Exception as e:
             print(f"Write error for '{command}': {e}")
@@ -301,15 +276,16 @@ class DeviceManager:
         Returns:
             Response string if expect_response=True, bool if expect_response=False
         """
-        if device_id not in self.sockets:
+        if device_id not in self.transports:
             return "" if expect_response else False
         
-        sock = self.sockets[device_id]
+        transport = self.transports[device_id]
         
-        if expect_response:
-            return self._query_device(sock, command)
-        else:
-            return self._write_device(sock, command)
+        with self._io_lock:
+            if expect_response:
+                return self._query_device(transport, command)
+            else:
+                return self._write_device(transport, command)
     
     def start_data_acquisition(self, device_id: str) -> bool:
         """Start data acquisition on a device.
@@ -356,19 +332,34 @@ class DeviceManager:
         """
         return self.send_command(device_id, command, expect_response=True)
     
-    def discover_devices(self, ip_range: str = "192.168.1") -> None:
+    def discover_devices(self, ip_range: str = "192.168.1", probe_idn: bool = False,
+                         concurrency: int = 128, timeout: float = 0.5) -> None:
         """Start device discovery in background.
         
         Args:
-            ip_range: IP range to scan (e.g., "192.168.1")
+            ip_range: Range to scan, as CIDR ("192.168.1.0/24"), a single
+                address, or a three-octet prefix ("192.168.1") for its /24
+            probe_idn: Query ``*IDN?`` on every responding host
+            concurrency: Maximum number of hosts probed at the same time
+            timeout: Connect timeout per host in seconds
+
+        Raises:
+            ValueError: If ``ip_range`` is not a valid range or is larger
+                than ``LanScanner.MAX_HOSTS`` addresses
         """
         if self._discovery_thread and self._discovery_thread.is_alive():
             return
         
+        scanner = LanScanner(port=config.DEFAULT_PORT, timeout=timeout,
+                             concurrency=concurrency, probe_idn=probe_idn)
+        hosts = scanner.hosts(ip_range)
+
         self._stop_discovery = False
+        with self._discovery_lock:
+            self.discovered_devices = {}
         self._discovery_thread = threading.Thread(
             target=self._discovery_worker,
-            args=(ip_range,),
+            args=(scanner, hosts),
             daemon=True
         )
         self._discovery_thread.start()
@@ -376,41 +367,58 @@ class DeviceManager:
     def stop_discovery(self) -> None:
         """Stop device discovery."""
         self._stop_discovery = True
-        if self._discovery_thread:
+        if self._discovery_thread and self._discovery_thread is not threading.current_thread():
             self._discovery_thread.join(timeout=1.0)
+
+    def is_discovering(self) -> bool:
+        """Return True while a discovery scan is running."""
+        return bool(self._discovery_thread and self._discovery_thread.is_alive())
     
-    def _discovery_worker(self, ip_range: str) -> None:
+    def _discovery_worker(self, scanner: LanScanner, hosts: list[str]) -> None:
         """Worker function for device discovery.
         
         Args:
-            ip_range: IP range to scan
+            scanner: Configured LAN scanner
+            hosts: Addresses to probe
         """
-        for i in range(1, 255):
-            if self._stop_discovery:
-                break
-                
-            ip = f"{ip_range}.{i}"
-            
-            # Skip if already connected
-            device_id = f"{ip}:{config.DEFAULT_PORT}"
-            if device_id in self.connected_devices:
-                if self.connected_devices[device_id].status == ConnectionStatus.CONNECTED:
-                    continue
-            
-            # Quick connection test
+        # Skip devices that are already connected
+        def is_connected(ip: str) -> bool:
+            device = self.connected_devices.get(f"{ip}:{config.DEFAULT_PORT}")
+            return device is not None and device.status == ConnectionStatus.CONNECTED
+
+        hosts = [ip for ip in hosts if not is_connected(ip)]
+
+        found = scanner.scan(hosts, on_found=self._on_device_discovered,
+                             should_stop=lambda: self._stop_discovery)
+
+        for callback in self.discovery_finished_callbacks:
             try:
-                with socket.create_connection((ip, config.DEFAULT_PORT), timeout=0.5):
-                    # Found a device - try full connection
-                    print(f"Found device at {ip}")
-                    # Note: Don't auto-connect here, just notify
-                    
-            except (socket.timeout, socket.error, ConnectionRefusedError):
-                # No device at this IP
-                pass
-            
-            # Small delay to avoid overwhelming the network
-            time.sleep(0.01)
+                callback(len(found))
+            except Exception as e:
+                print(f"Error in discovery finished callback: {e}")
+
+    def _on_device_discovered(self, device: DiscoveredDevice) -> None:
+        """Record a discovered device and notify callbacks."""
+        print(f"Found device at {device.ip_address}")
+        with self._discovery_lock:
+            self.discovered_devices[device.ip_address] = device
+        for callback in self.discovery_callbacks:
+            try:
+                callback(device)
+            except Exception as e:
+                print(f"Error in discovery callback: {e}")
     
+    def get_discovered_devices(self) -> dict[str, DiscoveredDevice]:
+        """Get the devices found by the current or last discovery scan.
+
+        Safe to call while a scan is running.
+
+        Returns:
+            Copy of the discovered devices, keyed by IP address
+        """
+        with self._discovery_lock:
+            return self.discovered_devices.copy()
+
     def get_connected_devices(self) -> dict[str, DeviceInfo]:
         """Get all connected devices.
         
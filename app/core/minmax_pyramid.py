@@ -0,0 +1,420 @@
+# -*- coding: utf-8 -*-
+"""Multi-resolution min/max pyramid for drawing long waveforms."""
+
+from __future__ import annotations
+
+from typing import Callable
+
+import numpy as np
+
+
+class _Level:
+    """Per-bucket minimum and maximum (with sample positions) of one level."""
+
+    def __init__(self, channels: int):
+        self.count = 0
+        self.mins = np.empty((channels, 0))
+        self.maxs = np.empty((channels, 0))
+        self.imin = np.empty((channels, 0), dtype=np.int64)
+        self.imax = np.empty((channels, 0), dtype=np.int64)
+
+    def reserve(self, count: int) -> None:
+        capacity = self.mins.shape[1]
+        if count <= capacity and self.mins.flags.writeable:
+            return
+        capacity = max(count, 2 * capacity, 64)
+        for name in ("mins", "maxs", "imin", "imax"):
+            old = getattr(self, name)
+            new = np.empty((old.shape[0], capacity), dtype=old.dtype)
+            new[:, :self.count] = old[:, :self.count]
+            setattr(self, name, new)
+
+
+class MinMaxPyramid:
+    """Append-only waveform history with min/max summaries per zoom level.
+
+    Level 0 holds the raw samples. Each further level stores, for buckets of
+    ``factor ** level`` samples, the minimum and maximum of every channel and
+    where they occurred. Drawing a range at a given pixel width reads the
+    coarsest level that still has about one bucket per pixel, so the cost
+    depends on the screen width rather than on the number of samples, and
+    peaks and dips stay visible at every zoom level.
+
+    Sample times must be non-decreasing. NaN values are ignored.
+
+    Pyramids opened from files can be partly lazy: ``from_levels`` takes the
+    coarse levels as stored and builds the finer ones only when a query
+    zooms in far enough to need them, and ``deferred`` draws a coarse
+    overview until the samples themselves are needed.
+    """
+
+    def __init__(self, channels: int, factor: int = 8):
+        """Initialize an empty pyramid.
+
+        Args:
+            channels: Number of channels sharing the time axis
+            factor: Samples per bucket of the next coarser level
+        """
+        if factor < 2:
+            raise ValueError("Pyramid factor must be at least 2")
+        self.channels = channels
+        self.factor = factor
+        self._x = np.empty(0)
+        self._y = np.empty((channels, 0))
+        self._count = 0
+        self._levels: list[_Level | None] = []
+        self._missing_levels = 0  # Finest levels not built yet (from_levels)
+        self._chunk_size = 1 << 20
+        self._overview: MinMaxPyramid | None = None  # Drawn until loaded (deferred)
+        self._load: Callable[[], tuple[np.ndarray, np.ndarray]] | None = None
+
+    @classmethod
+    def from_arrays(cls, x, y, factor: int = 8, chunk_size: int = 1 << 20) -> "MinMaxPyramid":
+        """Build a pyramid over existing arrays without copying them.
+
+        Intended for memory-mapped files: the raw samples stay on disk and are
+        paged in by queries that need them. The summary levels are computed
+        in one pass of ``chunk_size`` samples at a time.
+
+        Args:
+            x: Sample times, shape (count,)
+            y: Samples, shape (channels, count)
+            factor: Samples per bucket of the next coarser level
+            chunk_size: Samples summarized per step
+        """
+        if y.ndim != 2 or y.shape[1] != len(x):
+            raise ValueError(f"Expected values of shape (channels, {len(x)}), got {y.shape}")
+        pyramid = cls(y.shape[0], factor)
+        pyramid._x, pyramid._y = x, y
+        pyramid._count = len(x)
+        pyramid._chunk_size = chunk_size
+        pyramid._summarize()
+        return pyramid
+
+    @classmethod
+    def from_levels(cls, x, y, levels: dict[int, tuple[np.ndarray, ...]], factor: int = 8,
+                    chunk_size: int = 1 << 20) -> "MinMaxPyramid":
+        """Open a pyramid over existing arrays with stored summary levels.
+
+        Like ``from_arrays``, but the coarse levels are taken from ``levels``
+        (e.g. memory-mapped from the file the samples came from, see
+        ``stored_levels``), so drawing the overview reads no samples. The
+        finer levels are built in one chunked pass the first time a query
+        needs one, i.e. when the view is zoomed in.
+
+        Args:
+            x: Sample times, shape (count,)
+            y: Samples, shape (channels, count)
+            levels: {level index: (mins, maxs, imin, imax)}, each of shape
+                (channels, buckets). Only the run of coarsest levels is used.
+            factor: Samples per bucket of the next coarser level
+            chunk_size: Samples summarized per step when building finer levels
+
+        Raises:
+            ValueError: If the shapes do not match the samples
+        """
+        if y.ndim != 2 or y.shape[1] != len(x):
+            raise ValueError(f"Expected values of shape (channels, {len(x)}), got {y.shape}")
+        pyramid = cls(y.shape[0], factor)
+        pyramid._x, pyramid._y = x, y
+        pyramid._count = len(x)
+        pyramid._chunk_size = chunk_size
+
+        bucket_counts = []
+        count = len(x)
+        while count > 1:
+            count = -(-count // factor)
+            bucket_counts.append(count)
+        first = len(bucket_counts)
+        while first > 0 and first - 1 in levels:
+            first -= 1
+
+        pyramid._levels = [None] * first
+        for index in range(first, len(bucket_counts)):
+            level = _Level(pyramid.channels)
+            level.mins, level.maxs, level.imin, level.imax = levels[index]
+            expected = (pyramid.channels, bucket_counts[index])
+            if any(array.shape != expected for array in levels[index]):
+                raise ValueError(f"Level {index} should have shape {expected}")
+            level.count = bucket_counts[index]
+            pyramid._levels.append(level)
+        pyramid._missing_levels = first
+        return pyramid
+
+    @classmethod
+    def deferred(cls, channels: int, count: int, overview: "MinMaxPyramid",
+                 load: Callable[[], tuple[np.ndarray, np.ndarray]], factor: int = 8,
+                 chunk_size: int = 1 << 20) -> "MinMaxPyramid":
+        """Open a pyramid whose samples are read only once they are needed.
+
+        For recordings that cannot be memory-mapped, such as compressed
+        files. Queries are answered from ``overview``, a small pyramid over a
+        coarse summary of the samples (e.g. each chunk's minimum and maximum),
+        while the visible range holds at least one overview point per pixel.
+        The first query that needs more detail, or any access to the samples,
+        calls ``load`` and builds the full pyramid.
+
+        Args:
+            channels: Number of channels
+            count: Number of samples ``load`` returns
+            overview: Pyramid over the coarse summary
+            load: Returns the sample times (count,) and samples (channels, count)
+            factor: Samples per bucket of the next coarser level
+            chunk_size: Samples summarized per step when building the levels
+        """
+        if overview.channels != channels:
+            raise ValueError(f"Expected an overview of {channels} channels, got {overview.channels}")
+        pyramid = cls(channels, factor)
+        pyramid._count = count
+        pyramid._chunk_size = chunk_size
+        pyramid._overview = overview
+        pyramid._load = load
+        return pyramid
+
+    def __len__(self) -> int:
+        return self._count
+
+    @property
+    def x(self) -> np.ndarray:
+        """Sample times (view)."""
+        self._ensure_loaded()
+        return self._x[:self._count]
+
+    @property
+    def y(self) -> np.ndarray:
+        """Samples as (channels, count) (view)."""
+        self._ensure_loaded()
+        return self._y[:, :self._count]
+
+    def time_range(self) -> tuple[float, float] | None:
+        """Times of the first and last sample, or None if empty.
+
+        Does not read the samples of a deferred pyramid.
+        """
+        if not self._count:
+            return None
+        x = self._overview.x if self._overview is not None else self.x
+        return float(x[0]), float(x[len(x) - 1])
+
+    @property
+    def levels(self) -> int:
+        """Number of summary levels above the raw samples."""
+        return len(self._levels)
+
+    def stored_levels(self, max_buckets: int = 1 << 14) -> dict[int, tuple[np.ndarray, ...]]:
+        """Summary levels to store next to the samples for ``from_levels``.
+
+        Only levels of at most ``max_buckets`` buckets are returned. They are
+        enough to draw the whole range at any realistic width and take a
+        small, bounded amount of space.
+
+        Returns:
+            {level index: (mins, maxs, imin, imax)}, views of shape
+            (channels, buckets)
+        """
+        return {
+            index: (level.mins[:, :level.count], level.maxs[:, :level.count],
+                    level.imin[:, :level.count], level.imax[:, :level.count])
+            for index, level in enumerate(self._levels)
+            if level is not None and level.count <= max_buckets
+        }
+
+    def clear(self) -> None:
+        """Remove all samples."""
+        self._x = np.empty(0)
+        self._y = np.empty((self.channels, 0))
+        self._count = 0
+        self._levels.clear()
+        self._missing_levels = 0
+        self._overview = None
+        self._load = None
+
+    def append(self, x: float, values) -> None:
+        """Add one sample (one value per channel)."""
+        self.extend(np.array([x], dtype=np.float64),
+                    np.asarray(values, dtype=np.float64).reshape(self.channels, 1))
+
+    def extend(self, x, values) -> None:
+        """Add samples.
+
+        Args:
+            x: Sample times, shape (count,)
+            values: Samples, shape (channels, count)
+        """
+        x = np.asarray(x, dtype=np.float64)
+        values = np.asarray(values, dtype=np.float64)
+        count = len(x)
+        if values.shape != (self.channels, count):
+            raise ValueError(f"Expected values of shape ({self.channels}, {count}), "
+                             f"got {values.shape}")
+        if count == 0:
+            return
+        self._ensure_loaded()
+        if self._missing_levels:
+            self._build_missing_levels()
+
+        start = self._count
+        end = start + count
+        if end > len(self._x):
+            capacity = max(end, 2 * len(self._x), 1024)
+            x_new = np.empty(capacity)
+            y_new = np.empty((self.channels, capacity))
+            x_new[:start] = self._x[:start]
+            y_new[:, :start] = self._y[:, :start]
+            self._x, self._y = x_new, y_new
+        self._x[start:end] = x
+        self._y[:, start:end] = values
+        self._count = end
+
+        self._update_levels(start)
+
+    def _ensure_loaded(self) -> None:
+        """Read the samples of a deferred pyramid and build its levels."""
+        if self._load is None:
+            return
+        x, y = self._load()
+        if y.ndim != 2 or y.shape != (self.channels, len(x)):
+            raise ValueError(f"Expected values of shape ({self.channels}, {len(x)}), got {y.shape}")
+        self._load = self._overview = None
+        self._x, self._y, self._count = x, y, len(x)
+        self._summarize()
+
+    def _build_missing_levels(self) -> None:
+        """Build the finer levels that ``from_levels`` was not given."""
+        self._summarize(top=self._missing_levels)
+        self._missing_levels = 0
+
+    def _summarize(self, top: int | None = None) -> None:
+        """Compute the levels over all samples, ``chunk_size`` samples at a time.
+
+        Args:
+            top: Only compute the levels below this one
+        """
+        count = self._count
+        step = max(self.factor, self._chunk_size - self._chunk_size % self.factor)
+        for start in range(0, count, step):
+            self._count = min(start + step, count)
+            self._update_levels(start, top)
+
+    def _update_levels(self, first_changed: int, top: int | None = None) -> None:
+        """Recompute the buckets covering samples from ``first_changed`` on.
+
+        Args:
+            first_changed: First new or changed sample
+            top: Only update the levels below this one
+        """
+        level_index = 0
+        child_count = self._count
+        while child_count > 1 and level_index != top:
+            if level_index == len(self._levels):
+                self._levels.append(_Level(self.channels))
+            elif self._levels[level_index] is None:
+                self._levels[level_index] = _Level(self.channels)
+            level = self._levels[level_index]
+
+            first_bucket = first_changed // self.factor
+            bucket_count = -(-child_count // self.factor)
+            level.reserve(bucket_count)
+
+            lo = first_bucket * self.factor
+            mins, maxs, imin, imax = self._children(level_index, lo, child_count)
+            pad = (bucket_count - first_bucket) * self.factor - (child_count - lo)
+            if pad:
+                mins = np.pad(mins, ((0, 0), (0, pad)), constant_values=np.inf)
+                maxs = np.pad(maxs, ((0, 0), (0, pad)), constant_values=-np.inf)
+                imin = np.pad(imin, ((0, 0), (0, pad)), mode="edge")
+                imax = np.pad(imax, ((0, 0), (0, pad)), mode="edge")
+
+            shape = (self.channels, bucket_count - first_bucket, self.factor)
+            mins, maxs = mins.reshape(shape), maxs.reshape(shape)
+            pick_min = mins.argmin(axis=2)[..., None]
+            pick_max = maxs.argmax(axis=2)[..., None]
+            span = slice(first_bucket, bucket_count)
+            level.mins[:, span] = np.take_along_axis(mins, pick_min, 2)[..., 0]
+            level.maxs[:, span] = np.take_along_axis(maxs, pick_max, 2)[..., 0]
+            level.imin[:, span] = np.take_along_axis(imin.reshape(shape), pick_min, 2)[..., 0]
+            level.imax[:, span] = np.take_along_axis(imax.reshape(shape), pick_max, 2)[..., 0]
+            level.count = bucket_count
+
+            first_changed = first_bucket
+            child_count = bucket_count
+            level_index += 1
+
+        if top is None:
+            del self._levels[level_index:]
+
+    def _children(self, level_index: int, lo: int, hi: int):
+        """Min/max arrays of the level below ``level_index`` for items lo..hi."""
+        if level_index == 0:
+            raw = self._y[:, lo:hi]
+            invalid = np.isnan(raw)
+            index = np.broadcast_to(np.arange(lo, hi), raw.shape)
+            return (np.where(invalid, np.inf, raw), np.where(invalid, -np.inf, raw),
+                    index, index)
+        child = self._levels[level_index - 1]
+        return (child.mins[:, lo:hi], child.maxs[:, lo:hi],
+                child.imin[:, lo:hi], child.imax[:, lo:hi])
+
+    def query(self, x_min: float, x_max: float, pixels: int,
+              rows: list[int] | None = None) -> tuple[np.ndarray, np.ndarray]:
+        """Return the points to draw for ``x_min..x_max`` at ``pixels`` width.
+
+        If the range holds at most two samples per pixel the raw samples are
+        returned. Otherwise every bucket of the chosen level contributes its
+        minimum and maximum in time order.
+
+        Args:
+            x_min: Start of the visible range
+            x_max: End of the visible range
+            pixels: Width of the plot in pixels
+            rows: Channels to return (default: all)
+
+        Returns:
+            (x, y), both of shape (len(rows), points). Raw results are views.
+        """
+        if self._overview is not None:
+            overview_x = self._overview.x
+            inside = (np.searchsorted(overview_x, x_max, side="right")
+                      - np.searchsorted(overview_x, x_min, side="left"))
+            if inside >= pixels:
+                return self._overview.query(x_min, x_max, pixels, rows)
+
+        rows = list(range(self.channels)) if rows is None else list(rows)
+        x = self.x
+        # One extra sample on each side so lines continue to the plot edges
+        lo = max(int(np.searchsorted(x, x_min, side="left")) - 1, 0)
+        hi = min(int(np.searchsorted(x, x_max, side="right")) + 1, self._count)
+        count = hi - lo
+        pixels = max(int(pixels), 1)
+
+        if count <= 2 * pixels or not self._levels:
+            if rows and rows == list(range(rows[0], rows[-1] + 1)):
+                y = self._y[rows[0]:rows[-1] + 1, lo:hi]  # Consecutive rows stay a view
+            else:
+                y = self._y[rows, lo:hi]
+            return np.broadcast_to(x[lo:hi], y.shape), y
+
+        level_index = 0
+        bucket_size = self.factor
+        while count / bucket_size > pixels and level_index + 1 < len(self._levels):
+            level_index += 1
+            bucket_size *= self.factor
+        if self._levels[level_index] is None:
+            self._build_missing_levels()  # Zoomed in below the stored levels
+        level = self._levels[level_index]
+        first = lo // bucket_size
+        last = -(-hi // bucket_size)
+
+        imin = level.imin[rows, first:last]
+        imax = level.imax[rows, first:last]
+        mins = level.mins[rows, first:last]
+        maxs = level.maxs[rows, first:last]
+
+        # Each bucket becomes two points ordered by where they occurred
+        min_first = imin <= imax
+        index = np.stack((np.where(min_first, imin, imax), np.where(min_first, imax, imin)), axis=2)
+        value = np.stack((np.where(min_first, mins, maxs), np.where(min_first, maxs, mins)), axis=2)
+        index = index.reshape(len(rows), -1)
+        value = value.reshape(len(rows), -1)
+        value[~np.isfinite(value)] = np.nan  # Buckets without valid samples
+        return x[index], value
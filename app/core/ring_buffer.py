@@ -0,0 +1,151 @@
+# -*- coding: utf-8 -*-
+"""Multi-channel ring buffer giving real-time plots contiguous numpy views."""
+
+from __future__ import annotations
+
+from typing import Dict, Iterable, List, Sequence
+
+import numpy as np
+
+
+class RingBuffer:
+    """Preallocated multi-channel ring buffer.
+
+    Samples are written at the end of a (channels, 2 * capacity) array. When
+    the end is reached, the newest samples are moved back to the start, which
+    happens about once per ``capacity`` samples, so writing is amortized O(1).
+    The newest ``len(self)`` samples of each channel are therefore always one
+    contiguous slice, and ``view`` can be passed to pyqtgraph's ``setData``
+    without a conversion or copy.
+    """
+
+    def __init__(self, channels: Sequence[str], capacity: int, dtype=np.float64):
+        """Initialize the buffer.
+
+        Args:
+            channels: Channel names, in the order ``append`` expects values
+            capacity: Maximum number of samples kept per channel
+            dtype: Element type
+
+        Raises:
+            ValueError: If capacity is less than 1
+        """
+        if capacity < 1:
+            raise ValueError("Ring buffer capacity must be at least 1")
+        self.channels: List[str] = list(channels)
+        self._rows = {channel: i for i, channel in enumerate(self.channels)}
+        self._capacity = capacity
+        self._data = np.zeros((len(self.channels), 2 * capacity), dtype=dtype)
+        self._end = 0
+        self._size = 0
+
+    @property
+    def capacity(self) -> int:
+        return self._capacity
+
+    def __len__(self) -> int:
+        return self._size
+
+    def _make_room(self, count: int) -> None:
+        """Make sure ``count`` samples (at most the capacity) fit at the end."""
+        if self._end + count <= self._data.shape[1]:
+            return
+        keep = min(self._size, self._capacity - count)
+        self._data[:, :keep] = self._data[:, self._end - keep:self._end]
+        self._end = keep
+        self._size = keep
+
+    def append(self, values: Sequence[float]) -> None:
+        """Add one sample.
+
+        Args:
+            values: One value per channel, in the order of ``channels``
+        """
+        self._make_room(1)
+        self._data[:, self._end] = values
+        self._end += 1
+        self._size = min(self._size + 1, self._capacity)
+
+    def extend(self, block) -> None:
+        """Add several samples.
+
+        Args:
+            block: (channels, samples) array or one sequence per channel.
+                Beyond the capacity only the newest samples are kept.
+
+        Raises:
+            ValueError: If the block does not have one row per channel
+        """
+        block = np.asarray(block, dtype=self._data.dtype)
+        if block.ndim != 2 or block.shape[0] != len(self.channels):
+            raise ValueError(f"Expected a block of shape ({len(self.channels)}, samples), got {block.shape}")
+        count = block.shape[1]
+        if count == 0:
+            return
+        if count > self._capacity:
+            block = block[:, -self._capacity:]
+            count = self._capacity
+
+        self._make_room(count)
+        self._data[:, self._end:self._end + count] = block
+        self._end += count
+        self._size = min(self._size + count, self._capacity)
+
+    def view(self, channel: str) -> np.ndarray:
+        """Read-only view of a channel's samples, valid until the next write."""
+        row = self._data[self._rows[channel], self._end - self._size:self._end]
+        row.flags.writeable = False
+        return row
+
+    def __getitem__(self, channel: str) -> np.ndarray:
+        return self.view(channel)
+
+    def last(self, channel: str) -> float:
+        """Newest value of a channel.
+
+        Raises:
+            IndexError: If the buffer is empty
+        """
+        if not self._size:
+            raise IndexError("Ring buffer is empty")
+        return float(self._data[self._rows[channel], self._end - 1])
+
+    def clear(self) -> None:
+        """Discard all samples, keeping the allocated storage."""
+        self._end = 0
+        self._size = 0
+
+    def set_capacity(self, capacity: int) -> None:
+        """Change the capacity, keeping the newest samples.
+
+        Raises:
+            ValueError: If capacity is less than 1
+        """
+        if capacity < 1:
+            raise ValueError("Ring buffer capacity must be at least 1")
+        keep = min(self._size, capacity)
+        data = np.zeros((len(self.channels), 2 * capacity), dtype=self._data.dtype)
+        data[:, :keep] = self._data[:, self._end - keep:self._end]
+        self._data = data
+        self._capacity = capacity
+        self._end = keep
+        self._size = keep
+
+    def load(self, columns: Dict[str, Iterable[float]]) -> None:
+        """Replace the contents with per-channel data.
+
+        Missing channels are filled with zeros; the length is that of the
+        shortest given channel.
+        """
+        arrays = {channel: np.asarray(list(values), dtype=self._data.dtype)
+                  for channel, values in columns.items() if channel in self._rows}
+        count = min((len(array) for array in arrays.values()), default=0)
+        block = np.zeros((len(self.channels), count), dtype=self._data.dtype)
+        for channel, array in arrays.items():
+            block[self._rows[channel]] = array[:count]
+        self.clear()
+        self.extend(block)
+
+    def to_lists(self) -> Dict[str, List[float]]:
+        """Export as {channel: list of values} (used when saving to JSON)."""
+        return {channel: self.view(channel).tolist() for channel in self.channels}
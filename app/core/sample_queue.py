@@ -0,0 +1,178 @@
+# -*- coding: utf-8 -*-
+"""Bounded queue between acquisition threads and their consumers."""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Callable, Generic, Literal, TypeVar
+
+T = TypeVar("T")
+
+# What ``put`` does when the queue is full:
+#   "block"       - wait for the consumer (backpressure), drop after the timeout
+#   "drop_oldest" - discard the oldest queued item
+#   "coalesce"    - replace (or merge into) the newest queued item
+OverflowPolicy = Literal["block", "drop_oldest", "coalesce"]
+
+OVERFLOW_POLICIES = ("block", "drop_oldest", "coalesce")
+
+
+@dataclass
+class QueueStats:
+    """Counters of a ``SampleQueue``."""
+
+    depth: int
+    capacity: int
+    peak_depth: int
+    enqueued: int
+    dropped: int      # Items discarded by "drop_oldest" or a "block" timeout
+    coalesced: int    # Items replaced by or merged into a newer one
+
+
+class SampleQueue(Generic[T]):
+    """Thread-safe ring queue with a fixed capacity and an overflow policy.
+
+    The producer never grows memory without bound: once ``capacity`` items
+    are waiting, the policy decides whether it waits, drops the oldest item
+    or folds the new item into the newest one. Crossing the high watermark
+    calls ``on_high_watermark`` once; it is re-armed when the consumer has
+    drained the queue below the watermark again.
+    """
+
+    def __init__(self, capacity: int = 256, policy: OverflowPolicy = "drop_oldest",
+                 high_watermark: float = 0.8,
+                 on_high_watermark: Callable[[int, int], None] | None = None,
+                 merge: Callable[[T, T], T] | None = None,
+                 block_timeout: float = 1.0):
+        """Initialize the queue.
+
+        Args:
+            capacity: Maximum number of queued items
+            policy: Overflow policy, see ``OverflowPolicy``
+            high_watermark: Fill level (fraction of capacity) that triggers
+                ``on_high_watermark``
+            on_high_watermark: Called with (depth, capacity) from the producer
+                thread when the fill level reaches the watermark
+            merge: For "coalesce", combines the newest queued item with the
+                new one (e.g. concatenating blocks). Without it the new item
+                replaces the newest one.
+            block_timeout: For "block", seconds to wait for space before the
+                item is dropped
+
+        Raises:
+            ValueError: If capacity or policy is invalid
+        """
+        if capacity < 1:
+            raise ValueError("Queue capacity must be at least 1")
+        if policy not in OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown overflow policy: {policy}")
+
+        self.capacity = capacity
+        self.policy = policy
+        self.high_watermark = max(1, int(capacity * high_watermark))
+        self.on_high_watermark = on_high_watermark
+        self.merge = merge
+        self.block_timeout = block_timeout
+
+        self._items: deque[T] = deque()
+        self._condition = threading.Condition()
+        self._closed = False
+        self._above_watermark = False
+
+        self.peak_depth = 0
+        self.enqueued = 0
+        self.dropped = 0
+        self.coalesced = 0
+
+    def __len__(self) -> int:
+        with self._condition:
+            return len(self._items)
+
+    def put(self, item: T) -> bool:
+        """Add an item, applying the overflow policy if the queue is full.
+
+        Returns:
+            False if the item itself was dropped ("block" timeout or closed queue)
+        """
+        notify_depth = None
+        with self._condition:
+            if self._closed:
+                return False
+
+            if len(self._items) >= self.capacity:
+                if self.policy == "block":
+                    deadline = time.monotonic() + self.block_timeout
+                    while len(self._items) >= self.capacity and not self._closed:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            break
+                        self._condition.wait(remaining)
+                    if self._closed or len(self._items) >= self.capacity:
+                        self.dropped += 1
+                        return False
+                elif self.policy == "drop_oldest":
+                    self._items.popleft()
+                    self.dropped += 1
+                else:
+                    newest = self._items.pop()
+                    item = self.merge(newest, item) if self.merge else item
+                    self.coalesced += 1
+
+            self._items.append(item)
+            self.enqueued += 1
+            depth = len(self._items)
+            self.peak_depth = max(self.peak_depth, depth)
+            if depth >= self.high_watermark and not self._above_watermark:
+                self._above_watermark = True
+                notify_depth = depth
+
+        # Outside the lock so the callback may inspect the queue
+        if notify_depth is not None and self.on_high_watermark:
+            self.on_high_watermark(notify_depth, self.capacity)
+        return True
+
+    def drain(self, max_items: int | None = None) -> list[T]:
+        """Remove and return queued items in arrival order (never blocks)."""
+        with self._condition:
+            count = len(self._items) if max_items is None else min(max_items, len(self._items))
+            items = [self._items.popleft() for _ in range(count)]
+            if len(self._items) < self.high_watermark:
+                self._above_watermark = False
+            self._condition.notify_all()
+        return items
+
+    def clear(self) -> None:
+        """Discard all queued items without counting them as dropped."""
+        with self._condition:
+            self._items.clear()
+            self._above_watermark = False
+            self._condition.notify_all()
+
+    def close(self) -> None:
+        """Reject further items and release a producer waiting for space."""
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+
+    def reopen(self) -> None:
+        """Accept items again and reset the counters."""
+        with self._condition:
+            self._items.clear()
+            self._closed = False
+            self._above_watermark = False
+            self.peak_depth = self.enqueued = self.dropped = self.coalesced = 0
+
+    def stats(self) -> QueueStats:
+        """Snapshot of the queue counters."""
+        with self._condition:
+            return QueueStats(
+                depth=len(self._items),
+                capacity=self.capacity,
+                peak_depth=self.peak_depth,
+                enqueued=self.enqueued,
+                dropped=self.dropped,
+                coalesced=self.coalesced,
+            )
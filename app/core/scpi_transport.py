@@ -0,0 +1,233 @@
+# -*- coding: utf-8 -*-
+"""Buffered SCPI transport shared by the LR8450 TCP clients."""
+
+from __future__ import annotations
+
+import socket
+import time
+
+
+class SCPITransport:
+    """Line-oriented SCPI transport over a connected TCP socket.
+
+    Responses are received in large chunks into a reusable buffer instead of
+    one byte per ``recv`` call. Bytes that arrive after the end of a response
+    are kept in the buffer and returned by the next ``readline``.
+    """
+
+    DEFAULT_BUFFER_SIZE = 64 * 1024
+
+    def __init__(self, sock: socket.socket, timeout: float = 10.0,
+                 buffer_size: int = DEFAULT_BUFFER_SIZE):
+        """Initialize the transport.
+
+        Args:
+            sock: Connected TCP socket
+            timeout: Default timeout in seconds for send and receive
+            buffer_size: Initial size of the receive buffer in bytes
+        """
+        self.sock = sock
+        self.timeout = timeout
+        self._buffer = bytearray(buffer_size)
+        self._start = 0  # First unread byte
+        self._end = 0    # One past the last received byte
+
+    def send_line(self, command: str) -> None:
+        """Send a command terminated with CR+LF.
+
+        Args:
+            command: SCPI command to send
+
+        Raises:
+            OSError: If the socket send fails
+        """
+        data = command + "\r\n"
+        try:
+            payload = data.encode("ascii")
+        except UnicodeEncodeError:
+            # Comments and file names may contain Chinese characters
+            payload = data.encode("utf-8")
+
+        self.sock.settimeout(self.timeout)
+        self.sock.sendall(payload)
+
+    def readline(self, timeout: float | None = None) -> str | None:
+        """Read one response line terminated by LF or CR+LF.
+
+        Args:
+            timeout: Maximum time to wait in seconds (default: transport timeout)
+
+        Returns:
+            Response line without terminator, or None on timeout
+
+        Raises:
+            ConnectionError: If the peer closed the connection
+        """
+        if timeout is None:
+            timeout = self.timeout
+        deadline = time.monotonic() + timeout
+        search_from = self._start
+
+        while True:
+            newline = self._buffer.find(b"\n", search_from, self._end)
+            if newline >= 0:
+                line_end = newline
+                if line_end > self._start and self._buffer[line_end - 1] == 0x0D:
+                    line_end -= 1
+                line = self._buffer[self._start:line_end].decode("ascii", errors="ignore")
+                self._consume(newline + 1)
+                return line
+
+            search_from = self._end
+            if not self._fill(deadline):
+                return None
+
+    def read_block_into(self, out: memoryview | bytearray,
+                        timeout: float | None = None) -> int:
+        """Read one IEEE 488.2 binary block directly into ``out``.
+
+        Both definite length blocks (``#<n><len><data>``) and the ``#0``
+        form used by the LR8450, where the caller knows the data size, are
+        supported. Separators left over from a previous response are skipped.
+
+        Args:
+            out: Writable buffer receiving the block data. For ``#0`` blocks
+                its length is the number of bytes to read.
+            timeout: Maximum time to wait in seconds (default: transport timeout)
+
+        Returns:
+            Number of data bytes written to ``out``
+
+        Raises:
+            TimeoutError: If the block did not arrive in time
+            ValueError: If the block header is invalid or larger than ``out``
+            ConnectionError: If the peer closed the connection
+        """
+        if timeout is None:
+            timeout = self.timeout
+        deadline = time.monotonic() + timeout
+        out = memoryview(out).cast("B")
+
+        # Skip response separators and terminators before the header
+        while True:
+            self._ensure(1, deadline)
+            first = self._buffer[self._start]
+            if first == 0x23:  # '#'
+                break
+            if first not in b";,\r\n ":
+                raise ValueError(f"Invalid binary block header: {first:#04x}")
+            self._consume(self._start + 1)
+
+        self._ensure(2, deadline)
+        digits = self._buffer[self._start + 1] - 0x30
+        if not 0 <= digits <= 9:
+            raise ValueError("Invalid binary block length field")
+
+        if digits == 0:
+            length = len(out)
+        else:
+            self._ensure(2 + digits, deadline)
+            field = self._buffer[self._start + 2:self._start + 2 + digits]
+            length = int(field.decode("ascii"))
+            if length > len(out):
+                raise ValueError(f"Binary block too large: {length} > {len(out)} bytes")
+        self._consume(self._start + 2 + digits)
+
+        # Data already buffered, then receive the rest straight into ``out``
+        copied = min(self.pending(), length)
+        out[:copied] = self._buffer[self._start:self._start + copied]
+        self._consume(self._start + copied)
+
+        while copied < length:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise TimeoutError(f"Binary block incomplete: {copied}/{length} bytes")
+            self.sock.settimeout(remaining)
+            try:
+                received = self.sock.recv_into(out[copied:length])
+            except socket.timeout:
+                continue
+            if not received:
+                raise ConnectionError("Connection closed by device")
+            copied += received
+
+        return length
+
+    def skip_terminator(self) -> None:
+        """Consume a CR/LF terminator already sitting in the buffer."""
+        while self.pending() and self._buffer[self._start] in b"\r\n":
+            self._consume(self._start + 1)
+
+    def pending(self) -> int:
+        """Return the number of buffered bytes not yet consumed."""
+        return self._end - self._start
+
+    def clear(self) -> None:
+        """Discard all buffered bytes."""
+        self._start = 0
+        self._end = 0
+
+    def _consume(self, position: int) -> None:
+        """Mark buffered bytes up to ``position`` as consumed."""
+        self._start = position
+        if self._start >= self._end:
+            self._start = 0
+            self._end = 0
+
+    def _ensure(self, count: int, deadline: float) -> None:
+        """Receive until at least ``count`` unread bytes are buffered.
+
+        Raises:
+            TimeoutError: If the bytes did not arrive before ``deadline``
+        """
+        while self.pending() < count:
+            if not self._fill(deadline):
+                raise TimeoutError("Timed out waiting for device response")
+
+    def _fill(self, deadline: float) -> bool:
+        """Receive more bytes into the buffer.
+
+        Args:
+            deadline: ``time.monotonic()`` value after which to give up
+
+        Returns:
+            True if at least one byte was received, False on timeout
+
+        Raises:
+            ConnectionError: If the peer closed the connection
+        """
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return False
+
+        self._make_room()
+
+        self.sock.settimeout(remaining)
+        view = memoryview(self._buffer)[self._end:]
+        try:
+            received = self.sock.recv_into(view)
+        except socket.timeout:
+            return False
+        finally:
+            view.release()
+
+        if not received:
+            raise ConnectionError("Connection closed by device")
+
+        self._end += received
+        return True
+
+    def _make_room(self) -> None:
+        """Ensure there is free space at the end of the buffer."""
+        if self._end < len(self._buffer):
+            return
+
+        if self._start > 0:
+            # Move the unread tail to the front of the buffer
+            unread = self._end - self._start
+            self._buffer[:unread] = self._buffer[self._start:self._end]
+            self._start = 0
+            self._end = unread
+        else:
+            # A single response is larger than the buffer
+            self._buffer.extend(bytes(len(self._buffer)))
@@ -9,6 +9,8 @@ import time
 import logging
 from typing import Optional, Dict, Any
 
+from app.core.scpi_transport import SCPITransport
+
 
 class SimpleDeviceClient:
     """Simple device client that creates new connection for each command."""
@@ -41,37 +43,13 @@ class SimpleDeviceClient:
             sock.settimeout(self.timeout)
             sock.connect((self.ip_address, self.port))
             
+            transport = SCPITransport(sock, timeout=self.timeout)
+            
             # Send command
-            cmd_with_terminator = command + "\r\n"
             print(f">> {command}")
-            sock.sendall(cmd_with_terminator.encode("ascii"))
-            
-            # Receive response (byte by byte like official sample)
-            response_bytes = []
-            start_time = time.time()
+            transport.send_line(command)
             
-            while time.time() - start_time < self.timeout:
-                try:
-                    sock.settimeout(0.1)
-                    byte = sock.recv(1)
-                    if not byte:
-                        break
-                    
-                    char = byte.decode('ascii', errors='ignore')
-                    if char == '\n':  # LF found
-                        break
-                    elif char == '\r':  # Skip CR
-                        continue
-                    else:
-                        response_bytes.append(char)
-                        
-                except socket.timeout:
-                    if response_bytes:
-                        continue  # Keep waiting
-                    else:
-                        break  # No data received
-                        
-            response = ''.join(response_bytes)
+            response = transport.readline() or ""
             print(f"<< {response}")
             return response if response else None
             
@@ -102,9 +80,8 @@ class SimpleDeviceClient:
             sock.connect((self.ip_address, self.port))
             
             # Send command
-            cmd_with_terminator = command + "\r\n"
             print(f">> {command} (write)")
-            sock.sendall(cmd_with_terminator.encode("ascii"))
+            SCPITransport(sock, timeout=self.timeout).send_line(command)
             
             return True
             
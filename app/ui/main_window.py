@@ -40,6 +40,7 @@ class MainWindow(QMainWindow):
         self.data_acquisition = DataAcquisition(self.device_manager)
         self.current_waveform_data: WaveformData | None = None
         self.is_acquiring = False
+        self._acquisition_starting = False  # Waiting for device initialization
         
         # Setup device manager callbacks
         self.device_manager.add_status_callback(self._on_device_status_changed)
@@ -47,7 +48,10 @@ class MainWindow(QMainWindow):
         
         # Connect data acquisition signals (thread-safe)
         self.data_acquisition.data_received.connect(self._on_real_time_data)
+        self.data_acquisition.acquisition_started.connect(self._on_acquisition_started)
+        self.data_acquisition.acquisition_failed.connect(self._on_acquisition_failed)
         self.data_acquisition.error_occurred.connect(self._on_acquisition_error)
+        self.data_acquisition.queue_high_watermark.connect(self._on_queue_high_watermark)
         
         self._setup_ui()
 
@@ -351,8 +355,12 @@ class MainWindow(QMainWindow):
         self.data_table.add_log_entry(f"\u6536\u5230\u6570\u636e: {device_id}")
     
     def _start_acquisition(self) -> None:
-        """Start real-time data acquisition."""
-        if self.is_acquiring:
+        """Start real-time data acquisition.
+
+        The UI switches to running once the device has been initialized
+        (``_on_acquisition_started``).
+        """
+        if self.is_acquiring or self._acquisition_starting:
             return
         
         devices = self.device_manager.get_connected_devices()
@@ -368,28 +376,61 @@ class MainWindow(QMainWindow):
         success = self.data_acquisition.start_acquisition()
         
         if success:
-            self.is_acquiring = True
-            self.data_table.add_log_entry("\u5df2\u5f00\u59cb\u5b9e\u65f6\u6570\u636e\u91c7\u96c6")
-            self.status_bar.showMessage("\u5b9e\u65f6\u6570\u636e\u91c7\u96c6\u8fdb\u884c\u4e2d")
+            self._acquisition_starting = True
+            self.status_bar.showMessage("\u6b63\u5728\u521d\u59cb\u5316\u8bbe\u5907...")
             
-            # Update toolbar button states
+            # Stop stays available to cancel the initialization
             self.control_toolbar.start_action.setEnabled(False)
             self.control_toolbar.stop_action.setEnabled(True)
         else:
-            QMessageBox.critical(
-                self,
-                "\u9519\u8bef",
-                "\u65e0\u6cd5\u5f00\u59cb\u6570\u636e\u91c7\u96c6\u3002\u8bf7\u68c0\u67e5\u8bbe\u5907\u8fde\u63a5\u3002"
-            )
+            self._show_acquisition_start_error()
+    
+    def _on_acquisition_started(self, device_id: str) -> None:
+        """Switch the UI to running once the device is initialized.
+        
+        Args:
+            device_id: Device identifier
+        """
+        if not self._acquisition_starting:
+            return  # Stopped while initializing
+        self._acquisition_starting = False
+        self.is_acquiring = True
+        
+        self.data_table.start_real_time()
+        self.data_table.add_log_entry("\u5df2\u5f00\u59cb\u5b9e\u65f6\u6570\u636e\u91c7\u96c6")
+        self.status_bar.showMessage("\u5b9e\u65f6\u6570\u636e\u91c7\u96c6\u8fdb\u884c\u4e2d")
+    
+    def _on_acquisition_failed(self, device_id: str, error: str) -> None:
+        """Restore the idle UI when device initialization failed.
+        
+        Args:
+            device_id: Device identifier
+            error: Error message
+        """
+        if not self._acquisition_starting:
+            return
+        self._acquisition_starting = False
+        self.control_toolbar.start_action.setEnabled(True)
+        self.control_toolbar.stop_action.setEnabled(False)
+        self.status_bar.showMessage(f"\u91c7\u96c6\u542f\u52a8\u5931\u8d25: {error}")
+        self._show_acquisition_start_error()
+    
+    def _show_acquisition_start_error(self) -> None:
+        QMessageBox.critical(
+            self,
+            "\u9519\u8bef",
+            "\u65e0\u6cd5\u5f00\u59cb\u6570\u636e\u91c7\u96c6\u3002\u8bf7\u68c0\u67e5\u8bbe\u5907\u8fde\u63a5\u3002"
+        )
     
     def _stop_acquisition(self) -> None:
         """Stop real-time data acquisition."""
-        if not self.is_acquiring:
+        if not (self.is_acquiring or self._acquisition_starting):
             return
         
         # Stop real-time acquisition
         self.data_acquisition.stop_acquisition()
         self.is_acquiring = False
+        self._acquisition_starting = False
         
         self.data_table.add_log_entry("\u5df2\u505c\u6b62\u5b9e\u65f6\u6570\u636e\u91c7\u96c6")
         self.status_bar.showMessage("\u6570\u636e\u91c7\u96c6\u5df2\u505c\u6b62")
@@ -442,20 +483,31 @@ class MainWindow(QMainWindow):
         self.data_table.add_log_entry(f"\u91c7\u96c6\u9519\u8bef ({device_id}): {error}")
         self.status_bar.showMessage(f"\u91c7\u96c6\u9519\u8bef: {error}")
     
+    def _on_queue_high_watermark(self, depth: int, capacity: int) -> None:
+        """Warn that the GUI is falling behind the acquisition.
+        
+        Args:
+            depth: Results waiting in the acquisition queue
+            capacity: Queue capacity
+        """
+        stats = self.data_acquisition.queue.stats()
+        message = (f"\u754c\u9762\u5904\u7406\u843d\u540e\u4e8e\u91c7\u96c6: \u79ef\u538b {depth}/{capacity}"
+                   f"\uff0c\u5df2\u4e22\u5f03 {stats.dropped}\uff0c\u5df2\u5408\u5e76 {stats.coalesced}")
+        self.data_table.add_log_entry(message)
+        self.status_bar.showMessage(message, 5000)
+    
     def _update_data_table_with_real_time(self, data: RealTimeData) -> None:
         """Update data table with real-time values.
         
         Args:
             data: Real-time data
         """
-        # For now, just log the latest values
-        # TODO: Implement actual data table update with real-time values
-        pass
+        self.data_table.append_real_time_data(data)
     
     def closeEvent(self, event) -> None:
         """Handle application close event."""
         # Stop acquisition if running
-        if self.is_acquiring:
+        if self.is_acquiring or self._acquisition_starting:
             self.data_acquisition.stop_acquisition()
         
         # Cleanup device connections
@@ -3,13 +3,16 @@
 from __future__ import annotations
 
 import numpy as np
-from PySide6.QtCore import Qt
+from PySide6.QtCore import QAbstractTableModel, QModelIndex, Qt
 from PySide6.QtWidgets import (
+    QAbstractItemView,
+    QDoubleSpinBox,
+    QHBoxLayout,
     QHeaderView,
+    QLabel,
     QPlainTextEdit,
     QTabWidget,
-    QTableWidget,
-    QTableWidgetItem,
+    QTableView,
     QVBoxLayout,
     QWidget,
 )
@@ -20,6 +23,202 @@ from app import config
 from typing import TYPE_CHECKING
 if TYPE_CHECKING:
     from app.core.file_parser import WaveformData
+    from app.core.data_acquisition import RealTimeData
+
+
+def _format_value(value: float, channel_type: str) -> str:
+    """Format one sample for display."""
+    if np.isnan(value):
+        return ""
+    if channel_type == "logic":
+        return "1" if value > 0.5 else "0"
+    if channel_type in ["analog", "wave_calc"]:
+        return f"{value:.6f}"
+    return str(value)
+
+
+class WaveformTableModel(QAbstractTableModel):
+    """Table model reading samples straight from numpy arrays.
+
+    Cells are formatted only when the view asks for them, so the table
+    shows every sample of a recording regardless of its length. File data is
+    referenced without copying; real-time data is appended to a growable
+    store that keeps at most ``max_live_rows`` rows.
+    """
+
+    def __init__(self, parent=None) -> None:
+        """Initialize an empty model."""
+        super().__init__(parent)
+        self.max_live_rows = config.MAX_LIVE_TABLE_ROWS
+        self._headers: list[str] = ["\u65f6\u95f4 (s)"]
+        self._types: list[str] = []
+        self._time = np.empty(0)
+        self._columns: list[np.ndarray] = []
+        self._rows = 0
+
+        # Real-time store: row 0 is time, then one row per channel
+        self._live_names: list[str] = []
+        self._store = np.empty((1, 0))
+        self._start = 0
+        self._end = 0
+        self._next_time = 0.0
+
+    # Qt model interface
+    def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        return 0 if parent.isValid() else self._rows
+
+    def columnCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self._headers)
+
+    def data(self, index: QModelIndex, role: int = Qt.ItemDataRole.DisplayRole):
+        if role != Qt.ItemDataRole.DisplayRole or not index.isValid():
+            return None
+        row, column = index.row(), index.column()
+        if column == 0:
+            return f"{self._time[row]:.3f}"
+        values = self._columns[column - 1]
+        if row >= len(values):
+            return ""
+        return _format_value(values[row], self._types[column - 1])
+
+    def headerData(self, section: int, orientation: Qt.Orientation,
+                   role: int = Qt.ItemDataRole.DisplayRole):
+        if role != Qt.ItemDataRole.DisplayRole:
+            return None
+        if orientation == Qt.Orientation.Horizontal:
+            return self._headers[section] if section < len(self._headers) else None
+        return str(section + 1)
+
+    # Content
+    def set_waveform(self, waveform_data: WaveformData) -> None:
+        """Show a parsed recording (channel arrays are not copied).
+
+        Args:
+            waveform_data: Waveform data to display
+        """
+        channels = waveform_data.channels
+        rows = max([waveform_data.sample_count] + [len(channel.data) for channel in channels])
+        sample_rate = channels[0].sample_rate if channels else 0
+        time = np.arange(rows, dtype=np.float64)
+        if sample_rate > 0:
+            time /= sample_rate
+
+        self.beginResetModel()
+        # Drop the live store: samples arriving while a file is shown start
+        # a new real-time table instead of landing under the file's columns
+        self._live_names = []
+        self._store = np.empty((1, 0))
+        self._start = self._end = 0
+        self._headers = ["\u65f6\u95f4 (s)"] + [
+            f"{channel.name} ({channel.unit})" if channel.unit else channel.name
+            for channel in channels
+        ]
+        self._types = [channel.channel_type for channel in channels]
+        self._time = time
+        self._columns = [channel.data for channel in channels]
+        self._rows = rows
+        self.endResetModel()
+
+    def start_live(self) -> None:
+        """Clear the table for a new real-time acquisition."""
+        self.beginResetModel()
+        self._headers = ["\u65f6\u95f4 (s)"]
+        self._types = []
+        self._live_names = []
+        self._store = np.empty((1, 1024))
+        self._start = self._end = 0
+        self._next_time = 0.0
+        self._bind_live()
+        self.endResetModel()
+
+    def is_live(self) -> bool:
+        """Whether the model holds real-time data."""
+        return self._store.shape[1] > 0
+
+    def append_samples(self, channel_data: dict[str, np.ndarray], sample_rate: float) -> None:
+        """Append real-time samples, continuing the time axis.
+
+        Args:
+            channel_data: {channel name: samples}; shorter channels are
+                padded with NaN, which displays as an empty cell
+            sample_rate: Sample rate of the new samples (Hz)
+        """
+        if not self.is_live():
+            self.start_live()
+        count = max((len(values) for values in channel_data.values()), default=0)
+        if count == 0 or sample_rate <= 0:
+            return
+
+        for name in channel_data:
+            if name not in self._live_names:
+                self._add_live_channel(name)
+
+        period = 1.0 / sample_rate
+        skipped = max(count - self.max_live_rows, 0)
+        first_time = self._next_time + skipped * period
+        self._next_time += count * period
+        count -= skipped
+
+        self._reserve(count)
+        span = slice(self._end, self._end + count)
+        np.multiply(np.arange(count), period, out=self._store[0, span])
+        self._store[0, span] += first_time
+        self._store[1:, span] = np.nan
+        for row, name in enumerate(self._live_names, 1):
+            values = np.asarray(channel_data.get(name, ()), dtype=np.float64)[skipped:]
+            self._store[row, self._end:self._end + len(values)] = values
+
+        self.beginInsertRows(QModelIndex(), self._rows, self._rows + count - 1)
+        self._end += count
+        self._bind_live()
+        self.endInsertRows()
+
+        excess = self._rows - self.max_live_rows
+        if excess > 0:
+            self.beginRemoveRows(QModelIndex(), 0, excess - 1)
+            self._start += excess
+            self._bind_live()
+            self.endRemoveRows()
+
+    def row_for_time(self, seconds: float) -> int:
+        """Index of the first row at or after ``seconds`` (binary search)."""
+        if self._rows == 0:
+            return -1
+        row = int(np.searchsorted(self._time, seconds, side="left"))
+        return min(row, self._rows - 1)
+
+    def _add_live_channel(self, name: str) -> None:
+        column = len(self._headers)
+        self.beginInsertColumns(QModelIndex(), column, column)
+        store = np.full((self._store.shape[0] + 1, self._store.shape[1]), np.nan)
+        store[:-1, self._start:self._end] = self._store[:, self._start:self._end]
+        self._store = store
+        self._live_names.append(name)
+        self._headers.append(name)
+        self._types.append("analog")
+        self._bind_live()
+        self.endInsertColumns()
+
+    def _reserve(self, count: int) -> None:
+        """Make room for ``count`` rows after the current end of the store."""
+        capacity = self._store.shape[1]
+        if self._end + count <= capacity:
+            return
+        rows = self._end - self._start
+        if rows + count > capacity // 2:
+            capacity = max(2 * capacity, 2 * (rows + count))
+        store = np.empty((self._store.shape[0], capacity))
+        store[:, :rows] = self._store[:, self._start:self._end]
+        self._store = store
+        self._start, self._end = 0, rows
+        self._bind_live()
+
+    def _bind_live(self) -> None:
+        """Point the columns read by ``data`` at the live store."""
+        live = self._store[:, self._start:self._end]
+        self._time = live[0]
+        self._columns = list(live[1:])
+        self._rows = self._end - self._start
 
 
 class DataTable(QWidget):
@@ -37,11 +236,17 @@ class DataTable(QWidget):
 
         # Create tab widget
         self.tab_widget = QTabWidget()
-        
+
         # Data table tab
-        self.data_table = QTableWidget()
+        data_page = QWidget()
+        data_layout = QVBoxLayout(data_page)
+        data_layout.setContentsMargins(0, 0, 0, 0)
+        data_layout.addLayout(self._create_jump_bar())
+        self.data_model = WaveformTableModel(self)
+        self.data_table = QTableView()
         self._setup_data_table()
-        self.tab_widget.addTab(self.data_table, "\u6570\u636e")
+        data_layout.addWidget(self.data_table)
+        self.tab_widget.addTab(data_page, "\u6570\u636e")
 
         # Log tab
         self.log_text = QPlainTextEdit()
@@ -51,27 +256,28 @@ class DataTable(QWidget):
 
         layout.addWidget(self.tab_widget)
 
+    def _create_jump_bar(self) -> QHBoxLayout:
+        """Create the jump-to-time controls."""
+        bar = QHBoxLayout()
+        bar.addWidget(QLabel("\u8df3\u8f6c\u5230\u65f6\u95f4 (s):"))
+        self.jump_spin = QDoubleSpinBox()
+        self.jump_spin.setDecimals(3)
+        self.jump_spin.setRange(0.0, 1e9)
+        self.jump_spin.setKeyboardTracking(False)
+        self.jump_spin.valueChanged.connect(self.jump_to_time)
+        bar.addWidget(self.jump_spin)
+        bar.addStretch()
+        return bar
+
     def _setup_data_table(self) -> None:
         """Set up the data table."""
-        # Set up columns
-        headers = ["\u65f6\u95f4", "\u901a\u9053 1", "\u901a\u9053 2", "\u901a\u9053 3", "\u5355\u4f4d"]
-        self.data_table.setColumnCount(len(headers))
-        self.data_table.setHorizontalHeaderLabels(headers)
-
-        # Add sample data
-        sample_data = [
-            ["00:00:01", "1.234", "2.345", "3.456", "V"],
-            ["00:00:02", "1.235", "2.346", "3.457", "V"],
-            ["00:00:03", "1.236", "2.347", "3.458", "V"],
-            ["00:00:04", "1.237", "2.348", "3.459", "V"],
-            ["00:00:05", "1.238", "2.349", "3.460", "V"],
-        ]
+        self.data_table.setModel(self.data_model)
+        self.data_table.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
 
-        self.data_table.setRowCount(len(sample_data))
-        for row, row_data in enumerate(sample_data):
-            for col, data in enumerate(row_data):
-                item = QTableWidgetItem(str(data))
-                self.data_table.setItem(row, col, item)
+        # Fixed row heights keep scrolling independent of the row count
+        vertical_header = self.data_table.verticalHeader()
+        vertical_header.setSectionResizeMode(QHeaderView.ResizeMode.Fixed)
+        vertical_header.setDefaultSectionSize(22)
 
         # Adjust column widths
         header = self.data_table.horizontalHeader()
@@ -87,79 +293,50 @@ class DataTable(QWidget):
     def add_log_entry(self, message: str) -> None:
         """Add a new log entry."""
         self.log_text.appendPlainText(message)
-    
+
     def update_data(self, waveform_data: WaveformData) -> None:
         """Update the data table with waveform data.
-        
+
         Args:
             waveform_data: Waveform data to display in table
         """
         if not waveform_data.channels:
             self.add_log_entry("\u65e0\u6570\u636e\u53ef\u663e\u793a")
             return
-        
-        # Clear existing table
-        self.data_table.clear()
-        
-        # Prepare headers
-        headers = ["\u65f6\u95f4 (s)"]
-        for channel in waveform_data.channels:
-            if channel.unit:
-                header = f"{channel.name} ({channel.unit})"
-            else:
-                header = channel.name
-            headers.append(header)
-        
-        self.data_table.setColumnCount(len(headers))
-        self.data_table.setHorizontalHeaderLabels(headers)
-        
-        # Determine number of rows to display (limit to avoid performance issues)
-        max_rows = config.MAX_TABLE_ROWS
-        sample_count = waveform_data.sample_count
-        
-        if sample_count > max_rows:
-            # Sample data points evenly
-            indices = np.linspace(0, sample_count - 1, max_rows, dtype=int)
-            display_count = max_rows
-            self.add_log_entry(f"\u6570\u636e\u91cf\u8f83\u5927\uff0c\u4ec5\u663e\u793a {max_rows} \u4e2a\u91c7\u6837\u70b9")
-        else:
-            indices = np.arange(sample_count)
-            display_count = sample_count
-        
-        self.data_table.setRowCount(display_count)
-        
-        # Calculate time array
-        if waveform_data.channels and waveform_data.channels[0].sample_rate > 0:
-            sample_rate = waveform_data.channels[0].sample_rate
-            time_values = indices / sample_rate
-        else:
-            time_values = indices
-        
-        # Fill table data
-        for row in range(display_count):
-            # Time column
-            time_item = QTableWidgetItem(f"{time_values[row]:.3f}")
-            self.data_table.setItem(row, 0, time_item)
-            
-            # Channel data columns
-            for col, channel in enumerate(waveform_data.channels, 1):
-                if indices[row] < len(channel.data):
-                    value = channel.data[indices[row]]
-                    
-                    # Format value based on channel type
-                    if channel.channel_type == "logic":
-                        value_str = "1" if value > 0.5 else "0"
-                    elif channel.channel_type in ["analog", "wave_calc"]:
-                        value_str = f"{value:.6f}"
-                    else:
-                        value_str = str(value)
-                    
-                    item = QTableWidgetItem(value_str)
-                    self.data_table.setItem(row, col, item)
-        
-        # Adjust column widths
-        header = self.data_table.horizontalHeader()
-        header.setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
-        
+
+        self.data_model.set_waveform(waveform_data)
+
         # Add log entry
-        self.add_log_entry(f"\u6570\u636e\u8868\u5df2\u66f4\u65b0: {len(waveform_data.channels)}\u4e2a\u901a\u9053, {display_count}\u884c\u6570\u636e")
+        self.add_log_entry(f"\u6570\u636e\u8868\u5df2\u66f4\u65b0: {len(waveform_data.channels)}\u4e2a\u901a\u9053, {self.data_model.rowCount()}\u884c\u6570\u636e")
+
+    def start_real_time(self) -> None:
+        """Clear the table for a new real-time acquisition."""
+        self.data_model.start_live()
+
+    def append_real_time_data(self, data: RealTimeData) -> None:
+        """Append real-time samples to the table.
+
+        The view keeps following the newest row while it is scrolled to the
+        bottom.
+
+        Args:
+            data: Real-time data from acquisition
+        """
+        scroll_bar = self.data_table.verticalScrollBar()
+        follow = scroll_bar.value() >= scroll_bar.maximum()
+        self.data_model.append_samples(data.channel_data, data.sample_rate)
+        if follow:
+            self.data_table.scrollToBottom()
+
+    def jump_to_time(self, seconds: float) -> None:
+        """Scroll to and select the first row at or after ``seconds``.
+
+        Args:
+            seconds: Time in seconds
+        """
+        row = self.data_model.row_for_time(seconds)
+        if row < 0:
+            return
+        index = self.data_model.index(row, 0)
+        self.data_table.scrollTo(index, QAbstractItemView.ScrollHint.PositionAtTop)
+        self.data_table.selectRow(row)
@@ -2,7 +2,7 @@
 
 from __future__ import annotations
 
-from PySide6.QtCore import Qt
+from PySide6.QtCore import Qt, Signal
 from PySide6.QtWidgets import (
     QCheckBox,
     QComboBox,
@@ -34,12 +34,18 @@ from app.ui.widgets.manual_add_device_dialog import ManualAddDeviceDialog
 class ConnectionSettingsPage(QWidget):
     """Connection settings page."""
 
+    # Discovery results arrive on the scan thread and are forwarded to the GUI thread
+    device_found = Signal(object)      # DiscoveredDevice
+    discovery_finished = Signal(int)   # number of devices found
+
     def __init__(self):
         """Initialize the connection settings page."""
         super().__init__()
         self.device_manager = DeviceManagerSingleton.get_instance()
         self.settings_manager = get_settings_manager()
         self.device_manager.add_status_callback(self._on_device_status_changed)
+        self.device_manager.add_discovery_callback(self.device_found.emit)
+        self.device_manager.add_discovery_finished_callback(self.discovery_finished.emit)
         self.is_searching = False
         self._setup_ui()
         self._connect_signals()
@@ -75,6 +81,10 @@ class ConnectionSettingsPage(QWidget):
         self.lan_radio = QRadioButton("LAN")
         search_type_layout.addWidget(self.usb_radio)
         search_type_layout.addWidget(self.lan_radio)
+        search_type_layout.addWidget(QLabel("\u626b\u63cf\u8303\u56f4:"))
+        self.scan_range_edit = QLineEdit("192.168.2.0/24")
+        self.scan_range_edit.setToolTip("CIDR\u683c\u5f0f\uff0c\u5982 192.168.2.0/24")
+        search_type_layout.addWidget(self.scan_range_edit)
         search_type_layout.addStretch()
         search_layout.addLayout(search_type_layout)
 
@@ -203,6 +213,8 @@ class ConnectionSettingsPage(QWidget):
         
         # Found devices table
         self.found_table.doubleClicked.connect(self._connect_selected_device)
+        self.device_found.connect(self._on_device_found)
+        self.discovery_finished.connect(self._on_discovery_finished)
         
         # Connected devices table - ?????????????
         self.connected_table.doubleClicked.connect(self._open_device_config_dialog)
@@ -232,28 +244,29 @@ class ConnectionSettingsPage(QWidget):
     
     def _search_lan_devices(self):
         """Search for LAN devices."""
-        ip_range = "192.168.2"
-        self.status_bar.setText(f"\u6b63\u5728\u626b\u63cf IP \u8303\u56f4: {ip_range}.1-254")
-        self.device_manager.discover_devices(ip_range)
-        
-        import threading
-        import time
-        
-        def discovery_checker():
-            time.sleep(1)
-            for _ in range(30):
-                if not self.is_searching:
-                    break
-                devices = self.device_manager.get_connected_devices()
-                self._update_found_devices_table()
-                time.sleep(1)
-            
-            if self.is_searching:
-                self._stop_device_search()
-                device_count = len(self.device_manager.get_connected_devices())
-                self.status_bar.setText(f"\u641c\u7d22\u5b8c\u6210\uff0c\u53d1\u73b0 {device_count} \u53f0\u8bbe\u5907")
-        
-        threading.Thread(target=discovery_checker, daemon=True).start()
+        ip_range = self.scan_range_edit.text().strip()
+        try:
+            self.device_manager.discover_devices(ip_range, probe_idn=True)
+        except ValueError as e:
+            # Unparsable ranges and ranges larger than the scanner allows
+            self.status_bar.setText(f"\u65e0\u6548\u7684\u626b\u63cf\u8303\u56f4: {e}")
+            self._stop_device_search()
+            return
+
+        self.status_bar.setText(f"\u6b63\u5728\u626b\u63cf IP \u8303\u56f4: {ip_range}")
+
+    def _on_device_found(self, device):
+        """Show a device as soon as the scanner finds it."""
+        if self.is_searching:
+            self._update_found_devices_table()
+            self.status_bar.setText(f"\u53d1\u73b0\u8bbe\u5907: {device.ip_address}")
+
+    def _on_discovery_finished(self, device_count: int):
+        """Handle the end of a LAN scan."""
+        if not self.is_searching:
+            return
+        self._stop_device_search()
+        self.status_bar.setText(f"\u641c\u7d22\u5b8c\u6210\uff0c\u53d1\u73b0 {device_count} \u53f0\u8bbe\u5907")
     
     def _search_usb_devices(self):
         """Search for USB devices."""
@@ -264,6 +277,7 @@ class ConnectionSettingsPage(QWidget):
         """Update the found devices table."""
         devices = self.device_manager.get_connected_devices()
         self.found_table.setRowCount(0)
+        shown = set()
         
         for device_id, device in devices.items():
             if device.status in [ConnectionStatus.CONNECTED, ConnectionStatus.ERROR]:
@@ -274,6 +288,20 @@ class ConnectionSettingsPage(QWidget):
                 self.found_table.setItem(row, 2, QTableWidgetItem(device.ip_address))
                 status_text = "\u5df2\u8fde\u63a5" if device.status == ConnectionStatus.CONNECTED else "\u53d1\u73b0"
                 self.found_table.setItem(row, 3, QTableWidgetItem(status_text))
+                shown.add(device.ip_address)
+
+        # Devices found by the LAN scan but not connected yet
+        for ip_address, found in sorted(self.device_manager.get_discovered_devices().items()):
+            if ip_address in shown:
+                continue
+            parts = [part.strip() for part in found.idn.split(",")]
+            name = " ".join(parts[:2]) if len(parts) >= 2 else "LAN\u8bbe\u5907"
+            row = self.found_table.rowCount()
+            self.found_table.insertRow(row)
+            self.found_table.setItem(row, 0, QTableWidgetItem(name))
+            self.found_table.setItem(row, 1, QTableWidgetItem("LAN"))
+            self.found_table.setItem(row, 2, QTableWidgetItem(ip_address))
+            self.found_table.setItem(row, 3, QTableWidgetItem("\u53d1\u73b0"))
     
     def _clear_search_results(self):
         """Clear search results."""
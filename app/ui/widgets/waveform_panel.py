@@ -6,6 +6,10 @@ import numpy as np
 import pyqtgraph as pg
 from PySide6.QtWidgets import QVBoxLayout, QWidget
 
+from app.core.minmax_pyramid import MinMaxPyramid
+from app.core.ring_buffer import RingBuffer
+from app.core.settings_manager import get_settings_manager
+
 # Import here to avoid circular import
 from typing import TYPE_CHECKING
 if TYPE_CHECKING:
@@ -22,8 +26,11 @@ class WaveformPanel(QWidget):
         self.current_waveform_data: WaveformData | None = None
         self.real_time_mode = False
         self.real_time_curves = {}  # Store plot curves for real-time updates
-        self.real_time_data_buffer = {}  # Buffer for real-time data
-        self.buffer_size = 1000  # Maximum points to keep in buffer
+        self.real_time_data_buffer: dict[str, RingBuffer] = {}  # Time/value buffer per real-time channel
+        self.real_time_next_time: dict[str, float] = {}  # Time of the next sample per channel
+        # Maximum points to keep in buffer
+        self.buffer_size = int(get_settings_manager().get_setting("acquisition.buffer_size", 1000))
+        self.file_curves: list[tuple[pg.PlotDataItem, MinMaxPyramid]] = []  # Curves drawn per zoom level
         
         # Multi-scale settings
         self.active_scales = [0, 1]  # Default to 2 scales
@@ -57,6 +64,11 @@ class WaveformPanel(QWidget):
         
         layout.addWidget(self.plot_widget)
 
+        # Redraw file curves at the detail level of the new view
+        view_box = self.plot_widget.getViewBox()
+        view_box.sigXRangeChanged.connect(self._refresh_file_curves)
+        view_box.sigResized.connect(self._refresh_file_curves)
+
         # Add some sample data
         self._add_sample_data()
     
@@ -145,6 +157,7 @@ class WaveformPanel(QWidget):
         
         # Clear existing plots
         self.plot_widget.clear()
+        self.file_curves.clear()
         
         if not waveform_data.channels:
             return
@@ -194,12 +207,16 @@ class WaveformPanel(QWidget):
             # \u5728\u5bf9\u5e94\u7684ViewBox\u4e2d\u7ed8\u5236\u6570\u636e
             viewbox = axis_info['viewbox']
             curve = pg.PlotDataItem(
-                x_data, 
-                y_data,
                 pen=pg.mkPen(color=color, width=2),
                 name=label
             )
             viewbox.addItem(curve)
+            pyramid = MinMaxPyramid(1)
+            pyramid.extend(x_data, np.asarray(y_data, dtype=np.float64).reshape(1, -1))
+            self.file_curves.append((curve, pyramid))
+
+        # Start with the whole recording, summarized to the plot width
+        self._refresh_file_curves(full_range=True)
         
         # Update labels
         self.plot_widget.setLabel('bottom', '\u65f6\u95f4 (s)')
@@ -220,6 +237,27 @@ class WaveformPanel(QWidget):
             title = f"\u6ce2\u5f62\u6570\u636e: {waveform_data.device_info['file_name']}"
             self.plot_widget.setTitle(title)
 
+    def _refresh_file_curves(self, *_, full_range: bool = False) -> None:
+        """Redraw file curves with the points needed for the visible range.
+
+        Long recordings are drawn from min/max summaries, so the number of
+        points handed to pyqtgraph depends on the plot width, not the file size.
+
+        Args:
+            full_range: Draw the whole recording instead of the current view
+        """
+        if not self.file_curves:
+            return
+        view_box = self.plot_widget.getViewBox()
+        if full_range:
+            x_min, x_max = -np.inf, np.inf
+        else:
+            x_min, x_max = view_box.viewRange()[0]
+        pixels = max(int(view_box.width()), 100)
+        for curve, pyramid in self.file_curves:
+            x, y = pyramid.query(x_min, x_max, pixels)
+            curve.setData(x[0], y[0])
+
     def _add_sample_data(self) -> None:
         """Add sample waveform data for demonstration."""
         # Generate sample data
@@ -246,35 +284,45 @@ class WaveformPanel(QWidget):
         
         # Update data buffer for each channel
         for channel_name, channel_data in data.channel_data.items():
-            if channel_name not in self.real_time_data_buffer:
-                self.real_time_data_buffer[channel_name] = {
-                    'data': np.array([]),
-                    'time': np.array([])
-                }
-            
-            # Add new data to buffer
-            buffer = self.real_time_data_buffer[channel_name]
+            buffer = self.real_time_data_buffer.get(channel_name)
+            if buffer is None:
+                buffer = self.real_time_data_buffer[channel_name] = RingBuffer(("time", "value"), self.buffer_size)
             
-            # Create time array for new data
-            if len(buffer['time']) > 0:
-                last_time = buffer['time'][-1]
-                new_time = np.arange(len(channel_data)) / data.sample_rate + last_time + (1.0 / data.sample_rate)
-            else:
-                new_time = np.arange(len(channel_data)) / data.sample_rate
-            
-            # Append new data
-            buffer['data'] = np.concatenate([buffer['data'], channel_data])
-            buffer['time'] = np.concatenate([buffer['time'], new_time])
-            
-            # Limit buffer size
-            if len(buffer['data']) > self.buffer_size:
-                excess = len(buffer['data']) - self.buffer_size
-                buffer['data'] = buffer['data'][excess:]
-                buffer['time'] = buffer['time'][excess:]
+            # Add new data to buffer (oldest points are overwritten beyond buffer_size)
+            self._append_real_time_samples(channel_name, buffer, channel_data, data.sample_rate)
             
-            # Update plot curve
+            # Update plot curve with views of the buffer (no copy)
             if channel_name in self.real_time_curves:
-                self.real_time_curves[channel_name].setData(buffer['time'], buffer['data'])
+                self.real_time_curves[channel_name].setData(buffer.view("time"), buffer.view("value"))
+    
+    def _append_real_time_samples(self, channel_name: str, buffer: RingBuffer,
+                                  values: np.ndarray, sample_rate: float) -> None:
+        """Add consecutive samples to a channel buffer with a continuous time axis.
+        
+        Args:
+            channel_name: Channel the samples belong to
+            buffer: The channel's time/value buffer
+            values: New samples, oldest first
+            sample_rate: Samples per second
+        """
+        values = np.asarray(values, dtype=np.float64)
+        period = 1.0 / sample_rate
+        # Only the newest samples fit; skip the time of the others
+        skipped = max(len(values) - buffer.capacity, 0)
+        values = values[skipped:]
+        first_time = self.real_time_next_time.get(channel_name, 0.0) + skipped * period
+        self.real_time_next_time[channel_name] = first_time + len(values) * period
+        buffer.extend((first_time + np.arange(len(values)) * period, values))
+    
+    def set_buffer_size(self, buffer_size: int) -> None:
+        """Change how many real-time points are kept per channel.
+        
+        Args:
+            buffer_size: Maximum points per channel
+        """
+        self.buffer_size = max(1, int(buffer_size))
+        for buffer in self.real_time_data_buffer.values():
+            buffer.set_capacity(self.buffer_size)
     
     def _switch_to_real_time_mode(self) -> None:
         """Switch display to real-time mode."""
@@ -282,6 +330,7 @@ class WaveformPanel(QWidget):
         
         # Clear existing plots
         self.plot_widget.clear()
+        self.file_curves.clear()
         
         # Setup for real-time display
         self.plot_widget.setLabel('bottom', '\u65f6\u95f4 (s)')
@@ -314,6 +363,7 @@ class WaveformPanel(QWidget):
         self.real_time_mode = False
         self.real_time_curves.clear()
         self.real_time_data_buffer.clear()
+        self.real_time_next_time.clear()
         
         # Restore sample data or clear
         self.plot_widget.clear()
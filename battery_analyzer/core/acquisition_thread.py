@@ -4,12 +4,256 @@
 
 from __future__ import annotations
 
-from typing import Dict, List, Optional
+from typing import Callable, Dict, List, Literal, Optional, Tuple
+import math
 import time
 
-from PySide6.QtCore import QThread, Signal
+import numpy as np
 
+from PySide6.QtCore import Qt, QThread, Signal
+
+from app.core.sample_queue import OverflowPolicy, SampleQueue
 from battery_analyzer.core.lr8450_client import LR8450Client
+from battery_analyzer.core.memory_stream import MemoryStream
+
+# 错过采样时刻后的处理策略：
+#   "skip"     - 放弃已错过的时刻，对齐到下一个未来时刻（默认，采样间隔均匀）
+#   "catch_up" - 立即补采错过的时刻，直到赶上计划（保持总采样数）
+LatePolicy = Literal["skip", "catch_up"]
+
+# 采集方式：
+#   "realtime" - 按主机间隔读取 :MEMory:GETReal 实时值快照
+#   "memory"   - 连续读取设备存储，按设备采样间隔获得每个采样点（不遗漏、不重复）
+AcquisitionMode = Literal["realtime", "memory"]
+
+# 等待时单次睡眠的上限（秒），保证 stop()/pause() 能及时生效
+MAX_SLEEP_SLICE = 0.05
+
+# 通过 status_changed 报告实际采样率和抖动的间隔（秒）
+STATS_REPORT_INTERVAL = 10.0
+
+
+class DeadlineScheduler:
+    """基于 time.monotonic() 截止时刻的周期调度器
+
+    第 n 个采样时刻固定为 起点 + n × 间隔，与每次读取的耗时无关，
+    因此不会累积漂移。读取耗时超过间隔时按策略跳过或补采错过的时刻。
+    同时统计实际采样率、周期抖动（相邻采样间隔的标准差）和最大延迟。
+    """
+
+    def __init__(
+        self,
+        interval_sec: float,
+        policy: LatePolicy = "skip",
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep
+    ):
+        """初始化调度器
+
+        Args:
+            interval_sec: 采样间隔（秒）
+            policy: 错过采样时刻后的处理策略，"skip" 或 "catch_up"
+            clock: 单调时钟（测试时可替换）
+            sleep: 睡眠函数（测试时可替换）
+        """
+        if interval_sec <= 0:
+            raise ValueError("采样间隔必须大于0")
+        if policy not in ("skip", "catch_up"):
+            raise ValueError(f"未知的延迟策略: {policy}")
+
+        self.interval_sec = interval_sec
+        self.policy = policy
+        self._clock = clock
+        self._sleep = sleep
+        self.start()
+
+    def start(self) -> None:
+        """从当前时刻开始计划，并清零统计"""
+        now = self._clock()
+        self._origin = now
+        self._next_deadline = now
+        self._paused_at: Optional[float] = None
+        self._paused_total = 0.0
+        self._resumed = False
+
+        self.samples = 0
+        self.skipped = 0
+        self.max_lateness = 0.0
+        self._last_sample: Optional[float] = None
+        # Welford 算法累计相邻采样间隔的均值与方差
+        self._periods = 0
+        self._period_mean = 0.0
+        self._period_m2 = 0.0
+
+    def elapsed(self, at: Optional[float] = None) -> float:
+        """从开始起经过的采集时间（秒），不含暂停时间"""
+        if at is None:
+            at = self._clock()
+        paused = self._paused_total
+        if self._paused_at is not None:
+            paused += max(at - self._paused_at, 0.0)  # 正在暂停
+        return at - self._origin - paused
+
+    def wait_next(self, keep_waiting: Callable[[], bool] = lambda: True) -> bool:
+        """睡眠到下一个采样时刻
+
+        Args:
+            keep_waiting: 每个睡眠片段后调用，返回False时立即结束等待
+
+        Returns:
+            是否到达了采样时刻（False表示等待被中断）
+        """
+        while True:
+            remaining = self._next_deadline - self._clock()
+            if remaining <= 0:
+                return True
+            if not keep_waiting():
+                return False
+            self._sleep(min(remaining, MAX_SLEEP_SLICE))
+
+    def complete(self, started: float, finished: float) -> float:
+        """记录一次采样并计划下一个时刻
+
+        Args:
+            started: 发送读取请求前的时钟值
+            finished: 收到数据后的时钟值
+
+        Returns:
+            采样时间戳（秒，从开始起计，不含暂停时间），取请求与响应的中点
+        """
+        sample_time = (started + finished) / 2.0
+        self._record(started, sample_time)
+        self.advance(finished)
+        return self.elapsed(sample_time)
+
+    def advance(self, now: Optional[float] = None) -> None:
+        """越过当前时刻，按延迟策略计划下一个时刻"""
+        if now is None:
+            now = self._clock()
+        self._next_deadline += self.interval_sec
+
+        if self.policy == "skip" and now > self._next_deadline:
+            missed = math.ceil((now - self._next_deadline) / self.interval_sec)
+            self._next_deadline += missed * self.interval_sec
+            self.skipped += missed
+
+    def pause(self) -> None:
+        """暂停计划，暂停期间不计入采集时间"""
+        if self._paused_at is None:
+            self._paused_at = self._clock()
+
+    def resume(self) -> None:
+        """恢复计划，截止时刻整体后移暂停的时长"""
+        if self._paused_at is None:
+            return
+        paused = self._clock() - self._paused_at
+        self._paused_at = None
+        self._paused_total += paused
+        self._next_deadline += paused
+        # 暂停前后的间隔不计入抖动统计；恢复后的第一次采样重新确定计划起点
+        self._last_sample = None
+        self._resumed = True
+
+    def _record(self, started: float, sample_time: float) -> None:
+        if self._resumed:
+            # 采集线程察觉恢复需要一段时间，这段延迟不计入最大延迟和跳过次数，
+            # 此后的采样时刻从这次采样开始计划
+            self._resumed = False
+            self._next_deadline = max(self._next_deadline, started)
+        lateness = started - self._next_deadline
+        self.max_lateness = max(self.max_lateness, lateness)
+
+        if self._last_sample is not None:
+            period = sample_time - self._last_sample
+            self._periods += 1
+            delta = period - self._period_mean
+            self._period_mean += delta / self._periods
+            self._period_m2 += delta * (period - self._period_mean)
+        self._last_sample = sample_time
+        self.samples += 1
+
+    def statistics(self) -> Dict[str, float]:
+        """调度统计
+
+        Returns:
+            samples: 采样次数
+            skipped: 按 "skip" 策略跳过的时刻数
+            rate_hz: 实际平均采样率（不含暂停）
+            jitter_ms: 相邻采样间隔的标准差
+            max_lateness_ms: 读取开始相对计划时刻的最大延迟
+        """
+        # 由相邻采样间隔的均值计算，不含跨越暂停的间隔
+        periods = self._periods
+        rate = 1.0 / self._period_mean if periods and self._period_mean > 0 else 0.0
+        jitter = math.sqrt(self._period_m2 / periods) if periods > 1 else 0.0
+        return {
+            'samples': self.samples,
+            'skipped': self.skipped,
+            'rate_hz': rate,
+            'jitter_ms': jitter * 1000.0,
+            'max_lateness_ms': max(self.max_lateness, 0.0) * 1000.0,
+        }
+
+
+class SampleBlock:
+    """按通道顺序累积采样点，取出时合并为numpy数据块"""
+
+    def __init__(self, channels: List[str]):
+        """初始化数据块
+
+        Args:
+            channels: 通道顺序，决定数据块的行顺序
+        """
+        self.channels = list(channels)
+        self._rows = {channel: i for i, channel in enumerate(self.channels)}
+        self._timestamps: List[np.ndarray] = []
+        self._values: List[np.ndarray] = []
+        self._count = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    def append(self, timestamp: float, data: Dict[str, float]) -> None:
+        """添加一个采样点，缺少的通道为NaN"""
+        column = np.full((len(self.channels), 1), np.nan)
+        for channel, value in data.items():
+            row = self._rows.get(channel)
+            if row is not None:
+                column[row, 0] = value
+        self._timestamps.append(np.array([timestamp]))
+        self._values.append(column)
+        self._count += 1
+
+    def extend(self, timestamps: np.ndarray, values: Dict[str, np.ndarray]) -> None:
+        """添加连续的多个采样点"""
+        count = len(timestamps)
+        if not count:
+            return
+        block = np.full((len(self.channels), count), np.nan)
+        for channel, array in values.items():
+            row = self._rows.get(channel)
+            if row is not None:
+                block[row] = array
+        self._timestamps.append(np.asarray(timestamps, dtype=np.float64))
+        self._values.append(block)
+        self._count += count
+
+    def take(self) -> Tuple[np.ndarray, np.ndarray]:
+        """取出并清空累积的数据
+
+        Returns:
+            (时间戳数组 (样本数,), 数据数组 (通道数, 样本数))
+        """
+        if self._count:
+            timestamps = np.concatenate(self._timestamps)
+            values = np.concatenate(self._values, axis=1)
+        else:
+            timestamps = np.empty(0)
+            values = np.empty((len(self.channels), 0))
+        self._timestamps.clear()
+        self._values.clear()
+        self._count = 0
+        return timestamps, values
 
 
 class DataAcquisitionThread(QThread):
@@ -17,23 +261,43 @@ class DataAcquisitionThread(QThread):
     
     在后台线程中定期从LR8450设备读取数据，通过信号发送到主线程更新UI。
     这样可以避免数据采集阻塞UI线程，保持界面流畅。
+    采样时刻由 DeadlineScheduler 按固定截止时刻调度，时间戳为实测的采集时间。
+    存储模式下按相同的调度轮询设备存储，时间戳为设备采样序号 × 设备采样间隔。
+    采集到的数据先放入有界队列，主线程一次取出队列中的全部数据再发送信号，
+    UI卡顿时按溢出策略限制积压，不会在Qt事件队列中无限堆积。
     """
     
     # 信号：数据采集成功 (时间戳, 通道数据字典)
     data_acquired = Signal(float, dict)
     
+    # 信号：数据块采集成功 (时间戳数组 (样本数,), 数据数组 (通道数, 样本数))，
+    # 行顺序与 channels 一致，无效值为NaN；仅在 emit_blocks=True 时发送
+    block_acquired = Signal(object, object)
+    
     # 信号：采集错误 (错误消息)
     error_occurred = Signal(str)
     
     # 信号：采集状态 (状态消息)
     status_changed = Signal(str)
     
+    # 信号：队列积压达到高水位 (队列深度, 队列容量)
+    queue_high_watermark = Signal(int, int)
+    
+    # 内部信号：队列中有新数据，由主线程取出发送
+    _data_ready = Signal()
+    
     def __init__(
         self,
         device_client: LR8450Client,
         channels: List[str],
         interval_ms: int = 100,
-        parent=None
+        parent=None,
+        late_policy: LatePolicy = "skip",
+        acquisition_mode: AcquisitionMode = "realtime",
+        emit_blocks: bool = False,
+        block_interval_ms: int = 100,
+        queue_capacity: int = 256,
+        overflow_policy: Optional[OverflowPolicy] = None
     ):
         """初始化数据采集线程
         
@@ -42,6 +306,19 @@ class DataAcquisitionThread(QThread):
             channels: 要采集的通道列表，如 ["CH2_1", "CH2_3", "CH2_5", "CH2_7"]
             interval_ms: 采集间隔（毫秒），默认100ms
             parent: 父对象
+            late_policy: 读取耗时超过间隔时的策略，"skip"（跳过错过的时刻）
+                        或 "catch_up"（立即补采）
+            acquisition_mode: 采集方式，"realtime"（实时值快照）或 "memory"
+                        （连续读取设备存储，此时 interval_ms 为轮询间隔）；
+                        设备不支持存储读取时自动改用实时值
+            emit_blocks: 为True时累积采样点，用 block_acquired 成批发送，
+                        不再逐点发送 data_acquired
+            block_interval_ms: 数据块的最短发送间隔（毫秒），限制跨线程信号频率
+            queue_capacity: 等待主线程处理的最大数据项数（采样点或数据块）
+            overflow_policy: 队列满时的策略，"block"（等待主线程，反压到设备读取）、
+                        "drop_oldest"（丢弃最早的数据）或 "coalesce"（合并到最新一项：
+                        数据块模式下拼接，逐点模式下只保留最新采样点）；默认数据块模式
+                        为 "coalesce"（不丢失采样点），逐点模式为 "drop_oldest"
         """
         super().__init__(parent)
         
@@ -49,18 +326,53 @@ class DataAcquisitionThread(QThread):
         self.channels = channels
         self.interval_ms = interval_ms
         self.interval_sec = interval_ms / 1000.0
+        self.scheduler = DeadlineScheduler(self.interval_sec, late_policy)
+        self.acquisition_mode: AcquisitionMode = acquisition_mode
+        self.stream: Optional[MemoryStream] = None
+        self.last_sample_index = -1  # 存储模式下最后发送的设备采样序号
+        self.emit_blocks = emit_blocks
+        self.block_interval_sec = block_interval_ms / 1000.0
+        self._block = SampleBlock(channels)
+        
+        if overflow_policy is None:
+            overflow_policy = "coalesce" if emit_blocks else "drop_oldest"
+        self.queue: SampleQueue = SampleQueue(
+            queue_capacity,
+            overflow_policy,
+            on_high_watermark=self.queue_high_watermark.emit,
+            merge=self._merge_blocks if emit_blocks else None,
+        )
+        self._delivery_pending = False
+        self._data_ready.connect(self._deliver, Qt.ConnectionType.QueuedConnection)
         
         self._running = False
         self._paused = False
         self.data_index = 0
     
     def run(self):
-        """线程主循环 - 定期采集数据"""
+        """线程主循环 - 按截止时刻采集数据"""
         self._running = True
         self.data_index = 0
+        self.last_sample_index = -1
+        self.queue.reopen()
+        scheduler = self.scheduler
+        scheduler.start()
+        if self._paused:
+            scheduler.pause()
+        last_report = last_flush = time.monotonic()
         
         self.status_changed.emit("数据采集线程已启动")
         
+        if self.acquisition_mode == "memory":
+            self.stream = MemoryStream(self.device_client, self.channels)
+            if self.stream.start():
+                self.status_changed.emit(
+                    f"连续读取设备存储，设备采样间隔 {self.stream.interval * 1000:g} ms")
+            else:
+                self.stream = None
+                self.acquisition_mode = "realtime"
+                self.status_changed.emit("设备不支持存储读取，改用实时值采集")
+        
         while self._running:
             try:
                 # 如果暂停，跳过采集
@@ -68,28 +380,136 @@ class DataAcquisitionThread(QThread):
                     time.sleep(0.1)
                     continue
                 
-                # 计算时间戳
-                timestamp = self.data_index * self.interval_sec
-                
-                # 从设备读取数据
-                data = self.device_client.get_channel_data(self.channels)
+                # 等待下一个采样时刻
+                if not scheduler.wait_next(lambda: self._running and not self._paused):
+                    continue
                 
-                if data:
-                    # 发送数据到主线程
-                    self.data_acquired.emit(timestamp, data)
-                    self.data_index += 1
+                if self.stream is not None:
+                    finished = self._acquire_memory()
                 else:
-                    # 数据读取失败
-                    self.error_occurred.emit("设备无响应，未能读取数据")
+                    finished = self._acquire_realtime()
+                
+                if self.emit_blocks and finished - last_flush >= self.block_interval_sec:
+                    last_flush = finished
+                    self._flush_block()
                 
-                # 等待下一个采集周期
-                time.sleep(self.interval_sec)
+                if finished - last_report >= STATS_REPORT_INTERVAL:
+                    last_report = finished
+                    self.status_changed.emit(self._format_statistics())
                 
             except Exception as e:
                 self.error_occurred.emit(f"数据采集错误: {str(e)}")
-                time.sleep(self.interval_sec)
+                scheduler.advance()
+        
+        self._flush_block()
+        self.status_changed.emit(f"数据采集线程已停止（{self._format_statistics()}）")
+    
+    def _acquire_realtime(self) -> float:
+        """读取一次实时值快照，返回读取完成的时钟值"""
+        # 从设备读取数据，记录请求前后的时刻
+        started = time.monotonic()
+        data = self.device_client.get_channel_data(self.channels)
+        finished = time.monotonic()
+        
+        if data:
+            # 时间戳为实测采集时间
+            timestamp = self.scheduler.complete(started, finished)
+            if self.emit_blocks:
+                self._block.append(timestamp, data)
+            else:
+                self._publish((timestamp, data))
+            self.data_index += 1
+        else:
+            # 数据读取失败
+            self.scheduler.advance(finished)
+            self.error_occurred.emit("设备无响应，未能读取数据")
+        return finished
+    
+    def _acquire_memory(self) -> float:
+        """读取设备存储中的新采样点并发送（逐点或加入数据块），返回读取完成的时钟值"""
+        started = time.monotonic()
+        batch = self.stream.poll()
+        finished = time.monotonic()
+        
+        if batch is None:
+            self.scheduler.advance(finished)
+            self.error_occurred.emit("设备无响应，未能读取存储写入位置")
+            return finished
+        
+        self.scheduler.complete(started, finished)
+        if batch.lost:
+            self.error_occurred.emit(f"设备存储已覆盖 {batch.lost} 个未读取的采样点")
         
-        self.status_changed.emit("数据采集线程已停止")
+        timestamps = batch.timestamps
+        if self.emit_blocks:
+            self._block.extend(timestamps, batch.values)
+            self.data_index += batch.count
+        else:
+            for i in range(batch.count):
+                data = {
+                    channel: float(values[i])
+                    for channel, values in batch.values.items()
+                    if np.isfinite(values[i])
+                }
+                if data:
+                    self._publish((float(timestamps[i]), data))
+                    self.data_index += 1
+        if batch.count:
+            self.last_sample_index = batch.start_index + batch.count - 1
+        return finished
+    
+    def _flush_block(self) -> None:
+        """发送累积的数据块"""
+        if len(self._block):
+            self._publish(self._block.take())
+    
+    def _publish(self, item: Tuple) -> None:
+        """把数据放入队列，并在主线程尚未安排取出时通知主线程（采集线程中调用）"""
+        self.queue.put(item)
+        if not self._delivery_pending:
+            self._delivery_pending = True
+            self._data_ready.emit()
+    
+    def _deliver(self) -> None:
+        """取出队列中的全部数据并发送信号（在主线程中执行）"""
+        # 先清除标记再取出，取出之后放入的数据会再次通知
+        self._delivery_pending = False
+        signal = self.block_acquired if self.emit_blocks else self.data_acquired
+        for first, second in self.queue.drain():
+            signal.emit(first, second)
+    
+    @staticmethod
+    def _merge_blocks(older: Tuple[np.ndarray, np.ndarray],
+                      newer: Tuple[np.ndarray, np.ndarray]) -> Tuple[np.ndarray, np.ndarray]:
+        """合并两个数据块（"coalesce" 策略使用，不丢失数据）"""
+        return (np.concatenate((older[0], newer[0])),
+                np.concatenate((older[1], newer[1]), axis=1))
+    
+    def _format_statistics(self) -> str:
+        """格式化调度统计"""
+        stats = self.get_statistics()
+        return (f"实际采样率 {stats['rate_hz']:.2f} Hz"
+                f"（目标 {1.0 / self.interval_sec:.2f} Hz），"
+                f"抖动 {stats['jitter_ms']:.1f} ms，"
+                f"最大延迟 {stats['max_lateness_ms']:.1f} ms，"
+                f"跳过 {stats['skipped']} 个采样时刻，"
+                f"队列丢弃 {stats['queue_dropped']} / 合并 {stats['queue_coalesced']}")
+    
+    def get_statistics(self) -> Dict[str, float]:
+        """获取调度统计（见 DeadlineScheduler.statistics）与队列统计
+
+        队列统计：queue_depth 当前积压项数，queue_peak 最大积压项数，
+        queue_dropped 丢弃项数，queue_coalesced 合并项数
+        """
+        stats = self.scheduler.statistics()
+        queue_stats = self.queue.stats()
+        stats.update({
+            'queue_depth': queue_stats.depth,
+            'queue_peak': queue_stats.peak_depth,
+            'queue_dropped': queue_stats.dropped,
+            'queue_coalesced': queue_stats.coalesced,
+        })
+        return stats
     
     def stop(self):
         """停止采集线程"""
@@ -99,10 +519,12 @@ class DataAcquisitionThread(QThread):
     def pause(self):
         """暂停采集"""
         self._paused = True
+        self.scheduler.pause()
         self.status_changed.emit("数据采集已暂停")
     
     def resume(self):
         """恢复采集"""
+        self.scheduler.resume()
         self._paused = False
         self.status_changed.emit("数据采集已恢复")
     
@@ -113,4 +535,3 @@ class DataAcquisitionThread(QThread):
     def is_paused(self) -> bool:
         """是否已暂停"""
         return self._paused
-
@@ -5,49 +5,186 @@
 from __future__ import annotations
 
 import time
-from typing import Dict, List, Tuple
-from dataclasses import dataclass
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional, Tuple
+from dataclasses import dataclass, field
 import numpy as np
 
+if TYPE_CHECKING:
+    from battery_analyzer.core.engine_journal import EngineJournal
+
+# 日志和检查点中数据列的顺序（两块电池的时间戳相同，只记录一次）
+SAMPLE_COLUMNS = ('timestamp', 'ternary_voltage', 'ternary_temp', 'blade_voltage', 'blade_temp')
+
+
+class DataColumn:
+    """按需扩容的numpy数据列，追加时同步更新统计量
+
+    存储区容量不足时按2倍扩大（均摊O(1)）；最小值、最大值、总和、首末值以及
+    Welford方差在追加时增量更新，查询统计量不需要遍历数据。
+    """
+
+    def __init__(self, values: Iterable[float] = ()):
+        self._data = np.empty(0)
+        self._count = 0
+        self.first = float('nan')
+        self.last = float('nan')
+        self.min = float('inf')
+        self.max = float('-inf')
+        self.sum = 0.0
+        self._mean = 0.0
+        self._m2 = 0.0   # 与均值之差的平方和（Welford）
+        self.extend(values)
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __getitem__(self, index):
+        """整数下标返回float，切片返回数组视图"""
+        if isinstance(index, slice):
+            return self.values[index]
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError("数据列下标越界")
+        return float(self._data[index])
+
+    def __iter__(self):
+        return iter(self.values.tolist())
+
+    @property
+    def values(self) -> np.ndarray:
+        """全部数据（只读视图，下一次追加前有效）"""
+        view = self._data[:self._count]
+        view.flags.writeable = False
+        return view
+
+    @property
+    def mean(self) -> float:
+        return self._mean if self._count else float('nan')
+
+    @property
+    def variance(self) -> float:
+        """总体方差"""
+        return self._m2 / self._count if self._count else float('nan')
+
+    def append(self, value: float) -> None:
+        """追加一个数据"""
+        value = float(value)
+        self._reserve(1)
+        self._data[self._count] = value
+        self._count += 1
+
+        if self._count == 1:
+            self.first = value
+        self.last = value
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+        self.sum += value
+        delta = value - self._mean
+        self._mean += delta / self._count
+        self._m2 += delta * (value - self._mean)
+
+    def extend(self, values: Iterable[float]) -> None:
+        """追加多个数据（块统计量与已有统计量合并）"""
+        block = np.asarray(values if isinstance(values, np.ndarray) else list(values),
+                           dtype=np.float64).ravel()
+        count = len(block)
+        if count == 0:
+            return
+        self._reserve(count)
+        self._data[self._count:self._count + count] = block
+
+        block_mean = float(block.mean())
+        block_m2 = float(((block - block_mean) ** 2).sum())
+        total = self._count + count
+        delta = block_mean - self._mean
+        self._m2 += block_m2 + delta * delta * self._count * count / total
+        self._mean += delta * count / total
+
+        if self._count == 0:
+            self.first = float(block[0])
+        self._count = total
+        self.last = float(block[-1])
+        self.min = min(self.min, float(block.min()))
+        self.max = max(self.max, float(block.max()))
+        self.sum += float(block.sum())
+
+    def _reserve(self, count: int) -> None:
+        needed = self._count + count
+        if needed <= len(self._data):
+            return
+        data = np.empty(max(needed, 2 * len(self._data), 1024))
+        data[:self._count] = self._data[:self._count]
+        self._data = data
+
+    def tolist(self) -> List[float]:
+        return self.values.tolist()
+
+    def get_state(self) -> Dict[str, float]:
+        """统计量（与数据一起可以精确还原数据列）"""
+        return {'first': self.first, 'last': self.last, 'min': self.min, 'max': self.max,
+                'sum': self.sum, 'mean': self._mean, 'm2': self._m2}
+
+    @classmethod
+    def from_state(cls, values: np.ndarray, state: Dict[str, float]) -> "DataColumn":
+        """由数据和 get_state 的结果还原数据列（不重新计算统计量）"""
+        column = cls()
+        column._reserve(len(values))
+        column._data[:len(values)] = values
+        column._count = len(values)
+        column.first, column.last = state['first'], state['last']
+        column.min, column.max, column.sum = state['min'], state['max'], state['sum']
+        column._mean, column._m2 = state['mean'], state['m2']
+        return column
+
 
 @dataclass
 class BatteryTestData:
-    """电池测试数据"""
-    voltage_data: List[float]  # 电压数据
-    temp_data: List[float]     # 温度数据
-    timestamps: List[float]    # 时间戳
-    
+    """电池测试数据（numpy列存储，统计查询为O(1)）"""
+    voltage_data: DataColumn = field(default_factory=DataColumn)  # 电压数据
+    temp_data: DataColumn = field(default_factory=DataColumn)     # 温度数据
+    timestamps: DataColumn = field(default_factory=DataColumn)    # 时间戳
+
+    def __post_init__(self):
+        # 兼容以列表构造
+        for name in ('voltage_data', 'temp_data', 'timestamps'):
+            value = getattr(self, name)
+            if not isinstance(value, DataColumn):
+                setattr(self, name, DataColumn(value))
+
     def get_temp_rise(self) -> Dict[str, float]:
         """计算温升数据"""
-        if not self.temp_data:
+        temp = self.temp_data
+        if not temp:
             return {}
         
         return {
-            '初始温度': self.temp_data[0],
-            '当前温度': self.temp_data[-1],
-            '峰值温度': max(self.temp_data),
-            '最低温度': min(self.temp_data),
-            '温升': max(self.temp_data) - self.temp_data[0],
-            '平均温度': np.mean(self.temp_data),
+            '初始温度': temp.first,
+            '当前温度': temp.last,
+            '峰值温度': temp.max,
+            '最低温度': temp.min,
+            '温升': temp.max - temp.first,
+            '平均温度': temp.mean,
         }
     
     def get_voltage_drop(self) -> Dict[str, float]:
         """计算电压压降数据"""
-        if not self.voltage_data:
+        voltage = self.voltage_data
+        if not voltage:
             return {}
         
-        v_start = self.voltage_data[0]
-        v_current = self.voltage_data[-1]
+        v_start = voltage.first
+        v_current = voltage.last
         v_drop = v_start - v_current
         
         return {
             '初始电压': v_start,
             '当前电压': v_current,
-            '最高电压': max(self.voltage_data),
-            '最低电压': min(self.voltage_data),
+            '最高电压': voltage.max,
+            '最低电压': voltage.min,
             '电压降': v_drop,
             '压降率': (v_drop / v_start * 100) if v_start != 0 else 0,
-            '平均电压': np.mean(self.voltage_data),
+            '平均电压': voltage.mean,
         }
 
 
@@ -55,8 +192,8 @@ class BatteryAnalysisEngine:
     """电池分析引擎"""
 
     def __init__(self):
-        self.ternary_data = BatteryTestData([], [], [])
-        self.blade_data = BatteryTestData([], [], [])
+        self.ternary_data = BatteryTestData()
+        self.blade_data = BatteryTestData()
 
         # mAh测试参数
         self.mah_test_current = 1000.0  # mA（恒流测试电流）
@@ -65,6 +202,9 @@ class BatteryAnalysisEngine:
         self.mah_test_channel = "ternary"  # 测试通道
         self.mah_accumulated = 0.0      # 累计容量
         self.mah_last_update_index = 0  # 上次更新时的数据点索引
+        self.mah_test_suspended = False # 测试暂停（程序异常退出后恢复的测试），可继续
+        self.mah_elapsed_offset = 0.0   # 暂停前已测试的时长（秒）
+        self.mah_points_offset = 0      # 暂停前已测试的数据点数
 
         # mX+b校准参数 - 电压校准
         self.ternary_voltage_m = 1.0
@@ -78,6 +218,9 @@ class BatteryAnalysisEngine:
         self.blade_temp_m = 1.0
         self.blade_temp_b = 0.0
 
+        # 崩溃恢复日志（见 EngineJournal.attach），数据和状态变化都会写入
+        self.journal: Optional[EngineJournal] = None
+
     def apply_calibration(self, battery_type: str, data_type: str, value: float) -> float:
         """应用mX+b校准
 
@@ -119,6 +262,60 @@ class BatteryAnalysisEngine:
         if self.mah_test_active:
             self._update_capacity_from_data()
 
+        if self.journal is not None:
+            self.journal.log_point((timestamp, ternary_voltage, ternary_temp, blade_voltage, blade_temp))
+
+    def add_data_block(self, ternary_voltage, ternary_temp, blade_voltage, blade_temp,
+                       timestamps):
+        """批量添加数据点（数据已经过校准），结果与逐点调用 add_data_point 相同
+
+        Args:
+            ternary_voltage: 三元电池电压数组
+            ternary_temp: 三元电池温度数组
+            blade_voltage: 刀片电池电压数组
+            blade_temp: 刀片电池温度数组
+            timestamps: 时间戳数组（秒）
+        """
+        timestamps = np.asarray(timestamps, dtype=np.float64)
+        if not len(timestamps):
+            return
+
+        self.ternary_data.voltage_data.extend(np.asarray(ternary_voltage, dtype=np.float64))
+        self.ternary_data.temp_data.extend(np.asarray(ternary_temp, dtype=np.float64))
+        self.ternary_data.timestamps.extend(timestamps)
+
+        self.blade_data.voltage_data.extend(np.asarray(blade_voltage, dtype=np.float64))
+        self.blade_data.temp_data.extend(np.asarray(blade_temp, dtype=np.float64))
+        self.blade_data.timestamps.extend(timestamps)
+
+        if self.mah_test_active:
+            self._update_capacity_from_block()
+
+        if self.journal is not None:
+            count = len(timestamps)
+            self.journal.log_block(np.vstack([
+                timestamps,
+                self.ternary_data.voltage_data[-count:], self.ternary_data.temp_data[-count:],
+                self.blade_data.voltage_data[-count:], self.blade_data.temp_data[-count:],
+            ]))
+
+    def _update_capacity_from_block(self):
+        """按一次添加的多个数据点更新容量（相邻数据点时间差之和）"""
+        data = self.ternary_data if self.mah_test_channel == "ternary" else self.blade_data
+        current_index = len(data.timestamps)
+
+        if current_index <= self.mah_last_update_index:
+            return
+
+        if self.mah_last_update_index >= 1:
+            elapsed = data.timestamps[-1] - data.timestamps[self.mah_last_update_index - 1]
+        else:
+            # 与逐点计算一致：第一个数据点按默认100ms计
+            elapsed = 0.1 + data.timestamps[-1] - data.timestamps[0]
+
+        self.mah_accumulated += self.mah_test_current * (elapsed / 3600.0)
+        self.mah_last_update_index = current_index
+
     def _update_capacity_from_data(self):
         """根据实际采集的数据更新容量（使用恒流假设）"""
         data = self.ternary_data if self.mah_test_channel == "ternary" else self.blade_data
@@ -145,11 +342,17 @@ class BatteryAnalysisEngine:
 
     def clear_data(self):
         """清除所有数据"""
-        self.ternary_data = BatteryTestData([], [], [])
-        self.blade_data = BatteryTestData([], [], [])
+        self.ternary_data = BatteryTestData()
+        self.blade_data = BatteryTestData()
         self.mah_test_active = False
-        self.mah_accumulated = 0.0
         self.mah_last_update_index = 0
+        self.mah_test_start_index = 0
+        if not self.mah_test_suspended:
+            # 暂停的测试保留累计容量，清空数据后仍可继续
+            self.mah_accumulated = 0.0
+
+        if self.journal is not None:
+            self.journal.compact()
 
     def set_mx_plus_b(self, battery_type: str, data_type: str, m: float, b: float):
         """设置mX+b校准参数
@@ -175,6 +378,9 @@ class BatteryAnalysisEngine:
                 self.blade_temp_m = m
                 self.blade_temp_b = b
 
+        if self.journal is not None:
+            self.journal.log_event('set_mx_plus_b', battery_type, data_type, m, b)
+
     def get_calibration_params(self) -> Dict:
         """获取所有校准参数"""
         return {
@@ -199,6 +405,9 @@ class BatteryAnalysisEngine:
             self.blade_temp_m = params['blade_temp'].get('m', 1.0)
             self.blade_temp_b = params['blade_temp'].get('b', 0.0)
 
+        if self.journal is not None:
+            self.journal.log_event('set_calibration_params', params)
+
     def start_mah_test(self, current_ma: float, channel: str = "ternary"):
         """开始mAh容量测试（基于实际采集数据的恒流测试）
 
@@ -208,14 +417,20 @@ class BatteryAnalysisEngine:
         """
         self.mah_test_current = current_ma
         self.mah_test_active = True
+        self.mah_test_suspended = False
         self.mah_test_channel = channel
         self.mah_accumulated = 0.0
+        self.mah_elapsed_offset = 0.0
+        self.mah_points_offset = 0
 
         # 记录开始时的数据点索引
         data = self.ternary_data if channel == "ternary" else self.blade_data
         self.mah_test_start_index = len(data.timestamps)
         self.mah_last_update_index = self.mah_test_start_index
 
+        if self.journal is not None:
+            self.journal.log_event('start_mah_test', current_ma, channel)
+
     def stop_mah_test(self) -> float:
         """停止mAh容量测试
 
@@ -223,8 +438,97 @@ class BatteryAnalysisEngine:
             最终累计容量 (mAh)
         """
         self.mah_test_active = False
+        self.mah_test_suspended = False
+        if self.journal is not None:
+            self.journal.log_event('stop_mah_test')
         return self.mah_accumulated
 
+    def suspend_mah_test(self) -> None:
+        """暂停mAh容量测试（保留累计容量和测试时长，之后可以继续）"""
+        if not self.mah_test_active:
+            return
+        info = self.get_mah_test_info()
+        self.mah_elapsed_offset = info['elapsed_time']
+        self.mah_points_offset = info['data_points']
+        self.mah_test_active = False
+        self.mah_test_suspended = True
+        if self.journal is not None:
+            self.journal.log_event('suspend_mah_test')
+
+    def resume_mah_test(self) -> None:
+        """继续暂停的mAh容量测试
+
+        从当前数据点重新开始计时，暂停期间（包括程序未运行的时间）不计入容量。
+        """
+        if not self.mah_test_suspended:
+            return
+        data = self.ternary_data if self.mah_test_channel == "ternary" else self.blade_data
+        self.mah_test_active = True
+        self.mah_test_suspended = False
+        self.mah_test_start_index = len(data.timestamps)
+        self.mah_last_update_index = self.mah_test_start_index
+        if self.journal is not None:
+            self.journal.log_event('resume_mah_test')
+
+    def get_state(self) -> Dict:
+        """除数据以外的全部状态（mAh测试、校准参数、数据列统计量），可写入JSON"""
+        return {
+            'mah': {
+                'test_current': self.mah_test_current,
+                'test_active': self.mah_test_active,
+                'test_start_index': self.mah_test_start_index,
+                'test_channel': self.mah_test_channel,
+                'accumulated': self.mah_accumulated,
+                'last_update_index': self.mah_last_update_index,
+                'test_suspended': self.mah_test_suspended,
+                'elapsed_offset': self.mah_elapsed_offset,
+                'points_offset': self.mah_points_offset,
+            },
+            'calibration': self.get_calibration_params(),
+            'columns': {
+                f'{battery}.{name}': getattr(getattr(self, f'{battery}_data'), name).get_state()
+                for battery in ('ternary', 'blade')
+                for name in ('voltage_data', 'temp_data', 'timestamps')
+            },
+        }
+
+    def get_samples(self) -> np.ndarray:
+        """全部数据，(5, 点数) 的数组，行顺序同 SAMPLE_COLUMNS"""
+        return np.vstack([self.ternary_data.timestamps.values,
+                          self.ternary_data.voltage_data.values, self.ternary_data.temp_data.values,
+                          self.blade_data.voltage_data.values, self.blade_data.temp_data.values])
+
+    def restore_state(self, state: Dict, samples: np.ndarray) -> None:
+        """由 get_state 和 get_samples 的结果精确还原引擎
+
+        Args:
+            state: get_state 的结果
+            samples: (5, 点数) 的数组，行顺序同 SAMPLE_COLUMNS
+        """
+        columns = state['columns']
+        rows = dict(zip(SAMPLE_COLUMNS, samples))
+        for battery in ('ternary', 'blade'):
+            setattr(self, f'{battery}_data', BatteryTestData(
+                voltage_data=DataColumn.from_state(rows[f'{battery}_voltage'], columns[f'{battery}.voltage_data']),
+                temp_data=DataColumn.from_state(rows[f'{battery}_temp'], columns[f'{battery}.temp_data']),
+                timestamps=DataColumn.from_state(rows['timestamp'], columns[f'{battery}.timestamps']),
+            ))
+
+        mah = state['mah']
+        self.mah_test_current = mah['test_current']
+        self.mah_test_active = mah['test_active']
+        self.mah_test_start_index = mah['test_start_index']
+        self.mah_test_channel = mah['test_channel']
+        self.mah_accumulated = mah['accumulated']
+        self.mah_last_update_index = mah['last_update_index']
+        self.mah_test_suspended = mah.get('test_suspended', False)
+        self.mah_elapsed_offset = mah.get('elapsed_offset', 0.0)
+        self.mah_points_offset = mah.get('points_offset', 0)
+
+        journal, self.journal = self.journal, None  # 恢复校准参数不写入日志
+        self.set_calibration_params(state['calibration'])
+        self.journal = journal
+
     def get_mah_capacity(self) -> float:
         """获取当前累计容量（mAh）"""
         return self.mah_accumulated
@@ -243,14 +547,22 @@ class BatteryAnalysisEngine:
                 elapsed_time = 0.0
             current_voltage = data.voltage_data[-1] if data.voltage_data else 0.0
 
+        if not self.mah_test_active:
+            # 未在测试（已停止或暂停）时只显示暂停前的时长和点数
+            elapsed_time, points = self.mah_elapsed_offset, self.mah_points_offset
+        else:
+            elapsed_time += self.mah_elapsed_offset
+            points = self.mah_points_offset + len(data.timestamps) - self.mah_test_start_index
+
         return {
             'active': self.mah_test_active,
+            'suspended': self.mah_test_suspended,
             'current_ma': self.mah_test_current,
             'capacity_mah': self.mah_accumulated,
             'elapsed_time': elapsed_time,
             'current_voltage': current_voltage,
             'channel': self.mah_test_channel,
-            'data_points': len(data.timestamps) - self.mah_test_start_index,
+            'data_points': points,
         }
     
     def compare_temp_rise(self) -> Dict[str, any]:
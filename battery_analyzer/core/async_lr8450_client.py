@@ -0,0 +1,866 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""基于asyncio的LR8450设备客户端（TCP）
+
+AsyncLR8450Client 与 LR8450Client 提供相同的 query/write/configure/
+get_channel_data 接口，每条命令使用 asyncio.wait_for 实现超时，不再轮询等待。
+SyncLR8450Client 在后台事件循环线程中运行异步客户端，供现有的QThread工作线程
+以同步方式调用。
+"""
+
+from __future__ import annotations
+
+import asyncio
+import re
+import threading
+from typing import Any, Callable, Coroutine, Dict, List, Optional
+
+import numpy as np
+
+from app.core.device_capabilities import CapabilityCache, parse_idn
+from battery_analyzer.core.channel_reconciler import ChannelReconciler
+from battery_analyzer.core.lr8450_client import (
+    ANALOG_INVALID_CODES,
+    BINARY_DTYPES,
+    CAPABILITY_CACHE_DIR,
+    ESR_ERROR_MASK,
+    LEGACY_WRITE_DELAY,
+    LR8450Client,
+    MemoryDownload,
+    RealtimeMode,
+    SyncMode,
+)
+
+
+class AsyncLR8450Client:
+    """LR8450异步客户端 - 仅支持TCP/IP连接"""
+
+    # 单行响应的最大长度（批量读取的响应较长）
+    LINE_LIMIT = 1024 * 1024
+
+    def __init__(self, ip_address: str = "", port: int = 8802,
+                 realtime_mode: RealtimeMode = "batch",
+                 timeout: float = 10.0,
+                 sync_mode: SyncMode = "opc"):
+        """初始化异步客户端
+
+        Args:
+            ip_address: TCP/IP地址
+            port: TCP端口（默认8802）
+            realtime_mode: 实时数据读取方式，同 LR8450Client
+            timeout: 连接与发送超时（秒）
+            sync_mode: 写命令的同步方式，同 LR8450Client
+        """
+        self.connection_type = "TCP"
+        self.ip_address = ip_address
+        self.port = port
+        self.com_port = ""
+        self.timeout = timeout
+        self.sync_mode: SyncMode = sync_mode
+        self.realtime_mode: RealtimeMode = realtime_mode
+
+        # 通道原始值到工程值的换算系数 {通道名: 系数}
+        self.channel_scales: Dict[str, float] = {}
+
+        # 设备标识（*IDN? 响应）与已检测到的模块
+        self.idn: Optional[str] = None
+        self.installed_modules: List[int] = []
+
+        self.reader: Optional[asyncio.StreamReader] = None
+        self.writer: Optional[asyncio.StreamWriter] = None
+        self._lock: Optional[asyncio.Lock] = None
+        self._skip_blank_line = False
+
+        self.connected = False
+
+    async def connect(self) -> bool:
+        """连接到设备"""
+        try:
+            self.reader, self.writer = await asyncio.wait_for(
+                asyncio.open_connection(self.ip_address, self.port, limit=self.LINE_LIMIT),
+                self.timeout)
+            self._lock = asyncio.Lock()
+
+            # 初始化
+            idn = await self.query("*IDN?")
+            if not idn:
+                await self.disconnect()
+                return False
+            self.idn = idn
+
+            await self.write(":HEAD OFF")
+            await self.write("*CLS")
+            await self.wait_complete(legacy_delay=0.3)
+
+            self.connected = True
+            print(f"✓ TCP连接成功: {self.ip_address}:{self.port}")
+            return True
+
+        except (OSError, asyncio.TimeoutError) as e:
+            print(f"连接失败: {e}")
+            await self.disconnect()
+            return False
+
+    async def disconnect(self) -> None:
+        """断开连接"""
+        if self.writer:
+            try:
+                self.writer.close()
+                await asyncio.wait_for(self.writer.wait_closed(), 1.0)
+            except Exception:
+                pass
+        self.reader = None
+        self.writer = None
+        self.connected = False
+
+    @property
+    def serial_number(self) -> Optional[str]:
+        """设备序列号（*IDN? 响应的第3个字段）"""
+        if not self.idn:
+            return None
+        parts = self.idn.split(',')
+        return parts[2].strip() if len(parts) >= 3 else None
+
+    async def query(self, command: str, timeout: float = 3.0) -> Optional[str]:
+        """发送查询命令并接收一行响应
+
+        Args:
+            command: 查询命令
+            timeout: 等待响应的超时（秒）
+
+        Returns:
+            去掉结尾CR+LF的响应；超时或出错时返回None
+        """
+        if not self.writer:
+            return None
+
+        async with self._lock:
+            try:
+                await self._send(command)
+                line = await asyncio.wait_for(self.reader.readuntil(b"\n"), timeout)
+                if self._skip_blank_line and not line.strip():
+                    line = await asyncio.wait_for(self.reader.readuntil(b"\n"), timeout)
+                self._skip_blank_line = False
+            except asyncio.TimeoutError:
+                print(f"TCP查询超时 [{command}]")
+                return None
+            except (OSError, asyncio.IncompleteReadError, asyncio.LimitOverrunError) as e:
+                print(f"TCP查询错误 [{command}]: {e}")
+                return None
+
+        response = line.rstrip(b"\r\n").decode("ascii", errors="ignore")
+        return response if response else None
+
+    async def write(self, command: str) -> bool:
+        """发送写命令（不期待响应）"""
+        if not self.writer:
+            return False
+
+        async with self._lock:
+            try:
+                await self._send(command)
+                if self.sync_mode == "legacy":
+                    await asyncio.sleep(LEGACY_WRITE_DELAY)
+                return True
+            except (OSError, asyncio.TimeoutError) as e:
+                print(f"TCP写入错误 [{command}]: {e}")
+                return False
+
+    async def wait_complete(self, legacy_delay: float = 0.0, timeout: float = 5.0) -> bool:
+        """等待之前发送的命令全部执行完毕（*OPC? 屏障，同 LR8450Client.wait_complete）"""
+        if self.sync_mode == "opc":
+            response = await self.query("*OPC?", timeout=timeout)
+            if response and response.split()[-1] == "1":
+                return True
+            print(f"⚠️ *OPC? 无有效应答（{response!r}），改用固定延时同步")
+            self.sync_mode = "legacy"
+            await self._discard_pending()
+
+        await asyncio.sleep(legacy_delay)
+        return True
+
+    async def check_errors(self) -> Optional[str]:
+        """查询 *ESR? ，有错误位时再用 :ERRor? 读取错误号；无错误时返回None"""
+        response = await self.query("*ESR?")
+        try:
+            esr = int(response.split(',')[-1])
+        except (AttributeError, ValueError):
+            return None
+
+        if not esr & ESR_ERROR_MASK:
+            return None
+
+        error = await self.query(":ERRor?")
+        return f"ESR={esr}, ERR={error}"
+
+    async def _send(self, command: str) -> None:
+        """发送一条以CR+LF结尾的命令（调用方持有锁）"""
+        data = command + "\r\n"
+        try:
+            payload = data.encode("ascii")
+        except UnicodeEncodeError:
+            payload = data.encode("utf-8")
+        self.writer.write(payload)
+        await asyncio.wait_for(self.writer.drain(), self.timeout)
+
+    async def disable_all_channels(self, modules: List[int] = None) -> bool:
+        """禁用指定模块的所有通道（同 LR8450Client.disable_all_channels）"""
+        if modules is None:
+            modules = [1, 2, 3, 4]
+
+        print(f"\n🔧 禁用模块 {modules} 的所有通道...")
+        ChannelReconciler(self).invalidate()
+        disabled_count = 0
+        for module in modules:
+            for ch in range(1, 31):  # 每个模块30个通道
+                if await self.write(f":UNIT:STORe CH{module}_{ch},OFF"):
+                    disabled_count += 1
+
+        print(f"✓ 已禁用 {disabled_count} 个通道\n")
+        return disabled_count > 0
+
+    async def configure_channel(self, channel: str, enabled: bool = True,
+                                channel_type: str = "VOLTAGE",
+                                range_value: float = None,
+                                thermocouple_type: str = None,
+                                int_ext: str = None) -> bool:
+        """配置单个通道，参数同 LR8450Client.configure_channel"""
+        ChannelReconciler(self).invalidate()
+        if not await self.write(f":UNIT:STORe {channel},{'ON' if enabled else 'OFF'}"):
+            print(f"⚠️ 设置通道 {channel} 存储失败")
+            return False
+
+        if not enabled:
+            return True
+
+        mode = "TC" if channel_type == "TEMPERATURE" else "VOLTAGE"
+        commands = [f":UNIT:INMOde {channel},{mode}"]
+        if channel_type == "TEMPERATURE" and thermocouple_type:
+            commands.append(f":SCALing:UNIT {channel},TC_{thermocouple_type}")
+        if range_value is not None:
+            commands.append(f":UNIT:RANGe {channel},{range_value}")
+
+        for command in commands:
+            if not await self.write(command):
+                print(f"⚠️ 配置通道 {channel} 失败: {command}")
+                return False
+
+        # 记录换算系数（二进制读取使用）
+        if range_value is not None:
+            self.channel_scales[channel] = LR8450Client.range_scale(mode, range_value)
+        else:
+            self.channel_scales.pop(channel, None)
+
+        if channel_type == "TEMPERATURE" and int_ext:
+            await self.write(f":SCALing:REFerence {channel},{int_ext}")
+
+        print(f"✓ 通道 {channel} 配置完成")
+        return True
+
+    async def configure_channels(self, channels: List[str],
+                                 disable_others: bool = True,
+                                 channel_configs: List[Dict] = None) -> bool:
+        """批量配置多个通道，参数同 LR8450Client.configure_channels"""
+        print(f"\n🔧 开始配置 {len(channels)} 个通道...")
+
+        await self.write(":STOP")
+        await self.wait_complete(legacy_delay=0.5)
+
+        if disable_others:
+            if not await self.disable_all_channels():
+                print("⚠️ 禁用通道失败，继续配置...")
+
+        if not channel_configs:
+            channel_configs = [
+                {'channel': channel, 'type': 'VOLTAGE', 'range': 10.0}
+                for channel in channels
+            ]
+
+        success_count = 0
+        for config in channel_configs:
+            if await self.configure_channel(
+                channel=config.get('channel'),
+                enabled=True,
+                channel_type=config.get('type', 'VOLTAGE'),
+                range_value=config.get('range', 10.0),
+                thermocouple_type=config.get('thermocouple'),
+                int_ext=config.get('int_ext')
+            ):
+                success_count += 1
+
+        await self.wait_complete()
+        error = await self.check_errors()
+        if error:
+            print(f"⚠️ 设备报告配置错误: {error}")
+
+        print(f"\n✅ 通道配置完成: {success_count}/{len(channels)} 成功")
+
+        # 重新启动采集，让设备重新组织数据缓冲区
+        await self.write(":STARt")
+        await self.wait_complete(legacy_delay=1.0)
+        print("✓ 采集已重新启动\n")
+
+        return success_count == len(channels)
+
+    async def start_acquisition(self) -> bool:
+        """启动数据采集"""
+        return await self.write(":STARt")
+
+    async def stop_acquisition(self) -> bool:
+        """停止数据采集并查询状态确认"""
+        for attempt in range(3):
+            if not await self.write(":STOP"):
+                continue
+            await self.wait_complete(legacy_delay=0.5)
+            status = await self.query(":STATus?", timeout=1.0)
+            if status and ("STOP" in status.upper() or status.strip() == "0"):
+                print("✓ 采集已停止（已验证）")
+                return True
+            print(f"   设备仍在运行，继续尝试... ({attempt + 1}/3)")
+        return True
+
+    async def detect_installed_modules(self) -> List[int]:
+        """检测已安装的模块（空插槽不应答，按超时判定）"""
+        installed_modules = []
+        for unit_num in range(1, 5):
+            unit_name = f"UNIT{unit_num}"
+            response = await self.query(f":UNIT:IDN? {unit_name}", timeout=1.0)
+            if response and ',' in response and unit_name in response:
+                installed_modules.append(unit_num)
+        print(f"✓ 已安装的模块: UNIT{installed_modules}")
+        self.installed_modules = installed_modules
+        return list(installed_modules)
+
+    async def get_channel_data(self, channels: List[str]) -> Dict[str, float]:
+        """获取指定通道的实时数据，读取方式与回退顺序同 LR8450Client
+
+        Args:
+            channels: 通道列表，如 ["CH2_1", "CH2_3"]
+
+        Returns:
+            字典 {通道名: 测量值}
+        """
+        if self.realtime_mode == "binary" and channels:
+            data = await self._get_channel_data_binary(channels)
+            if data is not None:
+                return data
+            print("⚠️ 二进制读取失败，改用批量读取")
+            self.realtime_mode = "batch"
+            await self._resync()
+
+        if self.realtime_mode == "batch" and channels:
+            data = await self._get_channel_data_batch(channels)
+            if data is not None:
+                return data
+            print("⚠️ 批量读取失败，改用逐通道读取")
+            self.realtime_mode = "single"
+            await self._discard_pending()
+
+        return await self._get_channel_data_single(channels)
+
+    async def _realtime_read_failed(self, name: str, reason: object) -> Optional[Dict[str, float]]:
+        """实时读取无应答时判断是否降级（同 LR8450Client._realtime_read_failed）"""
+        await self._discard_pending()
+        error = await self.check_errors()
+        await self._resync()
+        if error:
+            print(f"⚠️ {name}命令出错: {error}")
+            return None
+
+        print(f"⚠️ {name}无应答（{reason}），重新同步后下次继续使用")
+        return {}
+
+    async def _get_channel_data_batch(self, channels: List[str]) -> Optional[Dict[str, float]]:
+        """一次往返读取所有通道的实时数据；不支持时返回None，无应答时返回空字典"""
+        queries = ";".join(f":MEMory:VREAL? {channel}" for channel in channels)
+        response = await self.query(f":MEMory:GETReal;{queries}")
+        if not response:
+            return await self._realtime_read_failed("批量读取", "超时")
+
+        values = [v for v in re.split(r"[;,]", response) if v.strip()]
+        if len(values) != len(channels):
+            print(f"⚠️ 批量响应数量不符: 期望 {len(channels)}，实际 {len(values)}")
+            return None
+
+        data = {}
+        for channel, text in zip(channels, values):
+            value = LR8450Client._parse_real_value(text)
+            if value is not None:
+                data[channel] = value
+        return data
+
+    async def _get_channel_data_single(self, channels: List[str]) -> Dict[str, float]:
+        """逐通道读取实时数据（每个通道一次往返）"""
+        await self.write(":MEMory:GETReal")
+        await self.wait_complete(legacy_delay=0.3)
+
+        data = {}
+        for channel in channels:
+            response = await self.query(f":MEMory:VREAL? {channel}")
+            value = LR8450Client._parse_real_value(response) if response else None
+            if value is not None:
+                data[channel] = value
+        return data
+
+    async def _get_channel_data_binary(self, channels: List[str]) -> Optional[Dict[str, float]]:
+        """二进制方式读取实时数据；设备不支持时返回None，无应答或连接出错时返回空字典"""
+        if not self.writer:
+            return None
+
+        try:
+            for channel in channels:
+                if LR8450Client.channel_kind(channel) == "analog":
+                    await self.get_channel_scale(channel)
+        except ValueError as e:
+            # 原始值无法换算，本次改用设备换算后的 :MEMory:VREAL? 读取
+            print(f"⚠️ {e}，本次改用批量读取")
+            return await self._get_channel_data_batch(channels)
+
+        try:
+            values = await self.fetch_realtime_binary(channels)
+        except ValueError as e:
+            # 应答不是二进制数据块
+            print(f"二进制读取错误: {e}")
+            return None
+        except asyncio.TimeoutError as e:
+            return await self._realtime_read_failed("二进制读取", e)
+        except (OSError, asyncio.IncompleteReadError) as e:
+            print(f"TCP二进制读取错误: {e}")
+            await self._resync()
+            return {}
+
+        return {
+            channel: float(value)
+            for channel, value in zip(channels, values)
+            if np.isfinite(value)
+        }
+
+    async def fetch_realtime_binary(self, channels: List[str],
+                                    timeout: float = 3.0) -> np.ndarray:
+        """用 :MEMory:BFETch? 读取所有通道的二进制值（同 LR8450Client.fetch_realtime_binary）
+
+        Raises:
+            ConnectionError: 未建立连接
+            ValueError: 响应不是二进制数据块，或无法获取通道量程
+            asyncio.TimeoutError: 数据块未在超时内到达
+        """
+        if not self.writer:
+            raise ConnectionError("TCP连接未建立")
+
+        groups: Dict[str, List[int]] = {}
+        for index, channel in enumerate(channels):
+            groups.setdefault(LR8450Client.channel_kind(channel), []).append(index)
+
+        # 换算系数可能需要查询设备，必须在发送读取命令之前准备好
+        scales = {}
+        for index in groups.get("analog", []):
+            scales[index] = await self.get_channel_scale(channels[index])
+
+        order = [index for indices in groups.values() for index in indices]
+        queries = ";".join(f":MEMory:BFETch? {channels[i]}" for i in order)
+
+        values = np.full(len(channels), np.nan)
+        async with self._lock:
+            await self._send(f":MEMory:GETReal;{queries}")
+            for kind, indices in groups.items():
+                dtype = BINARY_DTYPES[kind]
+                blocks = []
+                for _ in indices:
+                    blocks.append(await asyncio.wait_for(
+                        self._read_block(dtype.itemsize), timeout))
+                raw = np.frombuffer(b"".join(blocks), dtype=dtype)
+
+                decoded = raw.astype(np.float64)
+                if kind == "analog":
+                    decoded[np.isin(raw, ANALOG_INVALID_CODES)] = np.nan
+                    decoded *= np.array([scales[i] for i in indices])
+                values[indices] = decoded
+            # 最后一个数据块之后可能还有CR/LF，由下一次查询跳过
+            self._skip_blank_line = True
+
+        return values
+
+    async def read_memory_points(self, channels: List[str], start: int, count: int,
+                                 timeout: float = 3.0) -> Dict[str, np.ndarray]:
+        """读取存储中从start开始的count个点（同 LR8450Client.read_memory_points）
+
+        Raises:
+            ConnectionError: 未建立连接
+            ValueError: 点数超出范围，或响应不是二进制数据块或数量不符
+            asyncio.TimeoutError: 数据块未在超时内到达
+        """
+        if not self.writer:
+            raise ConnectionError("TCP连接未建立")
+        if not 1 <= count <= 5000:
+            raise ValueError(f"每次读取点数必须为1-5000: {count}")
+
+        scales = {}
+        try:
+            for channel in channels:
+                if LR8450Client.channel_kind(channel) == "analog":
+                    scales[channel] = await self.get_channel_scale(channel)
+        except ValueError as e:
+            # 原始值无法换算，改用设备换算后的 :MEMory:VDATa? 读取
+            print(f"⚠️ {e}，改用文本方式读取存储数据")
+            return await self._read_memory_points_text(channels, start, count, timeout)
+
+        result = {}
+        try:
+            async with self._lock:
+                await self._send(";".join(
+                    f":MEMory:POINt {channel},{start};:MEMory:BDATa? {count}"
+                    for channel in channels))
+                for channel in channels:
+                    dtype = BINARY_DTYPES[LR8450Client.channel_kind(channel)]
+                    raw = np.frombuffer(await asyncio.wait_for(
+                        self._read_block(count * dtype.itemsize), timeout), dtype=dtype)
+                    values = raw.astype(np.float64)
+                    if channel in scales:
+                        values[np.isin(raw, ANALOG_INVALID_CODES)] = np.nan
+                        values *= scales[channel]
+                    result[channel] = values
+                self._skip_blank_line = True
+        except Exception:
+            # 未读完的数据块留在连接中，之后的每次查询都会读到上一条的应答
+            await self._resync()
+            raise
+
+        return result
+
+    async def download_memory(self, channels: List[str], start: int = 0,
+                              count: Optional[int] = None,
+                              block_size: int = 5000,
+                              progress_callback: Optional[Callable[[int, int], None]] = None,
+                              resume: Optional[MemoryDownload] = None,
+                              max_retries: int = 3) -> MemoryDownload:
+        """批量下载设备存储的数据，参数、断线续传与异常同 LR8450Client.download_memory"""
+        block_size = max(1, min(block_size, 5000))
+
+        download = resume
+        if download is None:
+            download = await self._prepare_download(channels, start, count)
+
+        retries = 0
+        while True:
+            try:
+                await self._download_blocks(download, block_size, progress_callback)
+                return download
+            except (OSError, asyncio.IncompleteReadError) as e:
+                # asyncio.TimeoutError / ConnectionError 都是 OSError
+                if retries >= max_retries:
+                    raise ConnectionError(f"下载中断: {e}") from e
+                retries += 1
+                print(f"⚠️ 下载中断（{e}），第 {retries}/{max_retries} 次重连后继续...")
+                await self.disconnect()
+                await asyncio.sleep(1.0)
+                if not await self.connect():
+                    continue
+
+    async def _prepare_download(self, channels: List[str], start: int,
+                                count: Optional[int]) -> MemoryDownload:
+        """查询存储点数并为每个通道预分配数组"""
+        response = await self.query(":MEMory:MAXPoint?")
+        try:
+            max_point = int(response)
+        except (TypeError, ValueError):
+            raise ValueError(f"无法获取存储点数: {response!r}")
+
+        if count is None:
+            count = max_point - start
+        if start < 0 or count <= 0 or start + count > max_point:
+            raise ValueError(f"点范围 {start}+{count} 超出存储数据 (共 {max_point} 点)")
+
+        raw = {}
+        scales = {}
+        for channel in channels:
+            kind = LR8450Client.channel_kind(channel)
+            raw[channel] = np.empty(count, dtype=BINARY_DTYPES[kind])
+            scales[channel] = await self.get_channel_scale(channel) if kind == "analog" else 1.0
+
+        return MemoryDownload(
+            channels=list(channels),
+            start=start,
+            count=count,
+            raw=raw,
+            scales=scales,
+            completed={channel: 0 for channel in channels},
+        )
+
+    async def _download_blocks(self, download: MemoryDownload, block_size: int,
+                               progress_callback: Optional[Callable[[int, int], None]]) -> None:
+        """读取所有未完成的数据块"""
+        if not self.writer:
+            raise ConnectionError("TCP连接未建立")
+
+        for channel in download.channels:
+            array = download.raw[channel]
+            itemsize = array.dtype.itemsize
+            view = memoryview(array).cast("B")
+
+            while download.completed[channel] < download.count:
+                done = download.completed[channel]
+                points = min(block_size, download.count - done)
+
+                # 每块都重新指定读取位置，断线重连后可直接续传
+                async with self._lock:
+                    await self._send(
+                        f":MEMory:POINt {channel},{download.start + done};"
+                        f":MEMory:BDATa? {points}")
+                    view[done * itemsize:(done + points) * itemsize] = await asyncio.wait_for(
+                        self._read_block(points * itemsize), self.timeout)
+                    self._skip_blank_line = True
+
+                download.completed[channel] = done + points
+                if progress_callback:
+                    progress_callback(download.done_points, download.total_points)
+
+    async def _read_memory_points_text(self, channels: List[str], start: int, count: int,
+                                       timeout: float) -> Dict[str, np.ndarray]:
+        """用 :MEMory:VDATa? 读取存储数据（文本格式，同 LR8450Client._read_memory_points_text）"""
+        response = await self.query(";".join(
+            f":MEMory:POINt {channel},{start};:MEMory:VDATa? {count}"
+            for channel in channels), timeout=timeout)
+        if response is None:
+            raise asyncio.TimeoutError(":MEMory:VDATa? 无响应")
+
+        items = [item for item in re.split(r"[;,]", response) if item.strip()]
+        if len(items) != count * len(channels):
+            raise ValueError(f"存储数据数量不符: 期望 {count * len(channels)}，实际 {len(items)}")
+
+        result = {}
+        for i, channel in enumerate(channels):
+            values = [LR8450Client._parse_real_value(item) for item in items[i * count:(i + 1) * count]]
+            result[channel] = np.array(
+                [np.nan if value is None else value for value in values], dtype=np.float64)
+        return result
+
+    async def _read_block(self, size: int) -> bytes:
+        """读取一个IEEE 488.2二进制数据块（#0 形式时按size读取）"""
+        while True:
+            first = await self.reader.readexactly(1)
+            if first == b"#":
+                break
+            if first not in b";,\r\n ":
+                raise ValueError(f"Invalid binary block header: {first!r}")
+
+        digits = (await self.reader.readexactly(1))[0] - 0x30
+        if not 0 <= digits <= 9:
+            raise ValueError("Invalid binary block length field")
+        if digits:
+            size = int((await self.reader.readexactly(digits)).decode("ascii"))
+        return await self.reader.readexactly(size)
+
+    async def get_channel_scale(self, channel: str) -> float:
+        """获取模拟通道的换算系数（未知时向设备查询并缓存）
+
+        Raises:
+            ValueError: 无法获取通道的测量模式或量程（不缓存，下次重新查询）
+        """
+        scale = self.channel_scales.get(channel)
+        if scale is not None:
+            return scale
+
+        mode_response = await self.query(f":UNIT:INMOde? {channel}")
+        range_response = await self.query(f":UNIT:RANGe? {channel}")
+        try:
+            mode = mode_response.split(',')[-1].strip().upper()
+            range_value = float(range_response.split(',')[-1])
+        except (AttributeError, ValueError):
+            raise ValueError(f"无法获取通道 {channel} 的量程: {mode_response!r}, {range_response!r}")
+
+        scale = LR8450Client.range_scale(mode, range_value)
+        self.channel_scales[channel] = scale
+        return scale
+
+    async def _resync(self) -> None:
+        """重新连接，丢弃旧连接上未读完和迟到的应答（同 LR8450Client._resync）"""
+        if not self.writer:
+            return
+
+        print("⚠️ 应答不完整，重新连接以丢弃残留数据...")
+        await self.disconnect()
+        if not await self.connect():
+            print("❌ 重新连接失败")
+
+    async def _discard_pending(self, quiet_time: float = 0.05) -> None:
+        """丢弃失败读取后残留在接收缓冲区中的数据（直到接收空闲quiet_time秒）"""
+        self._skip_blank_line = False
+        if not self.reader:
+            return
+        try:
+            while await asyncio.wait_for(self.reader.read(65536), quiet_time):
+                pass
+        except asyncio.TimeoutError:
+            pass
+
+
+class _EventLoopThread:
+    """所有同步客户端共享的后台事件循环线程"""
+
+    _loop: Optional[asyncio.AbstractEventLoop] = None
+    _lock = threading.Lock()
+
+    @classmethod
+    def get_loop(cls) -> asyncio.AbstractEventLoop:
+        with cls._lock:
+            if cls._loop is None:
+                cls._loop = asyncio.new_event_loop()
+                thread = threading.Thread(
+                    target=cls._loop.run_forever,
+                    name="LR8450EventLoop",
+                    daemon=True)
+                thread.start()
+            return cls._loop
+
+
+class SyncLR8450Client:
+    """AsyncLR8450Client 的同步外观，接口与 LR8450Client 相同
+
+    每次调用把协程提交到共享的后台事件循环，并在调用线程中等待结果，
+    可以直接传给 DataAcquisitionThread、DeviceConfigWorker 等QThread工作线程。
+    设备标识（idn / serial_number）和 detect_installed_modules 的结果与
+    LR8450Client 一样保存在客户端上，ChannelReconciler 据此按序列号缓存、
+    只管理已安装的模块。
+    """
+
+    def __init__(self, ip_address: str = "", port: int = 8802,
+                 realtime_mode: RealtimeMode = "batch", **kwargs):
+        self.client = AsyncLR8450Client(ip_address, port, realtime_mode, **kwargs)
+        self._loop = _EventLoopThread.get_loop()
+        self.capability_cache: Optional[CapabilityCache] = None  # 首次检测模块时创建
+
+    range_scale = staticmethod(LR8450Client.range_scale)
+
+    def _run(self, coroutine: Coroutine, timeout: Optional[float] = None) -> Any:
+        """在后台事件循环中执行协程并等待结果"""
+        future = asyncio.run_coroutine_threadsafe(coroutine, self._loop)
+        return future.result(timeout)
+
+    # 连接参数（重新连接时读取）
+    @property
+    def connection_type(self) -> str:
+        return self.client.connection_type
+
+    @property
+    def ip_address(self) -> str:
+        return self.client.ip_address
+
+    @property
+    def port(self) -> int:
+        return self.client.port
+
+    @property
+    def com_port(self) -> str:
+        return self.client.com_port
+
+    @property
+    def connected(self) -> bool:
+        return self.client.connected
+
+    @property
+    def realtime_mode(self) -> RealtimeMode:
+        return self.client.realtime_mode
+
+    @property
+    def sync_mode(self) -> SyncMode:
+        return self.client.sync_mode
+
+    @property
+    def channel_scales(self) -> Dict[str, float]:
+        return self.client.channel_scales
+
+    # 设备标识与已检测到的模块
+    @property
+    def idn(self) -> Optional[str]:
+        return self.client.idn
+
+    @property
+    def serial_number(self) -> Optional[str]:
+        return self.client.serial_number
+
+    @property
+    def installed_modules(self) -> List[int]:
+        return self.client.installed_modules
+
+    def connect(self) -> bool:
+        return self._run(self.client.connect())
+
+    def disconnect(self) -> None:
+        self._run(self.client.disconnect())
+
+    def query(self, command: str, timeout: float = 3.0) -> Optional[str]:
+        return self._run(self.client.query(command, timeout))
+
+    def write(self, command: str) -> bool:
+        return self._run(self.client.write(command))
+
+    def disable_all_channels(self, modules: List[int] = None) -> bool:
+        return self._run(self.client.disable_all_channels(modules))
+
+    def configure_channel(self, channel: str, enabled: bool = True,
+                          channel_type: str = "VOLTAGE",
+                          range_value: float = None,
+                          thermocouple_type: str = None,
+                          int_ext: str = None) -> bool:
+        return self._run(self.client.configure_channel(
+            channel, enabled, channel_type, range_value, thermocouple_type, int_ext))
+
+    def configure_channels(self, channels: List[str],
+                           disable_others: bool = True,
+                           channel_configs: List[Dict] = None) -> bool:
+        return self._run(self.client.configure_channels(
+            channels, disable_others, channel_configs))
+
+    def start_acquisition(self) -> bool:
+        return self._run(self.client.start_acquisition())
+
+    def stop_acquisition(self) -> bool:
+        return self._run(self.client.stop_acquisition())
+
+    def detect_installed_modules(self, refresh: bool = False) -> List[int]:
+        """检测已安装的模块，已连接过的设备使用能力缓存（同 LR8450Client）"""
+        identity = parse_idn(self.idn)
+        if self.capability_cache is None:
+            self.capability_cache = CapabilityCache(CAPABILITY_CACHE_DIR)
+
+        if identity and not refresh:
+            cached = self.capability_cache.lookup(identity[1], identity[2])
+            if cached and self.capability_cache.revalidate(cached, self.query):
+                self.client.installed_modules = cached.installed_units
+                print(f"✓ 使用缓存的模块信息: UNIT{self.client.installed_modules}")
+                return list(self.client.installed_modules)
+
+        installed_modules = self._run(self.client.detect_installed_modules())
+        if identity and installed_modules:
+            capabilities = self.capability_cache.read(
+                self.query, identity[1], identity[2], identity[0], installed_modules)
+            if capabilities:
+                self.capability_cache.store(capabilities)
+        return installed_modules
+
+    def get_channel_data(self, channels: List[str]) -> Dict[str, float]:
+        return self._run(self.client.get_channel_data(channels))
+
+    def wait_complete(self, legacy_delay: float = 0.0, timeout: float = 5.0) -> bool:
+        return self._run(self.client.wait_complete(legacy_delay, timeout))
+
+    def check_errors(self) -> Optional[str]:
+        return self._run(self.client.check_errors())
+
+    def fetch_realtime_binary(self, channels: List[str],
+                              timeout: float = 3.0) -> np.ndarray:
+        return self._run(self.client.fetch_realtime_binary(channels, timeout))
+
+    def read_memory_points(self, channels: List[str], start: int, count: int,
+                           timeout: float = 3.0) -> Dict[str, np.ndarray]:
+        return self._run(self.client.read_memory_points(channels, start, count, timeout))
+
+    def download_memory(self, channels: List[str], start: int = 0,
+                        count: Optional[int] = None,
+                        block_size: int = 5000,
+                        progress_callback: Optional[Callable[[int, int], None]] = None,
+                        resume: Optional[MemoryDownload] = None,
+                        max_retries: int = 3) -> MemoryDownload:
+        """同 LR8450Client.download_memory；progress_callback 在后台事件循环线程中调用"""
+        return self._run(self.client.download_memory(
+            channels, start, count, block_size, progress_callback, resume, max_retries))
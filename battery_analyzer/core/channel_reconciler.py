@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""通道配置差异同步 - 只向设备发送与当前状态不同的配置命令"""
+
+from __future__ import annotations
+
+import math
+import re
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional
+
+from app.core.device_capabilities import parse_idn
+
+# 每个模块的通道数
+CHANNELS_PER_MODULE = 30
+
+# 插槽数（UNIT1-UNIT4）
+MODULE_SLOTS = 4
+
+_CHANNEL_PATTERN = re.compile(r"^CH(\d+)_\d+$")
+
+
+@dataclass
+class ChannelState:
+    """单个通道的配置状态，None表示未知（需要发送命令）"""
+    store: Optional[bool] = None          # 是否记录
+    mode: Optional[str] = None            # 测量模式，如 "VOLTAGE"、"TC"
+    range_value: Optional[float] = None   # 量程
+    thermocouple: Optional[str] = None    # 热电偶类型（设备不回读，来自已发送的命令）
+    int_ext: Optional[str] = None         # 参考接点（同上）
+
+
+# 已知的设备通道状态 {设备序列号: {通道名: 状态}}，同一进程内重复配置时不再读取设备
+_STATE_CACHE: Dict[str, Dict[str, ChannelState]] = {}
+
+
+class ChannelReconciler:
+    """通道配置同步器
+
+    读取一次设备的通道状态（:UNIT:STORe? / :UNIT:INMOde? / :UNIT:RANGe?，
+    每个模块合并为一条查询），按设备序列号缓存，然后与期望配置比较，
+    只发送有差异的命令。配置不变时不停止采集，也不发送任何配置命令。
+    只管理已知存在的模块，不向空插槽发送命令。
+    """
+
+    def __init__(self, client, modules: Optional[List[int]] = None):
+        """初始化同步器
+
+        Args:
+            client: LR8450设备客户端（需提供 query/write/wait_complete/check_errors）
+            modules: 需要管理的模块号，None时使用客户端检测到的已安装模块或
+                    能力缓存中的模块；都没有时读取设备状态时探测全部插槽，
+                    只管理读取到状态的模块
+        """
+        self.client = client
+        if modules is None:
+            modules = getattr(client, "installed_modules", None) or self._cached_modules()
+        # None表示模块未知，由 device_state 根据读取结果确定
+        self.modules: Optional[List[int]] = list(modules) if modules else None
+
+    def _cached_modules(self) -> List[int]:
+        """能力缓存中记录的已安装模块，没有缓存时返回空列表"""
+        cache = getattr(self.client, "capability_cache", None)
+        identity = parse_idn(getattr(self.client, "idn", None))
+        if cache is None or identity is None:
+            return []
+        cached = cache.lookup(identity[1], identity[2])
+        return cached.installed_units if cached else []
+
+    @property
+    def cache_key(self) -> str:
+        """设备缓存键：序列号，未知时使用连接地址"""
+        serial_number = getattr(self.client, "serial_number", None)
+        if serial_number:
+            return serial_number
+        return f"{self.client.ip_address or self.client.com_port}:{self.client.port}"
+
+    def device_state(self, refresh: bool = False) -> Dict[str, ChannelState]:
+        """获取设备通道状态（优先使用缓存）
+
+        Args:
+            refresh: 为True时忽略缓存重新读取设备
+        """
+        key = self.cache_key
+        if not refresh and key in _STATE_CACHE:
+            state = _STATE_CACHE[key]
+        else:
+            state = {}
+            for module in self.modules or range(1, MODULE_SLOTS + 1):
+                state.update(self._read_module(module))
+            _STATE_CACHE[key] = state
+
+        if self.modules is None:
+            self.modules = sorted({int(match.group(1)) for match in map(_CHANNEL_PATTERN.match, state)
+                                   if match})
+            print(f"⚠️ 未检测已安装模块，只管理有应答的模块: UNIT{self.modules}")
+        return state
+
+    def invalidate(self) -> None:
+        """丢弃当前设备的缓存状态"""
+        _STATE_CACHE.pop(self.cache_key, None)
+
+    def _read_module(self, module: int) -> Dict[str, ChannelState]:
+        """一次往返读取一个模块所有通道的状态，读取失败时返回空字典"""
+        channels = [f"CH{module}_{ch}" for ch in range(1, CHANNELS_PER_MODULE + 1)]
+        queries = ";".join(
+            f":UNIT:STORe? {channel};:UNIT:INMOde? {channel};:UNIT:RANGe? {channel}"
+            for channel in channels)
+        response = self.client.query(queries)
+        if not response:
+            return {}
+
+        # 每项为 "ch$,A"，只取最后一个字段
+        values = [item.split(',')[-1].strip().upper() for item in response.split(';')]
+        if len(values) != 3 * len(channels):
+            print(f"⚠️ 模块 {module} 状态响应数量不符: 期望 {3 * len(channels)}，实际 {len(values)}")
+            return {}
+
+        state = {}
+        for i, channel in enumerate(channels):
+            store, mode, range_text = values[3 * i:3 * i + 3]
+            try:
+                range_value = float(range_text)
+            except ValueError:
+                range_value = None
+            state[channel] = ChannelState(
+                store=store in ("ON", "1"),
+                mode=mode or None,
+                range_value=range_value,
+            )
+        return state
+
+    def plan(self, channel_configs: List[Dict],
+             disable_others: bool = True) -> List[str]:
+        """计算使设备达到期望配置所需的最少命令
+
+        Args:
+            channel_configs: 通道配置列表，格式同 LR8450Client.configure_channels
+            disable_others: 是否关闭其他通道的记录
+
+        Returns:
+            需要发送的命令列表
+        """
+        state = self.device_state()
+        commands = []
+        desired_channels = set()
+
+        for config in channel_configs:
+            channel = config.get('channel')
+            desired_channels.add(channel)
+            current = state.get(channel, ChannelState())
+
+            mode = "TC" if config.get('type', 'VOLTAGE') == "TEMPERATURE" else "VOLTAGE"
+            range_value = config.get('range', 10.0)
+            tc_type = config.get('thermocouple')
+            int_ext = config.get('int_ext')
+
+            if current.store is not True:
+                commands.append(f":UNIT:STORe {channel},ON")
+
+            # 切换测量模式后量程等设置会被设备重置，需要一并重新发送
+            mode_changed = current.mode != mode
+            if mode_changed:
+                commands.append(f":UNIT:INMOde {channel},{mode}")
+            if mode == "TC" and tc_type and (mode_changed or current.thermocouple != tc_type):
+                commands.append(f":SCALing:UNIT {channel},TC_{tc_type}")
+            if range_value is not None and (
+                    mode_changed or current.range_value is None
+                    or not math.isclose(current.range_value, float(range_value))):
+                commands.append(f":UNIT:RANGe {channel},{range_value}")
+            if mode == "TC" and int_ext and (mode_changed or current.int_ext != int_ext):
+                commands.append(f":SCALing:REFerence {channel},{int_ext}")
+
+        if disable_others:
+            for module in self.modules:
+                for ch in range(1, CHANNELS_PER_MODULE + 1):
+                    channel = f"CH{module}_{ch}"
+                    if channel in desired_channels:
+                        continue
+                    if state.get(channel, ChannelState()).store is not False:
+                        commands.append(f":UNIT:STORe {channel},OFF")
+
+        return commands
+
+    def apply(self, channel_configs: List[Dict],
+              disable_others: bool = True,
+              progress_callback: Optional[Callable[[int, str], None]] = None) -> bool:
+        """把期望配置同步到设备并启动采集
+
+        Args:
+            channel_configs: 通道配置列表，格式同 LR8450Client.configure_channels
+            disable_others: 是否关闭其他通道的记录
+            progress_callback: 进度回调 (进度百分比, 消息)
+
+        Returns:
+            设备是否无错误地接受了所有命令
+        """
+        def report(percent: int, message: str) -> None:
+            if progress_callback:
+                progress_callback(percent, message)
+
+        report(10, "读取设备通道状态...")
+        commands = self.plan(channel_configs, disable_others)
+        self._record_scales(channel_configs)
+
+        success = True
+        if commands:
+            print(f"🔧 发送 {len(commands)} 条配置变更命令")
+            report(20, "停止当前采集...")
+            self.client.write(":STOP")
+            self.client.wait_complete(legacy_delay=0.5)
+
+            for i, command in enumerate(commands):
+                report(20 + int((i + 1) / len(commands) * 60), f"发送 {command}")
+                if not self.client.write(command):
+                    success = False
+                    break
+
+            self.client.wait_complete()
+            error = self.client.check_errors()
+            if error:
+                print(f"⚠️ 设备报告配置错误: {error}")
+                success = False
+
+            if success:
+                self._update_cache(channel_configs, disable_others)
+            else:
+                # 无法确定哪些命令生效，下次重新读取设备
+                self.invalidate()
+        else:
+            print("✓ 通道配置未变化，无需发送配置命令")
+
+        report(85, "启动采集...")
+        self.client.write(":STARt")
+        self.client.wait_complete(legacy_delay=1.0 if commands else 0.2)
+        report(100, "配置完成")
+        return success
+
+    def _record_scales(self, channel_configs: List[Dict]) -> None:
+        """记录通道换算系数（二进制读取使用）"""
+        for config in channel_configs:
+            channel = config.get('channel')
+            range_value = config.get('range', 10.0)
+            mode = "TC" if config.get('type', 'VOLTAGE') == "TEMPERATURE" else "VOLTAGE"
+            if range_value is not None:
+                self.client.channel_scales[channel] = self.client.range_scale(mode, range_value)
+            else:
+                self.client.channel_scales.pop(channel, None)
+
+    def _update_cache(self, channel_configs: List[Dict], disable_others: bool) -> None:
+        """命令成功后把期望配置写入缓存"""
+        state = self.device_state()
+        desired_channels = set()
+
+        for config in channel_configs:
+            channel = config.get('channel')
+            desired_channels.add(channel)
+            current = state.setdefault(channel, ChannelState())
+            mode = "TC" if config.get('type', 'VOLTAGE') == "TEMPERATURE" else "VOLTAGE"
+            if current.mode != mode:
+                current.thermocouple = None
+                current.int_ext = None
+            current.store = True
+            current.mode = mode
+            range_value = config.get('range', 10.0)
+            current.range_value = float(range_value) if range_value is not None else current.range_value
+            if mode == "TC":
+                current.thermocouple = config.get('thermocouple') or current.thermocouple
+                current.int_ext = config.get('int_ext') or current.int_ext
+
+        if disable_others:
+            for module in self.modules:
+                for ch in range(1, CHANNELS_PER_MODULE + 1):
+                    channel = f"CH{module}_{ch}"
+                    if channel not in desired_channels:
+                        state.setdefault(channel, ChannelState()).store = False
@@ -9,6 +9,8 @@ import time
 
 from PySide6.QtCore import QThread, Signal
 
+from battery_analyzer.core.channel_reconciler import ChannelReconciler
+
 
 class DeviceConfigWorker(QThread):
     """设备配置工作线程
@@ -45,57 +47,19 @@ class DeviceConfigWorker(QThread):
         self.channel_configs = channel_configs
     
     def run(self):
-        """执行配置操作"""
+        """执行配置操作（只发送与设备当前状态不同的命令）"""
         try:
-            self.progress_updated.emit(10, "停止当前采集...")
-            
-            # 停止采集
-            self.device_client.write(":STOP")
-            time.sleep(0.3)
-            
-            self.progress_updated.emit(20, "禁用所有通道...")
-            
-            # 禁用所有通道
-            self.device_client.disable_all_channels()
-            
-            self.progress_updated.emit(40, f"配置 {len(self.channels)} 个通道...")
-            
-            # 配置通道
-            success_count = 0
-            total = len(self.channel_configs)
-            
-            for i, config in enumerate(self.channel_configs):
-                channel = config.get('channel')
-                ch_type = config.get('type', 'VOLTAGE')
-                range_val = config.get('range', 10.0)
-                tc_type = config.get('thermocouple')
-                int_ext = config.get('int_ext')
-                
-                progress = 40 + int((i + 1) / total * 40)
-                self.progress_updated.emit(progress, f"配置通道 {channel}...")
-                
-                if self.device_client.configure_channel(
-                    channel=channel,
-                    enabled=True,
-                    channel_type=ch_type,
-                    range_value=range_val,
-                    thermocouple_type=tc_type,
-                    int_ext=int_ext
-                ):
-                    success_count += 1
-            
-            self.progress_updated.emit(85, "启动采集...")
-            
-            # 启动采集
-            self.device_client.write(":STARt")
-            time.sleep(0.5)
-            
-            self.progress_updated.emit(100, "配置完成")
-            
-            if success_count == len(self.channels):
-                self.config_finished.emit(True, f"✓ 通道配置完成: {success_count}/{len(self.channels)} 成功")
+            reconciler = ChannelReconciler(self.device_client)
+            success = reconciler.apply(
+                self.channel_configs,
+                disable_others=True,
+                progress_callback=self.progress_updated.emit
+            )
+
+            if success:
+                self.config_finished.emit(True, f"✓ 通道配置完成: {len(self.channels)} 个通道")
             else:
-                self.config_finished.emit(True, f"⚠️ 通道配置部分成功: {success_count}/{len(self.channels)}")
+                self.config_finished.emit(True, "⚠️ 通道配置部分成功，设备报告了错误")
                 
         except Exception as e:
             self.config_finished.emit(False, f"❌ 配置失败: {str(e)}")
@@ -129,15 +93,10 @@ class DeviceStopWorker(QThread):
             for attempt in range(max_retries):
                 print(f"   尝试停止设备 (第 {attempt + 1}/{max_retries} 次)...")
 
-                # 发送停止命令
+                # 发送停止命令，*OPC? 在停止完成后应答
                 result = self.device_client.write(":STOP")
-                time.sleep(0.3)
-
-                # 再发送一次确保命令到达
-                self.device_client.write(":STOP")
-                time.sleep(0.2)
-
                 if result:
+                    self.device_client.wait_complete(legacy_delay=0.5)
                     success = True
                     break
 
@@ -176,7 +135,7 @@ class DeviceStartWorker(QThread):
         try:
             result = self.device_client.write(":STARt")
             if result:
-                time.sleep(0.2)
+                self.device_client.wait_complete(legacy_delay=0.2)
                 self.start_finished.emit(True, "✓ 采集已启动")
             else:
                 self.start_finished.emit(False, "⚠️ 启动命令发送失败")
@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""分析引擎日志 - 追加写入数据和状态变化，程序崩溃后重启时恢复引擎状态"""
+
+from __future__ import annotations
+
+import json
+import os
+import struct
+import time
+import zlib
+from typing import Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from battery_analyzer.core.analysis_engine import SAMPLE_COLUMNS, BatteryAnalysisEngine
+
+# 文件格式（小端）：
+#   文件头: MAGIC
+#   记录:   u8 类型 | u32 数据长度 | u32 CRC32 | 数据
+# 记录类型：
+#   POINT / BLOCK  add_data_point / add_data_block 添加的数据，float64 (5, 点数)，行顺序同 SAMPLE_COLUMNS
+#   EVENT          状态变化（开始/停止/暂停/继续mAh测试、修改校准参数），JSON {"op": 方法名, "args": 参数}
+#   CHECKPOINT     引擎状态（BatteryAnalysisEngine.get_state）和此时的数据点数，JSON
+#   SAMPLES        压缩日志时写入的全部历史数据，格式同 BLOCK，恢复时不重放
+MAGIC = b"BATJRNL1"
+_RECORD_HEADER = struct.Struct("<BII")
+
+POINT = 1
+BLOCK = 2
+EVENT = 3
+CHECKPOINT = 4
+SAMPLES = 5
+
+# 允许重放的引擎方法
+JOURNALED_EVENTS = ('start_mah_test', 'stop_mah_test', 'suspend_mah_test', 'resume_mah_test',
+                    'set_mx_plus_b', 'set_calibration_params')
+
+
+class EngineJournal:
+    """分析引擎的预写日志
+
+    引擎每次添加数据或改变状态后追加一条记录（写入操作系统缓冲区，进程崩溃
+    不会丢失；每隔 fsync_interval 秒落盘一次）。每 checkpoint_records 条记录
+    写一个检查点，恢复时检查点之前的数据整块读入，只重放之后的记录，重放
+    耗时有上限。记录数超过 compact_records 或引擎清空数据时压缩日志：整个
+    文件重写为一块数据加一个检查点。
+
+    写入失败时只提示并停止记录，不影响采集。
+    """
+
+    def __init__(
+        self,
+        path: str,
+        checkpoint_records: int = 1000,
+        compact_records: int = 100_000,
+        fsync_interval: float = 1.0
+    ):
+        """
+        Args:
+            path: 日志文件路径（目录不存在时自动创建）
+            checkpoint_records: 两个检查点之间的最大记录数
+            compact_records: 文件中记录数超过此值时压缩
+            fsync_interval: 落盘间隔（秒）
+        """
+        self.path = path
+        self.checkpoint_records = checkpoint_records
+        self.compact_records = compact_records
+        self.fsync_interval = fsync_interval
+
+        self.engine: Optional[BatteryAnalysisEngine] = None
+        self._file = None
+        self._records = 0                   # 文件中的记录数
+        self._records_since_checkpoint = 0
+        self._last_sync = time.monotonic()
+
+    def attach(self, engine: BatteryAnalysisEngine) -> None:
+        """开始记录引擎的变化
+
+        在 recover 之后调用：已有日志（包括恢复出的状态）会在其后继续追加。
+        """
+        self.engine = engine
+        engine.journal = self
+        self.compact()
+
+    def detach(self) -> None:
+        """停止记录并关闭文件（日志保留在磁盘上）"""
+        if self.engine is not None:
+            self.engine.journal = None
+            self.engine = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def discard(self) -> None:
+        """停止记录并删除日志（正常退出时调用，下次启动不再恢复）"""
+        self.detach()
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+    # 写入
+    def log_point(self, values: Tuple[float, ...]) -> None:
+        """记录 add_data_point 添加的一个数据点（顺序同 SAMPLE_COLUMNS）"""
+        self._append(POINT, np.asarray(values, dtype='<f8').tobytes())
+
+    def log_block(self, block: np.ndarray) -> None:
+        """记录 add_data_block 添加的数据，(5, 点数) 的数组"""
+        self._append(BLOCK, np.ascontiguousarray(block, dtype='<f8').tobytes())
+
+    def log_event(self, op: str, *args) -> None:
+        """记录一次状态变化，恢复时以相同参数重新调用引擎的 op 方法"""
+        self._append(EVENT, json.dumps({'op': op, 'args': list(args)}).encode('utf-8'))
+
+    def checkpoint(self) -> None:
+        """写入引擎当前状态"""
+        self._append(CHECKPOINT, self._checkpoint_payload())
+
+    def compact(self) -> None:
+        """把日志重写为一块数据加一个检查点（先写临时文件再替换）"""
+        if self.engine is None:
+            return
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            temp_path = self.path + ".tmp"
+            with open(temp_path, 'wb') as f:
+                f.write(MAGIC)
+                samples = self.engine.get_samples()
+                if samples.shape[1]:
+                    self._write_record(f, SAMPLES, np.ascontiguousarray(samples, dtype='<f8').tobytes())
+                self._write_record(f, CHECKPOINT, self._checkpoint_payload())
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_path, self.path)
+            self._file = open(self.path, 'ab')
+        except OSError as e:
+            self._fail(e)
+            return
+        self._records = 2
+        self._records_since_checkpoint = 0
+
+    def _checkpoint_payload(self) -> bytes:
+        state = {'rows': len(self.engine.ternary_data.timestamps), 'state': self.engine.get_state()}
+        return json.dumps(state).encode('utf-8')
+
+    @staticmethod
+    def _write_record(f, kind: int, payload: bytes) -> None:
+        f.write(_RECORD_HEADER.pack(kind, len(payload), zlib.crc32(payload)))
+        f.write(payload)
+
+    def _append(self, kind: int, payload: bytes) -> None:
+        if self._file is None:
+            return
+        try:
+            self._write_record(self._file, kind, payload)
+            self._file.flush()
+            if time.monotonic() - self._last_sync >= self.fsync_interval:
+                os.fsync(self._file.fileno())
+                self._last_sync = time.monotonic()
+        except OSError as e:
+            self._fail(e)
+            return
+
+        self._records += 1
+        if kind == CHECKPOINT:
+            self._records_since_checkpoint = 0
+            return
+        self._records_since_checkpoint += 1
+        if self._records_since_checkpoint >= self.checkpoint_records:
+            if self._records >= self.compact_records:
+                self.compact()
+            else:
+                self.checkpoint()
+
+    def _fail(self, error: OSError) -> None:
+        print(f"⚠️ 引擎日志写入失败，已停止记录: {error}")
+        self.detach()
+
+    # 恢复
+    def recover(self, engine: BatteryAnalysisEngine) -> bool:
+        """由日志恢复引擎状态
+
+        从最后一个完整的检查点还原，再重放其后的记录。文件末尾不完整或校验
+        失败的记录（写入过程中崩溃）被忽略。
+
+        Returns:
+            是否恢复出数据或未结束的mAh测试
+        """
+        try:
+            records = list(self._read_records())
+        except (OSError, ValueError) as e:
+            print(f"⚠️ 无法读取引擎日志: {e}")
+            return False
+
+        last = max((i for i, (kind, _) in enumerate(records) if kind == CHECKPOINT), default=None)
+        if last is None:
+            return False
+
+        blocks: List[np.ndarray] = [
+            np.frombuffer(payload, dtype='<f8').reshape(len(SAMPLE_COLUMNS), -1)
+            for kind, payload in records[:last] if kind in (POINT, BLOCK, SAMPLES)
+        ]
+        checkpoint = json.loads(records[last][1].decode('utf-8'))
+        samples = np.concatenate(blocks, axis=1) if blocks else np.empty((len(SAMPLE_COLUMNS), 0))
+        if samples.shape[1] != checkpoint['rows']:
+            print("⚠️ 引擎日志的检查点与数据不一致，不恢复")
+            return False
+
+        journal, engine.journal = engine.journal, None  # 重放时不写入日志
+        try:
+            engine.restore_state(checkpoint['state'], samples)
+            for kind, payload in records[last + 1:]:
+                if kind == POINT:
+                    timestamp, *values = np.frombuffer(payload, dtype='<f8').tolist()
+                    engine.add_data_point(*values, timestamp=timestamp)
+                elif kind == BLOCK:
+                    timestamps, *values = np.frombuffer(payload, dtype='<f8').reshape(len(SAMPLE_COLUMNS), -1)
+                    engine.add_data_block(*values, timestamps)
+                elif kind == EVENT:
+                    event = json.loads(payload.decode('utf-8'))
+                    if event['op'] in JOURNALED_EVENTS:
+                        getattr(engine, event['op'])(*event['args'])
+        finally:
+            engine.journal = journal
+
+        return bool(len(engine.ternary_data.timestamps)) or engine.mah_test_active or engine.mah_test_suspended
+
+    def _read_records(self) -> Iterator[Tuple[int, bytes]]:
+        """依次读取完整的记录，遇到不完整或校验失败的记录时停止"""
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, 'rb') as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"不是引擎日志文件: {self.path}")
+            while True:
+                header = f.read(_RECORD_HEADER.size)
+                if len(header) < _RECORD_HEADER.size:
+                    return
+                kind, length, crc = _RECORD_HEADER.unpack(header)
+                payload = f.read(length)
+                if len(payload) < length or zlib.crc32(payload) != crc:
+                    return
+                yield kind, payload
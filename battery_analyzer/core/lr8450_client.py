@@ -4,9 +4,18 @@
 
 from __future__ import annotations
 
+import os
+import re
 import socket
 import time
-from typing import Optional, Dict, List, Literal
+from dataclasses import dataclass, field
+from typing import Callable, Optional, Dict, List, Literal
+
+import numpy as np
+
+from app.core.device_capabilities import CapabilityCache, parse_idn
+from app.core.scpi_transport import SCPITransport
+from battery_analyzer.core.channel_reconciler import ChannelReconciler
 
 # USB串口支持
 try:
@@ -17,12 +26,95 @@ except ImportError:
     USB_AVAILABLE = False
 
 
+RealtimeMode = Literal["single", "batch", "binary"]
+
+# 命令同步方式："opc" 连续发送后用 *OPC? 等待完成，"legacy" 每条写命令后固定等待
+SyncMode = Literal["opc", "legacy"]
+
+# 旧方式下每条写命令后的等待时间（秒）
+LEGACY_WRITE_DELAY = 0.1
+
+# 设备能力缓存（已安装模块、记录通道）所在目录
+CAPABILITY_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".battery_analyzer")
+
+# *ESR? 中表示错误的位：QYE(4) / DDE(8) / EXE(16) / CME(32)
+ESR_ERROR_MASK = 0x3C
+
+# 二进制数据的字节序与类型（大端，数据长度同 HIOKIFileParser.DATA_SIZES）
+BINARY_DTYPES = {
+    "analog": np.dtype(">i2"),
+    "logic": np.dtype(">i2"),
+    "alarm": np.dtype(">i2"),
+    "pulse": np.dtype(">u4"),
+    "wave_calc": np.dtype(">f8"),
+}
+
+# 模拟通道的无效值：NODATA / BURNOUT / +OVER / -OVER
+ANALOG_INVALID_CODES = (32765, 32766, 32767, -32768)
+
+# 每量程的数据数（量程满度对应的原始值），见通信命令手册 :MEMory:ADATa?
+# 物理量 = 原始值 × 量程 / 每量程数据数
+COUNTS_PER_RANGE = {
+    "VOLTAGE": 20000,
+    "RESIST": 20000,
+    "STRAIN": 20000,
+    "HUMIDITY": 1000,
+}
+
+# 热电偶 / 测温电阻按量程（°C）区分
+TEMPERATURE_COUNTS_PER_RANGE = {
+    100: 10000,
+    500: 10000,
+    2000: 20000,
+}
+
+
+@dataclass
+class MemoryDownload:
+    """设备存储数据的下载状态（断线后可从最后完成的数据块继续）"""
+    channels: List[str]
+    start: int                      # 起始点
+    count: int                      # 每个通道的点数
+    raw: Dict[str, np.ndarray]      # 原始值 {通道名: 数组}
+    scales: Dict[str, float]        # 换算系数 {通道名: 系数}
+    completed: Dict[str, int] = field(default_factory=dict)  # 已完成点数
+
+    @property
+    def total_points(self) -> int:
+        return self.count * len(self.channels)
+
+    @property
+    def done_points(self) -> int:
+        return sum(self.completed.values())
+
+    @property
+    def finished(self) -> bool:
+        return self.done_points >= self.total_points
+
+    def to_physical(self) -> Dict[str, np.ndarray]:
+        """将原始值换算为工程值，无效值为NaN"""
+        result = {}
+        for channel in self.channels:
+            raw = self.raw[channel]
+            values = raw.astype(np.float64)
+            if LR8450Client.channel_kind(channel) == "analog":
+                values[np.isin(raw, ANALOG_INVALID_CODES)] = np.nan
+                values *= self.scales[channel]
+            result[channel] = values
+        return result
+
+
 class LR8450Client:
     """LR8450设备客户端 - 支持TCP/IP和USB两种连接方式"""
 
+    # 实时值中表示无数据的标志（9.99999E+99）
+    NODATA_MARK = '9.99999'
+
     def __init__(self, connection_type: Literal["TCP", "USB"] = "TCP",
                  ip_address: str = "", port: int = 8802,
-                 com_port: str = ""):
+                 com_port: str = "",
+                 realtime_mode: RealtimeMode = "batch",
+                 sync_mode: SyncMode = "opc"):
         """初始化LR8450客户端
 
         Args:
@@ -30,15 +122,35 @@ class LR8450Client:
             ip_address: TCP/IP地址（TCP模式使用）
             port: TCP端口（TCP模式使用，默认8802）
             com_port: COM端口（USB模式使用，如"COM3"）
+            realtime_mode: 实时数据读取方式
+                - "batch": 所有通道合并为一条命令，一次往返读取
+                - "single": 每个通道单独查询（旧方式）
+                - "binary": :MEMory:BFETch? 二进制读取，原始值按量程换算
+            sync_mode: 写命令的同步方式
+                - "opc": 写命令连续发送不等待，需要顺序时用 wait_complete() 的
+                  *OPC? 查询等待设备执行完毕
+                - "legacy": 每条写命令后固定等待（不支持 *OPC? 的固件，
+                  连接时检测到会自动切换）
         """
         self.connection_type = connection_type
         self.ip_address = ip_address
         self.port = port
         self.com_port = com_port
         self.timeout = 10.0
+        self.realtime_mode: RealtimeMode = realtime_mode
+        self.sync_mode: SyncMode = sync_mode
+
+        # 通道原始值到工程值的换算系数 {通道名: 系数}
+        self.channel_scales: Dict[str, float] = {}
+
+        # 设备标识（*IDN? 响应）与已检测到的模块
+        self.idn: Optional[str] = None
+        self.installed_modules: List[int] = []
+        self.capability_cache: Optional[CapabilityCache] = None  # 首次检测模块时创建
 
         # TCP连接对象
         self.sock: Optional[socket.socket] = None
+        self.transport: Optional[SCPITransport] = None
 
         # USB串口对象
         self.serial: Optional['serial.Serial'] = None
@@ -64,15 +176,17 @@ class LR8450Client:
         self.sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
         self.sock.settimeout(self.timeout)
         self.sock.connect((self.ip_address, self.port))
+        self.transport = SCPITransport(self.sock, timeout=self.timeout)
 
         # 初始化
         idn = self.query("*IDN?")
         if not idn:
             return False
+        self.idn = idn
 
         self.write(":HEAD OFF")
         self.write("*CLS")
-        time.sleep(0.3)
+        self.wait_complete(legacy_delay=0.3)
 
         self.connected = True
         print(f"✓ TCP连接成功: {self.ip_address}:{self.port}")
@@ -107,10 +221,11 @@ class LR8450Client:
         if not idn:
             self.serial.close()
             return False
+        self.idn = idn
 
         self.write(":HEAD OFF")
         self.write("*CLS")
-        time.sleep(0.3)
+        self.wait_complete(legacy_delay=0.3)
 
         self.connected = True
         print(f"✓ USB连接成功: {self.com_port}")
@@ -124,6 +239,7 @@ class LR8450Client:
             except:
                 pass
             self.sock = None
+            self.transport = None
 
         if self.serial:
             try:
@@ -134,6 +250,14 @@ class LR8450Client:
 
         self.connected = False
     
+    @property
+    def serial_number(self) -> Optional[str]:
+        """设备序列号（*IDN? 响应的第3个字段）"""
+        if not self.idn:
+            return None
+        parts = self.idn.split(',')
+        return parts[2].strip() if len(parts) >= 3 else None
+
     def query(self, command: str, timeout: float = 3.0) -> Optional[str]:
         """发送查询命令并接收响应（支持TCP和USB）"""
         if self.connection_type == "TCP":
@@ -144,40 +268,12 @@ class LR8450Client:
 
     def _query_tcp(self, command: str, timeout: float = 3.0) -> Optional[str]:
         """TCP方式查询"""
-        if not self.sock:
+        if not self.transport:
             return None
 
         try:
-            # 发送命令
-            cmd_with_terminator = command + "\r\n"
-            self.sock.sendall(cmd_with_terminator.encode('ascii'))
-
-            # 逐字节接收
-            response_chars = []
-            start_time = time.time()
-
-            while time.time() - start_time < timeout:
-                try:
-                    self.sock.settimeout(0.1)
-                    byte = self.sock.recv(1)
-                    if not byte:
-                        break
-
-                    char = byte.decode('ascii', errors='ignore')
-                    if char == '\n':
-                        break
-                    elif char == '\r':
-                        continue
-                    else:
-                        response_chars.append(char)
-
-                except socket.timeout:
-                    if response_chars:
-                        continue
-                    else:
-                        break
-
-            response = ''.join(response_chars)
+            self.transport.send_line(command)
+            response = self.transport.readline(timeout)
             return response if response else None
 
         except Exception as e:
@@ -237,13 +333,12 @@ class LR8450Client:
 
     def _write_tcp(self, command: str) -> bool:
         """TCP方式写入"""
-        if not self.sock:
+        if not self.transport:
             return False
 
         try:
-            cmd_with_terminator = command + "\r\n"
-            self.sock.sendall(cmd_with_terminator.encode('ascii'))
-            time.sleep(0.1)
+            self.transport.send_line(command)
+            self._legacy_pause(LEGACY_WRITE_DELAY)
             return True
         except Exception as e:
             print(f"TCP写入错误 [{command}]: {e}")
@@ -258,11 +353,73 @@ class LR8450Client:
             cmd_with_terminator = command + "\r\n"
             self.serial.write(cmd_with_terminator.encode('ascii'))
             self.serial.flush()
-            time.sleep(0.1)
+            self._legacy_pause(LEGACY_WRITE_DELAY)
             return True
         except Exception as e:
             print(f"USB写入错误 [{command}]: {e}")
             return False
+
+    def wait_complete(self, legacy_delay: float = 0.0, timeout: float = 5.0) -> bool:
+        """等待之前发送的命令全部执行完毕（*OPC? 屏障）
+
+        设备按顺序执行命令，*OPC? 在之前的命令（包括 :STOP、:MEMory:GETReal
+        等重叠命令）完成后才返回1。固件不应答时切换为旧的固定等待方式。
+
+        Args:
+            legacy_delay: 旧方式下的等待时间（秒）
+            timeout: 等待 *OPC? 应答的超时（秒）
+
+        Returns:
+            是否确认命令已完成（旧方式下固定等待后返回True）
+        """
+        if self.sync_mode == "opc":
+            response = self.query("*OPC?", timeout=timeout)
+            if response and response.split()[-1] == "1":
+                return True
+            print(f"⚠️ *OPC? 无有效应答（{response!r}），改用固定延时同步")
+            self.sync_mode = "legacy"
+            if self.transport:
+                self.transport.clear()
+
+        time.sleep(legacy_delay)
+        return True
+
+    def check_errors(self) -> Optional[str]:
+        """查询 *ESR? ，有错误位时再用 :ERRor? 读取错误号
+
+        Returns:
+            错误描述，无错误时返回None
+        """
+        response = self.query("*ESR?")
+        try:
+            esr = int(response.split(',')[-1])
+        except (AttributeError, ValueError):
+            return None
+
+        if not esr & ESR_ERROR_MASK:
+            return None
+
+        error = self.query(":ERRor?")
+        return f"ESR={esr}, ERR={error}"
+
+    def _resync(self) -> None:
+        """丢弃未读完或迟到的应答，使之后的查询与应答重新对应
+
+        TCP连接时重新连接，旧连接上残留和之后才到达的数据随旧socket一起丢弃
+        （只清空缓冲区无法丢弃迟到的应答）。USB每次查询前会清空输入缓冲，不需要处理。
+        """
+        if not self.transport:
+            return
+
+        print("⚠️ 应答不完整，重新连接以丢弃残留数据...")
+        self.disconnect()
+        if not self.connect():
+            print("❌ 重新连接失败")
+
+    def _legacy_pause(self, seconds: float) -> None:
+        """旧同步方式下的固定等待，*OPC? 方式下不等待"""
+        if self.sync_mode == "legacy":
+            time.sleep(seconds)
     
     def disable_all_channels(self, modules: List[int] = None) -> bool:
         """禁用指定模块的所有通道（防止数据错乱）
@@ -279,6 +436,7 @@ class LR8450Client:
                 modules = [1, 2, 3, 4]  # 默认禁用所有模块
 
             print(f"\n🔧 禁用模块 {modules} 的所有通道...")
+            ChannelReconciler(self).invalidate()
 
             disabled_count = 0
             for module in modules:
@@ -287,7 +445,7 @@ class LR8450Client:
                     store_cmd = f":UNIT:STORe {channel},OFF"
                     if self.write(store_cmd):
                         disabled_count += 1
-                    time.sleep(0.005)  # 减少延迟，提高速度
+                    self._legacy_pause(0.005)
 
             print(f"✓ 已禁用 {disabled_count} 个通道\n")
             return True
@@ -317,6 +475,9 @@ class LR8450Client:
             是否配置成功
         """
         try:
+            # 直接修改设备设置后，差异同步缓存不再可靠
+            ChannelReconciler(self).invalidate()
+
             # 1. 设置通道存储（启用/禁用）
             store_cmd = f":UNIT:STORe {channel},{'ON' if enabled else 'OFF'}"
             if not self.write(store_cmd):
@@ -336,14 +497,14 @@ class LR8450Client:
                     print(f"⚠️ 设置通道 {channel} 测量模式失败")
                     return False
                 print(f"✓ 通道 {channel} 测量模式设置为 TC (热电偶)")
-                time.sleep(0.1)
+                self._legacy_pause(0.1)
             else:
                 mode_cmd = f":UNIT:INMOde {channel},VOLTAGE"
                 if not self.write(mode_cmd):
                     print(f"⚠️ 设置通道 {channel} 测量模式失败")
                     return False
                 print(f"✓ 通道 {channel} 测量模式设置为 VOLTAGE (电压)")
-                time.sleep(0.1)
+                self._legacy_pause(0.1)
 
             # 3. 如果是温度通道，设置热电偶类型
             if channel_type == "TEMPERATURE" and thermocouple_type:
@@ -352,7 +513,7 @@ class LR8450Client:
                     print(f"⚠️ 设置通道 {channel} 热电偶类型失败")
                     return False
                 print(f"✓ 通道 {channel} 热电偶类型设置为 {thermocouple_type}")
-                time.sleep(0.1)
+                self._legacy_pause(0.1)
 
             # 4. 设置量程
             if range_value is not None:
@@ -365,14 +526,21 @@ class LR8450Client:
                     print(f"✓ 通道 {channel} 电压量程设置为 {range_value}V")
                 else:
                     print(f"✓ 通道 {channel} 温度量程设置为 {range_value}°C")
-                time.sleep(0.1)
+                self._legacy_pause(0.1)
+
+            # 记录换算系数（二进制读取使用）
+            mode = "TC" if channel_type == "TEMPERATURE" else "VOLTAGE"
+            if range_value is not None:
+                self.channel_scales[channel] = self.range_scale(mode, range_value)
+            else:
+                self.channel_scales.pop(channel, None)
 
             # 5. 如果是温度通道，设置INT/EXT（内部/外部参考）
             if channel_type == "TEMPERATURE" and int_ext:
                 ref_cmd = f":SCALing:REFerence {channel},{int_ext}"
                 if self.write(ref_cmd):
                     print(f"✓ 通道 {channel} 参考设置为 {int_ext}")
-                time.sleep(0.1)
+                self._legacy_pause(0.1)
 
             return True
 
@@ -403,57 +571,203 @@ class LR8450Client:
         """
         print(f"\n🔧 开始配置 {len(channels)} 个通道...")
 
-        # 0. 先停止采集（确保配置生效）
-        print("⏸️  停止采集以应用新配置...")
-        self.write(":STOP")
-        time.sleep(0.5)
+        if not channel_configs:
+            # 使用默认配置（电压，10V量程）
+            channel_configs = [
+                {'channel': channel, 'type': 'VOLTAGE', 'range': 10.0}
+                for channel in channels
+            ]
+
+        # 只发送与设备当前状态不同的命令，完成后重新启动采集
+        success = ChannelReconciler(self).apply(channel_configs, disable_others)
 
-        # 1. 先禁用所有通道（防止数据错乱）
-        if disable_others:
-            if not self.disable_all_channels():
-                print("⚠️ 禁用通道失败，继续配置...")
-
-        # 2. 配置指定的通道
-        success_count = 0
-
-        if channel_configs:
-            # 使用详细配置
-            for config in channel_configs:
-                channel = config.get('channel')
-                ch_type = config.get('type', 'VOLTAGE')
-                range_val = config.get('range', 10.0)
-                tc_type = config.get('thermocouple')
-                int_ext = config.get('int_ext')
-
-                if self.configure_channel(
-                    channel=channel,
-                    enabled=True,
-                    channel_type=ch_type,
-                    range_value=range_val,
-                    thermocouple_type=tc_type,
-                    int_ext=int_ext
-                ):
-                    success_count += 1
+        if success:
+            print(f"\n✅ 通道配置完成: {len(channel_configs)} 个通道\n")
         else:
-            # 使用默认配置（电压，10V量程）
-            for channel in channels:
-                if self.configure_channel(
-                    channel=channel,
-                    enabled=True,
-                    channel_type='VOLTAGE',
-                    range_value=10.0
-                ):
-                    success_count += 1
+            print(f"\n⚠️ 通道配置未全部成功\n")
+        return success
+
+    def download_memory(self, channels: List[str], start: int = 0,
+                        count: Optional[int] = None,
+                        block_size: int = 5000,
+                        progress_callback: Optional[Callable[[int, int], None]] = None,
+                        resume: Optional[MemoryDownload] = None,
+                        max_retries: int = 3) -> MemoryDownload:
+        """批量下载设备存储的数据（:MEMory:POINt + :MEMory:BDATa?）
+
+        每个通道按 block_size 点分块读取，数据块直接写入预分配的numpy数组。
+        连接断开时自动重连，并从最后完成的数据块继续。
+
+        Args:
+            channels: 通道列表，如 ["CH2_1", "CH2_3"]
+            start: 起始点
+            count: 点数，None表示读取到存储末尾（:MEMory:MAXPoint?）
+            block_size: 每块点数（1-5000）
+            progress_callback: 进度回调 (已完成点数, 总点数)
+            resume: 之前中断的下载状态，传入时忽略其他范围参数
+            max_retries: 断线重连次数
+
+        Returns:
+            下载状态，finished为True表示全部完成；用to_physical()取工程值
+
+        Raises:
+            ValueError: 点范围超出存储数据，或无法获取通道量程
+            ConnectionError: 重连失败
+        """
+        block_size = max(1, min(block_size, 5000))
+
+        download = resume
+        if download is None:
+            download = self._prepare_download(channels, start, count)
+
+        retries = 0
+        while True:
+            try:
+                self._download_blocks(download, block_size, progress_callback)
+                return download
+            except OSError as e:
+                # TimeoutError / ConnectionError 都是 OSError
+                if retries >= max_retries:
+                    raise ConnectionError(f"下载中断: {e}") from e
+                retries += 1
+                print(f"⚠️ 下载中断（{e}），第 {retries}/{max_retries} 次重连后继续...")
+                self.disconnect()
+                time.sleep(1.0)
+                if not self.connect():
+                    continue
+
+    def _prepare_download(self, channels: List[str], start: int,
+                          count: Optional[int]) -> MemoryDownload:
+        """查询存储点数并为每个通道预分配数组"""
+        response = self.query(":MEMory:MAXPoint?")
+        try:
+            max_point = int(response)
+        except (TypeError, ValueError):
+            raise ValueError(f"无法获取存储点数: {response!r}")
+
+        if count is None:
+            count = max_point - start
+        if start < 0 or count <= 0 or start + count > max_point:
+            raise ValueError(f"点范围 {start}+{count} 超出存储数据 (共 {max_point} 点)")
+
+        return self._allocate_download(channels, start, count)
+
+    def _allocate_download(self, channels: List[str], start: int,
+                           count: int) -> MemoryDownload:
+        """为每个通道预分配数组"""
+        raw = {}
+        scales = {}
+        for channel in channels:
+            kind = self.channel_kind(channel)
+            raw[channel] = np.empty(count, dtype=BINARY_DTYPES[kind])
+            scales[channel] = self.get_channel_scale(channel) if kind == "analog" else 1.0
+
+        return MemoryDownload(
+            channels=list(channels),
+            start=start,
+            count=count,
+            raw=raw,
+            scales=scales,
+            completed={channel: 0 for channel in channels},
+        )
+
+    def _download_blocks(self, download: MemoryDownload, block_size: int,
+                         progress_callback: Optional[Callable[[int, int], None]]) -> None:
+        """读取所有未完成的数据块"""
+        if not self.transport:
+            raise ConnectionError("TCP连接未建立")
+
+        for channel in download.channels:
+            array = download.raw[channel]
+            itemsize = array.dtype.itemsize
+            view = memoryview(array).cast("B")
+
+            while download.completed[channel] < download.count:
+                done = download.completed[channel]
+                points = min(block_size, download.count - done)
+
+                # 每块都重新指定读取位置，断线重连后可直接续传
+                self.transport.send_line(
+                    f":MEMory:POINt {channel},{download.start + done};"
+                    f":MEMory:BDATa? {points}")
+                self.transport.read_block_into(
+                    view[done * itemsize:(done + points) * itemsize])
+
+                download.completed[channel] = done + points
+                if progress_callback:
+                    progress_callback(download.done_points, download.total_points)
+
+        self.transport.skip_terminator()
+
+    def read_memory_points(self, channels: List[str], start: int, count: int,
+                           timeout: float = 3.0) -> Dict[str, np.ndarray]:
+        """读取存储中从start开始的count个点（连续采集用）
+
+        TCP连接时所有通道的 :MEMory:POINt + :MEMory:BDATa? 合并为一条消息，
+        二进制数据块依次读入预分配数组；USB连接时用 :MEMory:VDATa? 读取文本值。
+
+        Args:
+            channels: 通道列表
+            start: 起始点
+            count: 每个通道的点数（1-5000）
+            timeout: 每个数据块的超时（秒）
 
-        print(f"\n✅ 通道配置完成: {success_count}/{len(channels)} 成功")
+        Returns:
+            字典 {通道名: 工程值数组}，无效值为NaN
 
-        # 重新启动采集，让设备重新组织数据缓冲区
-        print("▶️  重新启动采集...")
-        self.write(":STARt")
-        time.sleep(1.0)  # 等待设备准备数据缓冲区
-        print("✓ 采集已重新启动\n")
+        Raises:
+            ConnectionError: 未连接或连接断开
+            ValueError: 响应格式或数量不符
+            TimeoutError: 数据未在超时内到达
+        """
+        if not 1 <= count <= 5000:
+            raise ValueError(f"每次读取点数必须为1-5000: {count}")
 
-        return success_count == len(channels)
+        if not self.transport:
+            return self._read_memory_points_text(channels, start, count, timeout)
+
+        try:
+            download = self._allocate_download(channels, start, count)
+        except ValueError as e:
+            # 原始值无法换算，改用设备换算后的 :MEMory:VDATa? 读取
+            print(f"⚠️ {e}，改用文本方式读取存储数据")
+            return self._read_memory_points_text(channels, start, count, timeout)
+        try:
+            self.transport.send_line(";".join(
+                f":MEMory:POINt {channel},{start};:MEMory:BDATa? {count}"
+                for channel in channels))
+            for channel in channels:
+                self.transport.read_block_into(memoryview(download.raw[channel]).cast("B"), timeout)
+                download.completed[channel] = count
+            self.transport.skip_terminator()
+        except Exception:
+            # 未读完的数据块留在连接中，之后的每次查询都会读到上一条的应答
+            self._resync()
+            raise
+        return download.to_physical()
+
+    def _read_memory_points_text(self, channels: List[str], start: int, count: int,
+                                 timeout: float) -> Dict[str, np.ndarray]:
+        """用 :MEMory:VDATa? 读取存储数据（文本格式，USB连接使用）"""
+        if not self.connected:
+            raise ConnectionError("设备未连接")
+
+        response = self.query(";".join(
+            f":MEMory:POINt {channel},{start};:MEMory:VDATa? {count}"
+            for channel in channels), timeout=timeout)
+        if response is None:
+            raise TimeoutError(":MEMory:VDATa? 无响应")
+
+        items = [item for item in re.split(r"[;,]", response) if item.strip()]
+        if len(items) != count * len(channels):
+            raise ValueError(f"存储数据数量不符: 期望 {count * len(channels)}，实际 {len(items)}")
+
+        result = {}
+        for i, channel in enumerate(channels):
+            values = [self._parse_real_value(item) for item in items[i * count:(i + 1) * count]]
+            result[channel] = np.array(
+                [np.nan if value is None else value for value in values], dtype=np.float64)
+        return result
 
     def start_acquisition(self) -> bool:
         """启动数据采集"""
@@ -479,7 +793,7 @@ class LR8450Client:
                 continue
 
             # 等待命令执行
-            time.sleep(0.5)
+            self.wait_complete(legacy_delay=0.5)
 
             # 验证设备是否停止（查询状态）
             try:
@@ -507,12 +821,30 @@ class LR8450Client:
         print("✓ 已发送多次停止命令")
         return True
 
-    def detect_installed_modules(self) -> List[int]:
+    def detect_installed_modules(self, refresh: bool = False) -> List[int]:
         """检测已安装的模块（通过查询单元ID）
 
+        已连接过的设备（按序列号和固件版本）使用磁盘缓存的模块信息，
+        只用一条合并查询确认模块未变化，不再逐个插槽查询。
+
+        Args:
+            refresh: 为True时忽略缓存，重新逐个插槽检测
+
         Returns:
             已安装模块的单元号列表，如 [1, 2] 表示UNIT1和UNIT2有模块
         """
+        identity = parse_idn(self.idn)
+        if self.capability_cache is None:
+            self.capability_cache = CapabilityCache(CAPABILITY_CACHE_DIR)
+
+        if identity and not refresh:
+            model, serial_number, firmware = identity
+            cached = self.capability_cache.lookup(serial_number, firmware)
+            if cached and self.capability_cache.revalidate(cached, self.query):
+                self.installed_modules = cached.installed_units
+                print(f"✓ 使用缓存的模块信息: UNIT{self.installed_modules}")
+                return list(self.installed_modules)
+
         try:
             installed_modules = []
 
@@ -525,7 +857,8 @@ class LR8450Client:
                 unit_name = f"UNIT{unit_num}"
 
                 # 尝试查询该单元的ID（正确的命令格式：:UNIT:IDN? UNIT1）
-                response = self.query(f":UNIT:IDN? {unit_name}")
+                # 空插槽不会应答，使用较短的超时
+                response = self.query(f":UNIT:IDN? {unit_name}", timeout=1.0)
 
                 print(f"  查询 {unit_name}: ", end="")
 
@@ -549,10 +882,19 @@ class LR8450Client:
                 else:
                     print(f"无响应 → ✗ 无模块")
 
-                time.sleep(0.1)
+                self._legacy_pause(0.1)
 
             print("-" * 60)
 
+            self.installed_modules = installed_modules
+
+            # 保存到能力缓存，下次连接同一设备时跳过检测
+            if identity and installed_modules:
+                capabilities = self.capability_cache.read(
+                    self.query, identity[1], identity[2], identity[0], installed_modules)
+                if capabilities:
+                    self.capability_cache.store(capabilities)
+
             if not installed_modules:
                 print("⚠ 未检测到任何已安装的模块")
                 print("\n提示：请确认：")
@@ -583,9 +925,231 @@ class LR8450Client:
         Returns:
             字典 {通道名: 测量值}
         """
+        # 只有设备不支持当前读取方式时才降级；无应答（超时）时重新同步，
+        # 本次返回空字典，下次仍用当前方式读取
+        if self.realtime_mode == "binary" and channels:
+            data = self._get_channel_data_binary(channels)
+            if data is not None:
+                return data
+            print("⚠️ 二进制读取失败，改用批量读取")
+            self.realtime_mode = "batch"
+            self._resync()
+
+        if self.realtime_mode == "batch" and channels:
+            data = self._get_channel_data_batch(channels)
+            if data is not None:
+                return data
+            # 固件不支持合并查询时，后续改用逐通道读取
+            print("⚠️ 批量读取失败，改用逐通道读取")
+            self.realtime_mode = "single"
+            if self.transport:
+                self.transport.clear()
+
+        return self._get_channel_data_single(channels)
+
+    def _realtime_read_failed(self, name: str, reason: object) -> Optional[Dict[str, float]]:
+        """实时读取无应答时判断是否降级
+
+        设备报告命令错误时返回None（不支持该读取方式）；否则只是应答超时，
+        重新同步后返回空字典，迟到的应答不会被下一次读取当作通道值。
+
+        Args:
+            name: 读取方式名称（用于提示）
+            reason: 失败原因
+        """
+        if self.transport:
+            self.transport.clear()
+        error = self.check_errors()
+        self._resync()
+        if error:
+            print(f"⚠️ {name}命令出错: {error}")
+            return None
+
+        print(f"⚠️ {name}无应答（{reason}），重新同步后下次继续使用")
+        return {}
+
+    def _get_channel_data_batch(self, channels: List[str]) -> Optional[Dict[str, float]]:
+        """一次往返读取所有通道的实时数据
+
+        将 :MEMory:GETReal 与各通道的 :MEMory:VREAL? 用分号合并为一条消息，
+        设备按顺序执行并把各查询结果用分号（或逗号）连接在一行中返回。
+
+        Args:
+            channels: 通道列表
+
+        Returns:
+            字典 {通道名: 测量值}；响应数量与通道数不符或设备报告命令错误时
+            返回None，无应答时返回空字典
+        """
+        queries = ";".join(f":MEMory:VREAL? {channel}" for channel in channels)
+        response = self.query(f":MEMory:GETReal;{queries}")
+        if not response:
+            return self._realtime_read_failed("批量读取", "超时")
+
+        values = [v for v in re.split(r"[;,]", response) if v.strip()]
+        if len(values) != len(channels):
+            print(f"⚠️ 批量响应数量不符: 期望 {len(channels)}，实际 {len(values)}")
+            return None
+
+        data = {}
+        for channel, text in zip(channels, values):
+            value = self._parse_real_value(text)
+            if value is not None:
+                data[channel] = value
+
+        return data
+
+    def _get_channel_data_binary(self, channels: List[str]) -> Optional[Dict[str, float]]:
+        """二进制方式读取实时数据
+
+        Returns:
+            字典 {通道名: 测量值}；设备不支持二进制读取时返回None，
+            无应答或连接出错时返回空字典
+        """
+        if not self.transport:
+            return None
+
+        try:
+            for channel in channels:
+                if self.channel_kind(channel) == "analog":
+                    self.get_channel_scale(channel)
+        except ValueError as e:
+            # 原始值无法换算，本次改用设备换算后的 :MEMory:VREAL? 读取
+            print(f"⚠️ {e}，本次改用批量读取")
+            return self._get_channel_data_batch(channels)
+
+        try:
+            values = self.fetch_realtime_binary(channels)
+        except ValueError as e:
+            # 应答不是二进制数据块
+            print(f"二进制读取错误: {e}")
+            return None
+        except TimeoutError as e:
+            return self._realtime_read_failed("二进制读取", e)
+        except Exception as e:
+            print(f"TCP二进制读取错误: {e}")
+            self._resync()
+            return {}
+
+        return {
+            channel: float(value)
+            for channel, value in zip(channels, values)
+            if np.isfinite(value)
+        }
+
+    def fetch_realtime_binary(self, channels: List[str],
+                              timeout: float = 3.0) -> np.ndarray:
+        """发送 :MEMory:GETReal 并用 :MEMory:BFETch? 读取所有通道的二进制值
+
+        所有查询合并为一条消息。通道按数据类型分组发送，每组的数据块连续
+        存放，用一次 numpy.frombuffer 解码，再按量程换算为工程值。
+
+        Args:
+            channels: 通道列表
+            timeout: 每个数据块的超时（秒）
+
+        Returns:
+            与channels顺序一致的工程值数组，无效值（NODATA/OVER/BURNOUT）为NaN
+
+        Raises:
+            ConnectionError: 未建立TCP连接或连接断开
+            ValueError: 响应不是二进制数据块，或无法获取通道量程
+            TimeoutError: 数据块未在超时内到达
+        """
+        if not self.transport:
+            raise ConnectionError("TCP连接未建立")
+
+        # 按数据类型分组，保证同类型数据在缓冲区中连续
+        groups: Dict[str, List[int]] = {}
+        for index, channel in enumerate(channels):
+            groups.setdefault(self.channel_kind(channel), []).append(index)
+
+        # 换算系数可能需要查询设备，必须在发送读取命令之前准备好
+        scales = {
+            index: self.get_channel_scale(channels[index])
+            for index in groups.get("analog", [])
+        }
+
+        order = [index for indices in groups.values() for index in indices]
+        queries = ";".join(f":MEMory:BFETch? {channels[i]}" for i in order)
+        self.transport.send_line(f":MEMory:GETReal;{queries}")
+
+        values = np.full(len(channels), np.nan)
+        for kind, indices in groups.items():
+            dtype = BINARY_DTYPES[kind]
+            raw = np.empty(len(indices), dtype=dtype)
+            view = memoryview(raw).cast("B")
+            for i in range(len(indices)):
+                self.transport.read_block_into(
+                    view[i * dtype.itemsize:(i + 1) * dtype.itemsize], timeout)
+
+            decoded = raw.astype(np.float64)
+            if kind == "analog":
+                decoded[np.isin(raw, ANALOG_INVALID_CODES)] = np.nan
+                decoded *= np.array([scales[i] for i in indices])
+            values[indices] = decoded
+
+        self.transport.skip_terminator()
+        return values
+
+    def get_channel_scale(self, channel: str) -> float:
+        """获取模拟通道原始值到工程值的换算系数（未知时向设备查询并缓存）
+
+        Raises:
+            ValueError: 无法获取通道的测量模式或量程（不缓存，下次重新查询）
+        """
+        scale = self.channel_scales.get(channel)
+        if scale is not None:
+            return scale
+
+        mode_response = self.query(f":UNIT:INMOde? {channel}")
+        range_response = self.query(f":UNIT:RANGe? {channel}")
+        try:
+            mode = mode_response.split(',')[-1].strip().upper()
+            range_value = float(range_response.split(',')[-1])
+        except (AttributeError, ValueError):
+            raise ValueError(f"无法获取通道 {channel} 的量程: {mode_response!r}, {range_response!r}")
+
+        scale = self.range_scale(mode, range_value)
+        self.channel_scales[channel] = scale
+        return scale
+
+    @staticmethod
+    def range_scale(mode: str, range_value: float) -> float:
+        """计算原始值到工程值的换算系数（量程 / 每量程数据数）
+
+        Args:
+            mode: 测量模式，如 "VOLTAGE"、"TC"、"RTD"、"HUMIDITY"
+            range_value: 量程（V 或 °C 等）
+        """
+        mode = mode.upper()
+        if mode in ("TC", "RTD"):
+            counts = TEMPERATURE_COUNTS_PER_RANGE.get(int(range_value), 10000)
+        else:
+            counts = COUNTS_PER_RANGE.get(mode, 20000)
+            if mode == "VOLTAGE" and range_value == 15:
+                range_value = 10.0  # 1-5V量程与10V量程相同
+        return range_value / counts
+
+    @staticmethod
+    def channel_kind(channel: str) -> str:
+        """根据通道名判断数据类型（analog/logic/alarm/pulse/wave_calc）"""
+        name = channel.upper()
+        if name.startswith("PLS"):
+            return "pulse"
+        if name.startswith("ALM") or name == "ALARM":
+            return "alarm"
+        if name == "LOG":
+            return "logic"
+        if name.startswith("W"):
+            return "wave_calc"
+        return "analog"
+
+    def _get_channel_data_single(self, channels: List[str]) -> Dict[str, float]:
+        """逐通道读取实时数据（每个通道一次往返）"""
         # 获取实时数据快照
         self.write(":MEMory:GETReal")
-        time.sleep(0.3)
+        self.wait_complete(legacy_delay=0.3)
 
         data = {}
 
@@ -600,17 +1164,13 @@ class LR8450Client:
             if not hasattr(self, '_debug_printed'):
                 print(f"  [调试] 查询 '{channel}' → 响应: '{response}'")
 
-            if response and '9.99999' not in response:
-                try:
-                    value = float(response)
-                    data[channel] = value
-                    if not hasattr(self, '_debug_printed'):
-                        print(f"  [调试] 通道 {channel} = {value}")
-                except ValueError:
-                    if not hasattr(self, '_debug_printed'):
-                        print(f"  [调试] 通道 {channel} 无法转换为浮点数: '{response}'")
+            value = self._parse_real_value(response) if response else None
+            if value is not None:
+                data[channel] = value
+                if not hasattr(self, '_debug_printed'):
+                    print(f"  [调试] 通道 {channel} = {value}")
 
-            time.sleep(0.01)
+            self._legacy_pause(0.01)
 
         # 标记已打印调试信息
         if not hasattr(self, '_debug_printed'):
@@ -619,6 +1179,17 @@ class LR8450Client:
 
         return data
 
+    @classmethod
+    def _parse_real_value(cls, text: str) -> Optional[float]:
+        """解析实时测量值，无数据或无法解析时返回None"""
+        text = text.strip()
+        if not text or cls.NODATA_MARK in text:
+            return None
+        try:
+            return float(text)
+        except ValueError:
+            return None
+
     @staticmethod
     def list_available_ports() -> List[Dict[str, str]]:
         """列出所有可用的COM端口
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""设备存储连续读取 - 跟踪设备写入位置，按设备采样间隔无遗漏、无重复地读取每个采样点"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+
+@dataclass
+class MemoryBatch:
+    """一次读取到的连续采样点"""
+    start_index: int                  # 第一个点在设备存储中的序号
+    values: Dict[str, np.ndarray]     # {通道名: 工程值数组}，无效值为NaN
+    interval: float                   # 设备采样间隔（秒）
+    lost: int = 0                     # 读取前已被设备覆盖、无法再读取的点数
+
+    @property
+    def count(self) -> int:
+        return len(next(iter(self.values.values()))) if self.values else 0
+
+    @property
+    def indices(self) -> np.ndarray:
+        """每个点的设备采样序号"""
+        return np.arange(self.start_index, self.start_index + self.count)
+
+    @property
+    def timestamps(self) -> np.ndarray:
+        """每个点的设备时间（秒）= 采样序号 × 采样间隔"""
+        return self.indices * self.interval
+
+
+class MemoryStream:
+    """设备存储的连续读取器
+
+    轮询设备的写入位置（:MEMory:TOPPoint? / :MEMory:MAXPoint?），
+    只读取上次之后新写入的点，每批最多 batch_size 点。
+    与 :MEMory:GETReal 快照轮询不同，主机轮询快慢不影响结果：
+    每个采样点恰好读取一次，时间戳来自设备采样序号。
+    """
+
+    def __init__(self, client, channels: List[str], batch_size: int = 1000):
+        """初始化读取器
+
+        Args:
+            client: LR8450设备客户端（需提供 query/read_memory_points）
+            channels: 要读取的通道列表
+            batch_size: 每次最多读取的点数（1-5000）
+        """
+        self.client = client
+        self.channels = list(channels)
+        self.batch_size = max(1, min(batch_size, 5000))
+        self.interval: Optional[float] = None
+        self.next_index = 0
+        self.lost_total = 0
+
+    def start(self, start_index: int = 0) -> bool:
+        """读取设备采样间隔并设置起始点
+
+        Args:
+            start_index: 第一个要读取的点（:STARt 后设备存储从0开始）
+
+        Returns:
+            设备是否支持存储读取（能获取采样间隔和写入位置）
+        """
+        # 响应为NR3数值，开启响应头时为 ":CONFIGURE:SAMPLE 1.0E-02"
+        response = self.client.query(":CONFigure:SAMPle?")
+        try:
+            self.interval = float(response.split()[-1])
+        except (AttributeError, IndexError, ValueError):
+            print(f"⚠️ 无法获取设备采样间隔: {response!r}")
+            return False
+        if self.interval <= 0:
+            return False
+
+        if self.write_position() is None:
+            return False
+
+        self.next_index = start_index
+        self.lost_total = 0
+        return True
+
+    def write_position(self) -> Optional[Tuple[int, int]]:
+        """查询设备存储中最早的点和已写入的点数
+
+        Returns:
+            (最早可读的点, 已写入的点数)，查询失败时返回None
+        """
+        response = self.client.query(":MEMory:TOPPoint?;:MEMory:MAXPoint?")
+        if not response:
+            return None
+        try:
+            top, written = (int(float(item)) for item in response.split(';'))
+        except ValueError:
+            return None
+        return top, written
+
+    def poll(self) -> Optional[MemoryBatch]:
+        """读取新写入的点
+
+        Returns:
+            新数据（可能为0个点）；写入位置查询失败时返回None
+
+        Raises:
+            与 LR8450Client.read_memory_points 相同
+        """
+        position = self.write_position()
+        if position is None:
+            return None
+        top, written = position
+
+        lost = 0
+        if self.next_index < top:
+            # 设备存储已循环覆盖尚未读取的点
+            lost = top - self.next_index
+            self.lost_total += lost
+            self.next_index = top
+        elif written < self.next_index:
+            # 设备重新开始记录，存储从头写入
+            self.next_index = 0
+
+        count = min(written - self.next_index, self.batch_size)
+        if count <= 0:
+            return MemoryBatch(self.next_index, {channel: np.empty(0) for channel in self.channels},
+                               self.interval, lost)
+
+        values = self.client.read_memory_points(self.channels, self.next_index, count)
+        batch = MemoryBatch(self.next_index, values, self.interval, lost)
+        self.next_index += count
+        return batch
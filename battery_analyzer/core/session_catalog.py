@@ -0,0 +1,283 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""测试目录 - 用SQLite记录每次保存的波形和会话记录，按型号/SN/测试员/时间检索"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import sqlite3
+from dataclasses import asdict, dataclass, fields
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from battery_analyzer.core.session_recorder import read_session
+from battery_analyzer.core.waveform_file import open_waveform
+
+SCHEMA_VERSION = 1
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS tests (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL UNIQUE,
+    kind TEXT NOT NULL,
+    product_model TEXT NOT NULL DEFAULT '',
+    product_sn TEXT NOT NULL DEFAULT '',
+    tester TEXT NOT NULL DEFAULT '',
+    start_time TEXT NOT NULL,
+    duration REAL,
+    points INTEGER,
+    channel_hash TEXT NOT NULL DEFAULT '',
+    peak_temp REAL,
+    temp_rise REAL,
+    voltage_drop REAL,
+    capacity_mah REAL,
+    registered TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_tests_model_time ON tests (product_model, start_time);
+CREATE INDEX IF NOT EXISTS idx_tests_tester_time ON tests (tester, start_time);
+CREATE INDEX IF NOT EXISTS idx_tests_sn ON tests (product_sn);
+CREATE INDEX IF NOT EXISTS idx_tests_time ON tests (start_time);
+"""
+
+# 允许排序的列（ORDER BY 不能使用参数，只接受这些列名）
+SORT_COLUMNS = (
+    'start_time', 'product_model', 'product_sn', 'tester', 'duration',
+    'peak_temp', 'temp_rise', 'voltage_drop', 'capacity_mah', 'kind',
+)
+
+
+@dataclass
+class CatalogEntry:
+    """目录中的一条测试记录
+
+    温度/电压指标取两块电池中较差的值（峰值温度、温升、压降取较大者）。
+    时间为ISO 8601字符串，可直接按字符串比较和排序。
+    """
+    path: str
+    kind: str                       # "waveform" 保存的波形 / "session" 采集会话记录
+    product_model: str = ""
+    product_sn: str = ""
+    tester: str = ""
+    start_time: str = ""
+    duration: Optional[float] = None
+    points: Optional[int] = None
+    channel_hash: str = ""
+    peak_temp: Optional[float] = None
+    temp_rise: Optional[float] = None
+    voltage_drop: Optional[float] = None
+    capacity_mah: Optional[float] = None
+
+
+def channel_config_hash(channel_config: Optional[Dict]) -> str:
+    """通道配置的摘要（相同配置的测试摘要相同）"""
+    if not channel_config:
+        return ""
+    text = json.dumps(channel_config, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()[:16]
+
+
+def summarize_columns(columns: Dict[str, np.ndarray]) -> Dict[str, Optional[float]]:
+    """由曲线数据计算目录中的汇总指标
+
+    Args:
+        columns: {通道名: 数组}，时间列名为 "x" 或 "timestamp"，
+            其余为 ternary_voltage / ternary_temp / blade_voltage / blade_temp
+
+    Returns:
+        {duration, peak_temp, temp_rise, voltage_drop}，没有数据的指标为None
+    """
+    def worst(values: List[float]) -> Optional[float]:
+        values = [value for value in values if value is not None and np.isfinite(value)]
+        return float(max(values)) if values else None
+
+    time_column = columns.get('x', columns.get('timestamp'))
+    duration = None
+    if time_column is not None and len(time_column):
+        duration = float(time_column[-1] - time_column[0])
+
+    peaks, rises, drops = [], [], []
+    for battery in ('ternary', 'blade'):
+        temp = columns.get(f'{battery}_temp')
+        if temp is not None and len(temp):
+            peak = np.nanmax(temp) if not np.isnan(temp).all() else None
+            peaks.append(peak)
+            rises.append(None if peak is None else peak - temp[0])
+        voltage = columns.get(f'{battery}_voltage')
+        if voltage is not None and len(voltage):
+            drops.append(voltage[0] - voltage[-1])
+
+    return {
+        'duration': duration,
+        'peak_temp': worst(peaks),
+        'temp_rise': worst(rises),
+        'voltage_drop': worst(drops),
+    }
+
+
+class SessionCatalog:
+    """测试目录（SQLite数据库）
+
+    只保存文件路径和检索/排序用的字段，波形数据仍在各自的文件中。
+    型号、测试员、SN和开始时间都有索引，数千次测试的检索和排序可即时完成。
+    只应在创建它的线程中使用。
+    """
+
+    def __init__(self, path: str):
+        """打开（不存在时创建）目录数据库
+
+        Args:
+            path: 数据库文件路径，":memory:" 表示内存数据库
+        """
+        self.path = path
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path)
+        self._conn.row_factory = sqlite3.Row
+        if path != ":memory:":
+            self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+        self._conn.execute(f"PRAGMA user_version={SCHEMA_VERSION}")
+        self._conn.commit()
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def __len__(self) -> int:
+        return self._conn.execute("SELECT COUNT(*) FROM tests").fetchone()[0]
+
+    def register(self, entry: CatalogEntry) -> None:
+        """登记一次测试（同一路径再次登记时更新原记录）"""
+        values = asdict(entry)
+        values['path'] = os.path.abspath(entry.path)
+        values['start_time'] = entry.start_time or datetime.now().isoformat(timespec='seconds')
+        values['registered'] = datetime.now().isoformat(timespec='seconds')
+        names = list(values)
+        updates = ", ".join(f"{name}=excluded.{name}" for name in names if name != 'path')
+        with self._conn:
+            self._conn.execute(
+                f"INSERT INTO tests ({', '.join(names)}) VALUES ({', '.join('?' * len(names))}) "
+                f"ON CONFLICT(path) DO UPDATE SET {updates}",
+                [values[name] for name in names])
+
+    def register_file(self, path: str) -> CatalogEntry:
+        """读取已有的波形文件（.bwf/.json）或会话记录（.bsr）并登记
+
+        Raises:
+            ValueError: 文件格式无法识别
+            OSError: 文件无法读取
+        """
+        lower = path.lower()
+        if lower.endswith('.bsr'):
+            info, data = read_session(path)
+            metadata = info.get('metadata', {})
+            columns = dict(zip(info['columns'], data))
+            kind, start_time = "session", info.get('created', '')
+        elif lower.endswith('.json'):
+            with open(path, 'r', encoding='utf-8') as f:
+                metadata = json.load(f)
+            columns = {name: np.asarray(values, dtype=np.float64) for name, values in metadata.items()
+                       if name == 'x_data' or name.endswith(('_voltage', '_temp'))}
+            columns['x'] = columns.pop('x_data', np.empty(0))
+            kind, start_time = "waveform", metadata.get('start_time', metadata.get('timestamp', ''))
+        else:
+            metadata, names, data = open_waveform(path)
+            columns = dict(zip(names, data))
+            kind, start_time = "waveform", metadata.get('start_time', metadata.get('timestamp', ''))
+
+        analysis = metadata.get('analysis_data') or {}
+        time_column = columns.get('x', columns.get('timestamp'))
+        entry = CatalogEntry(
+            path=path,
+            kind=kind,
+            product_model=metadata.get('product_model', ''),
+            product_sn=metadata.get('product_sn', ''),
+            tester=metadata.get('tester', ''),
+            start_time=start_time,
+            points=len(time_column) if time_column is not None else None,
+            channel_hash=channel_config_hash(metadata.get('channel_config')),
+            capacity_mah=analysis.get('mAh容量'),
+            **summarize_columns(columns),
+        )
+        self.register(entry)
+        return entry
+
+    def remove(self, path: str) -> None:
+        """从目录中删除一条记录（不删除文件）"""
+        with self._conn:
+            self._conn.execute("DELETE FROM tests WHERE path=?", (os.path.abspath(path),))
+
+    def search(
+        self,
+        product_model: Optional[str] = None,
+        product_sn: Optional[str] = None,
+        tester: Optional[str] = None,
+        since: Optional[str] = None,
+        until: Optional[str] = None,
+        kinds: Optional[Sequence[str]] = None,
+        order_by: str = 'start_time',
+        descending: bool = True,
+        limit: Optional[int] = 1000,
+    ) -> List[CatalogEntry]:
+        """检索测试记录
+
+        Args:
+            product_model: 产品型号（完全匹配）
+            product_sn: SN（以此开头）
+            tester: 测试员（完全匹配）
+            since: 开始时间下限（ISO 8601，含）
+            until: 开始时间上限（ISO 8601，不含）
+            kinds: 只返回这些类型
+            order_by: 排序列，见 SORT_COLUMNS
+            descending: 是否降序
+            limit: 最多返回条数，None表示不限
+
+        Raises:
+            ValueError: 排序列无效
+        """
+        if order_by not in SORT_COLUMNS:
+            raise ValueError(f"不能按 {order_by} 排序")
+
+        conditions, params = [], []
+        if product_model:
+            conditions.append("product_model=?")
+            params.append(product_model)
+        if product_sn:
+            # 用范围条件代替 LIKE，才能使用索引
+            conditions.append("product_sn>=? AND product_sn<?")
+            params += [product_sn, product_sn + "\U0010ffff"]
+        if tester:
+            conditions.append("tester=?")
+            params.append(tester)
+        if since:
+            conditions.append("start_time>=?")
+            params.append(since)
+        if until:
+            conditions.append("start_time<?")
+            params.append(until)
+        if kinds:
+            conditions.append(f"kind IN ({', '.join('?' * len(kinds))})")
+            params += list(kinds)
+
+        sql = "SELECT * FROM tests"
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        sql += f" ORDER BY {order_by} {'DESC' if descending else 'ASC'}, id DESC"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(int(limit))
+
+        names = [field.name for field in fields(CatalogEntry)]
+        return [CatalogEntry(**{name: row[name] for name in names})
+                for row in self._conn.execute(sql, params)]
+
+    def distinct(self, column: str) -> List[str]:
+        """某列出现过的全部取值（用于筛选下拉框）"""
+        if column not in ('product_model', 'tester', 'kind'):
+            raise ValueError(f"不能列出 {column} 的取值")
+        rows = self._conn.execute(
+            f"SELECT DISTINCT {column} FROM tests WHERE {column}!='' ORDER BY {column}")
+        return [row[0] for row in rows]
@@ -0,0 +1,435 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""测试会话记录 - 采集过程中把全分辨率数据分块追加写入磁盘，程序崩溃也不丢失已写入的数据"""
+
+from __future__ import annotations
+
+import json
+import lzma
+import os
+import queue
+import struct
+import threading
+import time
+import zlib
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# 文件格式（小端）：
+#   文件头: MAGIC | u32 头部长度 | UTF-8 JSON（列名、每列编码、元数据）
+#   数据块: CHUNK_MAGIC | u32 行数 | u32 数据长度 | u32 CRC32 | 摘要 | 各列编码后的数据
+#           （每列为 u32 长度 + 数据）。每个数据块独立编码，可单独解码。
+#   摘要为未压缩的各列最小值、最大值（float64）及其所在行（u32），各 (列数,) 个，
+#   召回时不解压数据即可显示全程概览（版本3起）。
+#   版本1的数据块没有数据长度字段，数据为未压缩的float64（列数 × 行数，按列存放）
+MAGIC = b"BATREC01"
+CHUNK_MAGIC = b"CHNK"
+FORMAT_VERSION = 3
+_HEADER_LENGTH = struct.Struct("<I")
+_CHUNK_HEADER = struct.Struct("<4sIII")
+_CHUNK_HEADER_V1 = struct.Struct("<4sII")
+_COLUMN_LENGTH = struct.Struct("<I")
+
+# 列编码为 "变换+压缩"，例如 "xor+zlib"：
+#   变换 raw   - float64原样存放
+#        xor   - 与前一个值的位模式异或（变化缓慢的数据高位字节大多为0）
+#        delta - 与前一个值的位模式之差（适合单调递增的时间戳）
+#   xor/delta 变换后按字节重排（各值的第n个字节放在一起），便于压缩
+#   压缩 zlib / lzma，省略表示不压缩
+TRANSFORMS = ("raw", "xor", "delta")
+COMPRESSORS = {
+    "": (lambda data: data, lambda data: data),
+    "zlib": (lambda data: zlib.compress(data, 6), zlib.decompress),
+    "lzma": (lambda data: lzma.compress(data, preset=6), lzma.decompress),
+}
+DEFAULT_CODEC = "xor+zlib"
+
+
+def _parse_codec(codec: str) -> Tuple[str, str]:
+    transform, _, compressor = codec.partition("+")
+    if transform not in TRANSFORMS or compressor not in COMPRESSORS:
+        raise ValueError(f"未知的编码: {codec}")
+    return transform, compressor
+
+
+def encode_column(values: np.ndarray, codec: str) -> bytes:
+    """按编码把一个数据块中的一列转换为字节"""
+    transform, compressor = _parse_codec(codec)
+    bits = np.ascontiguousarray(values, dtype='<f8').view('<u8')
+    if transform == "raw":
+        data = bits.tobytes()
+    else:
+        encoded = bits.copy()
+        if transform == "xor":
+            encoded[1:] ^= bits[:-1]
+        else:
+            encoded[1:] -= bits[:-1]  # uint64按模运算，解码时累加可精确还原
+        data = encoded.view(np.uint8).reshape(-1, 8).T.tobytes()
+    return COMPRESSORS[compressor][0](data)
+
+
+def decode_column(data: bytes, rows: int, codec: str) -> np.ndarray:
+    """encode_column 的逆变换"""
+    transform, compressor = _parse_codec(codec)
+    data = COMPRESSORS[compressor][1](data)
+    if transform == "raw":
+        return np.frombuffer(data, dtype='<f8', count=rows)
+    encoded = np.frombuffer(data, dtype=np.uint8).reshape(8, rows).T.copy().view('<u8').ravel()
+    if transform == "xor":
+        bits = np.bitwise_xor.accumulate(encoded)
+    else:
+        bits = np.cumsum(encoded, dtype=np.uint64)
+    return bits.view('<f8')
+
+
+def summarize_chunk(chunk: np.ndarray) -> bytes:
+    """数据块的摘要：各列最小值、最大值及其所在行（忽略NaN，全为NaN时为NaN）"""
+    valid = ~np.isnan(chunk)
+    imin = np.where(valid, chunk, np.inf).argmin(axis=1)
+    imax = np.where(valid, chunk, -np.inf).argmax(axis=1)
+    columns = np.arange(len(chunk))
+    has_valid = valid.any(axis=1)
+    mins = np.where(has_valid, chunk[columns, imin], np.nan)
+    maxs = np.where(has_valid, chunk[columns, imax], np.nan)
+    return (mins.astype('<f8').tobytes() + maxs.astype('<f8').tobytes()
+            + imin.astype('<u4').tobytes() + imax.astype('<u4').tobytes())
+
+
+class SessionRecorder:
+    """测试会话记录器
+
+    界面线程调用 write() 把数据块放入内存中的当前块，攒满 chunk_rows 行
+    （或距上次写入超过 fsync_interval 秒）后交给后台线程写入文件，
+    后台线程按各列的编码压缩后写入，每隔 fsync_interval 秒调用 fsync 落盘，
+    压缩不占用界面线程。内存中最多保留
+    max_pending_chunks 个待写入的块，与测试时长无关；磁盘长时间阻塞时
+    丢弃新块并计数，不阻塞界面。
+    """
+
+    def __init__(
+        self,
+        path: str,
+        columns: Sequence[str],
+        metadata: Optional[Dict] = None,
+        chunk_rows: int = 1024,
+        fsync_interval: float = 5.0,
+        max_pending_chunks: int = 64,
+        codecs: Optional[Dict[str, str]] = None,
+        default_codec: str = DEFAULT_CODEC
+    ):
+        """初始化记录器
+
+        Args:
+            path: 会话文件路径
+            columns: 列名（第一列通常为时间戳），决定 write 的行顺序
+            metadata: 写入文件头的附加信息（通道配置、校准参数等）
+            chunk_rows: 每个数据块的最大行数
+            fsync_interval: 落盘间隔（秒），0表示每块都落盘
+            max_pending_chunks: 等待写入的最大块数
+            codecs: {列名: 编码}，未指定的列使用 default_codec
+            default_codec: 默认编码，见 TRANSFORMS / COMPRESSORS
+
+        Raises:
+            ValueError: 编码无效
+        """
+        self.path = path
+        self.columns = list(columns)
+        self.codecs = [(codecs or {}).get(column, default_codec) for column in self.columns]
+        for codec in self.codecs:
+            _parse_codec(codec)
+        self.metadata = metadata or {}
+        self.chunk_rows = max(1, chunk_rows)
+        self.fsync_interval = max(0.0, fsync_interval)
+
+        self._pending = np.empty((len(self.columns), self.chunk_rows))
+        self._pending_rows = 0
+        self._pending_since = 0.0
+        self._chunks: queue.Queue = queue.Queue(maxsize=max(1, max_pending_chunks))
+        self._file = None
+        self._thread: Optional[threading.Thread] = None
+        self._error: Optional[Exception] = None
+
+        self.rows_written = 0
+        self.chunks_written = 0
+        self.bytes_written = 0
+        self.dropped_rows = 0
+
+    def start(self) -> None:
+        """创建会话文件、写入文件头并启动写入线程
+
+        Raises:
+            OSError: 无法创建文件
+        """
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        header = json.dumps({
+            'version': FORMAT_VERSION,
+            'columns': self.columns,
+            'codecs': self.codecs,
+            'dtype': '<f8',
+            'created': datetime.now().isoformat(),
+            'metadata': self.metadata,
+        }, ensure_ascii=False).encode('utf-8')
+
+        self._file = open(self.path, 'wb')
+        self._file.write(MAGIC + _HEADER_LENGTH.pack(len(header)) + header)
+        self._sync()
+
+        self._thread = threading.Thread(target=self._run, name="SessionRecorder", daemon=True)
+        self._thread.start()
+
+    def is_recording(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def write(self, block) -> None:
+        """追加数据
+
+        Args:
+            block: (列数, 行数) 的数组，行顺序同 columns
+        """
+        block = np.asarray(block, dtype=np.float64)
+        if block.ndim != 2 or block.shape[0] != len(self.columns):
+            raise ValueError(f"数据块形状应为 ({len(self.columns)}, 行数)，实际 {block.shape}")
+        if self._thread is None:
+            return
+
+        offset = 0
+        total = block.shape[1]
+        while offset < total:
+            if self._pending_rows == 0:
+                self._pending_since = time.monotonic()
+            count = min(self.chunk_rows - self._pending_rows, total - offset)
+            self._pending[:, self._pending_rows:self._pending_rows + count] = block[:, offset:offset + count]
+            self._pending_rows += count
+            offset += count
+            if self._pending_rows == self.chunk_rows:
+                self._submit_pending()
+
+        # 数据较慢时也按落盘间隔写出未满的块
+        if self._pending_rows and time.monotonic() - self._pending_since >= self.fsync_interval:
+            self._submit_pending()
+
+    def flush(self) -> None:
+        """把未满的块交给写入线程"""
+        if self._pending_rows:
+            self._submit_pending()
+
+    def close(self) -> None:
+        """写出剩余数据、落盘并关闭文件"""
+        if self._thread is None:
+            return
+        self.flush()
+        self._chunks.put(None)
+        self._thread.join()
+        self._thread = None
+        self._file.close()
+        self._file = None
+        if self._error:
+            print(f"⚠️ 会话记录写入失败: {self._error}")
+
+    def statistics(self) -> Dict[str, int]:
+        """记录统计"""
+        return {
+            'rows_written': self.rows_written,
+            'chunks_written': self.chunks_written,
+            'bytes_written': self.bytes_written,
+            'dropped_rows': self.dropped_rows,
+            'pending_chunks': self._chunks.qsize(),
+        }
+
+    def _submit_pending(self) -> None:
+        chunk = self._pending[:, :self._pending_rows].copy()
+        self._pending_rows = 0
+        try:
+            self._chunks.put_nowait(chunk)
+        except queue.Full:
+            self.dropped_rows += chunk.shape[1]
+            print(f"⚠️ 会话记录写入落后，丢弃 {chunk.shape[1]} 行")
+
+    def _run(self) -> None:
+        """写入线程：写数据块，按间隔落盘"""
+        last_sync = time.monotonic()
+        dirty = False
+        while True:
+            timeout = None if not dirty else max(0.0, last_sync + self.fsync_interval - time.monotonic())
+            try:
+                chunk = self._chunks.get(timeout=timeout)
+            except queue.Empty:
+                chunk = False  # 到达落盘时间，没有新数据
+
+            if chunk is None:
+                break
+            if chunk is not False and self._error is None:
+                try:
+                    payload = summarize_chunk(chunk) + b"".join(
+                        _COLUMN_LENGTH.pack(len(data)) + data
+                        for data in (encode_column(values, codec) for values, codec in zip(chunk, self.codecs)))
+                    self._file.write(_CHUNK_HEADER.pack(
+                        CHUNK_MAGIC, chunk.shape[1], len(payload), zlib.crc32(payload)))
+                    self._file.write(payload)
+                    self.rows_written += chunk.shape[1]
+                    self.bytes_written += _CHUNK_HEADER.size + len(payload)
+                    self.chunks_written += 1
+                    dirty = True
+                except OSError as e:
+                    self._error = e
+
+            if dirty and time.monotonic() - last_sync >= self.fsync_interval:
+                self._sync()
+                last_sync = time.monotonic()
+                dirty = False
+
+        if dirty:
+            self._sync()
+
+    def _sync(self) -> None:
+        try:
+            self._file.flush()
+            os.fsync(self._file.fileno())
+        except OSError as e:
+            self._error = e
+
+
+class SessionReader:
+    """会话文件读取器
+
+    打开时只读取文件头并扫描各数据块的位置（不读取数据），之后可按块
+    随机读取。文件末尾不完整或校验失败的块（写入过程中程序崩溃）会被忽略。
+    """
+
+    def __init__(self, path: str):
+        """打开会话文件
+
+        Raises:
+            ValueError: 不是会话文件
+        """
+        self.path = path
+        self._file = open(path, 'rb')
+        try:
+            if self._file.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"不是会话记录文件: {path}")
+            (length,) = _HEADER_LENGTH.unpack(self._file.read(_HEADER_LENGTH.size))
+            self.info: Dict = json.loads(self._file.read(length).decode('utf-8'))
+        except Exception:
+            self._file.close()
+            raise
+        self.columns: List[str] = self.info['columns']
+        self.version = self.info.get('version', 1)
+        self.codecs: List[str] = self.info.get('codecs', ["raw"] * len(self.columns))
+        self._summary_size = 24 * len(self.columns) if self.version >= 3 else 0
+        # 每个数据块: (数据偏移, 数据长度, 行数, CRC32)
+        self.chunks: List[Tuple[int, int, int, int]] = []
+        self._scan()
+
+    def __enter__(self) -> "SessionReader":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._file.close()
+
+    @property
+    def rows(self) -> int:
+        return sum(chunk[2] for chunk in self.chunks)
+
+    def _scan(self) -> None:
+        header = _CHUNK_HEADER if self.version >= 2 else _CHUNK_HEADER_V1
+        size = os.fstat(self._file.fileno()).st_size
+        position = self._file.tell()
+        while position + header.size <= size:
+            self._file.seek(position)
+            fields = header.unpack(self._file.read(header.size))
+            if self.version >= 2:
+                magic, rows, length, crc = fields
+            else:
+                magic, rows, crc = fields
+                length = rows * len(self.columns) * 8
+            start = position + header.size
+            if magic != CHUNK_MAGIC or start + length > size:
+                break
+            self.chunks.append((start, length, rows, crc))
+            position = start + length
+
+    def read_chunk(self, index: int) -> np.ndarray:
+        """读取一个数据块
+
+        Returns:
+            (列数, 行数) 的数组
+
+        Raises:
+            ValueError: 数据块校验失败
+        """
+        start, length, rows, crc = self.chunks[index]
+        self._file.seek(start)
+        payload = self._file.read(length)
+        if zlib.crc32(payload) != crc:
+            raise ValueError(f"数据块 {index} 校验失败")
+        if self.version < 2:
+            return np.frombuffer(payload, dtype='<f8').reshape(len(self.columns), rows)
+
+        block = np.empty((len(self.columns), rows))
+        offset = self._summary_size
+        for row, codec in enumerate(self.codecs):
+            (size,) = _COLUMN_LENGTH.unpack_from(payload, offset)
+            offset += _COLUMN_LENGTH.size
+            block[row] = decode_column(payload[offset:offset + size], rows, codec)
+            offset += size
+        return block
+
+    def overview(self) -> Optional[np.ndarray]:
+        """由各数据块的摘要得到全程概览（不解压数据）
+
+        Returns:
+            (列数, 2 × 块数) 的数组，每块两个点：各列在该块中先出现和后出现的
+            极值（时间戳列即为块的首尾时间）；版本3之前的文件返回None
+        """
+        if self.version < 3:
+            return None
+        columns = len(self.columns)
+        overview = np.empty((columns, 2 * len(self.chunks)))
+        for index, (start, _, _, _) in enumerate(self.chunks):
+            self._file.seek(start)
+            summary = self._file.read(self._summary_size)
+            mins = np.frombuffer(summary, dtype='<f8', count=columns)
+            maxs = np.frombuffer(summary, dtype='<f8', count=columns, offset=8 * columns)
+            imin = np.frombuffer(summary, dtype='<u4', count=columns, offset=16 * columns)
+            imax = np.frombuffer(summary, dtype='<u4', count=columns, offset=20 * columns)
+            min_first = imin <= imax
+            overview[:, 2 * index] = np.where(min_first, mins, maxs)
+            overview[:, 2 * index + 1] = np.where(min_first, maxs, mins)
+        return overview
+
+    def read_all(self) -> np.ndarray:
+        """读取全部完整的数据块（遇到校验失败的块时停止）"""
+        blocks = []
+        for index in range(len(self.chunks)):
+            try:
+                blocks.append(self.read_chunk(index))
+            except ValueError:
+                print(f"⚠️ 会话文件在第 {index + 1} 个数据块处不完整，已读取此前的数据")
+                break
+        return np.concatenate(blocks, axis=1) if blocks else np.empty((len(self.columns), 0))
+
+
+def read_session(path: str) -> Tuple[Dict, np.ndarray]:
+    """读取会话文件
+
+    文件末尾不完整或校验失败的块（写入过程中程序崩溃）会被忽略，
+    返回此前完整写入的全部数据。
+
+    Args:
+        path: 会话文件路径
+
+    Returns:
+        (文件头信息, (列数, 行数) 的数据数组)
+
+    Raises:
+        ValueError: 不是会话文件
+    """
+    with SessionReader(path) as reader:
+        return reader.info, reader.read_all()
@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""波形文件 - 列式二进制存储，召回时用 numpy.memmap 按需读取"""
+
+from __future__ import annotations
+
+import json
+import os
+import struct
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.core.minmax_pyramid import MinMaxPyramid
+
+# 文件格式（小端）：
+#   MAGIC | u32 头部长度 | UTF-8 JSON头部 | 填充到64字节边界 | 各列float64数据（依次连续存放）
+#   [| 曲线摘要层级]
+# 曲线摘要（可选，头部 "pyramid" 记录倍数和各层的桶数）是第一列（时间）之后各列的
+# MinMaxPyramid 中较粗的几层，每层依次存放 mins、maxs（float64）和 imin、imax（int64），
+# 形状均为 (曲线数, 桶数)。召回时映射这些层级即可显示全程，不需要读取数据。
+MAGIC = b"BATWAVE1"
+WAVEFORM_SUFFIX = ".bwf"
+_HEADER_LENGTH = struct.Struct("<I")
+_ALIGNMENT = 64
+
+
+def save_waveform(
+    path: str,
+    columns: Dict[str, np.ndarray],
+    metadata: Optional[Dict] = None,
+    pyramid: Optional[MinMaxPyramid] = None
+) -> None:
+    """保存波形文件
+
+    先写入临时文件再替换，保存过程中出错不会破坏已有文件。
+
+    Args:
+        path: 文件路径
+        columns: {列名: 数组}，各列长度相同，按字典顺序存放
+        metadata: 写入头部的信息（产品信息、通道配置、校准参数等）
+        pyramid: 第一列（时间）之后各列的曲线历史，保存其较粗的摘要层级
+    """
+    lengths = {len(values) for values in columns.values()}
+    if len(lengths) > 1:
+        raise ValueError(f"各列长度不一致: {sorted(lengths)}")
+    length = lengths.pop() if lengths else 0
+
+    header = {
+        'version': 1,
+        'columns': list(columns),
+        'length': length,
+        'dtype': '<f8',
+        'metadata': metadata or {},
+    }
+    levels = {}
+    if pyramid is not None:
+        if pyramid.channels != len(columns) - 1 or len(pyramid) != length:
+            raise ValueError("曲线历史与保存的列不一致")
+        levels = pyramid.stored_levels()
+        header['pyramid'] = {
+            'factor': pyramid.factor,
+            'levels': [[index, level[0].shape[1]] for index, level in levels.items()],
+        }
+    encoded = json.dumps(header, ensure_ascii=False).encode('utf-8')
+    prefix = MAGIC + _HEADER_LENGTH.pack(len(encoded)) + encoded
+    padding = -len(prefix) % _ALIGNMENT
+
+    temp_path = path + ".tmp"
+    with open(temp_path, 'wb') as f:
+        f.write(prefix + b"\0" * padding)
+        for values in columns.values():
+            np.ascontiguousarray(values, dtype='<f8').tofile(f)
+        for mins, maxs, imin, imax in levels.values():
+            for values, dtype in ((mins, '<f8'), (maxs, '<f8'), (imin, '<i8'), (imax, '<i8')):
+                np.ascontiguousarray(values, dtype=dtype).tofile(f)
+    os.replace(temp_path, path)
+
+
+def _read_header(path: str) -> Tuple[Dict, int]:
+    """读取头部，返回 (头部, 数据偏移)"""
+    with open(path, 'rb') as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"不是波形文件: {path}")
+        (length,) = _HEADER_LENGTH.unpack(f.read(_HEADER_LENGTH.size))
+        header = json.loads(f.read(length).decode('utf-8'))
+    prefix = len(MAGIC) + _HEADER_LENGTH.size + length
+    return header, prefix + (-prefix % _ALIGNMENT)
+
+
+def open_waveform(path: str) -> Tuple[Dict, List[str], np.ndarray]:
+    """以内存映射方式打开波形文件（只读取头部，数据在访问时才从磁盘读入）
+
+    Args:
+        path: 文件路径
+
+    Returns:
+        (头部metadata, 列名, (列数, 点数) 的只读数组)
+
+    Raises:
+        ValueError: 不是波形文件或文件不完整
+    """
+    header, offset = _read_header(path)
+    return header['metadata'], header['columns'], _map_columns(path, header, offset)
+
+
+def _map_columns(path: str, header: Dict, offset: int) -> np.ndarray:
+    names = header['columns']
+    count = header['length']
+    shape = (len(names), count)
+    if os.path.getsize(path) < offset + 8 * len(names) * count:
+        raise ValueError(f"波形文件不完整: {path}")
+
+    if count == 0:
+        return np.empty(shape)
+    return np.memmap(path, dtype=header['dtype'], mode='r', offset=offset, shape=shape)
+
+
+def open_waveform_pyramid(path: str, channels: Sequence[str]) -> Tuple[Dict, MinMaxPyramid]:
+    """以内存映射方式打开波形文件并建立曲线历史
+
+    文件中保存了曲线摘要且曲线列与 channels 一致时直接映射摘要层级，显示全程
+    不需要读取数据，放大时才计算较细的层级；否则（旧文件）完整读取一遍计算摘要。
+
+    Args:
+        path: 文件路径
+        channels: 时间列名和各曲线的列名
+
+    Returns:
+        (头部metadata, 曲线历史)
+
+    Raises:
+        ValueError: 不是波形文件、文件不完整或缺少所需的列
+    """
+    header, offset = _read_header(path)
+    names = header['columns']
+    data = _map_columns(path, header, offset)
+    missing = [channel for channel in channels if channel not in names]
+    if missing:
+        raise ValueError(f"波形文件缺少列: {', '.join(missing)}")
+    rows = [names.index(channel) for channel in channels]
+    x = data[rows[0]]
+    if rows[1:] == list(range(rows[1], rows[1] + len(rows) - 1)):
+        y = data[rows[1]:rows[-1] + 1]  # 连续的行，不复制
+    else:
+        y = data[rows[1:]]
+
+    stored = header.get('pyramid')
+    if not stored or names != list(channels):
+        return header['metadata'], MinMaxPyramid.from_arrays(x, y)
+
+    levels = {}
+    curves = len(names) - 1
+    offset += 8 * len(names) * header['length']
+    for index, buckets in stored['levels']:
+        if os.path.getsize(path) < offset + 4 * 8 * curves * buckets:
+            raise ValueError(f"波形文件不完整: {path}")
+        arrays = []
+        for dtype in ('<f8', '<f8', '<i8', '<i8'):
+            arrays.append(np.memmap(path, dtype=dtype, mode='r', offset=offset, shape=(curves, buckets)))
+            offset += 8 * curves * buckets
+        levels[index] = tuple(arrays)
+    return header['metadata'], MinMaxPyramid.from_levels(x, y, levels, factor=stored['factor'])
@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""召回对话框 - 从测试目录中按型号/SN/测试员/时间检索已保存的测试"""
+
+from __future__ import annotations
+
+import os
+from datetime import datetime, timedelta
+from typing import List, Optional
+
+from PySide6.QtCore import Qt
+from PySide6.QtWidgets import (
+    QDialog, QVBoxLayout, QHBoxLayout, QLabel, QPushButton, QComboBox, QLineEdit,
+    QTableWidget, QTableWidgetItem, QAbstractItemView, QHeaderView, QMessageBox, QFileDialog,
+)
+
+from battery_analyzer.core.session_catalog import CatalogEntry, SessionCatalog
+
+
+class SessionCatalogDialog(QDialog):
+    """召回对话框
+
+    检索和排序由数据库完成（点击表头按该列排序），表格只显示查询结果。
+    确定后 selected_path 为选中的文件；也可以浏览文件直接选择。
+    """
+
+    # (表头, 排序列, 显示格式)
+    COLUMNS = [
+        ("开始时间", 'start_time', "{}"),
+        ("型号", 'product_model', "{}"),
+        ("SN", 'product_sn', "{}"),
+        ("测试员", 'tester', "{}"),
+        ("时长(s)", 'duration', "{:.1f}"),
+        ("峰值温度(°C)", 'peak_temp', "{:.2f}"),
+        ("温升(°C)", 'temp_rise', "{:.2f}"),
+        ("压降(V)", 'voltage_drop', "{:.3f}"),
+        ("容量(mAh)", 'capacity_mah', "{:.1f}"),
+        ("类型", 'kind', "{}"),
+    ]
+
+    # 时间范围选项（天数，None表示全部）
+    PERIODS = [("全部", None), ("今天", 0), ("最近7天", 7), ("最近30天", 30), ("最近一年", 365)]
+
+    KIND_NAMES = {"waveform": "波形", "session": "会话记录"}
+
+    RESULT_LIMIT = 1000
+
+    def __init__(self, catalog: SessionCatalog, parent: Optional[QDialog] = None):
+        super().__init__(parent)
+        self.setWindowTitle("召回波形数据")
+        self.setMinimumSize(1000, 560)
+
+        self.catalog = catalog
+        self.selected_path: Optional[str] = None
+        self.entries: List[CatalogEntry] = []
+        self.order_by = 'start_time'
+        self.descending = True
+
+        layout = QVBoxLayout(self)
+
+        # 筛选条件
+        filter_layout = QHBoxLayout()
+        self.combo_model = self._create_filter_combo(catalog.distinct('product_model'))
+        self.edit_sn = QLineEdit()
+        self.edit_sn.setPlaceholderText("SN开头")
+        self.combo_tester = self._create_filter_combo(catalog.distinct('tester'))
+        self.combo_period = QComboBox()
+        for name, days in self.PERIODS:
+            self.combo_period.addItem(name, days)
+        for label, widget in (("型号:", self.combo_model), ("SN:", self.edit_sn),
+                              ("测试员:", self.combo_tester), ("时间:", self.combo_period)):
+            filter_layout.addWidget(QLabel(label))
+            filter_layout.addWidget(widget, 1)
+        layout.addLayout(filter_layout)
+
+        self.combo_model.currentTextChanged.connect(self.refresh)
+        self.edit_sn.textChanged.connect(self.refresh)
+        self.combo_tester.currentTextChanged.connect(self.refresh)
+        self.combo_period.currentIndexChanged.connect(self.refresh)
+
+        # 结果表格
+        self.table = QTableWidget(0, len(self.COLUMNS))
+        self.table.setHorizontalHeaderLabels([title for title, _, _ in self.COLUMNS])
+        self.table.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        self.table.setSelectionMode(QAbstractItemView.SelectionMode.SingleSelection)
+        self.table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.table.verticalHeader().setVisible(False)
+        header = self.table.horizontalHeader()
+        header.setSectionResizeMode(QHeaderView.ResizeMode.ResizeToContents)
+        header.setStretchLastSection(True)
+        header.setSortIndicatorShown(True)
+        header.sectionClicked.connect(self._on_header_clicked)
+        self.table.doubleClicked.connect(self._on_accept)
+        layout.addWidget(self.table)
+
+        self.label_count = QLabel()
+        self.label_count.setStyleSheet("color: #94a3b8;")
+        layout.addWidget(self.label_count)
+
+        # 按钮
+        button_layout = QHBoxLayout()
+        btn_import = QPushButton("导入文件到目录...")
+        btn_import.clicked.connect(self._import_files)
+        button_layout.addWidget(btn_import)
+        btn_browse = QPushButton("浏览文件...")
+        btn_browse.clicked.connect(self._browse_file)
+        button_layout.addWidget(btn_browse)
+        button_layout.addStretch()
+        btn_cancel = QPushButton("取消")
+        btn_cancel.clicked.connect(self.reject)
+        button_layout.addWidget(btn_cancel)
+        btn_recall = QPushButton("召回")
+        btn_recall.setDefault(True)
+        btn_recall.clicked.connect(self._on_accept)
+        button_layout.addWidget(btn_recall)
+        layout.addLayout(button_layout)
+
+        self.refresh()
+
+    def _create_filter_combo(self, values: List[str]) -> QComboBox:
+        combo = QComboBox()
+        combo.setEditable(True)
+        combo.addItem("")
+        combo.addItems(values)
+        return combo
+
+    def refresh(self, *_) -> None:
+        """按当前筛选条件和排序重新查询"""
+        days = self.combo_period.currentData()
+        since = None
+        if days is not None:
+            today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+            since = (today - timedelta(days=days)).isoformat()
+
+        self.entries = self.catalog.search(
+            product_model=self.combo_model.currentText().strip() or None,
+            product_sn=self.edit_sn.text().strip() or None,
+            tester=self.combo_tester.currentText().strip() or None,
+            since=since,
+            order_by=self.order_by,
+            descending=self.descending,
+            limit=self.RESULT_LIMIT,
+        )
+
+        self.table.setRowCount(len(self.entries))
+        for row, entry in enumerate(self.entries):
+            for column, (_, name, fmt) in enumerate(self.COLUMNS):
+                value = getattr(entry, name)
+                if name == 'kind':
+                    text = self.KIND_NAMES.get(value, value)
+                elif name == 'start_time':
+                    text = value.replace("T", " ")[:19]
+                else:
+                    text = "" if value is None else fmt.format(value)
+                item = QTableWidgetItem(text)
+                item.setToolTip(entry.path)
+                self.table.setItem(row, column, item)
+
+        column = [name for _, name, _ in self.COLUMNS].index(self.order_by)
+        order = Qt.SortOrder.DescendingOrder if self.descending else Qt.SortOrder.AscendingOrder
+        self.table.horizontalHeader().setSortIndicator(column, order)
+
+        text = f"共 {len(self.entries)} 条记录"
+        if len(self.entries) >= self.RESULT_LIMIT:
+            text += f"（只显示前 {self.RESULT_LIMIT} 条，请缩小筛选范围）"
+        self.label_count.setText(text)
+
+    def _on_header_clicked(self, column: int) -> None:
+        """点击表头：同一列切换升降序，其他列默认降序"""
+        name = self.COLUMNS[column][1]
+        self.descending = not self.descending if name == self.order_by else True
+        self.order_by = name
+        self.refresh()
+
+    def _on_accept(self, *_) -> None:
+        row = self.table.currentRow()
+        if row < 0:
+            QMessageBox.warning(self, "未选择", "请先选择要召回的测试")
+            return
+
+        path = self.entries[row].path
+        if not os.path.exists(path):
+            reply = QMessageBox.question(
+                self, "文件不存在",
+                f"文件已被移动或删除:\n{path}\n\n是否从目录中删除这条记录？",
+                QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No)
+            if reply == QMessageBox.StandardButton.Yes:
+                self.catalog.remove(path)
+                self.refresh()
+            return
+
+        self.selected_path = path
+        self.accept()
+
+    def _browse_file(self) -> None:
+        file_path, _ = QFileDialog.getOpenFileName(
+            self,
+            "召回波形数据",
+            "",
+            "波形文件 (*.bwf);;JSON文件 (*.json);;会话记录 (*.bsr);;所有文件 (*.*)"
+        )
+        if file_path:
+            self.selected_path = file_path
+            self.accept()
+
+    def _import_files(self) -> None:
+        """把已有的波形文件和会话记录登记到目录"""
+        file_paths, _ = QFileDialog.getOpenFileNames(
+            self,
+            "导入文件到目录",
+            "",
+            "波形文件和会话记录 (*.bwf *.json *.bsr);;所有文件 (*.*)"
+        )
+        if not file_paths:
+            return
+
+        failed = []
+        for file_path in file_paths:
+            try:
+                self.catalog.register_file(file_path)
+            except Exception as e:
+                failed.append(f"{os.path.basename(file_path)}: {e}")
+
+        self.refresh()
+        if failed:
+            QMessageBox.warning(self, "部分文件导入失败", "\n".join(failed[:20]))
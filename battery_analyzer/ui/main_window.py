@@ -12,6 +12,7 @@
 
 from __future__ import annotations
 
+import os
 import time
 from datetime import datetime
 from typing import Optional, List
@@ -40,12 +41,31 @@ from PySide6.QtWidgets import (
 import pyqtgraph as pg
 import numpy as np
 
+from app.core.minmax_pyramid import MinMaxPyramid
+from app.core.ring_buffer import RingBuffer
 from battery_analyzer.core.lr8450_client import LR8450Client
 from battery_analyzer.core.analysis_engine import BatteryAnalysisEngine
+from battery_analyzer.core.engine_journal import EngineJournal
 from battery_analyzer.core.acquisition_thread import DataAcquisitionThread
+from battery_analyzer.core.session_catalog import CatalogEntry, SessionCatalog, channel_config_hash, summarize_columns
+from battery_analyzer.core.session_recorder import SessionReader, SessionRecorder, read_session
+from battery_analyzer.core.waveform_file import WAVEFORM_SUFFIX, open_waveform_pyramid, save_waveform
 from battery_analyzer.core.device_worker import DeviceConfigWorker, DeviceStopWorker, DeviceStartWorker
 from battery_analyzer.ui.dialogs.channel_config_dialog import ChannelConfigDialog
 from battery_analyzer.ui.dialogs.device_connect_dialog import DeviceConnectDialog
+from battery_analyzer.ui.dialogs.session_catalog_dialog import SessionCatalogDialog
+from battery_analyzer.ui.render_scheduler import RenderScheduler
+
+# 曲线缓冲区的通道（时间戳 + 四路曲线），名称同波形文件中的字段
+PLOT_CHANNELS = ('x', 'ternary_voltage', 'ternary_temp', 'blade_voltage', 'blade_temp')
+
+# 会话记录文件的列：时间戳、四路校准后的值、四路设备原始值
+SESSION_COLUMNS = (
+    'timestamp', 'ternary_voltage', 'ternary_temp', 'blade_voltage', 'blade_temp',
+    'ternary_voltage_raw', 'ternary_temp_raw', 'blade_voltage_raw', 'blade_temp_raw',
+)
+# 会话记录的列编码：时间戳单调递增用差分，其余变化缓慢的测量值用异或（见 session_recorder）
+SESSION_CODECS = {'timestamp': 'delta+zlib'}
 
 
 class KPIWidget(QWidget):
@@ -556,14 +576,24 @@ class MainWindow(QMainWindow):
         # 数据采集状态
         self.is_running = False
         self.data_index = 0
-        self.max_points = 600  # 最多显示600个点（300秒）
+        self.max_points = 600  # 最近600个点（300秒），可设置到数百万点
+
+        # 最近数据的缓冲区（时间戳与四路曲线数据，用于KPI显示和保存波形）
+        self.plot_buffer = RingBuffer(PLOT_CHANNELS, self.max_points)
+
+        # 整个测试的曲线历史（四路曲线），绘图时按可见范围和像素宽度取最大/最小值摘要，
+        # 缩放到数小时的范围也只绘制与屏幕宽度相当的点数
+        self.plot_history = MinMaxPyramid(len(PLOT_CHANNELS) - 1)
+
+        # 界面刷新调度：曲线按帧率、KPI按更低频率刷新，窗口最小化时暂停
+        self.render_scheduler = RenderScheduler(
+            self._update_curves, self._update_kpis, fps=25.0, kpi_fps=4.0, parent=self)
+        self.render_scheduler.watch(self)
 
-        # 数据缓冲区
-        self.x_data = []
-        self.ternary_volt_data = []
-        self.ternary_temp_data = []
-        self.blade_volt_data = []
-        self.blade_temp_data = []
+        # 平移、缩放或改变大小后按新的可见范围重绘曲线
+        for plot in (self.waveforms.left_plot, self.waveforms.right_plot):
+            plot.plotItem.vb.sigXRangeChanged.connect(lambda *_: self.render_scheduler.mark_dirty())
+            plot.plotItem.vb.sigResized.connect(lambda *_: self.render_scheduler.mark_dirty())
 
         # 当前颜色和线宽（从控制面板获取）
         # 注意：这些颜色必须与 _create_dual_axis_plot() 中的Y轴颜色一致
@@ -576,6 +606,26 @@ class MainWindow(QMainWindow):
         self.update_timer = QTimer()
         self.update_timer.timeout.connect(self._update_waveform_virtual)
         self.update_interval_ms = 100  # 更新间隔（毫秒）
+        # 真实设备采集方式："memory" 连续读取设备存储（每个采样点恰好一次），
+        # "realtime" 按更新间隔读取实时值快照；设备不支持存储读取时自动回退
+        self.acquisition_mode = "memory"
+
+        # 会话记录：真实设备采集时把全部数据持续写入磁盘，程序崩溃也能找回
+        self.session_recorder: Optional[SessionRecorder] = None
+        self.session_dir = os.path.expanduser("~/.battery_analyzer/sessions")
+        self.session_fsync_interval = 5.0  # 落盘间隔（秒）
+
+        # 测试目录：保存的波形和会话记录都登记到SQLite数据库，召回时按条件检索
+        self.test_start_time: Optional[datetime] = None
+        try:
+            self.catalog: Optional[SessionCatalog] = SessionCatalog(
+                os.path.expanduser("~/.battery_analyzer/catalog.db"))
+        except Exception as e:
+            print(f"⚠️ 无法打开测试目录，召回时改为选择文件: {e}")
+            self.catalog = None
+
+        # 分析引擎日志：程序崩溃后重启时恢复数据和mAh测试状态，正常退出时删除
+        self.engine_journal = EngineJournal(os.path.expanduser("~/.battery_analyzer/engine.journal"))
 
         # 时间显示定时器
         self.app_start_time = time.time()  # 软件启动时间
@@ -602,6 +652,9 @@ class MainWindow(QMainWindow):
         # 初始化Y轴范围（根据配置的量程）
         self._update_plot_ranges()
 
+        # 恢复上次异常退出时的测试数据，之后开始记录日志
+        self._recover_engine_journal()
+
         # 连接产品信息字段的信号，自动保存配置（使用 editingFinished 而不是 textChanged 避免频繁保存）
         self.control.edit_model.editingFinished.connect(self._save_channel_config_to_file)
         self.control.edit_sn.editingFinished.connect(self._save_channel_config_to_file)
@@ -830,6 +883,7 @@ class MainWindow(QMainWindow):
         t_ternary_raw = data.get(self.channel_config['ternary_temp']['channel'], 0.0)
         v_blade_raw = data.get(self.channel_config['blade_voltage']['channel'], 0.0)
         t_blade_raw = data.get(self.channel_config['blade_temp']['channel'], 0.0)
+        device_values = (v_ternary_raw, t_ternary_raw, v_blade_raw, t_blade_raw)
 
         # 检测BURNOUT异常（温度超出量程1.5倍视为异常）
         ternary_temp_range = self.channel_config['ternary_temp']['range']
@@ -865,33 +919,68 @@ class MainWindow(QMainWindow):
         # 添加到分析引擎
         self.analysis_engine.add_data_point(v_ternary, t_ternary, v_blade, t_blade, timestamp)
 
-        # 添加到缓冲区
-        self.x_data.append(timestamp)
-        self.ternary_volt_data.append(v_ternary)
-        self.ternary_temp_data.append(t_ternary)
-        self.blade_volt_data.append(v_blade)
-        self.blade_temp_data.append(t_blade)
-
-        # 限制数据点数量（滚动显示）
-        if len(self.x_data) > self.max_points:
-            self.x_data.pop(0)
-            self.ternary_volt_data.pop(0)
-            self.ternary_temp_data.pop(0)
-            self.blade_volt_data.pop(0)
-            self.blade_temp_data.pop(0)
-
-        # 更新曲线
-        if len(self.volt_curves) >= 2 and len(self.temp_curves) >= 2:
-            self.volt_curves[0].setData(self.x_data, self.ternary_volt_data)
-            self.temp_curves[0].setData(self.x_data, self.ternary_temp_data)
-            self.volt_curves[1].setData(self.x_data, self.blade_volt_data)
-            self.temp_curves[1].setData(self.x_data, self.blade_temp_data)
-
-        # 更新KPI显示
-        self.ternary_voltage_kpi.set_value(f"{v_ternary:.2f}")
-        self.ternary_temp_kpi.set_value(f"{t_ternary:.2f}")
-        self.blade_voltage_kpi.set_value(f"{v_blade:.2f}")
-        self.blade_temp_kpi.set_value(f"{t_blade:.2f}")
+        # 添加到缓冲区（超过 max_points 时自动覆盖最早的点）
+        self.plot_buffer.append((timestamp, v_ternary, t_ternary, v_blade, t_blade))
+        self.plot_history.append(timestamp, (v_ternary, t_ternary, v_blade, t_blade))
+        self._record_session(np.array(
+            (timestamp, v_ternary, t_ternary, v_blade, t_blade) + device_values, dtype=np.float64)[:, None])
+
+        # 标记需要刷新，曲线和KPI由 render_scheduler 按帧率刷新
+        self.render_scheduler.mark_dirty()
+
+    def _on_block_acquired(self, timestamps: np.ndarray, values: np.ndarray) -> None:
+        """处理从采集线程接收到的数据块（真实设备数据）
+
+        与 _on_data_acquired 的处理相同，但每个数据块只更新一次曲线和KPI。
+
+        Args:
+            timestamps: 时间戳数组（秒）
+            values: 数据数组 (通道数, 样本数)，行顺序同 self._current_channels
+        """
+        rows = {channel: i for i, channel in enumerate(self._current_channels)}
+
+        def column(key: str) -> np.ndarray:
+            # 缺少的通道和无效值按0处理，与逐点处理的 data.get(..., 0.0) 一致
+            row = rows.get(self.channel_config[key]['channel'])
+            if row is None:
+                return np.zeros(len(timestamps))
+            return np.nan_to_num(values[row], nan=0.0)
+
+        raw = {key: column(key) for key in
+               ('ternary_voltage', 'ternary_temp', 'blade_voltage', 'blade_temp')}
+        device_values = np.vstack(list(raw.values()))  # 异常处理之前的设备原始值
+
+        # 检测BURNOUT及电压异常（超出量程1.5倍视为异常，设置为0）
+        labels = {
+            'ternary_voltage': "三元电池电压",
+            'ternary_temp': "三元电池温度 (BURNOUT)",
+            'blade_voltage': "刀片电池电压",
+            'blade_temp': "刀片电池温度 (BURNOUT)",
+        }
+        for key, data in raw.items():
+            value_range = self.channel_config[key]['range']
+            invalid = np.abs(data) > value_range * 1.5
+            if invalid.any():
+                print(f"⚠️ {labels[key]}异常: {int(invalid.sum())} 个数据点超出量程 {value_range}")
+                data[invalid] = 0.0
+
+        # 应用mX+b校准（对数组逐元素计算）
+        v_ternary = self.analysis_engine.apply_calibration("ternary", "voltage", raw['ternary_voltage'])
+        t_ternary = self.analysis_engine.apply_calibration("ternary", "temp", raw['ternary_temp'])
+        v_blade = self.analysis_engine.apply_calibration("blade", "voltage", raw['blade_voltage'])
+        t_blade = self.analysis_engine.apply_calibration("blade", "temp", raw['blade_temp'])
+
+        # 添加到分析引擎
+        self.analysis_engine.add_data_block(v_ternary, t_ternary, v_blade, t_blade, timestamps)
+
+        # 添加到缓冲区（超过 max_points 时自动覆盖最早的点）
+        block = np.vstack(np.broadcast_arrays(timestamps, v_ternary, t_ternary, v_blade, t_blade))
+        self.plot_buffer.extend(block)
+        self.plot_history.extend(block[0], block[1:])
+        self._record_session(np.vstack((block, device_values)))
+
+        # 标记需要刷新，曲线和KPI由 render_scheduler 按帧率刷新
+        self.render_scheduler.mark_dirty()
 
     def _on_acquisition_error(self, error_msg: str) -> None:
         """处理采集线程的错误
@@ -911,6 +1000,45 @@ class MainWindow(QMainWindow):
         """
         print(f"ℹ️ 采集状态: {status_msg}")
 
+    def _on_queue_high_watermark(self, depth: int, capacity: int) -> None:
+        """采集数据积压达到高水位时在状态栏提示
+
+        Args:
+            depth: 队列中等待处理的数据项数
+            capacity: 队列容量
+        """
+        stats = self.acquisition_thread.get_statistics() if self.acquisition_thread else {}
+        message = (f"⚠️ 界面处理落后于采集：积压 {depth}/{capacity}，"
+                   f"已丢弃 {stats.get('queue_dropped', 0)}，已合并 {stats.get('queue_coalesced', 0)}")
+        print(message)
+        self.statusBar().showMessage(message, 5000)
+
+    def _update_curves(self) -> None:
+        """按各图的可见范围和像素宽度更新四条曲线
+
+        点数不超过像素宽度2倍时直接使用历史数据的视图，否则使用最大/最小值摘要，
+        绘制的点数与测试时长无关，且不会漏掉尖峰。
+        """
+        if len(self.volt_curves) < 2 or len(self.temp_curves) < 2:
+            return
+        plots = (self.waveforms.left_plot, self.waveforms.right_plot)
+        for i, plot in enumerate(plots):
+            view_box = plot.plotItem.vb
+            x_min, x_max = view_box.viewRange()[0]
+            pixels = max(int(view_box.width()), 100)
+            x, y = self.plot_history.query(x_min, x_max, pixels, rows=[2 * i, 2 * i + 1])
+            self.volt_curves[i].setData(x[0], y[0])
+            self.temp_curves[i].setData(x[1], y[1])
+
+    def _update_kpis(self) -> None:
+        """用缓冲区的最新值刷新KPI显示"""
+        if not len(self.plot_buffer):
+            return
+        self.ternary_voltage_kpi.set_value(f"{self.plot_buffer.last('ternary_voltage'):.2f}")
+        self.ternary_temp_kpi.set_value(f"{self.plot_buffer.last('ternary_temp'):.2f}")
+        self.blade_voltage_kpi.set_value(f"{self.plot_buffer.last('blade_voltage'):.2f}")
+        self.blade_temp_kpi.set_value(f"{self.plot_buffer.last('blade_temp'):.2f}")
+
     def _update_waveform_virtual(self) -> None:
         """定时更新波形（虚拟数据模式）"""
         # 修正时间戳计算：100ms间隔 = 0.1秒
@@ -922,33 +1050,12 @@ class MainWindow(QMainWindow):
         # 添加到分析引擎
         self.analysis_engine.add_data_point(v_ternary, t_ternary, v_blade, t_blade, t)
 
-        # 添加到缓冲区
-        self.x_data.append(t)
-        self.ternary_volt_data.append(v_ternary)
-        self.ternary_temp_data.append(t_ternary)
-        self.blade_volt_data.append(v_blade)
-        self.blade_temp_data.append(t_blade)
-
-        # 限制数据点数量（滚动显示）
-        if len(self.x_data) > self.max_points:
-            self.x_data.pop(0)
-            self.ternary_volt_data.pop(0)
-            self.ternary_temp_data.pop(0)
-            self.blade_volt_data.pop(0)
-            self.blade_temp_data.pop(0)
-
-        # 更新曲线
-        if len(self.volt_curves) >= 2 and len(self.temp_curves) >= 2:
-            self.volt_curves[0].setData(self.x_data, self.ternary_volt_data)
-            self.temp_curves[0].setData(self.x_data, self.ternary_temp_data)
-            self.volt_curves[1].setData(self.x_data, self.blade_volt_data)
-            self.temp_curves[1].setData(self.x_data, self.blade_temp_data)
-
-        # 更新KPI显示
-        self.ternary_voltage_kpi.set_value(f"{v_ternary:.2f}")
-        self.ternary_temp_kpi.set_value(f"{t_ternary:.2f}")
-        self.blade_voltage_kpi.set_value(f"{v_blade:.2f}")
-        self.blade_temp_kpi.set_value(f"{t_blade:.2f}")
+        # 添加到缓冲区（超过 max_points 时自动覆盖最早的点）
+        self.plot_buffer.append((t, v_ternary, t_ternary, v_blade, t_blade))
+        self.plot_history.append(t, (v_ternary, t_ternary, v_blade, t_blade))
+
+        # 标记需要刷新，曲线和KPI由 render_scheduler 按帧率刷新
+        self.render_scheduler.mark_dirty()
 
         self.data_index += 1
     
@@ -966,11 +1073,9 @@ class MainWindow(QMainWindow):
         if not self.is_running:
             self.is_running = True
             self.data_index = 0
-            self.x_data.clear()
-            self.ternary_volt_data.clear()
-            self.ternary_temp_data.clear()
-            self.blade_volt_data.clear()
-            self.blade_temp_data.clear()
+            self.test_start_time = datetime.now()
+            self.plot_buffer.clear()
+            self.plot_history.clear()
 
             # 清空分析引擎数据
             self.analysis_engine.clear_data()
@@ -1041,17 +1146,23 @@ class MainWindow(QMainWindow):
             if hasattr(self.device_client, '_debug_printed'):
                 delattr(self.device_client, '_debug_printed')
 
+            self._start_session_recording()
+
             # 创建并启动采集线程
             self.acquisition_thread = DataAcquisitionThread(
                 device_client=self.device_client,
                 channels=self._current_channels,
-                interval_ms=self.update_interval_ms
+                interval_ms=self.update_interval_ms,
+                acquisition_mode=self.acquisition_mode,
+                emit_blocks=True,
+                overflow_policy="coalesce"  # 积压时拼接数据块，不丢失采样点
             )
 
             # 连接信号
-            self.acquisition_thread.data_acquired.connect(self._on_data_acquired)
+            self.acquisition_thread.block_acquired.connect(self._on_block_acquired)
             self.acquisition_thread.error_occurred.connect(self._on_acquisition_error)
             self.acquisition_thread.status_changed.connect(self._on_acquisition_status)
+            self.acquisition_thread.queue_high_watermark.connect(self._on_queue_high_watermark)
 
             # 启动线程
             self.acquisition_thread.start()
@@ -1082,9 +1193,10 @@ class MainWindow(QMainWindow):
             if self.acquisition_thread:
                 print("   断开信号连接...")
                 try:
-                    self.acquisition_thread.data_acquired.disconnect(self._on_data_acquired)
+                    self.acquisition_thread.block_acquired.disconnect(self._on_block_acquired)
                     self.acquisition_thread.error_occurred.disconnect(self._on_acquisition_error)
                     self.acquisition_thread.status_changed.disconnect(self._on_acquisition_status)
+                    self.acquisition_thread.queue_high_watermark.disconnect(self._on_queue_high_watermark)
                 except Exception:
                     pass  # 信号可能已断开
 
@@ -1130,6 +1242,7 @@ class MainWindow(QMainWindow):
 
     def _finalize_stop(self) -> None:
         """完成停止操作"""
+        self._stop_session_recording()
         self.statusBar().showMessage("数据采集已停止")
         print("✓ 数据采集已完全停止\n")
 
@@ -1141,6 +1254,105 @@ class MainWindow(QMainWindow):
             pass
         self.control.btn_start.clicked.connect(self._on_start)
     
+    def _start_session_recording(self) -> None:
+        """创建本次测试的会话记录文件（失败时只提示，不影响采集）"""
+        self._stop_session_recording()
+        path = os.path.join(self.session_dir, f"session_{datetime.now().strftime('%Y%m%d_%H%M%S')}.bsr")
+        metadata = {
+            'product_model': self.control.edit_model.text(),
+            'product_sn': self.control.edit_sn.text(),
+            'tester': self.control.edit_tester.text(),
+            'channels': self._current_channels,
+            'channel_config': self.channel_config,
+            'calibration': self.analysis_engine.get_calibration_params(),
+            'acquisition_mode': self.acquisition_mode,
+        }
+        recorder = SessionRecorder(path, SESSION_COLUMNS, metadata=metadata,
+                                   fsync_interval=self.session_fsync_interval,
+                                   codecs=SESSION_CODECS)
+        try:
+            recorder.start()
+        except OSError as e:
+            print(f"⚠️ 无法创建会话记录文件: {e}")
+            self.statusBar().showMessage(f"⚠️ 无法创建会话记录文件: {e}", 5000)
+            return
+        self.session_recorder = recorder
+        print(f"📝 会话记录: {path}")
+
+    def _record_session(self, block: np.ndarray) -> None:
+        """把数据块写入会话记录（列顺序同 SESSION_COLUMNS）"""
+        if self.session_recorder is not None:
+            self.session_recorder.write(block)
+
+    def _stop_session_recording(self) -> None:
+        """写出剩余数据并关闭会话记录文件"""
+        if self.session_recorder is None:
+            return
+        self.session_recorder.close()
+        stats = self.session_recorder.statistics()
+        print(f"📝 会话记录已保存: {self.session_recorder.path} "
+              f"({stats['rows_written']} 行，丢弃 {stats['dropped_rows']} 行)")
+        if stats['rows_written']:
+            self._register_in_catalog(self.session_recorder.path, "session",
+                                      self.session_recorder.metadata.get('channel_config'))
+        self.session_recorder = None
+
+    def _register_in_catalog(self, path: str, kind: str, channel_config: Optional[dict]) -> None:
+        """把当前测试登记到测试目录（汇总指标由整个测试的曲线数据计算）"""
+        if self.catalog is None:
+            return
+        columns = {'x': self.plot_history.x}
+        for row, channel in enumerate(PLOT_CHANNELS[1:]):
+            columns[channel] = self.plot_history.y[row]
+        entry = CatalogEntry(
+            path=path,
+            kind=kind,
+            product_model=self.control.edit_model.text(),
+            product_sn=self.control.edit_sn.text(),
+            tester=self.control.edit_tester.text(),
+            start_time=(self.test_start_time or datetime.now()).isoformat(timespec='seconds'),
+            points=len(self.plot_history),
+            channel_hash=channel_config_hash(channel_config),
+            capacity_mah=self.analysis_engine.get_mah_capacity() or None,
+            **summarize_columns(columns),
+        )
+        try:
+            self.catalog.register(entry)
+        except Exception as e:
+            print(f"⚠️ 登记到测试目录失败: {e}")
+
+    def _recover_engine_journal(self) -> None:
+        """由引擎日志恢复上次异常退出时的数据和mAh测试状态，并显示恢复的曲线
+
+        恢复的mAh测试处于暂停状态，由操作员在mAh容量测试对话框中继续或停止，
+        程序未运行的时间不计入容量。
+        """
+        if self.engine_journal.recover(self.analysis_engine):
+            self.analysis_engine.suspend_mah_test()
+            samples = self.analysis_engine.get_samples()
+            self.plot_history = MinMaxPyramid.from_arrays(samples[0], samples[1:])
+            tail = max(0, samples.shape[1] - self.plot_buffer.capacity)
+            self.plot_buffer.clear()
+            self.plot_buffer.extend(samples[:, tail:])
+            if samples.shape[1]:
+                for plot in (self.waveforms.left_plot, self.waveforms.right_plot):
+                    plot.setXRange(float(samples[0, 0]), float(samples[0, -1]))
+            self.render_scheduler.render_now()
+
+            message = f"✓ 已恢复上次异常退出时的测试数据（{samples.shape[1]} 个数据点）"
+            if self.analysis_engine.mah_test_suspended:
+                message += (f"，mAh测试已暂停: {self.analysis_engine.get_mah_capacity():.2f} mAh"
+                            f"（可在mAh容量测试中继续）")
+            print(message)
+            self.statusBar().showMessage(message)
+        self.engine_journal.attach(self.analysis_engine)
+
+    def closeEvent(self, event) -> None:
+        """关闭窗口时保存会话记录，删除引擎日志"""
+        self._stop_session_recording()
+        self.engine_journal.discard()
+        super().closeEvent(event)
+
     def _show_device_connect_dialog(self) -> None:
         """显示设备连接对话框"""
         # 传递保存的连接配置作为默认值
@@ -1734,22 +1946,24 @@ class MainWindow(QMainWindow):
             self._export_report_to_file(report_data, result_text)
 
     def _save_waveform(self) -> None:
-        """保存波形数据到文件"""
-        if not self.x_data:
+        """保存整个测试的波形数据到文件
+
+        默认保存为列式二进制波形文件（.bwf），召回时按需从磁盘读取；
+        选择 .json 时导出为JSON文本（文件较大，用于与其他工具交换数据）。
+        """
+        if not len(self.plot_history):
             QMessageBox.warning(self, "无数据", "当前没有波形数据可以保存")
             return
 
         from PySide6.QtWidgets import QFileDialog
-        import json
-        from datetime import datetime
 
         # 选择保存路径
-        default_name = f"waveform_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+        default_name = f"waveform_{datetime.now().strftime('%Y%m%d_%H%M%S')}{WAVEFORM_SUFFIX}"
         file_path, _ = QFileDialog.getSaveFileName(
             self,
             "保存波形数据",
             default_name,
-            "JSON文件 (*.json);;所有文件 (*.*)"
+            "波形文件 (*.bwf);;JSON文件 (*.json);;所有文件 (*.*)"
         )
 
         if not file_path:
@@ -1757,23 +1971,30 @@ class MainWindow(QMainWindow):
 
         try:
             # 准备保存的数据
-            save_data = {
+            info = {
                 'timestamp': datetime.now().isoformat(),
+                'start_time': (self.test_start_time or datetime.now()).isoformat(timespec='seconds'),
                 'product_model': self.control.edit_model.text(),
                 'product_sn': self.control.edit_sn.text(),
                 'tester': self.control.edit_tester.text(),
-                'x_data': self.x_data,
-                'ternary_voltage': self.ternary_volt_data,
-                'ternary_temp': self.ternary_temp_data,
-                'blade_voltage': self.blade_volt_data,
-                'blade_temp': self.blade_temp_data,
                 'channel_config': self.channel_config,
+                'calibration': self.analysis_engine.get_calibration_params(),
                 'analysis_data': self.analysis_engine.generate_report_data() if self.analysis_engine.ternary_data.timestamps else None,
             }
+            columns = {'x': self.plot_history.x}
+            for row, channel in enumerate(PLOT_CHANNELS[1:]):
+                columns[channel] = self.plot_history.y[row]
 
             # 写入文件
-            with open(file_path, 'w', encoding='utf-8') as f:
-                json.dump(save_data, f, ensure_ascii=False, indent=2)
+            if file_path.lower().endswith('.json'):
+                import json
+                save_data = dict(info, x_data=columns.pop('x').tolist())
+                save_data.update({channel: values.tolist() for channel, values in columns.items()})
+                with open(file_path, 'w', encoding='utf-8') as f:
+                    json.dump(save_data, f, ensure_ascii=False, indent=2)
+            else:
+                save_waveform(file_path, columns, info, pyramid=self.plot_history)
+            self._register_in_catalog(file_path, "waveform", self.channel_config)
 
             self.statusBar().showMessage(f"✓ 波形数据已保存到: {file_path}")
             QMessageBox.information(self, "保存成功", f"波形数据已保存到:\n{file_path}")
@@ -1782,62 +2003,70 @@ class MainWindow(QMainWindow):
             QMessageBox.critical(self, "保存失败", f"保存波形数据时出错:\n{str(e)}")
 
     def _recall_waveform(self) -> None:
-        """从文件召回波形数据"""
-        from PySide6.QtWidgets import QFileDialog
-        import json
+        """从测试目录（或直接选择文件）召回波形数据
 
+        波形文件以内存映射方式打开，由文件中保存的摘要层级显示全程概览，
+        放大时才从磁盘读取细节。会话记录（.bsr）先由各数据块的摘要显示概览，
+        放大时才解压全部数据。
+        """
         # 选择文件
-        file_path, _ = QFileDialog.getOpenFileName(
-            self,
-            "召回波形数据",
-            "",
-            "JSON文件 (*.json);;所有文件 (*.*)"
-        )
+        if self.catalog is not None:
+            dialog = SessionCatalogDialog(self.catalog, self)
+            if dialog.exec() != QDialog.DialogCode.Accepted:
+                return
+            file_path = dialog.selected_path
+        else:
+            from PySide6.QtWidgets import QFileDialog
+
+            file_path, _ = QFileDialog.getOpenFileName(
+                self,
+                "召回波形数据",
+                "",
+                "波形文件 (*.bwf);;JSON文件 (*.json);;会话记录 (*.bsr);;所有文件 (*.*)"
+            )
 
         if not file_path:
             return
 
         try:
-            # 读取文件
-            with open(file_path, 'r', encoding='utf-8') as f:
-                load_data = json.load(f)
+            # 读取文件：曲线历史和KPI缓冲区需要的最后若干点
+            if file_path.lower().endswith('.bsr'):
+                info, history, last = self._open_session_history(file_path)
+            else:
+                if file_path.lower().endswith('.json'):
+                    info, x, y = self._load_waveform_json(file_path)
+                    history = MinMaxPyramid.from_arrays(x, y)
+                else:
+                    info, history = open_waveform_pyramid(file_path, PLOT_CHANNELS)
+                tail = max(0, len(history) - self.plot_buffer.capacity)
+                last = np.vstack((history.x[tail:], history.y[:, tail:]))
 
             # 停止当前采集
             if self.is_running:
                 self._on_stop()
 
-            # 恢复数据
-            self.x_data = load_data.get('x_data', [])
-            self.ternary_volt_data = load_data.get('ternary_voltage', [])
-            self.ternary_temp_data = load_data.get('ternary_temp', [])
-            self.blade_volt_data = load_data.get('blade_voltage', [])
-            self.blade_temp_data = load_data.get('blade_temp', [])
+            self.plot_history = history
+            self.plot_buffer.clear()
+            self.plot_buffer.extend(last)
 
             # 恢复产品信息
-            if 'product_model' in load_data:
-                self.control.edit_model.setText(load_data['product_model'])
-            if 'product_sn' in load_data:
-                self.control.edit_sn.setText(load_data['product_sn'])
-            if 'tester' in load_data:
-                self.control.edit_tester.setText(load_data['tester'])
+            if 'product_model' in info:
+                self.control.edit_model.setText(info['product_model'])
+            if 'product_sn' in info:
+                self.control.edit_sn.setText(info['product_sn'])
+            if 'tester' in info:
+                self.control.edit_tester.setText(info['tester'])
 
             # 恢复通道配置
-            if 'channel_config' in load_data:
-                self.channel_config = load_data['channel_config']
-
-            # 更新波形显示
-            if len(self.volt_curves) >= 2 and len(self.temp_curves) >= 2:
-                self.volt_curves[0].setData(self.x_data, self.ternary_volt_data)
-                self.temp_curves[0].setData(self.x_data, self.ternary_temp_data)
-                self.volt_curves[1].setData(self.x_data, self.blade_volt_data)
-                self.temp_curves[1].setData(self.x_data, self.blade_temp_data)
-
-            # 更新KPI显示
-            if self.ternary_volt_data:
-                self.ternary_voltage_kpi.set_value(f"{self.ternary_volt_data[-1]:.2f}")
-                self.ternary_temp_kpi.set_value(f"{self.ternary_temp_data[-1]:.2f}")
-                self.blade_voltage_kpi.set_value(f"{self.blade_volt_data[-1]:.2f}")
-                self.blade_temp_kpi.set_value(f"{self.blade_temp_data[-1]:.2f}")
+            if 'channel_config' in info:
+                self.channel_config = info['channel_config']
+
+            # 显示全程，更新波形和KPI显示
+            time_range = history.time_range()
+            if time_range is not None:
+                for plot in (self.waveforms.left_plot, self.waveforms.right_plot):
+                    plot.setXRange(*time_range)
+            self.render_scheduler.render_now()
 
             self.statusBar().showMessage(f"✓ 波形数据已召回: {file_path}")
             QMessageBox.information(
@@ -1845,13 +2074,66 @@ class MainWindow(QMainWindow):
                 "召回成功",
                 f"波形数据已成功召回！\n\n"
                 f"文件: {file_path}\n"
-                f"时间: {load_data.get('timestamp', '未知')}\n"
-                f"数据点数: {len(self.x_data)}"
+                f"时间: {info.get('timestamp', '未知')}\n"
+                f"数据点数: {len(self.plot_history)}"
             )
 
         except Exception as e:
             QMessageBox.critical(self, "召回失败", f"召回波形数据时出错:\n{str(e)}")
 
+    def _open_session_history(self, file_path: str) -> tuple[dict, MinMaxPyramid, np.ndarray]:
+        """打开会话记录：由各数据块的摘要显示概览，放大时才解压全部数据
+
+        Returns:
+            (文件信息, 曲线历史, KPI缓冲区使用的最后若干点，(5, 点数))
+        """
+        with SessionReader(file_path) as reader:
+            info = dict(reader.info.get('metadata', {}), timestamp=reader.info.get('created'))
+            rows = [reader.columns.index(channel) for channel in ('timestamp',) + PLOT_CHANNELS[1:]]
+            overview = reader.overview()
+            count = reader.rows
+
+            tail, tail_rows = [], 0
+            for index in reversed(range(len(reader.chunks))):
+                if tail_rows >= self.plot_buffer.capacity:
+                    break
+                try:
+                    chunk = reader.read_chunk(index)[rows]
+                except ValueError:
+                    tail, tail_rows = [], 0  # 读取全部数据时此块之后的块也会被丢弃
+                    continue
+                tail.insert(0, chunk)
+                tail_rows += chunk.shape[1]
+        last = np.concatenate(tail, axis=1) if tail else np.empty((len(rows), 0))
+
+        def load() -> tuple[np.ndarray, np.ndarray]:
+            _, data = read_session(file_path)
+            return data[rows[0]], data[rows[1:]]
+
+        if overview is None:  # 版本3之前的文件没有数据块摘要
+            return info, MinMaxPyramid.from_arrays(*load()), last
+        history = MinMaxPyramid.deferred(len(rows) - 1, count,
+                                         MinMaxPyramid.from_arrays(overview[rows[0]], overview[rows[1:]]), load)
+        return info, history, last
+
+    def _load_waveform_json(self, file_path: str) -> tuple[dict, np.ndarray, np.ndarray]:
+        """读取JSON格式的波形文件
+
+        Returns:
+            (文件信息, 时间戳数组, (4, 点数) 的曲线数据；缺少的通道填0)
+        """
+        import json
+
+        with open(file_path, 'r', encoding='utf-8') as f:
+            load_data = json.load(f)
+
+        x = np.asarray(load_data.get('x_data', []), dtype=np.float64)
+        y = np.zeros((len(PLOT_CHANNELS) - 1, len(x)))
+        for row, channel in enumerate(PLOT_CHANNELS[1:]):
+            values = np.asarray(load_data.get(channel, []), dtype=np.float64)[:len(x)]
+            y[row, :len(values)] = values
+        return load_data, x, y
+
     def _export_report_to_file(self, report_data: dict, result_text: str) -> None:
         """导出报告到文件（支持PDF、Excel、HTML、TXT格式）"""
         from PySide6.QtWidgets import QFileDialog, QMessageBox
@@ -2847,8 +3129,45 @@ class MAHTestDialog(QDialog):
         self.update_timer = QTimer()
         self.update_timer.timeout.connect(self._update_test_display)
 
+        # 显示已有的测试（进行中或恢复后暂停的测试）
+        self._show_engine_state()
+
+    def _show_engine_state(self) -> None:
+        """按分析引擎中的mAh测试状态设置界面"""
+        main_window = self.parent()
+        if not main_window or not hasattr(main_window, 'analysis_engine'):
+            return
+        engine = main_window.analysis_engine
+        if not (engine.mah_test_active or engine.mah_test_suspended):
+            return
+
+        self.edit_test_current.setText(f"{engine.mah_test_current:g}")
+        self.radio_ternary_mah.setChecked(engine.mah_test_channel == "ternary")
+        self.radio_blade_mah.setChecked(engine.mah_test_channel == "blade")
+        self._set_test_running_ui(engine.mah_test_current, engine.mah_test_active)
+        self._update_test_display()
+        if engine.mah_test_active:
+            self.update_timer.start(500)
+
+    def _set_test_running_ui(self, current: float, active: bool) -> None:
+        """测试进行中或暂停时的界面：参数不可修改，可以停止；暂停时可以继续"""
+        self.btn_start_test.setEnabled(not active)
+        self.btn_start_test.setText("开始测试" if active else "继续测试")
+        self.btn_stop_test.setEnabled(True)
+        self.edit_test_current.setEnabled(False)
+        self.radio_ternary_mah.setEnabled(False)
+        self.radio_blade_mah.setEnabled(False)
+
+        if active:
+            self.label_status.setText("测试中...")
+            self.label_status.setStyleSheet("color: #10b981; font-weight: bold;")
+        else:
+            self.label_status.setText("已暂停（程序异常退出后恢复）")
+            self.label_status.setStyleSheet("color: #f59e0b; font-weight: bold;")
+        self.label_current.setText(f"{current:.2f} mA")
+
     def _start_capacity_test(self) -> None:
-        """开始容量测试。"""
+        """开始容量测试（暂停的测试则继续）。"""
         try:
             current = float(self.edit_test_current.text())
 
@@ -2868,20 +3187,15 @@ class MAHTestDialog(QDialog):
             channel = "ternary" if self.radio_ternary_mah.isChecked() else "blade"
             channel_name = "三元电池" if channel == "ternary" else "刀片电池"
 
-            # 启动分析引擎的mAh测试
+            # 启动分析引擎的mAh测试（暂停的测试从现在起继续累计）
             if hasattr(main_window, 'analysis_engine'):
-                main_window.analysis_engine.start_mah_test(current, channel)
+                if main_window.analysis_engine.mah_test_suspended:
+                    main_window.analysis_engine.resume_mah_test()
+                else:
+                    main_window.analysis_engine.start_mah_test(current, channel)
 
             # 更新UI
-            self.btn_start_test.setEnabled(False)
-            self.btn_stop_test.setEnabled(True)
-            self.edit_test_current.setEnabled(False)
-            self.radio_ternary_mah.setEnabled(False)
-            self.radio_blade_mah.setEnabled(False)
-
-            self.label_status.setText("测试中...")
-            self.label_status.setStyleSheet("color: #10b981; font-weight: bold;")
-            self.label_current.setText(f"{current:.2f} mA")
+            self._set_test_running_ui(current, active=True)
 
             # 开始定时更新显示（每500ms）
             self.update_timer.start(500)
@@ -2903,6 +3217,7 @@ class MAHTestDialog(QDialog):
 
         # 更新UI
         self.btn_start_test.setEnabled(True)
+        self.btn_start_test.setText("开始测试")
         self.btn_stop_test.setEnabled(False)
         self.edit_test_current.setEnabled(True)
         self.radio_ternary_mah.setEnabled(True)
@@ -2937,6 +3252,6 @@ class MAHTestDialog(QDialog):
         seconds = elapsed % 60
         self.label_time.setText(f"{hours:02d}:{minutes:02d}:{seconds:02d}")
 
-        # 如果测试不再活跃，自动停止更新
-        if not info['active']:
+        # 如果测试已被停止，自动停止更新（暂停的测试等待操作员继续）
+        if not info['active'] and not info['suspended'] and self.update_timer.isActive():
             self._stop_capacity_test()
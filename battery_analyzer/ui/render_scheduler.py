@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""界面刷新调度 - 数据到达时只做标记，按固定帧率重绘曲线、按更低频率刷新KPI"""
+
+from __future__ import annotations
+
+from typing import Callable, Optional
+
+from PySide6.QtCore import QEvent, QObject, QTimer, Qt
+from PySide6.QtWidgets import QWidget
+
+
+class RenderScheduler(QObject):
+    """按帧率合并界面刷新
+
+    数据处理函数调用 mark_dirty()，定时器每帧检查标记，有新数据时才调用
+    曲线刷新函数；KPI按更低的频率刷新。监视的窗口最小化或隐藏时暂停刷新，
+    恢复显示时立即补绘一次。这样界面开销只与帧率有关，与采样率无关。
+    """
+
+    def __init__(
+        self,
+        render_curves: Callable[[], None],
+        render_kpis: Callable[[], None],
+        fps: float = 25.0,
+        kpi_fps: float = 4.0,
+        parent: Optional[QObject] = None
+    ):
+        """初始化调度器
+
+        Args:
+            render_curves: 重绘曲线的函数
+            render_kpis: 刷新KPI显示的函数
+            fps: 曲线最大刷新帧率
+            kpi_fps: KPI最大刷新频率
+            parent: 父对象
+        """
+        super().__init__(parent)
+        self._render_curves = render_curves
+        self._render_kpis = render_kpis
+        self._curves_dirty = False
+        self._kpis_dirty = False
+        self._paused = False
+        self._window: Optional[QWidget] = None
+
+        self._curve_timer = QTimer(self)
+        self._curve_timer.setTimerType(Qt.TimerType.PreciseTimer)
+        self._curve_timer.timeout.connect(self._on_curve_frame)
+        self._kpi_timer = QTimer(self)
+        self._kpi_timer.timeout.connect(self._on_kpi_frame)
+        self.set_frame_rate(fps, kpi_fps)
+
+    def set_frame_rate(self, fps: float, kpi_fps: Optional[float] = None) -> None:
+        """设置曲线帧率和KPI刷新频率"""
+        self._curve_timer.setInterval(max(1, int(1000 / fps)))
+        if kpi_fps is not None:
+            self._kpi_timer.setInterval(max(1, int(1000 / kpi_fps)))
+
+    def watch(self, window: QWidget) -> None:
+        """监视窗口状态，最小化或隐藏时自动暂停"""
+        if self._window is not None:
+            self._window.removeEventFilter(self)
+        self._window = window
+        window.installEventFilter(self)
+        self._update_paused()
+
+    def mark_dirty(self) -> None:
+        """标记有新数据，下一帧重绘"""
+        self._curves_dirty = True
+        self._kpis_dirty = True
+        if not self._paused:
+            self._start_timers()
+
+    def render_now(self) -> None:
+        """立即重绘曲线和KPI（召回文件等一次性更新使用）"""
+        self._curves_dirty = False
+        self._kpis_dirty = False
+        self._render_curves()
+        self._render_kpis()
+
+    def is_paused(self) -> bool:
+        """是否因窗口不可见而暂停"""
+        return self._paused
+
+    def eventFilter(self, watched: QObject, event: QEvent) -> bool:
+        if watched is self._window and event.type() in (
+                QEvent.Type.WindowStateChange, QEvent.Type.Show, QEvent.Type.Hide):
+            self._update_paused()
+        return False
+
+    def _update_paused(self) -> None:
+        window = self._window
+        paused = window is not None and (window.isMinimized() or not window.isVisible())
+        if paused == self._paused:
+            return
+        self._paused = paused
+        if paused:
+            self._curve_timer.stop()
+            self._kpi_timer.stop()
+        elif self._curves_dirty or self._kpis_dirty:
+            # 恢复显示时补绘暂停期间的数据
+            self.render_now()
+
+    def _start_timers(self) -> None:
+        if not self._curve_timer.isActive():
+            self._curve_timer.start()
+        if not self._kpi_timer.isActive():
+            self._kpi_timer.start()
+
+    def _on_curve_frame(self) -> None:
+        if not self._curves_dirty:
+            # 没有新数据时停止定时器，下次标记时再启动
+            self._curve_timer.stop()
+            return
+        self._curves_dirty = False
+        self._render_curves()
+
+    def _on_kpi_frame(self) -> None:
+        if not self._kpis_dirty:
+            self._kpi_timer.stop()
+            return
+        self._kpis_dirty = False
+        self._render_kpis()
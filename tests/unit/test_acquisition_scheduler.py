@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+DeadlineScheduler / SampleBlock单元测试
+使用模拟时钟测试截止时刻调度、延迟策略、暂停与统计，以及采样点数据块的累积
+"""
+
+import unittest
+
+import numpy as np
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from battery_analyzer.core.acquisition_thread import DataAcquisitionThread, DeadlineScheduler, SampleBlock
+
+
+class FakeClock:
+    """可手动推进的模拟时钟，sleep直接推进时间"""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+class TestDeadlineScheduler(unittest.TestCase):
+    """截止时刻调度测试"""
+
+    def setUp(self):
+        self.clock = FakeClock()
+
+    def _make(self, policy="skip"):
+        return DeadlineScheduler(0.1, policy, clock=self.clock, sleep=self.clock.sleep)
+
+    def _acquire(self, scheduler, duration):
+        """等待采样时刻并模拟耗时duration秒的读取，返回时间戳"""
+        self.assertTrue(scheduler.wait_next())
+        started = self.clock()
+        self.clock.now += duration
+        return scheduler.complete(started, self.clock())
+
+    def test_no_drift(self):
+        """测试读取耗时不会使采样时刻漂移"""
+        scheduler = self._make()
+        timestamps = [self._acquire(scheduler, 0.03) for _ in range(5)]
+        for i, timestamp in enumerate(timestamps):
+            self.assertAlmostEqual(timestamp, i * 0.1 + 0.015)
+
+        stats = scheduler.statistics()
+        self.assertEqual(stats['samples'], 5)
+        self.assertEqual(stats['skipped'], 0)
+        self.assertAlmostEqual(stats['jitter_ms'], 0.0)
+
+    def test_skip_late_slots(self):
+        """测试读取超时后跳过错过的时刻"""
+        scheduler = self._make("skip")
+        self._acquire(scheduler, 0.35)
+        timestamp = self._acquire(scheduler, 0.0)
+        self.assertAlmostEqual(timestamp, 0.4)
+        self.assertEqual(scheduler.statistics()['skipped'], 3)
+
+    def test_catch_up_late_slots(self):
+        """测试读取超时后立即补采错过的时刻"""
+        scheduler = self._make("catch_up")
+        self._acquire(scheduler, 0.35)
+        timestamps = [self._acquire(scheduler, 0.0) for _ in range(4)]
+        self.assertAlmostEqual(timestamps[0], 0.35)
+        self.assertAlmostEqual(timestamps[-1], 0.4)
+        self.assertEqual(scheduler.statistics()['skipped'], 0)
+
+    def test_pause_excluded_from_timestamps(self):
+        """测试暂停时间不计入时间戳，恢复后按原间隔继续"""
+        scheduler = self._make()
+        self._acquire(scheduler, 0.0)
+        scheduler.pause()
+        self.clock.now += 5.0
+        scheduler.resume()
+        self.assertAlmostEqual(self._acquire(scheduler, 0.0), 0.1)
+
+    def test_pause_excluded_from_statistics(self):
+        """测试暂停时间和恢复后线程察觉的延迟不计入跳过次数、延迟、抖动和采样率"""
+        scheduler = self._make("skip")
+        for _ in range(5):
+            self._acquire(scheduler, 0.0)
+        scheduler.pause()
+        self.clock.now += 5.0
+        self.assertAlmostEqual(scheduler.statistics()['rate_hz'], 10.0, delta=0.5)
+        scheduler.resume()
+        self.clock.now += 0.25    # 采集线程在暂停等待中，稍后才开始采样
+        for _ in range(5):
+            self._acquire(scheduler, 0.0)
+
+        stats = scheduler.statistics()
+        self.assertEqual(stats['samples'], 10)
+        self.assertEqual(stats['skipped'], 0)
+        self.assertAlmostEqual(stats['max_lateness_ms'], 0.0)
+        self.assertAlmostEqual(stats['jitter_ms'], 0.0)
+        self.assertAlmostEqual(stats['rate_hz'], 10.0, delta=1.0)
+
+    def test_measured_rate(self):
+        """测试统计实际采样率"""
+        scheduler = self._make("skip")
+        for _ in range(11):
+            self._acquire(scheduler, 0.15)
+        stats = scheduler.statistics()
+        self.assertAlmostEqual(stats['rate_hz'], 5.0, delta=0.3)
+        self.assertGreater(stats['skipped'], 0)
+
+    def test_invalid_policy(self):
+        """测试未知策略"""
+        with self.assertRaises(ValueError):
+            DeadlineScheduler(0.1, "burst")
+
+
+class TestSampleBlock(unittest.TestCase):
+    """采样点数据块测试"""
+
+    def test_append_and_extend(self):
+        """测试逐点与成批添加后按通道顺序取出"""
+        block = SampleBlock(["CH2_1", "CH2_3"])
+        block.append(0.0, {"CH2_3": 25.0, "CH2_1": 3.7})
+        block.append(0.1, {"CH2_1": 3.6})
+        block.extend(np.array([0.2, 0.3]), {"CH2_1": np.array([3.5, 3.4]),
+                                            "CH2_3": np.array([26.0, 27.0])})
+        self.assertEqual(len(block), 4)
+
+        timestamps, values = block.take()
+        np.testing.assert_allclose(timestamps, [0.0, 0.1, 0.2, 0.3])
+        np.testing.assert_allclose(values, [[3.7, 3.6, 3.5, 3.4],
+                                            [25.0, np.nan, 26.0, 27.0]])
+        self.assertEqual(len(block), 0)
+        self.assertEqual(block.take()[1].shape, (2, 0))
+
+
+class TestAcquisitionQueuePolicy(unittest.TestCase):
+    """采集线程队列溢出策略测试"""
+
+    def test_block_mode_coalesces_without_loss(self):
+        """测试数据块模式默认合并积压的数据块，逐点模式默认丢弃最早的数据"""
+        self.assertEqual(DataAcquisitionThread(None, ["CH1_1"]).queue.policy, "drop_oldest")
+        thread = DataAcquisitionThread(None, ["CH1_1", "CH1_2"], emit_blocks=True, queue_capacity=2)
+        self.assertEqual(thread.queue.policy, "coalesce")
+
+        for start in range(0, 50, 5):
+            timestamps = np.arange(start, start + 5, dtype=float)
+            thread.queue.put((timestamps, np.vstack((timestamps, -timestamps))))
+        blocks = thread.queue.drain()
+        self.assertLessEqual(len(blocks), 2)
+        timestamps = np.concatenate([block[0] for block in blocks])
+        values = np.concatenate([block[1] for block in blocks], axis=1)
+        np.testing.assert_array_equal(timestamps, np.arange(50.0))
+        np.testing.assert_array_equal(values[1], -np.arange(50.0))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+BatteryAnalysisEngine单元测试
+测试批量添加数据与逐点添加结果一致，以及数据列的增量统计
+"""
+
+import unittest
+
+import numpy as np
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from battery_analyzer.core.analysis_engine import BatteryAnalysisEngine, BatteryTestData, DataColumn
+
+
+class TestDataBlock(unittest.TestCase):
+    """批量添加数据测试"""
+
+    def setUp(self):
+        self.timestamps = np.array([0.0, 0.01, 0.02, 0.05, 0.06])
+        self.voltage = np.linspace(4.2, 4.1, 5)
+        self.temp = np.linspace(25.0, 26.0, 5)
+
+    def _engines(self):
+        by_point = BatteryAnalysisEngine()
+        by_block = BatteryAnalysisEngine()
+        for engine in (by_point, by_block):
+            engine.add_data_point(4.3, 24.0, 3.3, 24.0, -0.01)
+            engine.start_mah_test(1000.0)
+        return by_point, by_block
+
+    def test_block_matches_points(self):
+        """测试数据与mAh累计容量与逐点添加相同"""
+        by_point, by_block = self._engines()
+        for i, timestamp in enumerate(self.timestamps):
+            by_point.add_data_point(self.voltage[i], self.temp[i],
+                                    self.voltage[i], self.temp[i], timestamp)
+        by_block.add_data_block(self.voltage[:2], self.temp[:2],
+                                self.voltage[:2], self.temp[:2], self.timestamps[:2])
+        by_block.add_data_block(self.voltage[2:], self.temp[2:],
+                                self.voltage[2:], self.temp[2:], self.timestamps[2:])
+
+        self.assertEqual(by_block.ternary_data.timestamps.tolist(), by_point.ternary_data.timestamps.tolist())
+        self.assertEqual(by_block.blade_data.voltage_data.tolist(), by_point.blade_data.voltage_data.tolist())
+        self.assertAlmostEqual(by_block.mah_accumulated, by_point.mah_accumulated)
+        self.assertAlmostEqual(by_block.mah_accumulated, 1000.0 * 0.07 / 3600.0)
+
+    def test_calibration_on_arrays(self):
+        """测试mX+b校准可直接用于数组"""
+        engine = BatteryAnalysisEngine()
+        engine.set_mx_plus_b("ternary", "voltage", 2.0, 0.5)
+        np.testing.assert_allclose(
+            engine.apply_calibration("ternary", "voltage", np.array([1.0, 2.0])), [2.5, 4.5])
+
+
+class TestDataColumn(unittest.TestCase):
+    """数据列增量统计测试"""
+
+    def test_running_statistics_match_numpy(self):
+        """测试逐点与成批追加的统计量与numpy计算结果一致"""
+        values = np.random.default_rng(1).normal(3.7, 0.2, 5000)
+        column = DataColumn()
+        for value in values[:1234]:
+            column.append(value)
+        column.extend(values[1234:4000])
+        column.extend(values[4000:].tolist())
+
+        self.assertEqual(len(column), 5000)
+        np.testing.assert_array_equal(column.values, values)
+        self.assertEqual(column.first, values[0])
+        self.assertEqual(column.last, values[-1])
+        self.assertEqual(column[-2], values[-2])
+        self.assertEqual(column.min, values.min())
+        self.assertEqual(column.max, values.max())
+        self.assertAlmostEqual(column.sum, values.sum(), places=6)
+        self.assertAlmostEqual(column.mean, values.mean(), places=12)
+        self.assertAlmostEqual(column.variance, values.var(), places=12)
+
+    def test_summaries(self):
+        """测试温升和压降统计"""
+        data = BatteryTestData([4.0, 4.2, 3.8], [25.0, 40.0, 30.0], [0.0, 1.0, 2.0])
+        rise = data.get_temp_rise()
+        self.assertEqual(rise['峰值温度'], 40.0)
+        self.assertEqual(rise['温升'], 15.0)
+        self.assertAlmostEqual(rise['平均温度'], 95.0 / 3)
+        drop = data.get_voltage_drop()
+        self.assertAlmostEqual(drop['电压降'], 0.2)
+        self.assertEqual(drop['最高电压'], 4.2)
+        self.assertEqual(BatteryTestData().get_temp_rise(), {})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+AsyncLR8450Client单元测试
+使用本地asyncio服务器模拟设备，测试查询超时、批量读取和同步外观
+"""
+
+import asyncio
+import tempfile
+import threading
+import time
+import unittest
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from app.core.device_capabilities import CapabilityCache
+from battery_analyzer.core.async_lr8450_client import AsyncLR8450Client, SyncLR8450Client
+from battery_analyzer.core.channel_reconciler import ChannelReconciler
+
+
+class FakeDevice:
+    """按命令应答的模拟设备，未知查询不应答"""
+
+    def __init__(self, replies):
+        self.replies = replies
+        self.commands = []
+        self.server = None
+
+    async def start(self):
+        self.server = await asyncio.start_server(self._handle, "127.0.0.1", 0)
+        return self.server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        self.server.close()
+        await self.server.wait_closed()
+
+    async def _handle(self, reader, writer):
+        while True:
+            line = await reader.readline()
+            if not line:
+                break
+            command = line.decode("ascii").strip()
+            self.commands.append(command)
+            reply = self.replies.get(command)
+            if reply is not None:
+                writer.write(reply)
+                await writer.drain()
+        writer.close()
+
+
+REPLIES = {
+    "*IDN?": b"HIOKI,LR8450,123456789,V1.00\r\n",
+    "*OPC?": b"1\r\n",
+    ":MEMory:GETReal;:MEMory:VREAL? CH2_1;:MEMory:VREAL? CH2_3":
+        b"+3.70000E+00;+9.99999E+99\r\n",
+    # UNIT3/UNIT4为空插槽（应答空行，避免等待超时）
+    ":UNIT:IDN? UNIT1": b"UNIT1,U8550,100000001,V 100\r\n",
+    ":UNIT:IDN? UNIT2": b"UNIT2,U8552,100000002,V 100\r\n",
+    ":UNIT:IDN? UNIT3": b"\r\n",
+    ":UNIT:IDN? UNIT4": b"\r\n",
+    ":UNIT:IDN? UNIT1;:MEMory:TARCH? UNIT1;:UNIT:IDN? UNIT2;:MEMory:TARCH? UNIT2":
+        b"UNIT1,U8550,100000001,V 100;CH1_1;UNIT2,U8552,100000002,V 100;CH2_1\r\n",
+    ":MEMory:MAXPoint?": b"3\r\n",
+    ":MEMory:POINt CH2_1,0;:MEMory:BDATa? 3": b"#0\x00\x01\x00\x02\x00\x03\r\n",
+    # 只应答第一个数据块
+    ":MEMory:POINt CH2_1,0;:MEMory:BDATa? 1;:MEMory:POINt CH2_3,0;:MEMory:BDATa? 1": b"#0\x1c\xe8",
+}
+
+
+class TestAsyncLR8450Client(unittest.TestCase):
+    """异步客户端测试"""
+
+    def _run(self, test):
+        async def main():
+            device = FakeDevice(REPLIES)
+            port = await device.start()
+            client = AsyncLR8450Client("127.0.0.1", port)
+            try:
+                self.assertTrue(await client.connect())
+                await test(client, device)
+            finally:
+                await client.disconnect()
+                await device.stop()
+
+        asyncio.run(main())
+
+    def test_connect_sends_init(self):
+        """测试连接时的初始化命令"""
+        async def test(client, device):
+            await client.query("*IDN?")
+            self.assertEqual(device.commands[:4], ["*IDN?", ":HEAD OFF", "*CLS", "*OPC?"])
+            self.assertEqual(client.sync_mode, "opc")
+
+        self._run(test)
+
+    def test_batch_read(self):
+        """测试一次往返读取多个通道"""
+        async def test(client, device):
+            data = await client.get_channel_data(["CH2_1", "CH2_3"])
+            self.assertEqual(data, {"CH2_1": 3.7})
+            self.assertEqual(client.realtime_mode, "batch")
+
+        self._run(test)
+
+    def test_query_timeout(self):
+        """测试无应答的查询按超时返回None"""
+        async def test(client, device):
+            started = time.monotonic()
+            self.assertIsNone(await client.query(":UNIT:IDN? UNIT4", timeout=0.2))
+            self.assertLess(time.monotonic() - started, 1.0)
+
+        self._run(test)
+
+    def test_memory_read_timeout_reconnects(self):
+        """测试存储数据块读取超时后重新连接，丢弃未读完的应答"""
+        async def test(client, device):
+            client.channel_scales = {"CH2_1": 0.0005, "CH2_3": 0.0005}
+            with self.assertRaises(asyncio.TimeoutError):
+                await client.read_memory_points(["CH2_1", "CH2_3"], 0, 1, timeout=0.2)
+            self.assertEqual(device.commands.count("*IDN?"), 2)
+            self.assertTrue(client.connected)
+            self.assertEqual(await client.query("*OPC?"), "1")
+
+        self._run(test)
+
+
+class TestSyncLR8450Client(unittest.TestCase):
+    """同步外观测试"""
+
+    def setUp(self):
+        self.device = FakeDevice(REPLIES)
+        self.loop = asyncio.new_event_loop()
+        self.port = self.loop.run_until_complete(self.device.start())
+        self.thread = threading.Thread(target=self.loop.run_forever, daemon=True)
+        self.thread.start()
+
+    def tearDown(self):
+        asyncio.run_coroutine_threadsafe(self.device.stop(), self.loop).result(2)
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join(2)
+
+    def test_blocking_calls(self):
+        """测试在普通线程中同步调用"""
+        client = SyncLR8450Client("127.0.0.1", self.port)
+        self.assertTrue(client.connect())
+        self.assertTrue(client.connected)
+        self.assertEqual(client.get_channel_data(["CH2_1", "CH2_3"]), {"CH2_1": 3.7})
+        client.disconnect()
+        self.assertFalse(client.connected)
+
+    def test_identity_and_modules(self):
+        """测试与LR8450Client相同的设备标识和模块信息，通道同步器按序列号缓存且只管理已安装模块"""
+        client = SyncLR8450Client("127.0.0.1", self.port)
+        self.assertTrue(client.connect())
+        try:
+            with tempfile.TemporaryDirectory() as directory:
+                client.capability_cache = CapabilityCache(directory)
+                self.assertEqual(client.detect_installed_modules(), [1, 2])
+                self.assertEqual(client.capability_cache.lookup("123456789", "V1.00").installed_units, [1, 2])
+
+            self.assertEqual(client.idn, "HIOKI,LR8450,123456789,V1.00")
+            self.assertEqual(client.serial_number, "123456789")
+            self.assertEqual(client.installed_modules, [1, 2])
+            reconciler = ChannelReconciler(client)
+            self.assertEqual(reconciler.cache_key, "123456789")
+            self.assertEqual(reconciler.modules, [1, 2])
+        finally:
+            client.disconnect()
+
+    def test_download_memory(self):
+        """测试同步下载设备存储数据"""
+        client = SyncLR8450Client("127.0.0.1", self.port)
+        self.assertTrue(client.connect())
+        try:
+            client.channel_scales["CH2_1"] = 0.0005
+            progress = []
+            download = client.download_memory(
+                ["CH2_1"], progress_callback=lambda done, total: progress.append((done, total)))
+        finally:
+            client.disconnect()
+
+        self.assertTrue(download.finished)
+        self.assertEqual(list(download.raw["CH2_1"]), [1, 2, 3])
+        self.assertEqual(progress, [(3, 3)])
+        self.assertAlmostEqual(download.to_physical()["CH2_1"][2], 0.0015)
+
+
+if __name__ == '__main__':
+    unittest.main()
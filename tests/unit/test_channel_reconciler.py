@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ChannelReconciler单元测试
+测试通道状态读取、差异命令计算与缓存
+"""
+
+import unittest
+from unittest.mock import Mock
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from app.core.device_capabilities import DeviceCapabilities
+from battery_analyzer.core.channel_reconciler import ChannelReconciler, _STATE_CACHE
+from battery_analyzer.core.lr8450_client import LR8450Client
+
+
+class FakeClient:
+    """记录命令的模拟客户端，只安装了模块2，CH2_1为10V电压通道，其余通道关闭"""
+
+    range_scale = staticmethod(LR8450Client.range_scale)
+
+    def __init__(self):
+        self.ip_address = "192.168.1.100"
+        self.com_port = ""
+        self.port = 8802
+        self.serial_number = "123456789"
+        self.installed_modules = [2]
+        self.channel_scales = {}
+        self.queries = []
+        self.writes = []
+
+    def query(self, command, timeout=3.0):
+        self.queries.append(command)
+        if not command.startswith(":UNIT:STORe? CH2_"):
+            return None  # 空插槽不应答
+        items = []
+        for part in command.split(";"):
+            name, channel = part.split()
+            if name == ":UNIT:STORe?":
+                items.append(f"{channel},{'ON' if channel == 'CH2_1' else 'OFF'}")
+            elif name == ":UNIT:INMOde?":
+                items.append(f"{channel},VOLTAGE")
+            else:
+                items.append(f"{channel},+1.00000E+01")
+        return ";".join(items)
+
+    def write(self, command):
+        self.writes.append(command)
+        return True
+
+    def wait_complete(self, legacy_delay=0.0, timeout=5.0):
+        return True
+
+    def check_errors(self):
+        return None
+
+
+class TestChannelReconciler(unittest.TestCase):
+    """通道配置差异同步测试"""
+
+    def setUp(self):
+        _STATE_CACHE.clear()
+        self.client = FakeClient()
+        self.reconciler = ChannelReconciler(self.client)
+
+    def test_unchanged_config_sends_nothing(self):
+        """测试配置不变时只启动采集"""
+        configs = [{'channel': 'CH2_1', 'type': 'VOLTAGE', 'range': 10.0}]
+        self.assertTrue(self.reconciler.apply(configs))
+        self.assertEqual(self.client.writes, [":STARt"])
+        self.assertEqual(len(self.client.queries), 1)
+        self.assertAlmostEqual(self.client.channel_scales["CH2_1"], 0.0005)
+
+    def test_only_changed_settings(self):
+        """测试只发送有差异的命令"""
+        configs = [
+            {'channel': 'CH2_1', 'type': 'VOLTAGE', 'range': 1.0},
+            {'channel': 'CH2_3', 'type': 'TEMPERATURE', 'range': 100,
+             'thermocouple': 'K', 'int_ext': 'INT'},
+        ]
+        commands = self.reconciler.plan(configs)
+        self.assertEqual(commands, [
+            ":UNIT:RANGe CH2_1,1.0",
+            ":UNIT:STORe CH2_3,ON",
+            ":UNIT:INMOde CH2_3,TC",
+            ":SCALing:UNIT CH2_3,TC_K",
+            ":UNIT:RANGe CH2_3,100",
+            ":SCALing:REFerence CH2_3,INT",
+        ])
+
+    def test_disable_other_channels(self):
+        """测试只关闭当前开启的其他通道"""
+        commands = self.reconciler.plan(
+            [{'channel': 'CH2_2', 'type': 'VOLTAGE', 'range': 10.0}])
+        self.assertEqual(commands, [":UNIT:STORe CH2_2,ON", ":UNIT:STORe CH2_1,OFF"])
+
+    def test_cache_by_serial(self):
+        """测试按序列号缓存状态，重复应用时不再读取设备"""
+        configs = [{'channel': 'CH2_3', 'type': 'VOLTAGE', 'range': 10.0}]
+        self.reconciler.apply(configs)
+        self.client.writes.clear()
+
+        ChannelReconciler(self.client).apply(configs)
+
+        self.assertEqual(len(self.client.queries), 1)
+        self.assertEqual(self.client.writes, [":STARt"])
+
+    def test_unreadable_module_sends_full_config(self):
+        """测试无法读取状态时发送完整命令"""
+        self.client.query = lambda command, timeout=3.0: None
+        commands = self.reconciler.plan(
+            [{'channel': 'CH2_1', 'type': 'VOLTAGE', 'range': 10.0}])
+        self.assertEqual(commands[:3], [
+            ":UNIT:STORe CH2_1,ON",
+            ":UNIT:INMOde CH2_1,VOLTAGE",
+            ":UNIT:RANGe CH2_1,10.0",
+        ])
+        self.assertEqual(len(commands), 3 + 29)
+
+    def test_undetected_modules_skip_empty_slots(self):
+        """测试未检测模块时只管理有应答的模块，配置失败后重新读取也不向空插槽发送命令"""
+        self.client.installed_modules = []
+        self.client.check_errors = lambda: "ESR=32, ERR=-100"
+        configs = [{'channel': 'CH2_1', 'type': 'VOLTAGE', 'range': 1.0}]
+
+        for _ in range(2):
+            reconciler = ChannelReconciler(self.client)
+            self.assertFalse(reconciler.apply(configs))
+            self.assertEqual(reconciler.modules, [2])
+
+        self.assertEqual(len(self.client.queries), 8)
+        self.assertFalse([command for command in self.client.writes
+                          if not command.startswith((":UNIT:RANGe CH2_", ":UNIT:STORe CH2_",
+                                                     ":STOP", ":STARt"))])
+
+    def test_modules_from_capability_cache(self):
+        """测试未检测模块时使用能力缓存中的模块"""
+        self.client.installed_modules = []
+        self.client.idn = "HIOKI,LR8450,123456789,V1.00"
+        self.client.capability_cache = Mock()
+        self.client.capability_cache.lookup.return_value = DeviceCapabilities(
+            "123456789", "V1.00", units={2: "UNIT2,U8552,1,V 100"})
+
+        reconciler = ChannelReconciler(self.client)
+        self.assertEqual(reconciler.modules, [2])
+        reconciler.device_state()
+        self.client.capability_cache.lookup.assert_called_once_with("123456789", "V1.00")
+        self.assertEqual(len(self.client.queries), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+DataAcquisition单元测试
+测试采集在工作线程中运行、按往返时间调整周期以及停止
+"""
+
+import threading
+import time
+import unittest
+from unittest.mock import patch
+
+from PySide6.QtCore import QCoreApplication
+from PySide6.QtWidgets import QApplication
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from app.core.data_acquisition import DataAcquisition, RealTimeData
+
+
+class FakeDeviceManager:
+    """CH1_1和CH2_1有数据的模拟设备管理器，记录调用线程"""
+
+    def __init__(self):
+        self.io_threads = set()
+
+    def get_connected_devices(self):
+        return {"192.168.1.100:8802": None}
+
+    def send_command(self, device_id, command, expect_response=True):
+        self.io_threads.add(threading.current_thread())
+        return "" if expect_response else True
+
+    def query_device(self, device_id, command):
+        self.io_threads.add(threading.current_thread())
+        if command.endswith(("CH1_1", "CH2_1")):
+            return "+1.00000E+00"
+        return "+9.99999E+99"
+
+
+def wait_for(event, timeout):
+    """处理Qt事件直到event被设置（信号以排队方式送到主线程）"""
+    app = QCoreApplication.instance()
+    deadline = time.monotonic() + timeout
+    while not event.is_set() and time.monotonic() < deadline:
+        app.processEvents()
+        event.wait(0.01)
+    return event.is_set()
+
+
+class TestDataAcquisitionWorker(unittest.TestCase):
+    """工作线程采集测试"""
+
+    @classmethod
+    def setUpClass(cls):
+        # 同一进程中的界面测试需要QApplication，因此不创建QCoreApplication
+        os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+        cls.app = QCoreApplication.instance() or QApplication([])
+
+    def setUp(self):
+        self.manager = FakeDeviceManager()
+        self.acquisition = DataAcquisition(self.manager)
+        self.acquisition.acquisition_interval = 0.0
+        self.received = []
+        self.done = threading.Event()
+
+        def on_data(device_id, data):
+            self.received.append(data)
+            if len(self.received) >= 3:
+                self.done.set()
+
+        self.acquisition.data_received.connect(on_data)
+
+    def test_io_runs_off_the_calling_thread(self):
+        """测试设备通信在工作线程中进行，数据通过信号送出"""
+        with patch('app.core.data_acquisition.time.sleep'), \
+                patch.object(self.acquisition, '_load_cached_channels', return_value=None), \
+                patch.object(self.acquisition, '_store_capabilities'):
+            self.assertTrue(self.acquisition.start_acquisition())
+            self.assertTrue(wait_for(self.done, 5.0))
+            self.acquisition.stop_acquisition()
+
+        self.assertNotIn(threading.main_thread(), self.manager.io_threads)
+        self.assertIsInstance(self.received[0], RealTimeData)
+        self.assertEqual(sorted(self.received[-1].channel_data), ["CH1_1", "CH2_1"])
+        self.assertGreater(self.acquisition.round_trip_time, 0.0)
+
+    def test_stop_ends_worker(self):
+        """测试停止后工作线程退出且不再送出数据"""
+        with patch('app.core.data_acquisition.time.sleep'), \
+                patch.object(self.acquisition, '_load_cached_channels', return_value=None), \
+                patch.object(self.acquisition, '_store_capabilities'):
+            self.acquisition.start_acquisition()
+            wait_for(self.done, 5.0)
+            self.acquisition.stop_acquisition()
+            self.acquisition._worker.join(2.0)
+
+        # 停止时丢弃已排队的数据，之后不再有新数据
+        self.app.processEvents()
+        count = len(self.received)
+        wait_for(threading.Event(), 0.1)
+        self.assertFalse(self.acquisition._worker.is_alive())
+        self.assertFalse(self.acquisition.is_acquiring)
+        self.assertEqual(len(self.received), count)
+
+    def test_stalled_gui_is_bounded(self):
+        """测试主线程未处理事件时积压的数据不超过队列容量"""
+        self.acquisition.set_acquisition_parameters(queue_capacity=2, overflow_policy="coalesce")
+        with patch('app.core.data_acquisition.time.sleep'), \
+                patch.object(self.acquisition, '_load_cached_channels', return_value=None), \
+                patch.object(self.acquisition, '_store_capabilities'):
+            self.acquisition.start_acquisition()
+            deadline = time.monotonic() + 5.0
+            while self.acquisition.queue.stats().coalesced < 5 and time.monotonic() < deadline:
+                time.sleep(0.01)
+            self.acquisition.stop_acquisition()
+            self.acquisition._worker.join(2.0)
+
+        self.app.processEvents()
+        self.assertGreaterEqual(self.acquisition.queue.stats().coalesced, 5)
+        self.assertLessEqual(len(self.received), 2)
+
+    def test_queue_reconfigured_only_when_idle(self):
+        """测试采集中修改队列参数推迟到下次启动，停止后不再送出排队的数据"""
+        with patch('app.core.data_acquisition.time.sleep'), \
+                patch.object(self.acquisition, '_load_cached_channels', return_value=None), \
+                patch.object(self.acquisition, '_store_capabilities'):
+            self.acquisition.start_acquisition()
+            wait_for(self.done, 5.0)
+            queue = self.acquisition.queue
+            self.acquisition.set_acquisition_parameters(queue_capacity=4, overflow_policy="drop_oldest")
+            self.assertIs(self.acquisition.queue, queue)
+
+            self.acquisition.stop_acquisition()
+            self.acquisition._worker.join(2.0)
+            self.assertEqual(len(queue), 0)
+            self.assertFalse(queue.put(("192.168.1.100:8802", None)))
+
+            # 停止前已发出的通知在主线程中处理时不再送出数据
+            count = len(self.received)
+            queue.reopen()
+            queue.put(("192.168.1.100:8802", None))
+            self.acquisition._deliver()
+            self.assertEqual(len(self.received), count)
+            self.assertEqual(len(queue), 0)
+
+        with patch.object(self.acquisition, '_initialize_acquisition', return_value=False):
+            self.acquisition.start_acquisition()
+            self.acquisition._worker.join(2.0)
+        self.assertEqual((self.acquisition.queue.capacity, self.acquisition.queue.policy),
+                         (4, "drop_oldest"))
+
+    def test_started_signal_precedes_data(self):
+        """测试设备初始化完成后先送出acquisition_started，再送出数据"""
+        events = []
+        self.acquisition.acquisition_started.connect(lambda device_id: events.append("started"))
+        self.acquisition.data_received.connect(lambda device_id, data: events.append("data"))
+        with patch('app.core.data_acquisition.time.sleep'), \
+                patch.object(self.acquisition, '_load_cached_channels', return_value=None), \
+                patch.object(self.acquisition, '_store_capabilities'):
+            self.acquisition.start_acquisition()
+            wait_for(self.done, 5.0)
+            self.acquisition.stop_acquisition()
+
+        self.assertEqual(events[0], "started")
+        self.assertIn("data", events)
+
+    def test_failed_initialization_is_reported(self):
+        """测试设备初始化失败时送出acquisition_failed，不送出acquisition_started"""
+        started, failed = [], threading.Event()
+        self.acquisition.acquisition_started.connect(started.append)
+        self.acquisition.acquisition_failed.connect(lambda device_id, error: failed.set())
+        with patch.object(self.acquisition, '_initialize_acquisition', return_value=False):
+            self.assertTrue(self.acquisition.start_acquisition())
+            self.assertTrue(wait_for(failed, 5.0))
+
+        self.assertEqual(started, [])
+        self.assertFalse(self.acquisition.is_acquiring)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+CapabilityCache单元测试
+测试设备能力缓存的保存、固件校验与单次查询确认
+"""
+
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from app.core.device_capabilities import CapabilityCache, DeviceCapabilities, parse_idn
+from battery_analyzer.core.lr8450_client import LR8450Client
+
+
+IDN = "HIOKI,LR8450,123456789,V1.00"
+
+
+def device_query(command, timeout=3.0):
+    """模拟设备：UNIT1(U8550, CH1_1/CH1_2记录) 与 UNIT2(U8552, 无记录通道)"""
+    replies = {
+        ":UNIT:IDN? UNIT1": "UNIT1,U8550,100000001,V1.00",
+        ":MEMory:TARCH? UNIT1": "CH1_1,CH1_2",
+        ":UNIT:IDN? UNIT2": "UNIT2,U8552,100000002,V1.00",
+    }
+    return ";".join(replies[part] for part in command.split(";") if part in replies) or None
+
+
+class TestCapabilityCache(unittest.TestCase):
+    """设备能力缓存测试"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cache = CapabilityCache(self.tmp.name)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_parse_idn(self):
+        """测试解析 *IDN? 响应"""
+        self.assertEqual(parse_idn(IDN), ("LR8450", "123456789", "V1.00"))
+        self.assertIsNone(parse_idn("HIOKI,LR8450"))
+
+    def test_read_in_one_query(self):
+        """测试一次查询读取模块与记录通道"""
+        queries = []
+
+        def query(command):
+            queries.append(command)
+            return device_query(command)
+
+        capabilities = CapabilityCache.read(query, "123456789", "V1.00", "LR8450", [1, 2])
+
+        self.assertEqual(len(queries), 1)
+        self.assertEqual(capabilities.installed_units, [1, 2])
+        self.assertEqual(capabilities.channel_counts, {1: 15, 2: 30})
+        self.assertEqual(capabilities.all_stored_channels(), ["CH1_1", "CH1_2"])
+
+    def test_persist_and_firmware_check(self):
+        """测试保存到磁盘并在固件版本变化时失效"""
+        capabilities = CapabilityCache.read(device_query, "123456789", "V1.00", "LR8450", [1])
+        self.cache.store(capabilities)
+
+        reloaded = CapabilityCache(self.tmp.name)
+        self.assertEqual(reloaded.lookup("123456789", "V1.00").units, capabilities.units)
+        self.assertIsNone(reloaded.lookup("123456789", "V1.01"))
+
+    def test_revalidate_removes_changed_device(self):
+        """测试模块变化时删除缓存"""
+        capabilities = DeviceCapabilities(
+            serial="123456789", firmware="V1.00", units={1: "UNIT1,U8551,100000009,V1.00"})
+        self.cache.store(capabilities)
+
+        self.assertFalse(self.cache.revalidate(capabilities, device_query))
+        self.assertIsNone(self.cache.lookup("123456789", "V1.00"))
+
+
+class TestDetectWithCache(unittest.TestCase):
+    """LR8450Client模块检测使用缓存测试"""
+
+    def test_known_device_skips_detection(self):
+        """测试已知设备只发送一条确认查询"""
+        with tempfile.TemporaryDirectory() as tmp:
+            client = LR8450Client(ip_address="192.168.1.100")
+            client.idn = IDN
+            client.capability_cache = CapabilityCache(tmp)
+
+            with patch.object(client, 'query', side_effect=device_query), \
+                    patch('battery_analyzer.core.lr8450_client.time.sleep'):
+                self.assertEqual(client.detect_installed_modules(), [1, 2])
+
+            with patch.object(client, 'query', side_effect=device_query) as query:
+                self.assertEqual(client.detect_installed_modules(), [1, 2])
+
+            self.assertEqual(query.call_count, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
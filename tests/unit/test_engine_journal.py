@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+EngineJournal单元测试
+测试崩溃后精确恢复引擎状态、检查点限制重放记录数以及日志压缩
+"""
+
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+import sys
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from battery_analyzer.core.analysis_engine import BatteryAnalysisEngine
+from battery_analyzer.core.engine_journal import CHECKPOINT, EngineJournal
+
+
+class TestEngineJournal(unittest.TestCase):
+    """引擎日志测试"""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "state", "engine.journal")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def run_test(self, engine, start=0, count=300):
+        """模拟一次采集：逐点和整块添加数据，中途开始mAh测试并修改校准参数"""
+        for i in range(start, start + count):
+            t = i * 0.1
+            engine.add_data_point(4.2 - 1e-3 * i, 25 + 0.05 * i, 4.1 - 1e-3 * i, 26 + 0.03 * i, t)
+            if i == start + 50:
+                engine.start_mah_test(500.0, "blade")
+                engine.set_mx_plus_b("ternary", "temp", 1.01, -0.2)
+            if i % 100 == 99:
+                t = np.arange(i + 1, i + 21) * 0.1
+                engine.add_data_block(np.full(20, 4.0), np.full(20, 30.0), np.full(20, 3.9), np.full(20, 31.0), t)
+
+    def assertEngineEqual(self, restored, engine):
+        self.assertEqual(restored.get_state(), engine.get_state())
+        np.testing.assert_array_equal(restored.get_samples(), engine.get_samples())
+        self.assertEqual(restored.get_mah_test_info(), engine.get_mah_test_info())
+
+    def test_recover_after_crash(self):
+        """测试未正常关闭（文件末尾不完整）时恢复出与崩溃前相同的状态"""
+        journal = EngineJournal(self.path, checkpoint_records=64)
+        engine = BatteryAnalysisEngine()
+        journal.attach(engine)
+        self.run_test(engine)
+        journal._file.write(b"\x01\xff\xff")   # 模拟崩溃时写了一半的记录
+        journal.detach()
+
+        restored = BatteryAnalysisEngine()
+        recovered = EngineJournal(self.path)
+        self.assertTrue(recovered.recover(restored))
+        self.assertEngineEqual(restored, engine)
+        self.assertTrue(restored.mah_test_active)
+
+        # 恢复后继续记录，再次恢复结果仍一致
+        recovered.attach(restored)
+        self.run_test(engine, start=300, count=100)
+        self.run_test(restored, start=300, count=100)
+        again = BatteryAnalysisEngine()
+        self.assertTrue(EngineJournal(self.path).recover(again))
+        self.assertEngineEqual(again, engine)
+        recovered.detach()
+
+    def test_checkpoint_bounds_replay_and_compaction(self):
+        """测试检查点之后的记录数不超过设定值，记录过多时压缩为数据块和检查点"""
+        journal = EngineJournal(self.path, checkpoint_records=32, compact_records=200)
+        engine = BatteryAnalysisEngine()
+        journal.attach(engine)
+        self.run_test(engine, count=500)
+
+        records = list(journal._read_records())
+        self.assertLess(len(records), 200 + 32)
+        last_checkpoint = max(i for i, (kind, _) in enumerate(records) if kind == CHECKPOINT)
+        self.assertLessEqual(len(records) - last_checkpoint - 1, 32)
+
+        restored = BatteryAnalysisEngine()
+        self.assertTrue(EngineJournal(self.path).recover(restored))
+        self.assertEngineEqual(restored, engine)
+        journal.detach()
+
+    def test_recovered_mah_test_resumes_without_downtime(self):
+        """测试恢复后暂停的mAh测试：清空数据后仍保留容量，继续后不计入停机时间"""
+        journal = EngineJournal(self.path)
+        engine = BatteryAnalysisEngine()
+        journal.attach(engine)
+        engine.start_mah_test(3600.0)
+        engine.add_data_block(np.full(11, 4.0), np.full(11, 25.0), np.full(11, 4.0), np.full(11, 25.0),
+                              np.arange(11.0))
+        journal.detach()
+
+        restored = BatteryAnalysisEngine()
+        self.assertTrue(EngineJournal(self.path).recover(restored))
+        restored.suspend_mah_test()
+        capacity = restored.get_mah_capacity()
+        self.assertAlmostEqual(capacity, 10.1)
+        self.assertTrue(restored.get_mah_test_info()['suspended'])
+
+        # 重新开始采集（时间戳从停机后的时刻继续）后继续测试
+        restored.clear_data()
+        self.assertEqual(restored.get_mah_capacity(), capacity)
+        restored.add_data_block(np.full(2, 4.0), np.full(2, 25.0), np.full(2, 4.0), np.full(2, 25.0),
+                                np.array([5000.0, 5001.0]))
+        restored.resume_mah_test()
+        restored.add_data_block(np.full(5, 4.0), np.full(5, 25.0), np.full(5, 4.0), np.full(5, 25.0),
+                                np.arange(5002.0, 5007.0))
+        self.assertAlmostEqual(restored.get_mah_capacity(), capacity + 5.0)
+        info = restored.get_mah_test_info()
+        self.assertTrue(info['active'])
+        self.assertAlmostEqual(info['elapsed_time'], 10.0 + 4.0)
+        self.assertEqual(info['data_points'], 11 + 5)
+
+    def test_clear_and_discard(self):
+        """测试清空数据后不恢复旧数据（校准参数保留），正常退出删除日志"""
+        journal = EngineJournal(self.path)
+        engine = BatteryAnalysisEngine()
+        journal.attach(engine)
+        self.run_test(engine, count=100)
+        engine.clear_data()
+
+        restored = BatteryAnalysisEngine()
+        self.assertFalse(EngineJournal(self.path).recover(restored))
+        self.assertEqual(restored.get_calibration_params(), engine.get_calibration_params())
+
+        journal.discard()
+        self.assertFalse(os.path.exists(self.path))
+        self.assertFalse(EngineJournal(self.path).recover(BatteryAnalysisEngine()))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+LanScanner单元测试
+测试扫描范围解析、并发扫描与 *IDN? 探测
+"""
+
+import socket
+import threading
+import time
+import unittest
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from app.core.lan_scanner import LanScanner
+
+
+class FakeInstrument:
+    """在本机端口上应答 *IDN? 的模拟设备"""
+
+    def __init__(self):
+        self.server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.server.bind(("127.0.0.1", 0))
+        self.server.listen(8)
+        self.port = self.server.getsockname()[1]
+        threading.Thread(target=self._serve, daemon=True).start()
+
+    def _serve(self):
+        while True:
+            try:
+                conn, _ = self.server.accept()
+            except OSError:
+                return
+            with conn:
+                conn.settimeout(1.0)
+                try:
+                    if conn.recv(64).startswith(b"*IDN?"):
+                        conn.sendall(b"HIOKI,LR8450,123456789,V1.00\r\n")
+                except OSError:
+                    pass
+
+    def close(self):
+        self.server.close()
+
+
+class TestLanScanner(unittest.TestCase):
+    """并发扫描测试"""
+
+    def test_hosts_from_cidr(self):
+        """测试CIDR与旧的三段前缀"""
+        self.assertEqual(len(LanScanner.hosts("192.168.2.0/24")), 254)
+        self.assertEqual(LanScanner.hosts("192.168.2"), LanScanner.hosts("192.168.2.0/24"))
+        self.assertEqual(LanScanner.hosts("10.0.0.8/30"), ["10.0.0.9", "10.0.0.10"])
+        self.assertEqual(LanScanner.hosts("10.0.0.8"), ["10.0.0.8"])
+        with self.assertRaises(ValueError):
+            LanScanner.hosts("192.168.300.0/24")
+
+    def test_range_size_limit(self):
+        """测试超过 MAX_HOSTS 的扫描范围被拒绝"""
+        self.assertEqual(len(LanScanner.hosts("10.0.0.0/20")), 4094)
+        with self.assertRaises(ValueError):
+            LanScanner.hosts("10.0.0.0/19")
+        with self.assertRaises(ValueError):
+            LanScanner(concurrency=4).scan("10.0.0.0/8")
+
+    def test_scan_streams_results_with_idn(self):
+        """测试发现设备时立即回调并读取 *IDN?"""
+        device = FakeInstrument()
+        try:
+            scanner = LanScanner(port=device.port, timeout=0.5, probe_idn=True)
+            streamed = []
+            found = scanner.scan(["127.0.0.1", "127.0.0.2"], on_found=streamed.append)
+        finally:
+            device.close()
+
+        self.assertEqual([d.ip_address for d in found], ["127.0.0.1"])
+        self.assertEqual(streamed, found)
+        self.assertEqual(found[0].idn, "HIOKI,LR8450,123456789,V1.00")
+
+    def test_probes_run_concurrently(self):
+        """测试多个主机并行探测"""
+        scanner = LanScanner(concurrency=16)
+
+        def slow_probe(address):
+            time.sleep(0.2)
+            return None
+
+        scanner.probe = slow_probe
+        started = time.monotonic()
+        scanner.scan([f"10.0.0.{i}" for i in range(1, 17)])
+        self.assertLess(time.monotonic() - started, 1.0)
+
+    def test_submits_through_bounded_window(self):
+        """测试按有界窗口逐步提交探测任务，不一次性为所有地址创建任务"""
+        scanner = LanScanner(concurrency=4)
+        pulled = []
+        finished = []
+        outstanding = []
+
+        def addresses():
+            for i in range(1000):
+                pulled.append(i)
+                yield f"10.0.{i // 256}.{i % 256}"
+
+        def probe(address):
+            outstanding.append(len(pulled) - len(finished))
+            finished.append(address)
+            return None
+
+        scanner.probe = probe
+        scanner.scan(addresses())
+        self.assertEqual(len(finished), 1000)
+        self.assertLessEqual(max(outstanding), 8)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,361 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+LR8450Client单元测试
+测试实时数据的批量读取与解析
+"""
+
+import socket
+import unittest
+from unittest.mock import patch, Mock
+
+import numpy as np
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from battery_analyzer.core.lr8450_client import LR8450Client
+from app.core.scpi_transport import SCPITransport
+
+
+class TestBatchRealtimeRead(unittest.TestCase):
+    """批量实时读取测试"""
+
+    def setUp(self):
+        self.client = LR8450Client(ip_address="192.168.1.100")
+        self.channels = ["CH2_1", "CH2_3", "CH2_5"]
+
+    def test_single_round_trip(self):
+        """测试所有通道合并为一条查询"""
+        with patch.object(self.client, 'query',
+                          return_value="+3.70000E+00;+2.51000E+01;+3.65000E+00") as query:
+            data = self.client.get_channel_data(self.channels)
+
+        query.assert_called_once_with(
+            ":MEMory:GETReal;:MEMory:VREAL? CH2_1;:MEMory:VREAL? CH2_3;:MEMory:VREAL? CH2_5")
+        self.assertEqual(data, {"CH2_1": 3.7, "CH2_3": 25.1, "CH2_5": 3.65})
+
+    def test_comma_separated_reply(self):
+        """测试逗号分隔的响应"""
+        with patch.object(self.client, 'query',
+                          return_value="+1.0E+00,+2.0E+00,+3.0E+00"):
+            data = self.client.get_channel_data(self.channels)
+
+        self.assertEqual(list(data.values()), [1.0, 2.0, 3.0])
+
+    def test_nodata_is_skipped(self):
+        """测试过滤NODATA标志"""
+        with patch.object(self.client, 'query',
+                          return_value="+1.0E+00;+9.99999E+99;+3.0E+00"):
+            data = self.client.get_channel_data(self.channels)
+
+        self.assertEqual(data, {"CH2_1": 1.0, "CH2_5": 3.0})
+
+    def test_fallback_to_single_mode(self):
+        """测试响应数量不符时回退到逐通道读取"""
+        with patch.object(self.client, 'query', return_value="+1.0E+00"), \
+                patch.object(self.client, 'write', return_value=True), \
+                patch('battery_analyzer.core.lr8450_client.time.sleep'):
+            self.client.get_channel_data(self.channels)
+
+        self.assertEqual(self.client.realtime_mode, "single")
+
+    def test_timeout_keeps_batch_mode(self):
+        """测试无应答且设备未报告错误时重新同步，下次仍用批量读取"""
+        replies = {"*ESR?": "0"}
+        with patch.object(self.client, 'query', side_effect=lambda cmd, **kwargs: replies.get(cmd)), \
+                patch.object(self.client, '_resync') as resync:
+            data = self.client.get_channel_data(self.channels)
+
+        self.assertEqual(data, {})
+        self.assertEqual(self.client.realtime_mode, "batch")
+        resync.assert_called_once()
+
+    def test_device_error_falls_back(self):
+        """测试设备报告命令错误时改用逐通道读取"""
+        replies = {"*ESR?": "32", ":ERRor?": "-100", "*OPC?": "1", ":MEMory:VREAL? CH2_1": "+1.0E+00"}
+        with patch.object(self.client, 'query', side_effect=lambda cmd, **kwargs: replies.get(cmd)), \
+                patch.object(self.client, 'write', return_value=True), \
+                patch('battery_analyzer.core.lr8450_client.time.sleep'):
+            data = self.client.get_channel_data(self.channels)
+
+        self.assertEqual(data, {"CH2_1": 1.0})
+        self.assertEqual(self.client.realtime_mode, "single")
+
+
+class TestBinaryRealtimeRead(unittest.TestCase):
+    """二进制实时读取测试"""
+
+    def setUp(self):
+        self.client = LR8450Client(ip_address="192.168.1.100", realtime_mode="binary")
+        self.sock = Mock()
+        self.client.transport = SCPITransport(self.sock)
+
+    def _reply(self, payload):
+        chunks = [payload]
+
+        def recv_into(buffer):
+            chunk = chunks.pop(0)
+            buffer[:len(chunk)] = chunk
+            return len(chunk)
+
+        self.sock.recv_into.side_effect = recv_into
+
+    def test_range_scale(self):
+        """测试量程换算系数"""
+        self.assertAlmostEqual(LR8450Client.range_scale("VOLTAGE", 10), 0.0005)
+        self.assertAlmostEqual(LR8450Client.range_scale("VOLTAGE", 15), 0.0005)
+        self.assertAlmostEqual(LR8450Client.range_scale("TC", 100), 0.01)
+        self.assertAlmostEqual(LR8450Client.range_scale("TC", 2000), 0.1)
+
+    def test_decode_analog_channels(self):
+        """测试模拟通道原始值解码与换算"""
+        self.client.channel_scales = {"CH2_1": 0.0005, "CH2_3": 0.01}
+        # 7400 × 0.0005 = 3.7V，2510 × 0.01 = 25.1°C
+        self._reply(b"#0\x1c\xe8;#0\x09\xce\r\n")
+
+        data = self.client.get_channel_data(["CH2_1", "CH2_3"])
+
+        sent = self.sock.sendall.call_args[0][0]
+        self.assertEqual(sent, b":MEMory:GETReal;:MEMory:BFETch? CH2_1;:MEMory:BFETch? CH2_3\r\n")
+        self.assertAlmostEqual(data["CH2_1"], 3.7)
+        self.assertAlmostEqual(data["CH2_3"], 25.1)
+
+    def test_unknown_range_uses_scaled_read(self):
+        """测试无法获取量程时不缓存猜测的系数，本次改用已换算的批量读取"""
+        replies = {":MEMory:GETReal;:MEMory:VREAL? CH2_1": "+3.70000E+00"}
+        with patch.object(self.client, 'query', side_effect=lambda cmd: replies.get(cmd)):
+            with self.assertRaises(ValueError):
+                self.client.get_channel_scale("CH2_1")
+            data = self.client.get_channel_data(["CH2_1"])
+
+        self.assertEqual(data, {"CH2_1": 3.7})
+        self.assertEqual(self.client.channel_scales, {})
+        self.assertEqual(self.client.realtime_mode, "binary")
+        self.sock.sendall.assert_not_called()
+
+    def test_timeout_keeps_binary_mode(self):
+        """测试二进制读取超时后重新同步，不改用批量读取"""
+        self.client.channel_scales = {"CH2_1": 0.0005}
+        self.sock.recv_into.side_effect = socket.timeout()
+        with patch.object(self.client, 'query', return_value="0"), \
+                patch.object(self.client, '_resync') as resync:
+            data = self.client.get_channel_data(["CH2_1"])
+
+        self.assertEqual(data, {})
+        self.assertEqual(self.client.realtime_mode, "binary")
+        resync.assert_called_once()
+
+    def test_invalid_codes_are_nan(self):
+        """测试NODATA/OVER值为NaN"""
+        self.client.channel_scales = {"CH1_1": 0.0005, "CH1_2": 0.0005}
+        self._reply(b"#0\x7f\xfd#0\x80\x00")
+
+        values = self.client.fetch_realtime_binary(["CH1_1", "CH1_2"])
+
+        self.assertTrue(np.isnan(values).all())
+
+
+class TestCommandSync(unittest.TestCase):
+    """*OPC? 命令同步测试"""
+
+    def setUp(self):
+        self.client = LR8450Client(ip_address="192.168.1.100")
+        self.sock = Mock()
+        self.client.transport = SCPITransport(self.sock)
+
+    def test_writes_are_not_delayed(self):
+        """测试 *OPC? 方式下写命令不等待"""
+        with patch('battery_analyzer.core.lr8450_client.time.sleep') as sleep, \
+                patch.object(self.client, 'query', return_value="1") as query:
+            self.client.write(":UNIT:STORe CH2_1,ON")
+            self.client.write(":UNIT:RANGe CH2_1,10")
+            self.assertTrue(self.client.wait_complete(legacy_delay=0.5))
+
+        sleep.assert_not_called()
+        query.assert_called_once_with("*OPC?", timeout=5.0)
+        self.assertEqual(self.sock.sendall.call_count, 2)
+
+    def test_fallback_to_legacy_timing(self):
+        """测试 *OPC? 无应答时改用固定延时"""
+        with patch('battery_analyzer.core.lr8450_client.time.sleep') as sleep, \
+                patch.object(self.client, 'query', return_value=None):
+            self.client.wait_complete(legacy_delay=0.5)
+            self.client.write(":STOP")
+
+        self.assertEqual(self.client.sync_mode, "legacy")
+        self.assertEqual([c.args[0] for c in sleep.call_args_list], [0.5, 0.1])
+
+    def test_check_errors(self):
+        """测试 *ESR? 错误位与 :ERRor? 查询"""
+        replies = {"*ESR?": "32", ":ERRor?": "102"}
+        with patch.object(self.client, 'query', side_effect=lambda cmd: replies[cmd]):
+            self.assertEqual(self.client.check_errors(), "ESR=32, ERR=102")
+
+        with patch.object(self.client, 'query', return_value="0"):
+            self.assertIsNone(self.client.check_errors())
+
+
+class FakeMemoryDevice:
+    """模拟存储数据的设备：第n点的原始值为n，可指定在某次读取后断线，
+    或在第stall_after个数据块之后停顿（剩余数据块在下一条命令之前才到达）"""
+
+    def __init__(self, max_point, fail_after=None, stall_after=None):
+        self.max_point = max_point
+        self.fail_after = fail_after
+        self.stall_after = stall_after
+        self.requests = []
+        self.pending = b""
+        self.late = b""
+
+    def settimeout(self, timeout):
+        pass
+
+    def sendall(self, data):
+        command = data.decode("ascii").strip()
+        self.requests.append(command)
+        self.pending += self.late
+        self.late = b""
+        if command == ":MEMory:MAXPoint?":
+            self.pending += f"{self.max_point}\n".encode("ascii")
+            return
+        parts = command.split(";")
+        for point_cmd, data_cmd in zip(parts[::2], parts[1::2]):
+            position = int(point_cmd.split(",")[1])
+            points = int(data_cmd.split()[1])
+            values = np.arange(position, position + points, dtype=">i2")
+            if self.stall_after == 0:
+                self.late += b"#0" + values.tobytes()
+                continue
+            if self.stall_after is not None:
+                self.stall_after -= 1
+            self.pending += b"#0" + values.tobytes()
+        if self.late:
+            self.stall_after = None
+
+    def recv_into(self, buffer):
+        if self.fail_after is not None and len(self.requests) > self.fail_after:
+            self.fail_after = None
+            self.pending = b""
+            return 0
+        if not self.pending and self.late:
+            raise socket.timeout()
+        chunk = self.pending[:len(buffer)]
+        self.pending = self.pending[len(chunk):]
+        buffer[:len(chunk)] = chunk
+        return len(chunk)
+
+
+class TestMemoryDownload(unittest.TestCase):
+    """存储数据批量下载测试"""
+
+    def setUp(self):
+        self.client = LR8450Client(ip_address="192.168.1.100")
+        self.client.channel_scales = {"CH2_1": 0.0005, "CH2_3": 0.0005}
+
+    def _attach(self, device):
+        self.client.transport = SCPITransport(device)
+        self.client.connected = True
+
+    def test_download_in_blocks(self):
+        """测试分块读取与进度回调"""
+        device = FakeMemoryDevice(12000)
+        self._attach(device)
+        progress = []
+
+        download = self.client.download_memory(
+            ["CH2_1"], progress_callback=lambda done, total: progress.append((done, total)))
+
+        self.assertTrue(download.finished)
+        np.testing.assert_array_equal(download.raw["CH2_1"], np.arange(12000))
+        self.assertEqual(progress, [(5000, 12000), (10000, 12000), (12000, 12000)])
+        self.assertEqual(device.requests[1], ":MEMory:POINt CH2_1,0;:MEMory:BDATa? 5000")
+
+    def test_resume_after_disconnect(self):
+        """测试断线重连后从最后完成的数据块继续"""
+        device = FakeMemoryDevice(3000, fail_after=3)
+        self._attach(device)
+
+        def reconnect():
+            self._attach(device)
+            return True
+
+        with patch.object(self.client, 'connect', side_effect=reconnect), \
+                patch('battery_analyzer.core.lr8450_client.time.sleep'):
+            download = self.client.download_memory(
+                ["CH2_1", "CH2_3"], start=1000, count=2000, block_size=1000)
+
+        self.assertTrue(download.finished)
+        for channel in ("CH2_1", "CH2_3"):
+            np.testing.assert_array_equal(download.raw[channel], np.arange(1000, 3000))
+        # 第3块（CH2_3起始块）中断后重新请求同一位置
+        self.assertEqual(device.requests[3], device.requests[4])
+        self.assertAlmostEqual(download.to_physical()["CH2_1"][0], 0.5)
+
+    def test_read_memory_points(self):
+        """测试连续采集时按位置读取新数据点"""
+        device = FakeMemoryDevice(12000)
+        self._attach(device)
+
+        values = self.client.read_memory_points(["CH2_1"], 200, 3)
+
+        self.assertEqual(device.requests, [":MEMory:POINt CH2_1,200;:MEMory:BDATa? 3"])
+        np.testing.assert_allclose(values["CH2_1"], [0.1, 0.1005, 0.101])
+
+    def test_timeout_mid_block_resyncs(self):
+        """测试数据块读取超时后重新连接，下一次读取不会读到上一次迟到的数据块"""
+        self._attach(FakeMemoryDevice(12000, stall_after=1))
+        fresh = FakeMemoryDevice(12000)
+
+        def reconnect():
+            self._attach(fresh)
+            return True
+
+        with patch.object(self.client, 'connect', side_effect=reconnect) as connect:
+            with self.assertRaises(TimeoutError):
+                self.client.read_memory_points(["CH2_1", "CH2_3"], 100, 4, timeout=0.05)
+            connect.assert_called_once()
+            values = self.client.read_memory_points(["CH2_1", "CH2_3"], 104, 4)
+
+        for channel in ("CH2_1", "CH2_3"):
+            np.testing.assert_allclose(values[channel], np.arange(104, 108) * 0.0005)
+        self.assertEqual(fresh.requests, [
+            ":MEMory:POINt CH2_1,104;:MEMory:BDATa? 4;:MEMory:POINt CH2_3,104;:MEMory:BDATa? 4"])
+
+    def test_read_memory_points_text(self):
+        """测试USB连接时用 :MEMory:VDATa? 读取"""
+        self.client.connected = True
+        with patch.object(self.client, 'query',
+                          return_value="+1.0E+00,+9.99999E+99;+2.0E+00,+3.0E+00") as query:
+            values = self.client.read_memory_points(["CH2_1", "CH2_3"], 10, 2)
+
+        query.assert_called_once_with(
+            ":MEMory:POINt CH2_1,10;:MEMory:VDATa? 2;"
+            ":MEMory:POINt CH2_3,10;:MEMory:VDATa? 2", timeout=3.0)
+        np.testing.assert_array_equal(values["CH2_1"], [1.0, np.nan])
+        np.testing.assert_array_equal(values["CH2_3"], [2.0, 3.0])
+
+    def test_read_memory_points_unknown_range(self):
+        """测试无法获取量程时改用 :MEMory:VDATa? 读取已换算的值"""
+        device = FakeMemoryDevice(12000)
+        self._attach(device)
+        replies = {":MEMory:POINt CH2_5,10;:MEMory:VDATa? 2": "+1.0E+00,+2.0E+00"}
+        with patch.object(self.client, 'query',
+                          side_effect=lambda cmd, **kwargs: replies.get(cmd)):
+            values = self.client.read_memory_points(["CH2_5"], 10, 2)
+
+        np.testing.assert_array_equal(values["CH2_5"], [1.0, 2.0])
+        self.assertNotIn("CH2_5", self.client.channel_scales)
+        self.assertEqual(device.requests, [])
+
+    def test_range_check(self):
+        """测试超出存储范围"""
+        self._attach(FakeMemoryDevice(100))
+        with patch.object(self.client, 'query', return_value="100"):
+            with self.assertRaises(ValueError):
+                self.client.download_memory(["CH2_1"], start=50, count=100)
+
+
+if __name__ == '__main__':
+    unittest.main()
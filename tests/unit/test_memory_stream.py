@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+MemoryStream单元测试
+测试按设备写入位置连续读取存储数据
+"""
+
+import unittest
+
+import numpy as np
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from battery_analyzer.core.memory_stream import MemoryStream
+
+
+class FakeClient:
+    """模拟设备存储：第n点的值为n，written为已写入点数，top为最早可读的点"""
+
+    def __init__(self, interval="+10.0E-03"):
+        self.interval = interval
+        self.top = 0
+        self.written = 0
+        self.reads = []
+
+    def query(self, command, timeout=3.0):
+        if command == ":CONFigure:SAMPle?":
+            return self.interval
+        if command == ":MEMory:TOPPoint?;:MEMory:MAXPoint?":
+            return f"{self.top};{self.written}"
+        return None
+
+    def read_memory_points(self, channels, start, count, timeout=3.0):
+        self.reads.append((start, count))
+        return {channel: np.arange(start, start + count, dtype=np.float64)
+                for channel in channels}
+
+
+class TestMemoryStream(unittest.TestCase):
+    """存储连续读取测试"""
+
+    def setUp(self):
+        self.client = FakeClient()
+        self.stream = MemoryStream(self.client, ["CH2_1", "CH2_3"], batch_size=100)
+        self.assertTrue(self.stream.start())
+
+    def test_every_sample_once(self):
+        """测试轮询快慢不同时每个点恰好读取一次"""
+        indices = []
+        for written in (0, 30, 30, 250, 260):
+            self.client.written = written
+            batch = self.stream.poll()
+            indices.extend(batch.indices.tolist())
+            np.testing.assert_array_equal(batch.values["CH2_3"], batch.indices)
+
+        # 最后一次轮询时积压的点按batch_size分批读取
+        self.client.written = 260
+        indices.extend(self.stream.poll().indices.tolist())
+        self.assertEqual(indices, list(range(260)))
+        self.assertEqual(self.client.reads, [(0, 30), (30, 100), (130, 100), (230, 30)])
+
+    def test_interval_with_response_header(self):
+        """测试开启响应头时也能解析采样间隔"""
+        self.client.interval = ":CONFIGURE:SAMPLE 1.0E-02"
+        self.assertTrue(self.stream.start())
+        self.assertEqual(self.stream.interval, 0.01)
+
+    def test_device_timestamps(self):
+        """测试时间戳来自设备采样序号与采样间隔"""
+        self.client.written = 3
+        batch = self.stream.poll()
+        np.testing.assert_allclose(batch.timestamps, [0.0, 0.01, 0.02])
+
+    def test_overwritten_samples_are_counted(self):
+        """测试设备存储覆盖未读取的点时记录丢失数量"""
+        self.client.top, self.client.written = 500, 550
+        batch = self.stream.poll()
+        self.assertEqual(batch.lost, 500)
+        self.assertEqual(batch.start_index, 500)
+        self.assertEqual(self.stream.lost_total, 500)
+
+    def test_unsupported_device(self):
+        """测试设备不支持存储读取"""
+        self.client.interval = None
+        self.assertFalse(MemoryStream(self.client, ["CH2_1"]).start())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+MinMaxPyramid单元测试
+测试增量构建、按像素宽度选择层级以及尖峰保留
+"""
+
+import unittest
+
+import numpy as np
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from app.core.minmax_pyramid import MinMaxPyramid
+
+
+class TestMinMaxPyramid(unittest.TestCase):
+    """最大/最小值金字塔测试"""
+
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.x = np.arange(50000, dtype=float) * 0.1
+        self.y = rng.normal(size=(2, 50000))
+        self.y[0, 31234] = 40.0
+        self.y[1, 777] = -40.0
+
+    def test_incremental_matches_bulk(self):
+        """测试分批追加与一次性写入得到相同的摘要"""
+        bulk = MinMaxPyramid(2, factor=4)
+        bulk.extend(self.x, self.y)
+        incremental = MinMaxPyramid(2, factor=4)
+        for start in range(0, len(self.x), 333):
+            incremental.extend(self.x[start:start + 333], self.y[:, start:start + 333])
+
+        self.assertEqual(len(incremental), len(bulk))
+        self.assertEqual(incremental.levels, bulk.levels)
+        for pixels in (50, 400, 3000):
+            x_a, y_a = incremental.query(0, self.x[-1], pixels)
+            x_b, y_b = bulk.query(0, self.x[-1], pixels)
+            np.testing.assert_array_equal(x_a, x_b)
+            np.testing.assert_array_equal(y_a, y_b)
+
+    def test_zoomed_out_keeps_peaks(self):
+        """测试缩小显示时点数与像素宽度相当，且尖峰不丢失"""
+        pyramid = MinMaxPyramid(2)
+        pyramid.extend(self.x, self.y)
+
+        x, y = pyramid.query(0, self.x[-1], 500)
+        self.assertLessEqual(y.shape[1], 4 * 500)
+        self.assertEqual(y[0].max(), 40.0)
+        self.assertEqual(y[1].min(), -40.0)
+        self.assertEqual(x[0][y[0].argmax()], self.x[31234])
+        self.assertTrue(np.all(np.diff(x[0]) >= 0))
+
+    def test_zoomed_in_returns_raw_view(self):
+        """测试放大到少量点时直接返回原始数据（零拷贝）"""
+        pyramid = MinMaxPyramid(2)
+        pyramid.extend(self.x, self.y)
+
+        x, y = pyramid.query(100.0, 110.0, 800, rows=[1])
+        self.assertEqual(y.shape[0], 1)
+        np.testing.assert_array_equal(y[0], self.y[1, 999:1102])
+        np.testing.assert_array_equal(x[0], self.x[999:1102])
+        self.assertTrue(np.shares_memory(y, pyramid.y))
+
+    def test_nan_and_clear(self):
+        """测试NaN不影响摘要，clear后可重新写入"""
+        pyramid = MinMaxPyramid(1, factor=2)
+        values = np.array([[1.0, np.nan, 3.0, np.nan, np.nan, np.nan, 2.0, 0.5]])
+        pyramid.extend(np.arange(8.0), values)
+        _, y = pyramid.query(0, 7, 1)
+        self.assertEqual(np.nanmax(y), 3.0)
+        self.assertEqual(np.nanmin(y), 0.5)
+
+        pyramid.clear()
+        self.assertEqual(len(pyramid), 0)
+        pyramid.append(0.0, [5.0])
+        _, y = pyramid.query(0, 1, 10)
+        np.testing.assert_array_equal(y, [[5.0]])
+
+    def test_stored_levels_build_finer_levels_on_zoom(self):
+        """测试由保存的粗层级打开：显示全程不计算细层级，放大时才计算，结果与完整构建相同"""
+        full = MinMaxPyramid.from_arrays(self.x, self.y)
+        stored = full.stored_levels(max_buckets=100)
+        self.assertEqual(min(stored), 2)
+        pyramid = MinMaxPyramid.from_levels(self.x, self.y, stored)
+        self.assertEqual(pyramid.levels, full.levels)
+
+        for x_max, pixels in ((self.x[-1], 50), (1000.0, 400), (100.0, 300)):
+            x_a, y_a = pyramid.query(0, x_max, pixels)
+            x_b, y_b = full.query(0, x_max, pixels)
+            np.testing.assert_array_equal(x_a, x_b)
+            np.testing.assert_array_equal(y_a, y_b)
+            if x_max == self.x[-1]:
+                self.assertIsNone(pyramid._levels[0])  # 全程只读保存的层级
+
+        self.assertIsNotNone(pyramid._levels[0])
+        pyramid.extend(self.x[-1:] + 1, np.zeros((2, 1)))
+        self.assertEqual(len(pyramid), len(self.x) + 1)
+
+    def test_deferred_loads_only_when_zoomed(self):
+        """测试延迟打开：概览足够时不读取数据，放大后读取并完整构建"""
+        loads = []
+
+        def load():
+            loads.append(True)
+            return self.x, self.y
+
+        # 概览为每1000点的首尾时间和最小/最大值
+        edges = np.arange(0, len(self.x), 1000)
+        overview_x = np.column_stack((self.x[edges], self.x[edges + 999])).ravel()
+        overview_y = np.empty((2, 2 * len(edges)))
+        overview_y[:, ::2] = self.y.reshape(2, -1, 1000).min(axis=2)
+        overview_y[:, 1::2] = self.y.reshape(2, -1, 1000).max(axis=2)
+        pyramid = MinMaxPyramid.deferred(2, len(self.x), MinMaxPyramid.from_arrays(overview_x, overview_y), load)
+
+        self.assertEqual(len(pyramid), len(self.x))
+        self.assertEqual(pyramid.time_range(), (0.0, self.x[-1]))
+        _, y = pyramid.query(0, self.x[-1], 50)
+        self.assertEqual(y[0].max(), 40.0)
+        self.assertEqual(loads, [])
+
+        x, y = pyramid.query(100.0, 110.0, 800)
+        self.assertEqual(loads, [True])
+        np.testing.assert_array_equal(y[1], self.y[1, 999:1102])
+        self.assertEqual(pyramid.levels, MinMaxPyramid.from_arrays(self.x, self.y).levels)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+RenderScheduler单元测试
+测试按帧率合并刷新、KPI低频刷新以及窗口最小化时暂停
+"""
+
+import time
+import unittest
+
+import sys
+import os
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from PySide6.QtWidgets import QApplication, QWidget
+
+from battery_analyzer.ui.render_scheduler import RenderScheduler
+
+
+def process_events(seconds):
+    """处理Qt事件一段时间（定时器在事件循环中触发）"""
+    app = QApplication.instance()
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        app.processEvents()
+        time.sleep(0.005)
+
+
+class TestRenderScheduler(unittest.TestCase):
+    """界面刷新调度测试"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QApplication.instance() or QApplication([])
+        if not isinstance(cls.app, QApplication):
+            raise unittest.SkipTest("已存在非界面的QCoreApplication")
+
+    def setUp(self):
+        self.curve_frames = 0
+        self.kpi_frames = 0
+        self.window = QWidget()
+        self.window.show()
+        self.scheduler = RenderScheduler(self._render_curves, self._render_kpis,
+                                         fps=50.0, kpi_fps=5.0)
+        self.scheduler.watch(self.window)
+
+    def tearDown(self):
+        self.window.close()
+
+    def _render_curves(self):
+        self.curve_frames += 1
+
+    def _render_kpis(self):
+        self.kpi_frames += 1
+
+    def test_frames_independent_of_sample_rate(self):
+        """测试大量数据到达时刷新次数受帧率限制"""
+        deadline = time.monotonic() + 0.5
+        samples = 0
+        while time.monotonic() < deadline:
+            for _ in range(50):
+                self.scheduler.mark_dirty()
+                samples += 1
+            process_events(0.005)
+        process_events(0.1)
+
+        self.assertGreater(samples, 1000)
+        self.assertGreater(self.curve_frames, 5)
+        self.assertLessEqual(self.curve_frames, 35)
+        self.assertLessEqual(self.kpi_frames, 5)
+        self.assertLess(self.kpi_frames, self.curve_frames)
+
+    def test_no_frames_without_data(self):
+        """测试没有新数据时不重绘"""
+        process_events(0.1)
+        self.assertEqual(self.curve_frames, 0)
+
+    def test_paused_while_minimized(self):
+        """测试窗口最小化时暂停，恢复时补绘"""
+        self.window.showMinimized()
+        process_events(0.05)
+        self.assertTrue(self.scheduler.is_paused())
+
+        self.scheduler.mark_dirty()
+        process_events(0.1)
+        self.assertEqual(self.curve_frames, 0)
+
+        self.window.showNormal()
+        process_events(0.05)
+        self.assertFalse(self.scheduler.is_paused())
+        self.assertEqual(self.curve_frames, 1)
+        self.assertEqual(self.kpi_frames, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
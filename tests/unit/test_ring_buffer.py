@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+RingBuffer单元测试
+测试多通道环形缓冲区的覆盖、连续视图与容量调整
+"""
+
+import unittest
+
+import numpy as np
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from app.core.ring_buffer import RingBuffer
+
+
+class TestRingBuffer(unittest.TestCase):
+    """环形缓冲区测试"""
+
+    def setUp(self):
+        self.buffer = RingBuffer(["x", "v"], capacity=4)
+
+    def test_keeps_latest_points(self):
+        """测试超过容量后保留最新的点，视图连续且零拷贝"""
+        for i in range(11):
+            self.buffer.append((i, 10 * i))
+            expected = np.arange(max(0, i - 3), i + 1)
+            np.testing.assert_array_equal(self.buffer.view("x"), expected)
+            np.testing.assert_array_equal(self.buffer["v"], 10 * expected)
+
+        view = self.buffer.view("x")
+        self.assertTrue(view.flags.c_contiguous)
+        self.assertFalse(view.flags.writeable)
+        self.assertFalse(view.flags.owndata)
+        self.assertEqual(self.buffer.last("v"), 100.0)
+
+    def test_extend_blocks(self):
+        """测试成批写入，包括超过容量的数据块"""
+        self.buffer.extend([[0, 1, 2], [0, 10, 20]])
+        self.buffer.extend([[3, 4], [30, 40]])
+        np.testing.assert_array_equal(self.buffer.view("x"), [1, 2, 3, 4])
+
+        self.buffer.extend(np.vstack([np.arange(10), np.arange(10)]))
+        np.testing.assert_array_equal(self.buffer.view("v"), [6, 7, 8, 9])
+
+        with self.assertRaises(ValueError):
+            self.buffer.extend([[1, 2]])
+
+    def test_set_capacity_and_load(self):
+        """测试调整容量与从列数据恢复"""
+        self.buffer.load({"x": [1, 2, 3], "v": [4, 5, 6]})
+        self.buffer.set_capacity(2)
+        self.assertEqual(self.buffer.to_lists(), {"x": [2.0, 3.0], "v": [5.0, 6.0]})
+
+        self.buffer.set_capacity(1000)
+        self.buffer.extend(np.ones((2, 998)))
+        self.assertEqual(len(self.buffer), 1000)
+        self.buffer.clear()
+        self.assertEqual(len(self.buffer), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+SampleQueue单元测试
+测试有界队列的溢出策略、计数与高水位回调
+"""
+
+import threading
+import time
+import unittest
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from app.core.sample_queue import SampleQueue
+
+
+class TestSampleQueue(unittest.TestCase):
+    """有界队列测试"""
+
+    def test_drop_oldest(self):
+        """测试队列满时丢弃最早的数据"""
+        queue = SampleQueue(3, "drop_oldest")
+        for i in range(5):
+            self.assertTrue(queue.put(i))
+        self.assertEqual(queue.drain(), [2, 3, 4])
+        stats = queue.stats()
+        self.assertEqual((stats.dropped, stats.coalesced, stats.peak_depth), (2, 0, 3))
+
+    def test_coalesce_to_latest(self):
+        """测试队列满时用新数据替换最新一项"""
+        queue = SampleQueue(2, "coalesce")
+        for i in range(4):
+            queue.put(i)
+        self.assertEqual(queue.drain(), [0, 3])
+        self.assertEqual(queue.stats().coalesced, 2)
+
+    def test_coalesce_with_merge(self):
+        """测试合并函数把新数据并入最新一项"""
+        queue = SampleQueue(2, "coalesce", merge=lambda older, newer: older + newer)
+        for item in ([1], [2], [3], [4]):
+            queue.put(item)
+        self.assertEqual(queue.drain(), [[1], [2, 3, 4]])
+
+    def test_block_until_consumed(self):
+        """测试队列满时生产者等待消费者"""
+        queue = SampleQueue(1, "block", block_timeout=2.0)
+        queue.put(1)
+        consumer = threading.Timer(0.1, queue.drain)
+        consumer.start()
+        started = time.monotonic()
+        self.assertTrue(queue.put(2))
+        self.assertGreaterEqual(time.monotonic() - started, 0.05)
+        consumer.join()
+        self.assertEqual(queue.drain(), [2])
+        self.assertEqual(queue.stats().dropped, 0)
+
+    def test_block_timeout_drops(self):
+        """测试等待超时后丢弃新数据"""
+        queue = SampleQueue(1, "block", block_timeout=0.05)
+        queue.put(1)
+        self.assertFalse(queue.put(2))
+        self.assertEqual(queue.stats().dropped, 1)
+        self.assertEqual(queue.drain(), [1])
+
+    def test_high_watermark_callback(self):
+        """测试高水位回调只在越过水位时触发一次，取出后重新启用"""
+        calls = []
+        queue = SampleQueue(10, high_watermark=0.5,
+                            on_high_watermark=lambda depth, capacity: calls.append((depth, capacity)))
+        for i in range(8):
+            queue.put(i)
+        self.assertEqual(calls, [(5, 10)])
+        queue.drain()
+        for i in range(5):
+            queue.put(i)
+        self.assertEqual(calls, [(5, 10), (5, 10)])
+
+    def test_invalid_policy(self):
+        """测试未知溢出策略"""
+        with self.assertRaises(ValueError):
+            SampleQueue(10, "grow")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+SCPITransport单元测试
+测试缓冲读取、行切分以及剩余字节的保留
+"""
+
+import unittest
+import socket
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from app.core.scpi_transport import SCPITransport
+
+
+class FakeSocket:
+    """按预设分片返回数据的模拟socket"""
+
+    def __init__(self, chunks):
+        self.chunks = list(chunks)
+        self.sent = []
+        self.recv_calls = 0
+
+    def settimeout(self, timeout):
+        pass
+
+    def sendall(self, data):
+        self.sent.append(data)
+
+    def recv_into(self, buffer):
+        self.recv_calls += 1
+        if not self.chunks:
+            raise socket.timeout()
+        chunk = self.chunks.pop(0)
+        if isinstance(chunk, Exception):
+            raise chunk
+        buffer[:len(chunk)] = chunk
+        return len(chunk)
+
+
+class TestSCPITransport(unittest.TestCase):
+    """SCPITransport单元测试"""
+
+    def test_send_line_appends_terminator(self):
+        """测试发送命令时附加CR+LF"""
+        sock = FakeSocket([])
+        SCPITransport(sock).send_line("*IDN?")
+        self.assertEqual(sock.sent, [b"*IDN?\r\n"])
+
+    def test_readline_strips_crlf(self):
+        """测试CR+LF结尾的响应"""
+        sock = FakeSocket([b"HIOKI,LR8450,V1.00\r\n"])
+        transport = SCPITransport(sock)
+        self.assertEqual(transport.readline(), "HIOKI,LR8450,V1.00")
+        self.assertEqual(sock.recv_calls, 1)
+
+    def test_readline_across_chunks(self):
+        """测试响应被拆分到多个分片"""
+        sock = FakeSocket([b"+1.23", b"000E", b"-02\n"])
+        transport = SCPITransport(sock)
+        self.assertEqual(transport.readline(), "+1.23000E-02")
+
+    def test_leftover_bytes_carry_over(self):
+        """测试一次接收多个响应时保留剩余字节"""
+        sock = FakeSocket([b"1\nOFF\r\n+5.0"])
+        transport = SCPITransport(sock)
+        self.assertEqual(transport.readline(), "1")
+        self.assertEqual(transport.readline(), "OFF")
+        self.assertEqual(transport.pending(), 4)
+        sock.chunks.append(b"E-01\n")
+        self.assertEqual(transport.readline(), "+5.0E-01")
+        self.assertEqual(transport.pending(), 0)
+
+    def test_readline_timeout_returns_none(self):
+        """测试超时返回None"""
+        transport = SCPITransport(FakeSocket([]))
+        self.assertIsNone(transport.readline(0.05))
+
+    def test_connection_closed(self):
+        """测试连接被对端关闭"""
+        transport = SCPITransport(FakeSocket([b""]))
+        with self.assertRaises(ConnectionError):
+            transport.readline()
+
+    def test_response_larger_than_buffer(self):
+        """测试超过缓冲区大小的响应"""
+        payload = b",".join(b"+1.00000E-02" for _ in range(20))
+        chunks = [payload[i:i + 16] for i in range(0, len(payload), 16)]
+        transport = SCPITransport(FakeSocket(chunks + [b"\n"]), buffer_size=32)
+        self.assertEqual(transport.readline(), payload.decode("ascii"))
+
+
+class TestBinaryBlock(unittest.TestCase):
+    """IEEE 488.2二进制数据块读取测试"""
+
+    def test_definite_length_block(self):
+        """测试 #<n><len> 形式的数据块"""
+        transport = SCPITransport(FakeSocket([b"#14\x00\x0a\x0d\xff"]))
+        out = bytearray(8)
+        self.assertEqual(transport.read_block_into(out), 4)
+        self.assertEqual(bytes(out[:4]), b"\x00\x0a\x0d\xff")
+
+    def test_indefinite_block_uses_buffer_size(self):
+        """测试 #0 形式的数据块按调用方给定长度读取"""
+        transport = SCPITransport(FakeSocket([b"#0\x12", b"\x34\x56\x78"]))
+        out = bytearray(4)
+        self.assertEqual(transport.read_block_into(out), 4)
+        self.assertEqual(bytes(out), b"\x12\x34\x56\x78")
+
+    def test_consecutive_blocks_with_separator(self):
+        """测试分号分隔的多个数据块及结尾换行"""
+        sock = FakeSocket([b"#0\x00\x01;#0\x00\x02\n+1\n"])
+        transport = SCPITransport(sock)
+        out = bytearray(4)
+        view = memoryview(out)
+        transport.read_block_into(view[0:2])
+        transport.read_block_into(view[2:4])
+        transport.skip_terminator()
+        self.assertEqual(bytes(out), b"\x00\x01\x00\x02")
+        self.assertEqual(transport.readline(), "+1")
+
+    def test_invalid_header(self):
+        """测试非二进制响应"""
+        transport = SCPITransport(FakeSocket([b"+1.0E+00\n"]))
+        with self.assertRaises(ValueError):
+            transport.read_block_into(bytearray(2))
+
+    def test_incomplete_block_times_out(self):
+        """测试数据块不完整时超时"""
+        transport = SCPITransport(FakeSocket([b"#0\x00"]))
+        with self.assertRaises(TimeoutError):
+            transport.read_block_into(bytearray(4), timeout=0.05)
+
+
+if __name__ == '__main__':
+    unittest.main()
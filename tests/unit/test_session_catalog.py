@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+SessionCatalog单元测试
+测试登记与更新、按条件检索排序以及从已有文件导入
+"""
+
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+import sys
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from battery_analyzer.core.session_catalog import (
+    CatalogEntry, SessionCatalog, channel_config_hash, summarize_columns)
+from battery_analyzer.core.waveform_file import save_waveform
+
+
+class TestSessionCatalog(unittest.TestCase):
+    """测试目录测试"""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.catalog = SessionCatalog(os.path.join(self.directory.name, "catalog", "catalog.db"))
+
+    def tearDown(self):
+        self.catalog.close()
+        self.directory.cleanup()
+
+    def path(self, name):
+        return os.path.join(self.directory.name, name)
+
+    def test_search_filters_and_sorting(self):
+        """测试按型号/测试员/时间筛选、SN前缀匹配以及排序"""
+        self.catalog.register(CatalogEntry(self.path("a.bwf"), "waveform", "X1", "SN-001", "张三",
+                                           "2026-09-20T10:00:00", temp_rise=12.0))
+        self.catalog.register(CatalogEntry(self.path("b.bwf"), "waveform", "X1", "SN-002", "张三",
+                                           "2026-10-05T10:00:00", temp_rise=8.0))
+        self.catalog.register(CatalogEntry(self.path("c.bsr"), "session", "X2", "TN-003", "李四",
+                                           "2026-10-06T10:00:00", temp_rise=20.0))
+
+        found = self.catalog.search(product_model="X1", tester="张三", since="2026-10-01")
+        self.assertEqual([entry.path for entry in found], [self.path("b.bwf")])
+        self.assertEqual(len(self.catalog.search(product_sn="SN-")), 2)
+        self.assertEqual([entry.temp_rise for entry in self.catalog.search(order_by='temp_rise', descending=False)],
+                         [8.0, 12.0, 20.0])
+        self.assertEqual(self.catalog.distinct('tester'), ["张三", "李四"])
+        with self.assertRaises(ValueError):
+            self.catalog.search(order_by="path; DROP TABLE tests")
+
+    def test_register_same_path_updates(self):
+        """测试同一文件再次登记时更新原记录，删除记录不影响其他记录"""
+        self.catalog.register(CatalogEntry(self.path("a.bwf"), "waveform", "X1"))
+        self.catalog.register(CatalogEntry(self.path("a.bwf"), "waveform", "X2"))
+        self.catalog.register(CatalogEntry(self.path("b.bwf"), "waveform", "X3"))
+        self.assertEqual(len(self.catalog), 2)
+        self.assertEqual(self.catalog.search(product_model="X2")[0].path, self.path("a.bwf"))
+
+        self.catalog.remove(self.path("a.bwf"))
+        self.assertEqual([entry.product_model for entry in self.catalog.search()], ["X3"])
+
+    def test_register_waveform_file(self):
+        """测试导入已有的波形文件并计算汇总指标"""
+        x = np.arange(5.0)
+        columns = {
+            'x': x,
+            'ternary_voltage': 4.2 - 0.1 * x,
+            'ternary_temp': np.array([25.0, 30.0, 40.0, 35.0, 32.0]),
+            'blade_voltage': 4.0 - 0.05 * x,
+            'blade_temp': np.array([25.0, 26.0, 27.0, 28.0, 29.0]),
+        }
+        config = {'ternary_temp': {'channel': 'CH2_3'}}
+        save_waveform(self.path("w.bwf"), columns, {
+            'product_model': "X1", 'product_sn': "SN-9", 'tester': "王五",
+            'start_time': "2026-10-01T08:00:00", 'channel_config': config,
+            'analysis_data': {'mAh容量': 150.0},
+        })
+
+        entry = self.catalog.register_file(self.path("w.bwf"))
+        self.assertEqual(self.catalog.search(product_sn="SN-9"), [entry])
+        self.assertEqual(entry.points, 5)
+        self.assertEqual(entry.duration, 4.0)
+        self.assertEqual(entry.peak_temp, 40.0)
+        self.assertEqual(entry.temp_rise, 15.0)
+        self.assertAlmostEqual(entry.voltage_drop, 0.4)
+        self.assertEqual(entry.capacity_mah, 150.0)
+        self.assertEqual(entry.channel_hash, channel_config_hash(config))
+
+    def test_summarize_empty_columns(self):
+        """测试没有数据时汇总指标为None"""
+        summary = summarize_columns({'x': np.empty(0), 'ternary_temp': np.empty(0)})
+        self.assertEqual(set(summary.values()), {None})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+SessionRecorder单元测试
+测试分块写入、文件读回、列编码压缩以及崩溃后不完整文件的恢复
+"""
+
+import os
+import tempfile
+import time
+import unittest
+
+import numpy as np
+
+import sys
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from battery_analyzer.core.session_recorder import (
+    SessionReader, SessionRecorder, decode_column, encode_column, read_session)
+
+
+class TestSessionRecorder(unittest.TestCase):
+    """会话记录测试"""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "sessions", "test.bsr")
+        self.data = np.vstack([np.arange(2500) * 0.1, np.sin(np.arange(2500))])
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_round_trip(self):
+        """测试分块写入后完整读回，文件头包含列名和元数据"""
+        recorder = SessionRecorder(self.path, ["timestamp", "voltage"],
+                                   metadata={"product_sn": "SN-1"}, chunk_rows=1000)
+        recorder.start()
+        for start in range(0, 2500, 333):
+            recorder.write(self.data[:, start:start + 333])
+        recorder.close()
+
+        info, data = read_session(self.path)
+        self.assertEqual(info['columns'], ["timestamp", "voltage"])
+        self.assertEqual(info['metadata'], {"product_sn": "SN-1"})
+        np.testing.assert_array_equal(data, self.data)
+        self.assertEqual(recorder.statistics()['chunks_written'], 3)
+        self.assertEqual(recorder.statistics()['dropped_rows'], 0)
+
+    def test_partial_chunk_written_after_interval(self):
+        """测试数据较慢时按落盘间隔写出未满的块（未关闭也能读到）"""
+        recorder = SessionRecorder(self.path, ["timestamp", "voltage"],
+                                   chunk_rows=1000, fsync_interval=0.0)
+        recorder.start()
+        recorder.write(self.data[:, :10])
+        deadline = time.monotonic() + 2.0
+        while recorder.rows_written < 10 and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+        _, data = read_session(self.path)
+        np.testing.assert_array_equal(data, self.data[:, :10])
+        recorder.close()
+
+    def test_truncated_file_recovers_complete_chunks(self):
+        """测试文件末尾不完整（模拟崩溃）时读取此前完整的块"""
+        recorder = SessionRecorder(self.path, ["timestamp", "voltage"], chunk_rows=1000)
+        recorder.start()
+        recorder.write(self.data)
+        recorder.close()
+
+        with open(self.path, 'r+b') as f:
+            f.truncate(os.path.getsize(self.path) - 100)
+
+        _, data = read_session(self.path)
+        np.testing.assert_array_equal(data, self.data[:, :2000])
+
+
+    def test_compressed_chunks_random_access(self):
+        """测试压缩编码的文件小于原始数据，并可单独读取任一数据块"""
+        data = np.vstack([np.arange(5000) * 0.01, 3.7 + np.round(np.sin(np.arange(5000) / 500), 3)])
+        recorder = SessionRecorder(self.path, ["timestamp", "voltage"], chunk_rows=1000,
+                                   codecs={"timestamp": "delta+lzma"}, default_codec="xor+zlib")
+        recorder.start()
+        recorder.write(data)
+        recorder.close()
+
+        self.assertLess(os.path.getsize(self.path), data.nbytes / 2)
+        with SessionReader(self.path) as reader:
+            self.assertEqual(reader.codecs, ["delta+lzma", "xor+zlib"])
+            self.assertEqual(len(reader.chunks), 5)
+            self.assertEqual(reader.rows, 5000)
+            np.testing.assert_array_equal(reader.read_chunk(3), data[:, 3000:4000])
+
+    def test_overview_without_decoding(self):
+        """测试各数据块的摘要：不解压即可得到每块的首尾时间和最小/最大值（按出现顺序）"""
+        data = self.data.copy()
+        data[1, 1500] = np.nan
+        recorder = SessionRecorder(self.path, ["timestamp", "voltage"], chunk_rows=1000)
+        recorder.start()
+        recorder.write(data)
+        recorder.close()
+
+        with SessionReader(self.path) as reader:
+            overview = reader.overview()
+        self.assertEqual(overview.shape, (2, 6))
+        np.testing.assert_array_equal(overview[0], [0.0, 99.9, 100.0, 199.9, 200.0, 249.9])
+        for index, start in enumerate(range(0, 2500, 1000)):
+            voltage = data[1, start:start + 1000]
+            first, last = sorted((np.nanargmin(voltage), np.nanargmax(voltage)))
+            self.assertEqual(list(overview[1, 2 * index:2 * index + 2]), [voltage[first], voltage[last]])
+
+    def test_codecs_are_lossless(self):
+        """测试各编码精确还原（包括NaN、无穷大和负数）"""
+        values = np.array([0.0, -1.5, np.nan, np.inf, 1e-300, -0.0, 12345.678])
+        for codec in ["raw", "xor", "delta+zlib", "xor+lzma"]:
+            decoded = decode_column(encode_column(values, codec), len(values), codec)
+            self.assertEqual(decoded.tobytes(), values.tobytes(), codec)
+        with self.assertRaises(ValueError):
+            SessionRecorder(self.path, ["voltage"], default_codec="xor+gzip")
+
+
+if __name__ == '__main__':
+    unittest.main()
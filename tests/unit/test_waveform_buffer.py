@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+实时波形缓冲区单元测试
+测试波形面板用共用的RingBuffer保存实时数据：固定容量、连续的时间轴以及零拷贝视图
+"""
+
+import unittest
+
+import numpy as np
+
+import sys
+import os
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from PySide6.QtWidgets import QApplication
+
+from app.core.data_acquisition import RealTimeData
+from app.core.ring_buffer import RingBuffer
+from app.ui.widgets.waveform_panel import WaveformPanel
+
+
+class TestWaveformPanelBuffer(unittest.TestCase):
+    """实时通道缓冲区测试"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QApplication.instance() or QApplication([])
+        if not isinstance(cls.app, QApplication):
+            raise unittest.SkipTest("已存在非界面的QCoreApplication")
+
+    def setUp(self):
+        self.panel = WaveformPanel()
+
+    def tearDown(self):
+        self.panel.deleteLater()
+
+    def push(self, values, sample_rate, channel="CH1_1"):
+        values = np.asarray(values, dtype=float)
+        self.panel.update_real_time_data(RealTimeData(0.0, {channel: values}, len(values), sample_rate))
+        return self.panel.real_time_data_buffer[channel]
+
+    def test_keeps_latest_points_with_continuous_time(self):
+        """测试超过容量后保留最新的点，时间轴连续"""
+        self.panel.set_buffer_size(10)
+        for start in range(0, 47, 7):
+            buffer = self.push(np.arange(start, start + 7), sample_rate=10.0)
+
+        self.assertIsInstance(buffer, RingBuffer)
+        np.testing.assert_array_equal(buffer.view("value"), np.arange(39, 49))
+        np.testing.assert_allclose(buffer.view("time"), np.arange(39, 49) / 10.0)
+        self.assertAlmostEqual(self.panel.real_time_next_time["CH1_1"], 4.9)
+
+    def test_curve_uses_buffer_views(self):
+        """测试曲线使用的数据是缓冲区的连续视图"""
+        self.panel.set_buffer_size(8)
+        buffer = self.push(np.ones(5), sample_rate=1.0)
+        self.assertTrue(np.shares_memory(buffer.view("value"), buffer._data))
+        self.assertTrue(buffer.view("time").flags.c_contiguous)
+        x, y = self.panel.real_time_curves["CH1_1"].getData()
+        np.testing.assert_array_equal(y, np.ones(5))
+
+    def test_oversized_block_and_resize(self):
+        """测试单次写入超过容量时时间仍正确，调整容量保留最新的点"""
+        self.panel.set_buffer_size(4)
+        buffer = self.push(np.arange(10), sample_rate=2.0)
+        np.testing.assert_array_equal(buffer.view("value"), [6, 7, 8, 9])
+        np.testing.assert_allclose(buffer.view("time"), [3.0, 3.5, 4.0, 4.5])
+
+        self.panel.set_buffer_size(2)
+        np.testing.assert_array_equal(buffer.view("value"), [8, 9])
+        self.panel.set_buffer_size(6)
+        self.push([10.0], sample_rate=2.0)
+        np.testing.assert_array_equal(buffer.view("value"), [8, 9, 10])
+        np.testing.assert_allclose(buffer.view("time"), [4.0, 4.5, 5.0])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+波形文件单元测试
+测试列式保存、内存映射召回、保存的曲线摘要以及不完整文件的检测
+"""
+
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+import sys
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from app.core.minmax_pyramid import MinMaxPyramid
+from battery_analyzer.core.waveform_file import open_waveform, open_waveform_pyramid, save_waveform
+
+
+class TestWaveformFile(unittest.TestCase):
+    """波形文件测试"""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "test.bwf")
+        self.x = np.arange(10000) * 0.1
+        self.voltage = np.sin(self.x)
+        self.temp = np.cos(self.x) * 10 + 25
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_round_trip_is_memory_mapped(self):
+        """测试保存后以内存映射方式读回，列连续存放"""
+        save_waveform(self.path, {'x': self.x, 'voltage': self.voltage, 'temp': self.temp},
+                      {'product_sn': '电池-01'})
+
+        metadata, names, data = open_waveform(self.path)
+        self.assertEqual(metadata, {'product_sn': '电池-01'})
+        self.assertEqual(names, ['x', 'voltage', 'temp'])
+        self.assertIsInstance(data, np.memmap)
+        np.testing.assert_array_equal(data[0], self.x)
+        np.testing.assert_array_equal(data[2], self.temp)
+        self.assertEqual(os.path.getsize(self.path) % 8, 0)
+
+        # 曲线历史直接建立在映射数据上，不复制原始数据
+        pyramid = MinMaxPyramid.from_arrays(data[0], data[1:], chunk_size=1000)
+        self.assertTrue(np.shares_memory(pyramid.y, data))
+        _, y = pyramid.query(0, self.x[-1], 200)
+        self.assertEqual(y[1].max(), self.temp.max())
+        del pyramid, data
+
+    def test_stored_pyramid_levels_are_memory_mapped(self):
+        """测试保存曲线摘要后召回时直接映射，显示全程不计算细层级，结果与完整计算相同"""
+        x = np.arange(200000) * 0.01
+        y = np.vstack([np.sin(x), np.cos(x) * 10 + 25])
+        y[1, 123456] = 99.0
+        history = MinMaxPyramid.from_arrays(x, y)
+        save_waveform(self.path, {'x': x, 'voltage': y[0], 'temp': y[1]}, {'tester': '张三'}, pyramid=history)
+        self.assertLess(os.path.getsize(self.path), 1.1 * 3 * 8 * len(x))
+
+        metadata, pyramid = open_waveform_pyramid(self.path, ['x', 'voltage', 'temp'])
+        self.assertEqual(metadata, {'tester': '张三'})
+        self.assertEqual(pyramid.time_range(), (0.0, x[-1]))
+        self.assertIsNone(pyramid._levels[0])
+        self.assertIsInstance(pyramid._levels[-1].mins, np.memmap)
+
+        _, overview = pyramid.query(0, x[-1], 1000)
+        self.assertEqual(overview[1].max(), 99.0)
+        self.assertIsNone(pyramid._levels[0])   # 全程只读取保存的层级
+
+        for x_max in (x[-1], 200.0, 20.0):
+            x_a, y_a = pyramid.query(0, x_max, 300)
+            x_b, y_b = history.query(0, x_max, 300)
+            np.testing.assert_array_equal(x_a, x_b)
+            np.testing.assert_array_equal(y_a, y_b)
+
+        # 列顺序不同时重新计算摘要
+        _, reordered = open_waveform_pyramid(self.path, ['x', 'temp', 'voltage'])
+        self.assertEqual(reordered.query(0, x[-1], 1000)[1][0].max(), 99.0)
+        with self.assertRaises(ValueError):
+            open_waveform_pyramid(self.path, ['x', 'current'])
+        del pyramid, reordered
+
+    def test_incomplete_file_and_wrong_format(self):
+        """测试文件被截断或格式不对时报错"""
+        save_waveform(self.path, {'x': self.x, 'voltage': self.voltage})
+        with open(self.path, 'r+b') as f:
+            f.truncate(os.path.getsize(self.path) - 8)
+        with self.assertRaises(ValueError):
+            open_waveform(self.path)
+
+        other = os.path.join(self.directory.name, "other.json")
+        with open(other, 'w', encoding='utf-8') as f:
+            f.write('{"x_data": []}')
+        with self.assertRaises(ValueError):
+            open_waveform(other)
+
+        with self.assertRaises(ValueError):
+            save_waveform(self.path, {'x': self.x, 'voltage': self.voltage[:10]})
+
+
+if __name__ == '__main__':
+    unittest.main()
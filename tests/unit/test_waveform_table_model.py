@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+WaveformTableModel单元测试
+测试按需格式化、按时间跳转以及实时追加与行数上限
+"""
+
+import unittest
+
+import numpy as np
+
+import sys
+import os
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from PySide6.QtCore import Qt
+from PySide6.QtWidgets import QApplication
+
+from app.core.file_parser import ChannelData, WaveformData
+from app.ui.widgets.data_table import WaveformTableModel
+
+
+class TestWaveformTableModel(unittest.TestCase):
+    """数据表模型测试"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QApplication.instance() or QApplication([])
+
+    def setUp(self):
+        self.model = WaveformTableModel()
+
+    def cell(self, row, column):
+        return self.model.data(self.model.index(row, column))
+
+    def test_large_recording_is_not_copied(self):
+        """测试大文件全部行可见，直接读取通道数组"""
+        voltage = np.linspace(0.0, 1.0, 2_000_000)
+        logic = np.zeros(2_000_000)
+        logic[5] = 1.0
+        waveform = WaveformData(
+            channels=[ChannelData("CH1", "analog", "V", voltage, 1000.0),
+                      ChannelData("L1", "logic", "", logic, 1000.0)],
+            start_time="", recording_duration=2000.0, sample_count=2_000_000)
+        self.model.set_waveform(waveform)
+
+        self.assertEqual(self.model.rowCount(), 2_000_000)
+        self.assertEqual(self.model.columnCount(), 3)
+        self.assertEqual(self.model.headerData(1, Qt.Orientation.Horizontal), "CH1 (V)")
+        self.assertIs(self.model._columns[0], voltage)
+        self.assertEqual(self.cell(1_999_999, 0), "1999.999")
+        self.assertEqual(self.cell(1_999_999, 1), "1.000000")
+        self.assertEqual(self.cell(5, 2), "1")
+
+        self.assertEqual(self.model.row_for_time(1234.5675), 1_234_568)
+        self.assertEqual(self.model.row_for_time(1e9), 1_999_999)
+
+    def test_live_append_and_trim(self):
+        """测试实时追加连续时间轴、新通道列以及超过上限时删除最早的行"""
+        self.model.max_live_rows = 10
+        self.model.start_live()
+        self.model.append_samples({"CH1": np.arange(4.0)}, sample_rate=2.0)
+        self.model.append_samples({"CH1": np.arange(4.0, 8.0), "CH2": np.ones(2)}, sample_rate=2.0)
+
+        self.assertEqual(self.model.rowCount(), 8)
+        self.assertEqual(self.model.columnCount(), 3)
+        self.assertEqual(self.cell(0, 2), "")
+        self.assertEqual(self.cell(4, 2), "1.000000")
+        self.assertEqual(self.cell(6, 2), "")
+
+        for start in range(8, 200, 8):
+            self.model.append_samples({"CH1": np.arange(start, start + 8.0)}, sample_rate=2.0)
+        self.assertEqual(self.model.rowCount(), 10)
+        self.assertEqual(self.cell(0, 1), "190.000000")
+        self.assertEqual(self.cell(0, 0), "95.000")
+        self.assertEqual(self.model.row_for_time(97.0), 4)
+
+
+    def test_live_append_after_loading_file(self):
+        """测试采集中打开文件后，新的实时数据不会显示在文件的通道列下"""
+        self.model.start_live()
+        self.model.append_samples({"CH1": np.arange(5.0), "CH2": np.arange(5.0)}, sample_rate=1.0)
+        waveform = WaveformData(
+            channels=[ChannelData("F1", "analog", "V", np.arange(3.0), 1.0)],
+            start_time="", recording_duration=3.0, sample_count=3)
+        self.model.set_waveform(waveform)
+        self.assertFalse(self.model.is_live())
+
+        self.model.append_samples({"CH1": np.array([7.0, 8.0])}, sample_rate=1.0)
+        self.assertEqual(self.model.rowCount(), 2)
+        self.assertEqual(self.model.columnCount(), 2)
+        self.assertEqual(self.model.headerData(1, Qt.Orientation.Horizontal), "CH1")
+        self.assertEqual(self.cell(1, 1), "8.000000")
+        self.assertEqual(self.cell(1, 0), "1.000")
+
+
+if __name__ == '__main__':
+    unittest.main()